@@ -11,7 +11,6 @@ This package provides a modular system for:
 from .database import PostgreSQLVectorDB, RAGDocument
 from .processing import ingest_documents, DocumentProcessor
 from .config import MetadataManager, DB_CONFIG
-from .web import app
 
 __version__ = '0.1.0'
 
@@ -25,4 +24,13 @@ __all__ = [
     'app'
 ]
 
+
+def __getattr__(name):
+    # The web app connects to the database at import, so it is only
+    # imported when asked for (``from src import app``)
+    if name == 'app':
+        from .web import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 """RAG AI system package.""" 
@@ -28,6 +28,16 @@ DB_CONFIG = {
     "port": 5432
 }
 
+# Connection pool configuration
+POOL_CONFIG = {
+    "min_size": 1,  # Connections kept open even when idle
+    "max_size": 10,  # Maximum number of open connections per process
+    "timeout": 30,  # Seconds to wait for a free connection
+    "max_idle": 300,  # Close surplus connections idle for longer than this (seconds)
+    "max_lifetime": 3600,  # Replace connections older than this (seconds)
+    "health_check_interval": 30  # Verify connections idle for longer than this (seconds)
+}
+
 # Default metadata
 DEFAULT_METADATA = {
     "ingested_by": "datasundae",
@@ -46,6 +56,8 @@ URL_CONFIG = {
 DOC_CONFIG = {
     'chunk_size': 1000,  # Number of characters per chunk
     'chunk_overlap': 200,  # Number of characters to overlap between chunks
+    'chunk_tokens': 512,  # Maximum embedding model tokens per chunk (streaming chunker)
+    'chunk_overlap_tokens': 50,  # Tokens of whole sentences repeated from the previous chunk
     'min_chunk_size': 100,  # Minimum chunk size for PDF processing
     'max_chunk_size': 2000,  # Maximum chunk size for PDF processing
     'max_chunks': 100,  # Maximum number of chunks per document
@@ -53,6 +65,40 @@ DOC_CONFIG = {
     'supported_formats': ['.txt', '.pdf'],  # Supported file formats
     'tesseract_path': '/usr/local/bin/tesseract',  # Path to Tesseract OCR executable
     'poppler_path': '/usr/local/bin/pdftoppm',  # Path to Poppler PDF tools
+    'extraction_workers': None,  # Processes for page-parallel PDF extraction, None uses all cores
+    'pages_per_task': 16,  # Pages per extraction shard sent to a worker
+    'parallel_min_pages': 32,  # Extract smaller PDFs in-process (pool start-up is not worth it)
+    'ocr_workers': None,  # Concurrent Tesseract processes for the OCR fallback, None uses all cores
+    'ocr_dpi': 300,  # Resolution pages are rendered at for OCR
+    'ocr_max_pixels': 40_000_000,  # Render oversized pages at a lower DPI to stay under this many pixels
+}
+
+# Staged ingestion pipeline configuration (src/processing/ingest_documents.py)
+INGEST_CONFIG = {
+    'workers': {
+        'extract': 2,  # Files extracted at once (large PDFs also shard pages across processes)
+        'chunk': 1,  # Chunking workers (tokenizer-bound)
+        'write': 2,  # Concurrent database writers (one per pooled connection)
+    },
+    'queue_size': 4,  # Files queued in front of each stage; bounds memory use
+}
+
+# Bulk loading with COPY (src/database/bulk_loader.py)
+BULK_LOAD_CONFIG = {
+    'format': 'binary',  # COPY format: 'binary' (pgvector binary vectors) or 'text'
+    'staging': True,  # COPY into an unlogged staging table, then merge (upserts keyed rows)
+    'defer_indexes': False,  # Drop vector/metadata indexes during the load and rebuild after (locks the table)
+    'read_size': 1 << 20,  # Bytes handed to the server per COPY read
+}
+
+# Re-embedding with a new model (src/database/migrate_embeddings.py)
+EMBEDDING_MIGRATION_CONFIG = {
+    'model': 'sentence-transformers/all-mpnet-base-v2',  # Model to migrate to
+    'source_table': 'documents',  # Table served by the application until cut-over
+    'target_table': 'documents_new',  # Table filled with the new embeddings
+    'batch_size': 256,  # Rows per page: one keyset read, encode call and COPY each
+    'queue_size': 4,  # Pages read/encoded ahead of the writer
+    'dual_write': True,  # Mirror writes on the source into the target with a trigger
 }
 
 # Vector search configuration
@@ -98,17 +144,97 @@ MODEL_CONFIG = {
     'embedding_model': 'sentence-transformers/all-MiniLM-L6-v2',  # Model for generating embeddings
     'embedding_dimension': 384,  # Dimension of the embeddings
     'batch_size': 32,  # Batch size for processing documents
-    'device': 'mps',  # Use Metal Performance Shaders
+    'device': None,  # Torch device for the 'torch' backend, None picks cuda/mps/cpu automatically
+    'backend': 'torch',  # Encoder backend: 'torch', 'torch-int8', 'onnx' or 'onnx-int8' (see src/utils/encoders.py)
+    'num_threads': None,  # Intra-op threads for the ONNX backends, None lets onnxruntime decide
     'num_workers': 10,  # Match number of performance cores
     'use_amp': True,  # Use Automatic Mixed Precision
     'pin_memory': True  # Pin memory for faster data transfer
 }
 
+# Query embedding cache configuration
+QUERY_CACHE_CONFIG = {
+    'max_size': 10000,  # Maximum number of cached query embeddings
+    'ttl': 3600,  # Seconds a cached query embedding stays valid
+    'lowercase': True,  # Lowercase queries in cache keys (the MiniLM model is uncased)
+}
+
+# Search result cache configuration
+RESULT_CACHE_CONFIG = {
+    'max_size': 1000,  # Maximum number of cached top-k result sets
+    'ttl': 300,  # Seconds a result set stays valid (bounds staleness from other processes' writes)
+}
+
+# Semantic answer cache configuration (see src/llm/answer_cache.py)
+ANSWER_CACHE_CONFIG = {
+    'max_size': 1000,  # Maximum number of cached answers
+    'ttl': 3600,  # Seconds a cached answer stays valid
+    'threshold': 0.95,  # Minimum cosine similarity between the cached and the new question
+    'per_user': True,  # Only serve answers to the user who asked the question
+}
+
+# Context packing configuration (see src/llm/context.py)
+CONTEXT_CONFIG = {
+    'max_tokens': 20000,  # Chat model tokens of retrieved context per request
+    'max_chunk_tokens': 4000,  # Longer passages are truncated to this many tokens
+    'min_truncated_tokens': 64,  # Fill the rest of the budget with a truncated passage only if this much is left
+}
+
+# Request tracing configuration (see src/utils/tracing.py)
+TRACING_CONFIG = {
+    'enabled': True,  # Record per-request traces (spans outside a request are never recorded)
+    'buffer_size': 500,  # Recent traces kept in memory for /debug/traces
+    'export_url': os.getenv('TRACING_EXPORT_URL'),  # OTLP/HTTP JSON endpoint of a local collector, e.g. http://localhost:4318/v1/traces
+    'export_queue_size': 1000,  # Traces waiting for export before new ones are dropped
+    'service_name': 'pragi',  # service.name of exported spans
+}
+
+# Prometheus metrics configuration (see src/utils/metrics.py)
+METRICS_CONFIG = {
+    'latency_buckets': (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),  # Histogram buckets in seconds
+    'token_buckets': (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768),  # Histogram buckets for OpenAI token usage
+    'textfile': os.getenv('METRICS_TEXTFILE'),  # node_exporter textfile the ingestion jobs write their metrics to
+    'pushgateway': os.getenv('PUSHGATEWAY_URL'),  # Pushgateway the ingestion jobs push their metrics to, e.g. localhost:9091
+    'job': 'pragi_ingest',  # Job label of pushed ingestion metrics
+    'multiprocess_dir': os.getenv('PROMETHEUS_MULTIPROC_DIR'),  # Shared metrics directory of multi-worker servers (gunicorn)
+}
+
+# pgvector index configuration (see src/database/index_manager.py)
+INDEX_CONFIG = {
+    'index_name': 'documents_embedding_idx',  # Name of the managed vector index
+    'method': 'hnsw',  # 'hnsw' (better recall/latency, slower build) or 'ivfflat'
+    'distance': 'cosine',  # Operator class suffix: cosine, l2 or ip
+    'lists': None,  # ivfflat lists, None derives rows/1000 (sqrt(rows) above 1M rows)
+    'min_lists': 10,  # Lower bound for derived ivfflat lists
+    'lists_drift_factor': 2.0,  # Rebuild ivfflat once built and ideal lists differ by more than this factor
+    'm': None,  # HNSW graph degree, None derives from row count
+    'ef_construction': None,  # HNSW build candidate list size, None derives from row count
+    'probes': None,  # Default ivfflat.probes per query (None keeps the server setting)
+    'ef_search': None,  # Default hnsw.ef_search per query (None keeps the server setting)
+    'maintenance_work_mem': '1GB',  # Memory for index builds
+    'max_parallel_maintenance_workers': 4,  # Parallel workers for index builds
+    'rebuild_on_startup': False,  # Rebuild drifted indexes at startup instead of only logging
+}
+
+# In-process FAISS index configuration (FAISSVectorDB)
+FAISS_CONFIG = {
+    'index_dir': str(PROJECT_ROOT / "data" / "faiss"),  # Directory holding the index and its document store
+    'index_type': 'hnsw',  # 'flat' (exact), 'ivf' (IVF-Flat, needs training) or 'hnsw'
+    'nlist': None,  # IVF cells, None derives ~4*sqrt(n) at (re)build time
+    'nprobe': 16,  # IVF cells scanned per query
+    'min_train_size': 10000,  # Vectors needed before an 'ivf' index is trained (exact search until then)
+    'hnsw_m': 32,  # HNSW graph degree
+    'ef_construction': 200,  # HNSW build-time candidate list size
+    'ef_search': 64,  # HNSW query-time candidate list size
+    'max_deleted_ratio': 0.2,  # Rebuild once this share of an HNSW index is deleted vectors
+}
+
 # Cache configuration
 CACHE_CONFIG = {
     'cache_dir': str(PROJECT_ROOT / "cache"),  # Directory for caching embeddings and other data
     'max_cache_size': 1024 * 1024 * 1024,  # 1GB maximum cache size
     'cache_ttl': 86400,  # Cache time-to-live in seconds (24 hours)
+    'extraction_cache': True,  # Reuse extracted page text and chunks of unchanged files (keyed by SHA-256)
 }
 
 # Create necessary directories
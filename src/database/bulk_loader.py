@@ -0,0 +1,397 @@
+"""
+Bulk loading of documents and embeddings with COPY.
+
+``execute_values`` sends every embedding as a ``'[0.1, ...]'::vector`` text
+literal that the server parses back into floats. The bulk loader instead
+streams rows with ``COPY ... FROM STDIN`` in PostgreSQL's binary format,
+with embeddings in pgvector's binary representation (see
+``pgvector.Vector.to_binary``), so neither side formats or parses floats.
+
+By default rows are copied into an unlogged staging table and merged into
+``documents`` with a single INSERT ... SELECT; keyed rows (with a source and
+chunk index) are upserted. For large initial loads the vector and metadata
+indexes can be dropped for the load and rebuilt afterwards, which is much
+faster than maintaining an HNSW graph row by row. The load is one
+transaction: if it fails, neither rows nor dropped indexes are affected.
+
+Usage:
+    python -m src.processing.ingest_documents ~/Books --bulk --defer-indexes
+"""
+
+import io
+import json
+import os
+import time
+from itertools import count
+from struct import Struct
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from pgvector import Vector
+
+from ..config.config import BULK_LOAD_CONFIG, INDEX_CONFIG
+from ..processing.rag_document import RAGDocument
+from .incremental import identify
+
+COLUMNS = ("content", "encrypted_content", "metadata", "embedding", "source", "chunk_index", "content_hash")
+
+COPY_FORMATS = ("binary", "text")
+
+_HEADER = b"PGCOPY\n\xff\r\n\x00" + Struct(">ii").pack(0, 0)
+_TRAILER = Struct(">h").pack(-1)
+_FIELD_COUNT = Struct(">h")
+_LENGTH = Struct(">i")
+_INT4 = Struct(">ii")
+_INT8 = Struct(">iq")
+_NULL = _LENGTH.pack(-1)
+_JSONB_VERSION = b"\x01"
+
+_TEXT_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+_staging_ids = count()
+
+Row = Tuple[str, str, str, np.ndarray, Optional[str], Optional[int], Optional[str]]
+
+
+def binary_text(value: Optional[str]) -> bytes:
+    """Binary COPY field of a text value."""
+    if value is None:
+        return _NULL
+    data = value.encode("utf-8")
+    return _LENGTH.pack(len(data)) + data
+
+
+def binary_int4(value: Optional[int]) -> bytes:
+    """Binary COPY field of an integer value."""
+    return _NULL if value is None else _INT4.pack(4, value)
+
+
+def binary_int8(value: Optional[int]) -> bytes:
+    """Binary COPY field of a bigint value."""
+    return _NULL if value is None else _INT8.pack(8, value)
+
+
+def binary_jsonb(value: Optional[str]) -> bytes:
+    """Binary COPY field of a JSON document (JSONB version 1 + text)."""
+    if value is None:
+        return _NULL
+    data = _JSONB_VERSION + value.encode("utf-8")
+    return _LENGTH.pack(len(data)) + data
+
+
+def binary_vector(value: Optional[np.ndarray]) -> bytes:
+    """Binary COPY field of an embedding in pgvector's send format."""
+    if value is None:
+        return _NULL
+    data = Vector(value).to_binary()
+    return _LENGTH.pack(len(data)) + data
+
+
+# Binary encoders of COLUMNS
+_COLUMN_ENCODERS = (binary_text, binary_text, binary_jsonb, binary_vector, binary_text, binary_int4, binary_text)
+
+
+def encode_fields(rows: Iterable[tuple], encoders: Tuple[Callable[[Any], bytes], ...]) -> bytes:
+    """Encode rows as binary COPY tuples, one encoder per column.
+
+    Args:
+        rows: Row tuples
+        encoders: ``binary_*`` functions matching the columns
+
+    Returns:
+        Tuples without the COPY header and trailer
+    """
+    field_count = _FIELD_COUNT.pack(len(encoders))
+    parts: List[bytes] = []
+    for row in rows:
+        parts.append(field_count)
+        parts.extend(encode(value) for encode, value in zip(encoders, row))
+    return b"".join(parts)
+
+
+def encode_binary(rows: Iterable[Row]) -> bytes:
+    """Encode rows of ``COLUMNS`` as a block of binary COPY tuples.
+
+    Args:
+        rows: (content, encrypted_content, metadata JSON, embedding, source,
+            chunk_index, content_hash) tuples; the last three may be None
+
+    Returns:
+        Tuples without the COPY header and trailer
+    """
+    return encode_fields(rows, _COLUMN_ENCODERS)
+
+
+def encode_text(rows: Iterable[Row]) -> bytes:
+    """Encode rows of ``COLUMNS`` as text COPY lines (for servers or poolers
+    that cannot take binary COPY).
+
+    Args:
+        rows: See ``encode_binary``
+
+    Returns:
+        Tab-separated lines
+    """
+    lines = []
+    for content, encrypted, metadata, embedding, source, chunk_index, digest in rows:
+        fields = [content, encrypted, metadata, Vector(embedding).to_text(), source, chunk_index, digest]
+        lines.append("\t".join(
+            "\\N" if value is None else str(value).translate(_TEXT_ESCAPES) for value in fields
+        ) + "\n")
+    return "".join(lines).encode("utf-8")
+
+
+class _ByteStream(io.RawIOBase):
+    """Read-only file over an iterator of byte blocks, consumed lazily by COPY."""
+
+    def __init__(self, blocks: Iterator[bytes]):
+        self._blocks = blocks
+        self._buffer = bytearray()
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            block = next(self._blocks, None)
+            if block is None:
+                break
+            self._buffer += block
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+def copy_rows(cur, table: str, columns: Iterable[str], blocks: Iterable[bytes], copy_format: str = "binary"):
+    """Stream encoded blocks into a table with ``COPY ... FROM STDIN``.
+
+    Args:
+        cur: Cursor of the loading transaction
+        table: Target table
+        columns: Columns in the order the blocks encode them
+        blocks: Output of ``encode_fields`` / ``encode_binary`` (or
+            ``encode_text`` lines), pulled lazily while the COPY runs
+        copy_format: 'binary' or 'text'
+    """
+    if copy_format not in COPY_FORMATS:
+        raise ValueError(f"Unknown COPY format '{copy_format}', expected one of {COPY_FORMATS}")
+
+    def framed() -> Iterator[bytes]:
+        if copy_format == "binary":
+            yield _HEADER
+        yield from blocks
+        if copy_format == "binary":
+            yield _TRAILER
+
+    cur.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT {copy_format});",
+        _ByteStream(framed()),
+        size=BULK_LOAD_CONFIG['read_size']
+    )
+
+
+class BulkLoader:
+    """Streams documents and their embeddings into the documents table with COPY.
+
+    Example:
+        >>> loader = BulkLoader(pool, encrypt=db._encrypt_data, defer_indexes=True)
+        >>> stats = loader.load((batch, model.encode(texts(batch))) for batch in batches)
+        >>> stats["rows_per_second"]
+    """
+
+    def __init__(
+        self,
+        pool,
+        encrypt: Callable[[str], str],
+        copy_format: str = BULK_LOAD_CONFIG['format'],
+        staging: bool = BULK_LOAD_CONFIG['staging'],
+        defer_indexes: bool = BULK_LOAD_CONFIG['defer_indexes'],
+        table: str = "documents"
+    ):
+        """Initialize the loader.
+
+        Args:
+            pool: ConnectionPool to load through
+            encrypt: Function producing ``encrypted_content`` from the text
+            copy_format: 'binary' or 'text'
+            staging: Copy into an unlogged staging table and merge (keyed rows
+                are upserted), instead of copying straight into ``table``
+            defer_indexes: Drop the vector and metadata indexes during the
+                load and rebuild them afterwards. The table is locked for the
+                whole load, so use it for initial or offline loads
+            table: Target table
+        """
+        if copy_format not in COPY_FORMATS:
+            raise ValueError(f"Unknown COPY format '{copy_format}', expected one of {COPY_FORMATS}")
+        self.pool = pool
+        self.encrypt = encrypt
+        self.copy_format = copy_format
+        self.staging = staging
+        self.defer_indexes = defer_indexes
+        self.table = table
+        self.deferred_indexes = [INDEX_CONFIG['index_name'], f"{table}_metadata_idx"]
+
+    def load(
+        self,
+        batches: Iterable[Tuple[List[RAGDocument], np.ndarray]],
+        keyed: bool = False
+    ) -> Dict[str, Any]:
+        """Load batches of documents with their embedding matrices.
+
+        Batches are pulled lazily while the COPY runs, so only the batch
+        being encoded is held in memory.
+
+        Args:
+            batches: (documents, embeddings) pairs
+            keyed: Store each document's source, chunk index and content
+                hash (see ``incremental.identify``), so that a later load or
+                sync of the same source replaces its rows instead of adding
+                them again. Requires ``metadata['source']``
+
+        Returns:
+            Statistics: ``rows``, ``seconds``, ``copy_seconds``,
+            ``merge_seconds``, ``index_seconds`` and ``rows_per_second``
+        """
+        if keyed and not self.staging:
+            raise ValueError("Keyed bulk loads need a staging table to upsert through")
+
+        stats = {"rows": 0, "format": self.copy_format, "staging": self.staging, "deferred_indexes": self.defer_indexes}
+        start = time.perf_counter()
+        staging = f"{self.table}_load_{os.getpid()}_{next(_staging_ids)}"
+        target = staging if self.staging else self.table
+        encode = encode_binary if self.copy_format == "binary" else encode_text
+
+        def blocks() -> Iterator[bytes]:
+            for documents, embeddings in batches:
+                rows = list(self._rows(documents, embeddings, keyed))
+                stats["rows"] += len(rows)
+                yield encode(rows)
+
+        try:
+            with self.pool.connection("bulk_load") as conn:
+                try:
+                    with conn.cursor() as cur:
+                        # Losing the last commit on a server crash is acceptable for a re-runnable load
+                        cur.execute("SET LOCAL synchronous_commit = off;")
+                        if self.defer_indexes:
+                            cur.execute(f"DROP INDEX IF EXISTS {', '.join(self.deferred_indexes)};")
+                        if self.staging:
+                            cur.execute(f"""
+                                CREATE UNLOGGED TABLE {staging} (
+                                    seq BIGINT GENERATED ALWAYS AS IDENTITY,
+                                    content TEXT NOT NULL,
+                                    encrypted_content TEXT NOT NULL,
+                                    metadata JSONB,
+                                    embedding vector,
+                                    source TEXT,
+                                    chunk_index INTEGER,
+                                    content_hash TEXT
+                                );
+                            """)
+
+                        copy_start = time.perf_counter()
+                        copy_rows(cur, target, COLUMNS, blocks(), self.copy_format)
+                        stats["copy_seconds"] = time.perf_counter() - copy_start
+
+                        merge_start = time.perf_counter()
+                        if self.staging:
+                            stats["merged"] = self._merge(cur, staging)
+                            cur.execute(f"DROP TABLE {staging};")
+                        stats["merge_seconds"] = time.perf_counter() - merge_start
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+
+            index_start = time.perf_counter()
+            if self.defer_indexes:
+                self._rebuild_indexes()
+            else:
+                with self.pool.connection("bulk_load_analyze") as conn:
+                    with conn.cursor() as cur:
+                        cur.execute(f"ANALYZE {self.table};")
+                    conn.commit()
+            stats["index_seconds"] = time.perf_counter() - index_start
+
+        except Exception as e:
+            raise ValueError(f"Error bulk loading documents: {str(e)}")
+
+        stats["seconds"] = time.perf_counter() - start
+        stats["rows_per_second"] = stats["rows"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+        return stats
+
+    def _rows(self, documents: List[RAGDocument], embeddings: np.ndarray, keyed: bool) -> Iterator[Row]:
+        """Encrypt and serialize one batch into rows of ``COLUMNS``."""
+        if len(documents) != len(embeddings):
+            raise ValueError(f"Got {len(embeddings)} embeddings for {len(documents)} documents")
+        # One conversion per batch; Vector keeps big-endian float32 rows without copying
+        embeddings = np.asarray(embeddings, dtype=">f4")
+        keys = {id(chunk.document): chunk for chunk in identify(documents).values()} if keyed else {}
+        for document, embedding in zip(documents, embeddings):
+            chunk = keys.get(id(document))
+            if keyed and chunk is None:
+                # Superseded by a later document with the same key
+                continue
+            yield (
+                document.text,
+                self.encrypt(document.text),
+                json.dumps(document.metadata),
+                embedding,
+                chunk.source if chunk else None,
+                chunk.chunk_index if chunk else None,
+                chunk.content_hash if chunk else None
+            )
+
+    def _merge(self, cur, staging: str) -> int:
+        """Move the staged rows into the target table.
+
+        Unkeyed rows are appended; keyed rows are upserted, the last staged
+        row winning if a key was loaded twice.
+
+        Returns:
+            Number of rows written
+        """
+        columns = ", ".join(COLUMNS)
+        cur.execute(f"""
+            INSERT INTO {self.table} ({columns})
+            SELECT {columns} FROM {staging} WHERE source IS NULL ORDER BY seq;
+        """)
+        written = cur.rowcount
+        cur.execute(f"""
+            INSERT INTO {self.table} ({columns})
+            SELECT DISTINCT ON (source, chunk_index) {columns} FROM {staging}
+            WHERE source IS NOT NULL
+            ORDER BY source, chunk_index, seq DESC
+            ON CONFLICT (source, chunk_index) WHERE source IS NOT NULL DO UPDATE SET
+                content = EXCLUDED.content,
+                encrypted_content = EXCLUDED.encrypted_content,
+                metadata = EXCLUDED.metadata,
+                embedding = EXCLUDED.embedding,
+                content_hash = EXCLUDED.content_hash;
+        """)
+        return written + cur.rowcount
+
+    def _rebuild_indexes(self):
+        """Recreate the indexes dropped for the load (and analyze the table)."""
+        from .index_manager import IndexManager
+
+        with self.pool.connection("bulk_load_indexes") as conn:
+            autocommit = conn.autocommit
+            conn.autocommit = True
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(f"SET maintenance_work_mem = '{INDEX_CONFIG['maintenance_work_mem']}';")
+                    cur.execute(
+                        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {self.table}_metadata_idx "
+                        f"ON {self.table} USING GIN (metadata);"
+                    )
+            finally:
+                # Session settings would stay with the pooled connection
+                if not conn.closed:
+                    with conn.cursor() as cur:
+                        cur.execute("RESET maintenance_work_mem;")
+                conn.autocommit = autocommit
+        # Sized for the new row count
+        IndexManager(self.pool, table=self.table).ensure()
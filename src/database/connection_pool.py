@@ -0,0 +1,434 @@
+"""
+Thread-safe PostgreSQL connection pool shared by the vector database classes.
+
+Pools survive ``fork()`` (e.g. gunicorn ``--preload``): a child process
+forgets the connections it inherited, without closing them over the socket
+it shares with the parent, and opens its own on first use.
+"""
+
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+
+from ..config.config import POOL_CONFIG
+from ..utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(psycopg2.pool.PoolError):
+    """Raised when no connection becomes available within the pool timeout."""
+
+
+class _PooledConnection:
+    """A connection together with the bookkeeping the pool needs for it."""
+
+    __slots__ = ("conn", "pid", "created_at", "last_used", "last_checked")
+
+    def __init__(self, conn: Any):
+        now = time.monotonic()
+        self.conn = conn
+        self.pid = os.getpid()
+        self.created_at = now
+        self.last_used = now
+        self.last_checked = now
+
+
+class ConnectionPool:
+    """A bounded pool of persistent psycopg2 connections.
+
+    Connections are handed out LIFO so the hottest ones stay warm, checked
+    with ``SELECT 1`` when they have been idle longer than
+    ``health_check_interval``, and closed once they sit idle for longer than
+    ``max_idle`` (down to ``min_size``) or exceed ``max_lifetime``.
+
+    Example:
+        >>> pool = ConnectionPool(DB_CONFIG)
+        >>> with pool.connection("search") as conn:
+        ...     with conn.cursor() as cur:
+        ...         cur.execute("SELECT 1")
+    """
+
+    def __init__(
+        self,
+        conn_params: Dict[str, Any],
+        min_size: int = POOL_CONFIG["min_size"],
+        max_size: int = POOL_CONFIG["max_size"],
+        timeout: float = POOL_CONFIG["timeout"],
+        max_idle: float = POOL_CONFIG["max_idle"],
+        max_lifetime: float = POOL_CONFIG["max_lifetime"],
+        health_check_interval: float = POOL_CONFIG["health_check_interval"],
+        connection_factory: Callable[..., Any] = psycopg2.connect
+    ):
+        """Initialize the pool and open ``min_size`` connections.
+
+        Args:
+            conn_params: Keyword arguments passed to the connection factory
+            min_size: Number of connections kept open even when idle
+            max_size: Maximum number of open connections
+            timeout: Seconds to wait for a free connection before failing
+            max_idle: Seconds after which surplus idle connections are closed
+            max_lifetime: Seconds after which a connection is replaced
+            health_check_interval: Idle seconds after which a connection is
+                verified with ``SELECT 1`` before being handed out
+            connection_factory: Callable creating a new DB-API connection
+        """
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min_size={min_size}, max_size={max_size}")
+
+        self.conn_params = dict(conn_params)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.health_check_interval = health_check_interval
+        self._connection_factory = connection_factory
+
+        self._idle = deque()
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self._stats = {
+            "connections_created": 0,
+            "connections_closed": 0,
+            "health_check_failures": 0,
+            "timeouts": 0,
+            "checkouts": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+        }
+        self._call_stats: Dict[str, Dict[str, float]] = {}
+        _instances.add(self)
+
+        for _ in range(min_size):
+            self._size += 1
+            self._idle.append(self._open())
+
+    def _open(self) -> _PooledConnection:
+        """Open a new connection (the caller has already reserved a slot)."""
+        try:
+            conn = self._connection_factory(**self.conn_params)
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._stats["connections_created"] += 1
+        return _PooledConnection(conn)
+
+    @staticmethod
+    def _close_quietly(pooled: _PooledConnection) -> None:
+        """Close a connection, logging rather than raising on failure."""
+        try:
+            if not pooled.conn.closed:
+                pooled.conn.close()
+        except Exception as e:
+            logger.warning(f"Error closing pooled connection: {str(e)}")
+
+    def _discard(self, pooled: _PooledConnection) -> None:
+        """Close a connection and release its slot."""
+        self._close_quietly(pooled)
+        with self._cond:
+            self._size -= 1
+            self._stats["connections_closed"] += 1
+            self._cond.notify()
+
+    def _is_healthy(self, pooled: _PooledConnection, now: float) -> bool:
+        """Check whether a connection taken from the idle list is still usable."""
+        if pooled.conn.closed:
+            return False
+        if now - pooled.created_at > self.max_lifetime:
+            return False
+        if now - pooled.last_checked < self.health_check_interval:
+            return True
+        try:
+            with pooled.conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            pooled.conn.rollback()
+            pooled.last_checked = now
+            return True
+        except Exception as e:
+            logger.warning(f"Pooled connection failed health check: {str(e)}")
+            with self._cond:
+                self._stats["health_check_failures"] += 1
+            return False
+
+    def _reap_idle_locked(self, now: float) -> list:
+        """Release surplus connections that have been idle too long.
+
+        Must be called with the condition held. The slots are released here;
+        the returned connections are closed by the caller outside the lock.
+        """
+        expired = []
+        # The oldest idle connections sit on the left of the deque.
+        while self._idle and self._size > self.min_size:
+            if now - self._idle[0].last_used <= self.max_idle:
+                break
+            expired.append(self._idle.popleft())
+            self._size -= 1
+            self._stats["connections_closed"] += 1
+        return expired
+
+    def _checkout(self) -> Tuple[_PooledConnection, float]:
+        """Take a connection from the pool, waiting up to ``timeout`` seconds.
+
+        Returns:
+            Tuple of the pooled connection and the seconds spent waiting
+        """
+        start = time.monotonic()
+        deadline = start + self.timeout
+
+        while True:
+            pooled = None
+            expired = []
+            try:
+                with self._cond:
+                    while True:
+                        if self._closed:
+                            raise psycopg2.pool.PoolError("Connection pool is closed")
+                        now = time.monotonic()
+                        expired.extend(self._reap_idle_locked(now))
+                        if self._idle:
+                            pooled = self._idle.pop()
+                            break
+                        if self._size < self.max_size:
+                            self._size += 1
+                            break
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            self._stats["timeouts"] += 1
+                            raise PoolTimeoutError(
+                                f"No database connection available after {self.timeout}s "
+                                f"(max_size={self.max_size})"
+                            )
+                        self._cond.wait(remaining)
+            finally:
+                for stale in expired:
+                    self._close_quietly(stale)
+
+            if pooled is None:
+                pooled = self._open()
+            elif not self._is_healthy(pooled, time.monotonic()):
+                self._discard(pooled)
+                continue
+
+            waited = time.monotonic() - start
+            with self._cond:
+                self._stats["checkouts"] += 1
+                self._stats["wait_seconds_total"] += waited
+                self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], waited)
+            return pooled, waited
+
+    def _checkin(self, pooled: _PooledConnection, discard: bool = False) -> None:
+        """Return a connection to the idle list, or close it if it is unusable."""
+        if pooled.pid != os.getpid():
+            # Borrowed before a fork: the parent still owns it
+            _inherited.append(pooled.conn)
+            return
+        if discard or self._closed or pooled.conn.closed:
+            self._discard(pooled)
+            return
+
+        try:
+            if pooled.conn.status != psycopg2.extensions.STATUS_READY:
+                pooled.conn.rollback()
+        except Exception as e:
+            logger.warning(f"Could not reset pooled connection: {str(e)}")
+            self._discard(pooled)
+            return
+
+        pooled.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(pooled)
+            self._cond.notify()
+
+    def _call_entry_locked(self, label: str) -> Dict[str, float]:
+        """Return the metrics record for a call label (condition must be held)."""
+        return self._call_stats.setdefault(label, {
+            "calls": 0,
+            "errors": 0,
+            "wait_seconds_total": 0.0,
+            "latency_seconds_total": 0.0,
+            "latency_seconds_max": 0.0,
+        })
+
+    def _record_call(self, label: str, waited: float, held: float, failed: bool) -> None:
+        """Accumulate per-label latency and pool-wait metrics."""
+        with self._cond:
+            stats = self._call_entry_locked(label)
+            stats["calls"] += 1
+            stats["errors"] += int(failed)
+            stats["wait_seconds_total"] += waited
+            stats["latency_seconds_total"] += held
+            stats["latency_seconds_max"] = max(stats["latency_seconds_max"], held)
+
+    @contextmanager
+    def connection(self, label: str = "query") -> Iterator[Any]:
+        """Borrow a connection for the duration of a ``with`` block.
+
+        The transaction is committed when the block exits normally and rolled
+        back when it raises, mirroring ``with psycopg2.connect(...) as conn``.
+        Connections that fail with an operational error are discarded.
+
+        Args:
+            label: Name of the calling operation, used to group metrics
+
+        Yields:
+            An open psycopg2 connection
+        """
+        with span("db.connect", label=label) as connect:
+            pooled, waited = self._checkout()
+            connect.set(wait_ms=round(waited * 1e3, 3))
+        acquired = time.monotonic()
+        discard = False
+        failed = False
+        try:
+            yield pooled.conn
+            if not pooled.conn.closed and pooled.conn.status != psycopg2.extensions.STATUS_READY:
+                pooled.conn.commit()
+        except Exception as e:
+            failed = True
+            discard = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+            if not discard and not pooled.conn.closed:
+                try:
+                    pooled.conn.rollback()
+                except Exception:
+                    discard = True
+            raise
+        finally:
+            self._record_call(label, waited, time.monotonic() - acquired, failed)
+            self._checkin(pooled, discard=discard)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of pool size, wait and per-call latency metrics.
+
+        Returns:
+            Dictionary with pool-wide counters plus a ``calls`` mapping of
+            label to call count, error count and average/max latency in ms
+        """
+        with self._cond:
+            snapshot = dict(self._stats)
+            snapshot["size"] = self._size
+            snapshot["idle"] = len(self._idle)
+            snapshot["in_use"] = self._size - len(self._idle)
+            snapshot["min_size"] = self.min_size
+            snapshot["max_size"] = self.max_size
+            calls = {}
+            for label, stats in self._call_stats.items():
+                count = stats["calls"] or 1
+                calls[label] = {
+                    "calls": stats["calls"],
+                    "errors": stats["errors"],
+                    "avg_wait_ms": stats["wait_seconds_total"] / count * 1000,
+                    "avg_latency_ms": stats["latency_seconds_total"] / count * 1000,
+                    "max_latency_ms": stats["latency_seconds_max"] * 1000,
+                }
+            snapshot["calls"] = calls
+        return snapshot
+
+    def _after_fork(self) -> None:
+        """Forget the connections inherited from the parent process.
+
+        They share their sockets with the parent, and closing them (or letting
+        them be garbage collected) would send a terminate message that ends
+        the parent's sessions, so they are parked for the life of the child.
+        The lock is replaced as well, since another thread of the parent may
+        have held it at the time of the fork.
+        """
+        _inherited.extend(pooled.conn for pooled in self._idle)
+        self._idle = deque()
+        self._size = 0
+        self._cond = threading.Condition()
+        self._stats = dict.fromkeys(self._stats, 0)
+        self._stats["wait_seconds_total"] = self._stats["wait_seconds_max"] = 0.0
+        self._call_stats = {}
+
+    def close(self) -> None:
+        """Close all idle connections and refuse further checkouts.
+
+        Connections currently borrowed are closed when they are returned.
+        """
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for pooled in idle:
+            self._discard(pooled)
+
+
+_pools: Dict[Tuple, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+# Every pool in the process, and connections a forked child must never close
+_instances: "weakref.WeakSet[ConnectionPool]" = weakref.WeakSet()
+_inherited: list = []
+
+
+def _reset_after_fork() -> None:
+    """Give a forked child empty pools and fresh locks."""
+    global _pools_lock
+    _pools_lock = threading.Lock()
+    for pool in list(_instances):
+        pool._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_connection_pool(conn_params: Dict[str, Any], **pool_kwargs) -> ConnectionPool:
+    """Return the process-wide pool for a set of connection parameters.
+
+    Every ``PostgreSQLVectorDB`` pointing at the same database shares one
+    pool, so the web apps and any helper objects reuse the same connections.
+
+    Args:
+        conn_params: psycopg2 connection keyword arguments
+        **pool_kwargs: Overrides for ``ConnectionPool`` settings, only used
+            when the pool is created
+
+    Returns:
+        The shared ConnectionPool instance
+    """
+    key = tuple(sorted((k, str(v)) for k, v in conn_params.items()))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = ConnectionPool(conn_params, **pool_kwargs)
+            _pools[key] = pool
+            logger.info(
+                f"Created connection pool for {conn_params.get('dbname')}@{conn_params.get('host')} "
+                f"(min={pool.min_size}, max={pool.max_size})"
+            )
+        return pool
+
+
+def connection_pools() -> Dict[str, ConnectionPool]:
+    """Return the shared pools by "dbname@host", e.g. for metrics."""
+    with _pools_lock:
+        return {
+            f"{pool.conn_params.get('dbname')}@{pool.conn_params.get('host')}": pool
+            for pool in _pools.values() if not pool._closed
+        }
+
+
+def close_all_pools() -> None:
+    """Close every shared pool, e.g. on shutdown."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,177 @@
+"""
+Process-wide cache of query embeddings.
+"""
+
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from ..config.config import QUERY_CACHE_CONFIG
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryEmbeddingCache:
+    """Bounded LRU cache of query embeddings with a time-to-live.
+
+    Entries are keyed on the embedding model name plus the normalized query
+    text and stored as read-only float32 vectors, so the same question asked
+    twice (or retried after an error) skips the encoder.
+
+    Example:
+        >>> cache = QueryEmbeddingCache(max_size=100, ttl=60)
+        >>> vector = cache.get_or_compute("What is Dasein?", "all-MiniLM-L6-v2", model.encode)
+    """
+
+    def __init__(
+        self,
+        max_size: int = QUERY_CACHE_CONFIG["max_size"],
+        ttl: float = QUERY_CACHE_CONFIG["ttl"],
+        lowercase: bool = QUERY_CACHE_CONFIG["lowercase"]
+    ):
+        """Initialize the cache.
+
+        Args:
+            max_size: Maximum number of embeddings kept
+            ttl: Seconds an embedding stays valid
+            lowercase: Whether to lowercase queries when building keys (safe
+                for uncased models such as MiniLM)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.lowercase = lowercase
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def normalize(self, query: str) -> str:
+        """Normalize query text so trivially different spellings share a key.
+
+        Args:
+            query: Raw query text
+
+        Returns:
+            NFKC-normalized text with collapsed whitespace
+        """
+        text = _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", query)).strip()
+        # lower(), not casefold(): the uncased tokenizer keeps "ß" distinct from "ss"
+        return text.lower() if self.lowercase else text
+
+    def get(self, query: str, model_name: str) -> Optional[np.ndarray]:
+        """Look up a cached embedding.
+
+        Args:
+            query: Query text
+            model_name: Name of the embedding model
+
+        Returns:
+            The cached float32 embedding, or None on a miss
+        """
+        key = (model_name, self.normalize(query))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, embedding = entry
+            if now - stored_at > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+    def put(self, query: str, model_name: str, embedding: Any) -> np.ndarray:
+        """Store an embedding.
+
+        Args:
+            query: Query text
+            model_name: Name of the embedding model
+            embedding: Embedding vector
+
+        Returns:
+            The stored read-only float32 copy of the embedding
+        """
+        vector = np.array(embedding, dtype=np.float32)
+        vector.setflags(write=False)
+        key = (model_name, self.normalize(query))
+        with self._lock:
+            self._entries[key] = (time.monotonic(), vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return vector
+
+    def get_or_compute(
+        self,
+        query: str,
+        model_name: str,
+        encode: Callable[[str], Any]
+    ) -> np.ndarray:
+        """Return the cached embedding for a query, encoding it on a miss.
+
+        Args:
+            query: Query text
+            model_name: Name of the embedding model
+            encode: Function producing the embedding for ``query``
+
+        Returns:
+            Read-only float32 embedding
+        """
+        embedding = self.get(query, model_name)
+        if embedding is None:
+            embedding = self.put(query, model_name, encode(query))
+        return embedding
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size.
+
+        Returns:
+            Dictionary of cache statistics
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_cache: Optional[QueryEmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    """Return the query embedding cache shared by the whole process.
+
+    Returns:
+        The process-wide QueryEmbeddingCache
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = QueryEmbeddingCache()
+        return _cache
@@ -0,0 +1,198 @@
+"""
+Memory-mapped matrix of pre-normalized embeddings for brute-force search.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+# Generation written to the sidecar while it is being modified, so a crash
+# mid-write is detected as out of sync on the next open.
+DIRTY_GENERATION = -1
+
+
+class EmbeddingMatrix:
+    """Contiguous float32 matrix of unit-length embeddings stored in a .npy file.
+
+    Each document owns one row ("slot"). Cosine similarity against every
+    document is a single matrix-vector product; rows of deleted documents are
+    masked out. A small JSON file next to the matrix records the row count,
+    dimension and the generation of the table the matrix reflects.
+
+    Example:
+        >>> matrix = EmbeddingMatrix("data/rag.db.vectors.npy")
+        >>> matrix.reset(dim=384)
+        >>> matrix.set_rows([0, 1], embeddings)
+        >>> slots, scores = matrix.top_k(query_embedding, k=5)
+    """
+
+    def __init__(self, path: str, initial_capacity: int = 1024):
+        """Initialize the matrix wrapper (nothing is read until ``open``).
+
+        Args:
+            path: Path of the .npy file holding the matrix
+            initial_capacity: Rows allocated when a new matrix is created
+        """
+        self.path = Path(path)
+        self.meta_path = Path(f"{path}.json")
+        self.initial_capacity = initial_capacity
+        self.dim: Optional[int] = None
+        self.count = 0
+        self.generation: Optional[int] = None
+        self._matrix: Optional[np.memmap] = None
+        self._valid = np.zeros(0, dtype=bool)
+
+    @property
+    def capacity(self) -> int:
+        """Number of rows allocated in the file."""
+        return 0 if self._matrix is None else self._matrix.shape[0]
+
+    @property
+    def n_valid(self) -> int:
+        """Number of rows that belong to live documents."""
+        return int(self._valid[:self.count].sum())
+
+    def open(self) -> Optional[int]:
+        """Map an existing matrix file.
+
+        Returns:
+            The generation recorded in the sidecar, or None if the files are
+            missing or unreadable (the caller should rebuild)
+        """
+        try:
+            with open(self.meta_path, "r") as f:
+                meta = json.load(f)
+            matrix = np.load(self.path, mmap_mode="r+")
+        except (OSError, ValueError):
+            return None
+        if matrix.ndim != 2 or matrix.shape[1] != meta["dim"] or matrix.shape[0] < meta["count"]:
+            return None
+
+        self._matrix = matrix
+        self.dim = meta["dim"]
+        self.count = meta["count"]
+        self.generation = meta["generation"]
+        self._valid = np.zeros(self.capacity, dtype=bool)
+        return self.generation
+
+    def reset(self, dim: int, capacity: Optional[int] = None) -> None:
+        """Create a new, empty matrix file.
+
+        Args:
+            dim: Embedding dimension
+            capacity: Rows to allocate up front
+        """
+        self.close()
+        capacity = max(capacity or 0, self.initial_capacity)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._matrix = np.lib.format.open_memmap(self.path, mode="w+", dtype=np.float32, shape=(capacity, dim))
+        self.dim = dim
+        self.count = 0
+        self.generation = None
+        self._valid = np.zeros(capacity, dtype=bool)
+
+    def _grow(self, min_capacity: int) -> None:
+        """Reallocate the file with at least ``min_capacity`` rows."""
+        capacity = max(min_capacity, self.capacity * 2, self.initial_capacity)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(capacity, self.dim))
+        grown[:self.count] = self._matrix[:self.count]
+        grown.flush()
+        del grown
+        self._matrix.flush()
+        self._matrix = None
+        os.replace(tmp_path, self.path)
+        self._matrix = np.load(self.path, mmap_mode="r+")
+
+        valid = np.zeros(capacity, dtype=bool)
+        valid[:len(self._valid)] = self._valid
+        self._valid = valid
+
+    def set_rows(self, slots: Iterable[int], vectors: np.ndarray) -> None:
+        """Write (normalized) embeddings into the given slots and mark them live.
+
+        Args:
+            slots: Row indices, may extend past the current count
+            vectors: Array of shape (len(slots), dim)
+        """
+        slots = np.asarray(list(slots), dtype=np.int64)
+        if len(slots) == 0:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(slots), -1)
+        if self._matrix is None:
+            self.reset(vectors.shape[1], capacity=int(slots.max()) + 1)
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match index dimension {self.dim}")
+
+        needed = int(slots.max()) + 1
+        if needed > self.capacity:
+            self._grow(needed)
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self._matrix[slots] = vectors / norms
+        self._valid[slots] = True
+        self.count = max(self.count, needed)
+
+    def mark_valid(self, slots: Iterable[int]) -> None:
+        """Mark rows as belonging to live documents (used after ``open``)."""
+        slots = np.asarray(list(slots), dtype=np.int64)
+        slots = slots[slots < self.count]
+        self._valid[slots] = True
+
+    def invalidate(self, slots: Iterable[int]) -> None:
+        """Mask out the rows of deleted documents."""
+        slots = np.asarray(list(slots), dtype=np.int64)
+        slots = slots[slots < self.count]
+        self._valid[slots] = False
+
+    def write_meta(self, generation: int) -> None:
+        """Flush the matrix and record which table generation it reflects.
+
+        Args:
+            generation: Table generation, or DIRTY_GENERATION before a write
+        """
+        if self._matrix is not None:
+            self._matrix.flush()
+        tmp_path = self.meta_path.with_name(self.meta_path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"dim": self.dim, "count": self.count, "generation": generation}, f)
+        os.replace(tmp_path, self.meta_path)
+        self.generation = generation
+
+    def top_k(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Find the k live rows most similar to the query.
+
+        Args:
+            query: Query embedding
+            k: Number of rows to return
+
+        Returns:
+            Tuple of (slots, cosine similarities), best first
+        """
+        if self._matrix is None or self.count == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        scores = np.asarray(self._matrix[:self.count]) @ query
+        scores[~self._valid[:self.count]] = -np.inf
+
+        k = min(k, self.n_valid)
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return top, scores[top]
+
+    def close(self) -> None:
+        """Flush and unmap the matrix."""
+        if self._matrix is not None:
+            self._matrix.flush()
+        self._matrix = None
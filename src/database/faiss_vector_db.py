@@ -0,0 +1,683 @@
+"""
+In-process FAISS vector database for single-box and offline deployments.
+
+Vectors live in a FAISS index persisted to ``<index_dir>/index.faiss``;
+content, metadata and a copy of each embedding live in a small SQLite
+document store next to it. The SQLite rowid is the FAISS id, so the store
+doubles as the id -> row mapping and as the source for index rebuilds.
+
+Rebuild tooling:
+    python -m src.database.faiss_vector_db stats
+    python -m src.database.faiss_vector_db rebuild --index-type ivf
+    python -m src.database.faiss_vector_db import-postgres
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import faiss
+import numpy as np
+
+from ..config.config import FAISS_CONFIG, MODEL_CONFIG
+from ..processing.rag_document import RAGDocument
+from ..utils.metrics import DOCUMENT_EMBEDDING_SECONDS, QUERY_EMBEDDING_SECONDS, SEARCH_SECONDS, timed
+from ..utils.model_registry import get_embedding_model
+from .embedding_cache import get_query_embedding_cache
+from .result_cache import SearchResultCache
+
+INDEX_TYPES = ("flat", "ivf", "hnsw")
+
+# Generation recorded in the sidecar while the index is being modified, so an
+# interrupted write is detected as out of sync on the next start.
+DIRTY_GENERATION = -1
+
+
+class FAISSVectorDB:
+    """FAISS-backed vector database with the same interface as PostgreSQLVectorDB.
+
+    Supported index types:
+        - ``flat``: exact inner-product search
+        - ``ivf``: IVF-Flat; searched exactly until ``min_train_size`` vectors
+          exist, then trained and rebuilt automatically
+        - ``hnsw``: HNSW graph; deletions are tombstoned in the document store
+          and compacted by a rebuild once ``max_deleted_ratio`` is exceeded
+
+    Embeddings are L2-normalized, so inner product equals cosine similarity.
+
+    Example:
+        >>> db = FAISSVectorDB(index_dir="data/faiss", index_type="hnsw")
+        >>> db.add_documents([RAGDocument(text="Being and Time", metadata={"type": "book"})])
+        >>> results = db.search("What is Dasein?", k=5)
+    """
+
+    def __init__(
+        self,
+        index_dir: Optional[str] = None,
+        index_type: Optional[str] = None,
+        cache_size: int = 1000,
+        autosave: bool = True
+    ):
+        """Initialize the FAISS vector database.
+
+        Args:
+            index_dir: Directory for the index and document store, defaults to
+                ``FAISS_CONFIG['index_dir']``
+            index_type: 'flat', 'ivf' or 'hnsw', defaults to
+                ``FAISS_CONFIG['index_type']``. Only used when the index is
+                created or rebuilt; an existing index keeps its type.
+            cache_size: Size of the LRU cache for search results (0 disables it)
+            autosave: Write the index to disk after every add/delete. Bulk
+                loads can disable this and call ``save()`` once at the end.
+        """
+        self.index_dir = Path(index_dir or FAISS_CONFIG['index_dir'])
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.index_dir / "index.faiss"
+        self.meta_path = self.index_dir / "index.faiss.json"
+        self.index_type = index_type or FAISS_CONFIG['index_type']
+        if self.index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type '{self.index_type}', expected one of {INDEX_TYPES}")
+        self.dim = MODEL_CONFIG['embedding_dimension']
+        self.autosave = autosave
+
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.RLock()
+
+        self.result_cache = SearchResultCache(max_size=cache_size)
+
+        self.model_name = MODEL_CONFIG['embedding_model']
+        self.query_cache = get_query_embedding_cache()
+
+        self.conn = sqlite3.connect(str(self.index_dir / "docstore.db"), check_same_thread=False)
+        self._init_store()
+
+        self.index = None
+        self.built_type = None
+        self._live = self._count()
+        self._load_index()
+
+    @property
+    def model(self):
+        """Embedding model, shared process-wide and loaded on first use."""
+        return get_embedding_model(self.model_name)
+
+    def _init_store(self):
+        """Create the document store tables."""
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                content TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                embedding BLOB NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS index_meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        """)
+        self.conn.execute("INSERT OR IGNORE INTO index_meta (key, value) VALUES ('generation', 0)")
+        self.conn.commit()
+
+    def _get_generation(self) -> int:
+        """Read the document store generation, bumped by every write."""
+        return self.conn.execute("SELECT value FROM index_meta WHERE key = 'generation'").fetchone()[0]
+
+    def _bump_generation(self) -> int:
+        """Increment the document store generation inside the current transaction."""
+        self.conn.execute("UPDATE index_meta SET value = value + 1 WHERE key = 'generation'")
+        return self._get_generation()
+
+    def _write_meta(self, generation: int):
+        """Atomically record which store generation the index on disk reflects."""
+        tmp_path = self.meta_path.with_name(self.meta_path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"generation": generation, "index_type": self.built_type, "dim": self.dim}, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def _load_index(self):
+        """Load the index from disk, rebuilding it when missing or out of sync."""
+        with self._lock:
+            try:
+                with open(self.meta_path, "r") as f:
+                    meta = json.load(f)
+                if meta["generation"] == self._get_generation() and meta["dim"] == self.dim:
+                    self.index = faiss.read_index(str(self.index_path))
+                    self.built_type = meta["index_type"]
+                    self._apply_search_params()
+                    self.logger.info(f"Loaded {self.built_type} index with {self.index.ntotal} vectors")
+                    return
+                self.logger.warning("FAISS index is out of sync with the document store, rebuilding")
+            except (OSError, ValueError, KeyError, RuntimeError):
+                self.logger.info("No usable FAISS index on disk, building from the document store")
+            self.rebuild()
+
+    def _new_index(self, index_type: str, n_vectors: int):
+        """Create an empty index of the given type wrapped in an id map.
+
+        Args:
+            index_type: 'flat', 'ivf' or 'hnsw'
+            n_vectors: Number of vectors the index will hold (sizes IVF lists)
+
+        Returns:
+            Tuple of (index accepting external ids, type actually built)
+        """
+        if index_type == "ivf" and n_vectors < FAISS_CONFIG['min_train_size']:
+            # Not enough data to train meaningful centroids yet
+            index_type = "flat"
+
+        if index_type == "hnsw":
+            base = faiss.IndexHNSWFlat(self.dim, FAISS_CONFIG['hnsw_m'], faiss.METRIC_INNER_PRODUCT)
+            base.hnsw.efConstruction = FAISS_CONFIG['ef_construction']
+        elif index_type == "ivf":
+            # ~4*sqrt(n) lists, keeping at least 39 training points per centroid
+            nlist = FAISS_CONFIG['nlist'] or max(1, min(int(4 * math.sqrt(n_vectors)), n_vectors // 39))
+            quantizer = faiss.IndexFlatIP(self.dim)
+            # Inverted lists store external ids themselves and support
+            # remove_ids directly, so IVF is not wrapped in an id map
+            return faiss.IndexIVFFlat(quantizer, self.dim, nlist, faiss.METRIC_INNER_PRODUCT), index_type
+        else:
+            base = faiss.IndexFlatIP(self.dim)
+        return faiss.IndexIDMap2(base), index_type
+
+    def _apply_search_params(self):
+        """Set query-time parameters (nprobe / efSearch) on the loaded index."""
+        if self.built_type == "ivf":
+            faiss.extract_index_ivf(self.index).nprobe = FAISS_CONFIG['nprobe']
+        elif self.built_type == "hnsw":
+            faiss.downcast_index(self.index.index).hnsw.efSearch = FAISS_CONFIG['ef_search']
+
+    def _iter_embeddings(self, chunk_size: int = 10000) -> Iterable[Tuple[np.ndarray, np.ndarray]]:
+        """Yield (ids, embeddings) chunks from the document store."""
+        cursor = self.conn.execute("SELECT id, embedding FROM documents ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            ids = np.array([row[0] for row in rows], dtype=np.int64)
+            vectors = np.vstack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
+            yield ids, vectors
+
+    def rebuild(self, index_type: Optional[str] = None) -> Dict[str, Any]:
+        """Rebuild the index from the document store.
+
+        Drops deleted vectors, retrains IVF centroids on the current data and
+        can switch the index type.
+
+        Args:
+            index_type: New index type, defaults to the configured one
+
+        Returns:
+            Dictionary with the index type, vector count and build time
+        """
+        with self._lock:
+            if index_type is not None:
+                if index_type not in INDEX_TYPES:
+                    raise ValueError(f"Unknown index type '{index_type}', expected one of {INDEX_TYPES}")
+                self.index_type = index_type
+
+            start = time.perf_counter()
+            total = self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            index, built_type = self._new_index(self.index_type, total)
+
+            if built_type == "ivf":
+                # Train on (at most) 256 vectors per list, then add everything
+                nlist = faiss.extract_index_ivf(index).nlist
+                sample_size = min(total, 256 * nlist)
+                sample = np.empty((sample_size, self.dim), dtype=np.float32)
+                filled = 0
+                for _, vectors in self._iter_embeddings():
+                    take = min(len(vectors), sample_size - filled)
+                    sample[filled:filled + take] = vectors[:take]
+                    filled += take
+                    if filled == sample_size:
+                        break
+                index.train(sample)
+
+            for ids, vectors in self._iter_embeddings():
+                index.add_with_ids(vectors, ids)
+
+            self.index = index
+            self.built_type = built_type
+            self._apply_search_params()
+            self.save()
+            self.result_cache.invalidate()
+
+            stats = {
+                "index_type": built_type,
+                "vectors": index.ntotal,
+                "seconds": time.perf_counter() - start
+            }
+            self.logger.info(f"Built {built_type} index with {index.ntotal} vectors in {stats['seconds']:.2f}s")
+            return stats
+
+    def save(self):
+        """Write the index to disk and mark it as matching the document store."""
+        with self._lock:
+            tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+            faiss.write_index(self.index, str(tmp_path))
+            os.replace(tmp_path, self.index_path)
+            self._write_meta(self._get_generation())
+
+    def _add_rows(self, texts: List[str], metadatas: List[Dict[str, Any]], embeddings: np.ndarray) -> List[str]:
+        """Store rows and add their (normalized) embeddings to the index.
+
+        Args:
+            texts: Document texts
+            metadatas: Metadata dictionaries aligned with ``texts``
+            embeddings: Embedding matrix aligned with ``texts``
+
+        Returns:
+            List of document IDs
+        """
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32).reshape(len(texts), self.dim)
+        faiss.normalize_L2(embeddings)
+
+        with self._lock:
+            self._write_meta(DIRTY_GENERATION)
+            try:
+                ids = []
+                for text, metadata, embedding in zip(texts, metadatas, embeddings):
+                    cursor = self.conn.execute(
+                        "INSERT INTO documents (content, metadata, embedding) VALUES (?, ?, ?)",
+                        (text, json.dumps(metadata), embedding.tobytes())
+                    )
+                    ids.append(cursor.lastrowid)
+                self._bump_generation()
+                self.conn.commit()
+                self._live += len(ids)
+            except Exception:
+                self.conn.rollback()
+                raise
+
+            self.index.add_with_ids(embeddings, np.array(ids, dtype=np.int64))
+
+            if self.index_type == "ivf" and self.built_type != "ivf" \
+                    and self.index.ntotal >= FAISS_CONFIG['min_train_size']:
+                # Enough vectors to train IVF centroids now
+                self.rebuild()
+            elif self.autosave:
+                self.save()
+        return [str(doc_id) for doc_id in ids]
+
+    def add_documents(
+        self,
+        documents: List[RAGDocument],
+        batch_size: Optional[int] = None,
+        embeddings: Optional[np.ndarray] = None
+    ) -> List[str]:
+        """Embed documents and add them to the index.
+
+        Args:
+            documents: List of RAGDocument instances
+            batch_size: Documents per encode batch, defaults to
+                ``MODEL_CONFIG['batch_size']``
+            embeddings: Precomputed embeddings aligned with ``documents``
+
+        Returns:
+            List of document IDs
+        """
+        batch_size = batch_size or MODEL_CONFIG['batch_size']
+        doc_ids = []
+        try:
+            for offset in range(0, len(documents), batch_size):
+                batch = documents[offset:offset + batch_size]
+                if embeddings is not None:
+                    batch_embeddings = embeddings[offset:offset + batch_size]
+                else:
+                    with DOCUMENT_EMBEDDING_SECONDS.time():
+                        batch_embeddings = self.model.encode(
+                            [doc.text for doc in batch],
+                            batch_size=batch_size,
+                            convert_to_numpy=True,
+                            show_progress_bar=False
+                        )
+                doc_ids.extend(self._add_rows([doc.text for doc in batch], [doc.metadata for doc in batch], batch_embeddings))
+        except Exception as e:
+            raise ValueError(f"Error adding documents: {str(e)}")
+        finally:
+            self.result_cache.invalidate()
+        return doc_ids
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """Embed a search query, reusing the process-wide query embedding cache.
+
+        Args:
+            query: Query text
+
+        Returns:
+            Read-only float32 query embedding
+        """
+        return self.query_cache.get_or_compute(query, self.model_name, timed(QUERY_EMBEDDING_SECONDS, self.model.encode))
+
+    @SEARCH_SECONDS.labels(backend="faiss").time()
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        metadata_filter: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[RAGDocument, float]]:
+        """Search for similar documents.
+
+        Args:
+            query: Query text
+            k: Number of results
+            metadata_filter: Filter with the same syntax as PostgreSQLVectorDB
+                (equality, ``$in``, ``$exists``, ``$regex``)
+
+        Returns:
+            List of (document, cosine similarity) tuples, best first
+        """
+        try:
+            query_embedding = self.embed_query(query)
+
+            cache_key = self.result_cache.make_key(query_embedding, k, metadata_filter)
+            generation = self.result_cache.generation
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+            vector = np.array(query_embedding, dtype=np.float32).reshape(1, -1)
+            faiss.normalize_L2(vector)
+
+            with self._lock:
+                ntotal = self.index.ntotal
+                # Tombstoned and filtered-out hits are skipped, so over-fetch and
+                # widen the search until k documents survive or the index is exhausted
+                fetch = k if not metadata_filter and ntotal == self._live else k * 4
+                documents = []
+                while True:
+                    fetch = min(fetch, ntotal)
+                    if fetch <= 0:
+                        break
+                    scores, ids = self.index.search(vector, fetch)
+                    documents = self._collect(ids[0], scores[0], k, metadata_filter)
+                    if len(documents) >= k or fetch >= ntotal:
+                        break
+                    fetch *= 4
+
+            self.result_cache.put(cache_key, documents, generation)
+            return documents
+
+        except Exception as e:
+            self.logger.error(f"Error in vector search: {str(e)}")
+            raise ValueError(f"Error searching documents: {str(e)}")
+
+    def _collect(
+        self,
+        ids: np.ndarray,
+        scores: np.ndarray,
+        k: int,
+        metadata_filter: Optional[Dict[str, Any]]
+    ) -> List[Tuple[RAGDocument, float]]:
+        """Load the documents behind FAISS hits, dropping deleted and filtered ones."""
+        hits = [(int(doc_id), float(score)) for doc_id, score in zip(ids, scores) if doc_id >= 0]
+        if not hits:
+            return []
+        placeholders = ','.join('?' * len(hits))
+        rows = {
+            row[0]: row for row in self.conn.execute(
+                f"SELECT id, content, metadata FROM documents WHERE id IN ({placeholders})",
+                [doc_id for doc_id, _ in hits]
+            )
+        }
+
+        documents = []
+        for doc_id, score in hits:
+            row = rows.get(doc_id)
+            if row is None:
+                continue
+            metadata = json.loads(row[2])
+            if metadata_filter and not _matches(metadata, metadata_filter):
+                continue
+            documents.append((RAGDocument(text=row[1], metadata=metadata, doc_id=doc_id), score))
+            if len(documents) == k:
+                break
+        return documents
+
+    def _count(self) -> int:
+        """Number of live documents in the store."""
+        return self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def get_document(self, doc_id: str) -> Optional[RAGDocument]:
+        """Get a document by ID.
+
+        Args:
+            doc_id: Document ID
+
+        Returns:
+            RAGDocument instance if found, None otherwise
+        """
+        try:
+            with self._lock:
+                row = self.conn.execute(
+                    "SELECT content, metadata FROM documents WHERE id = ?", (int(doc_id),)
+                ).fetchone()
+            if row is None:
+                return None
+            return RAGDocument(text=row[0], metadata=json.loads(row[1]))
+        except Exception as e:
+            raise ValueError(f"Error getting document: {str(e)}")
+
+    def delete_document(self, doc_id: str) -> bool:
+        """Delete a document by ID.
+
+        IVF and flat indexes remove the vector through an id selector. HNSW
+        graphs cannot remove vectors, so the row is dropped from the document
+        store (hiding the vector from results) and the index is compacted once
+        enough deletions accumulate.
+
+        Args:
+            doc_id: Document ID
+
+        Returns:
+            True if document was deleted, False otherwise
+        """
+        try:
+            with self._lock:
+                self._write_meta(DIRTY_GENERATION)
+                cursor = self.conn.execute("DELETE FROM documents WHERE id = ?", (int(doc_id),))
+                deleted = cursor.rowcount > 0
+                self._bump_generation()
+                self.conn.commit()
+                self._live = self._count()
+
+                if deleted and self.built_type != "hnsw":
+                    ids = np.array([int(doc_id)], dtype=np.int64)
+                    self.index.remove_ids(faiss.IDSelectorBatch(ids.size, faiss.swig_ptr(ids)))
+
+                if self.built_type == "hnsw" and self.index.ntotal \
+                        and 1 - self._live / self.index.ntotal > FAISS_CONFIG['max_deleted_ratio']:
+                    self.rebuild()
+                elif self.autosave:
+                    self.save()
+
+            if deleted:
+                self.result_cache.invalidate()
+            return deleted
+
+        except Exception as e:
+            raise ValueError(f"Error deleting document: {str(e)}")
+
+    def clear(self):
+        """Clear all documents and reset the index."""
+        try:
+            with self._lock:
+                self.conn.execute("DELETE FROM documents")
+                self._bump_generation()
+                self.conn.commit()
+                self._live = 0
+                self.rebuild()
+        except Exception as e:
+            raise ValueError(f"Error clearing database: {str(e)}")
+
+    def import_postgres(self, conn, batch_size: int = 5000) -> int:
+        """Copy content, metadata and embeddings from the Postgres documents table.
+
+        Rows are read with keyset pagination and added without re-encoding.
+
+        Args:
+            conn: Open psycopg2 connection to the Postgres database
+            batch_size: Rows fetched per page
+
+        Returns:
+            Number of documents imported
+        """
+        autosave, self.autosave = self.autosave, False
+        imported = 0
+        last_id = 0
+        try:
+            while True:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        SELECT id, content, metadata, embedding::text
+                        FROM documents
+                        WHERE id > %s AND embedding IS NOT NULL
+                        ORDER BY id
+                        LIMIT %s;
+                    """, [last_id, batch_size])
+                    rows = cur.fetchall()
+                if not rows:
+                    break
+                embeddings = np.array([json.loads(row[3]) for row in rows], dtype=np.float32)
+                self._add_rows([row[1] for row in rows], [row[2] or {} for row in rows], embeddings)
+                imported += len(rows)
+                last_id = rows[-1][0]
+                self.logger.info(f"Imported {imported} documents")
+        finally:
+            self.autosave = autosave
+            self.save()
+            self.result_cache.invalidate()
+        return imported
+
+    def stats(self) -> Dict[str, Any]:
+        """Get index statistics.
+
+        Returns:
+            Dictionary with the index type, vector and document counts
+        """
+        with self._lock:
+            documents = self._count()
+            return {
+                "index_type": self.built_type,
+                "configured_type": self.index_type,
+                "vectors": self.index.ntotal,
+                "documents": documents,
+                "deleted_vectors": self.index.ntotal - documents,
+                "generation": self._get_generation()
+            }
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Get query embedding and search result cache statistics.
+
+        Returns:
+            Dictionary with ``query_embeddings`` and ``search_results`` entries
+        """
+        return {
+            "query_embeddings": self.query_cache.stats(),
+            "search_results": self.result_cache.stats()
+        }
+
+    def close(self):
+        """Save the index and close the document store."""
+        with self._lock:
+            if self.index is not None:
+                self.save()
+            self.conn.close()
+
+
+def _matches(metadata: Dict[str, Any], metadata_filter: Dict[str, Any]) -> bool:
+    """Evaluate a PostgreSQLVectorDB-style metadata filter in Python.
+
+    Follows the SQL that PostgreSQLVectorDB generates:
+        - equality is JSONB containment (``@>``): a list matches when it holds
+          every given element and an object when it holds every given key, so
+          ``{"tags": ["a"]}`` matches ``{"tags": ["a", "b"]}`` while
+          ``{"tags": "a"}`` does not
+        - ``$in`` is ``?|``: a value matches when it is one of the candidates,
+          a list when any of its elements is, an object when any is a key
+        - ``$exists`` tests for the key
+
+    ``$regex`` is a regular expression search on the value as a string,
+    whereas the Postgres backend only checks for the exact string (``?``).
+    """
+    for key, value in metadata_filter.items():
+        if isinstance(value, dict):
+            for op, val in value.items():
+                if op == '$in' and (key not in metadata or not _any_of(metadata[key], val)):
+                    return False
+                if op == '$exists' and (key in metadata) != bool(val):
+                    return False
+                if op == '$regex' and not re.search(val, str(metadata.get(key, ""))):
+                    return False
+        elif key not in metadata or not _contains(metadata[key], value):
+            return False
+    return True
+
+
+def _contains(value: Any, expected: Any) -> bool:
+    """JSONB containment of ``expected`` in a metadata value."""
+    if isinstance(expected, dict):
+        return isinstance(value, dict) and all(
+            key in value and _contains(value[key], item) for key, item in expected.items()
+        )
+    if isinstance(expected, list):
+        return isinstance(value, list) and all(
+            any(_contains(element, item) for element in value) for item in expected
+        )
+    if isinstance(value, (dict, list)):
+        return False
+    if isinstance(value, bool) or isinstance(expected, bool):
+        # JSON booleans never equal numbers
+        return value is expected
+    return value == expected
+
+
+def _any_of(value: Any, candidates: List[Any]) -> bool:
+    """Whether a metadata value, or one of its elements or keys, is a candidate."""
+    elements = value if isinstance(value, (dict, list)) else [value]
+    return any(_contains(element, candidate) for element in elements for candidate in candidates
+               if not isinstance(candidate, (dict, list)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the in-process FAISS vector index")
+    parser.add_argument("command", choices=["stats", "rebuild", "import-postgres"], help="Action to run")
+    parser.add_argument("--index-dir", default=FAISS_CONFIG['index_dir'], help="Directory holding the index")
+    parser.add_argument("--index-type", choices=INDEX_TYPES, help="Index type to build (rebuild only)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per page (import-postgres only)")
+
+    args = parser.parse_args()
+
+    try:
+        db = FAISSVectorDB(index_dir=args.index_dir, index_type=args.index_type)
+        if args.command == "rebuild":
+            print(json.dumps(db.rebuild(args.index_type), indent=2))
+        elif args.command == "import-postgres":
+            import psycopg2
+            from ..config.config import DB_CONFIG
+            conn = psycopg2.connect(**DB_CONFIG)
+            try:
+                print(f"Imported {db.import_postgres(conn, args.batch_size)} documents")
+            finally:
+                conn.close()
+        print(json.dumps(db.stats(), indent=2))
+        db.close()
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,89 @@
+"""
+Change detection for incremental re-ingestion.
+
+A chunk is identified by its source path and its position within the source
+(``chunk_index``); its content hash tells whether the stored row is still
+current. Re-syncing a folder then only embeds and writes chunks whose hash
+changed, and removes chunks past the new end of a shrunk source.
+"""
+
+import hashlib
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+from ..processing.rag_document import RAGDocument
+
+ChunkKey = Tuple[str, int]
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 of a chunk's text (hex)."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class Chunk(NamedTuple):
+    """A document with its stable identity and content hash."""
+    document: RAGDocument
+    source: str
+    chunk_index: int
+    content_hash: str
+
+
+class SyncPlan(NamedTuple):
+    """What an incremental sync has to write."""
+    added: List[Chunk]
+    updated: List[Chunk]
+    skipped: int
+    chunk_counts: Dict[str, int]  # Chunks per source after the sync
+
+
+def identify(documents: Iterable[RAGDocument]) -> Dict[ChunkKey, Chunk]:
+    """Assign each document its (source, chunk index) key and content hash.
+
+    ``metadata['chunk_index']`` is used when present, otherwise the position
+    of the document among the documents of the same source. A later document
+    with the same key replaces an earlier one.
+
+    Args:
+        documents: Documents with ``metadata['source']``
+
+    Returns:
+        Chunks by key, in input order
+
+    Raises:
+        ValueError: If a document has no source
+    """
+    chunks: Dict[ChunkKey, Chunk] = {}
+    positions: Dict[str, int] = {}
+    for document in documents:
+        source = (document.metadata or {}).get("source")
+        if not source:
+            raise ValueError("Incremental ingestion needs metadata['source'] on every document")
+        source = str(source)
+        chunk_index = int(document.metadata.get("chunk_index", positions.get(source, 0)))
+        positions[source] = chunk_index + 1
+        chunks[(source, chunk_index)] = Chunk(document, source, chunk_index, content_hash(document.text))
+    return chunks
+
+
+def plan_sync(chunks: Dict[ChunkKey, Chunk], existing: Dict[ChunkKey, str]) -> SyncPlan:
+    """Compare new chunks with the stored content hashes.
+
+    Args:
+        chunks: Output of ``identify``; must hold every chunk of each source
+        existing: Stored content hash per key for the same sources
+
+    Returns:
+        SyncPlan with the chunks to insert and to update
+    """
+    added, updated, skipped = [], [], 0
+    chunk_counts: Dict[str, int] = {}
+    for key, chunk in chunks.items():
+        chunk_counts[chunk.source] = max(chunk_counts.get(chunk.source, 0), chunk.chunk_index + 1)
+        stored = existing.get(key)
+        if stored is None:
+            added.append(chunk)
+        elif stored != chunk.content_hash:
+            updated.append(chunk)
+        else:
+            skipped += 1
+    return SyncPlan(added, updated, skipped, chunk_counts)
@@ -0,0 +1,301 @@
+"""
+Management of the pgvector index on the documents table.
+
+The index method (ivfflat or hnsw) and its build parameters come from
+INDEX_CONFIG, with unset parameters derived from the table size. The index
+is only rebuilt when the built parameters drift from the desired ones, and
+rebuilds use CREATE INDEX CONCURRENTLY under a temporary name followed by a
+swap, so searches keep an index throughout.
+
+Usage:
+    python -m src.database.index_manager status
+    python -m src.database.index_manager ensure
+"""
+
+import argparse
+import json
+import logging
+import math
+import time
+from typing import Any, Dict, List, Optional
+
+from ..config.config import DB_CONFIG, INDEX_CONFIG
+
+logger = logging.getLogger(__name__)
+
+INDEX_METHODS = ("ivfflat", "hnsw")
+
+
+def derive_index_params(method: str, row_count: int) -> Dict[str, int]:
+    """Derive index build parameters from the number of rows.
+
+    Follows the pgvector guidance: ``lists = rows / 1000`` up to 1M rows and
+    ``sqrt(rows)`` beyond, and a denser HNSW graph for larger tables.
+    Explicit values in INDEX_CONFIG take precedence.
+
+    Args:
+        method: 'ivfflat' or 'hnsw'
+        row_count: (Estimated) number of rows in the table
+
+    Returns:
+        Dictionary of index storage parameters
+    """
+    row_count = max(int(row_count), 0)
+    if method == "ivfflat":
+        if INDEX_CONFIG['lists']:
+            lists = INDEX_CONFIG['lists']
+        elif row_count <= 1_000_000:
+            lists = row_count // 1000
+        else:
+            lists = int(math.sqrt(row_count))
+        return {"lists": max(lists, INDEX_CONFIG['min_lists'])}
+
+    if method == "hnsw":
+        m = INDEX_CONFIG['m'] or (16 if row_count <= 1_000_000 else 24)
+        ef_construction = INDEX_CONFIG['ef_construction'] or max(64 if row_count <= 1_000_000 else 128, 2 * m)
+        return {"m": m, "ef_construction": ef_construction}
+
+    raise ValueError(f"Unknown index method '{method}', expected one of {INDEX_METHODS}")
+
+
+class IndexManager:
+    """Creates, inspects and rebuilds the vector index of the documents table.
+
+    Example:
+        >>> manager = IndexManager(pool)
+        >>> plan = manager.plan()
+        >>> if plan["action"] != "none":
+        ...     manager.ensure()
+    """
+
+    def __init__(
+        self,
+        pool,
+        table: str = "documents",
+        column: str = "embedding",
+        index_name: Optional[str] = None,
+        method: Optional[str] = None
+    ):
+        """Initialize the index manager.
+
+        Args:
+            pool: ConnectionPool used for catalog queries and builds
+            table: Table holding the embeddings
+            column: Vector column to index
+            index_name: Name of the index, defaults to INDEX_CONFIG['index_name']
+            method: 'ivfflat' or 'hnsw', defaults to INDEX_CONFIG['method']
+        """
+        self.pool = pool
+        self.table = table
+        self.column = column
+        self.index_name = index_name or INDEX_CONFIG['index_name']
+        self.method = method or INDEX_CONFIG['method']
+        if self.method not in INDEX_METHODS:
+            raise ValueError(f"Unknown index method '{self.method}', expected one of {INDEX_METHODS}")
+
+    def row_estimate(self, cur) -> int:
+        """Estimate the table's row count from planner statistics.
+
+        Falls back to an exact count for tables that were never analyzed.
+        """
+        cur.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass;", [self.table])
+        estimate = cur.fetchone()[0]
+        if estimate is None or estimate < 0:
+            cur.execute(f"SELECT COUNT(*) FROM {self.table};")
+            estimate = cur.fetchone()[0]
+        return int(estimate)
+
+    def current(self, cur, index_name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Describe an existing index.
+
+        Args:
+            cur: Database cursor
+            index_name: Index to describe, defaults to the managed index
+
+        Returns:
+            Dictionary with ``method``, ``params`` and ``valid``, or None if
+            the index does not exist
+        """
+        cur.execute("""
+            SELECT am.amname, c.reloptions, i.indisvalid
+            FROM pg_class c
+            JOIN pg_am am ON am.oid = c.relam
+            JOIN pg_index i ON i.indexrelid = c.oid
+            WHERE c.relname = %s AND c.relkind = 'i';
+        """, [index_name or self.index_name])
+        row = cur.fetchone()
+        if row is None:
+            return None
+        method, reloptions, valid = row
+        params = {}
+        for option in reloptions or []:
+            key, _, value = option.partition("=")
+            params[key] = int(value) if value.isdigit() else value
+        return {"method": method, "params": params, "valid": valid}
+
+    def plan(self) -> Dict[str, Any]:
+        """Compare the existing index with the desired one.
+
+        Returns:
+            Dictionary with ``action`` ('none', 'create' or 'rebuild'), the
+            ``reason``, the ``current`` index and the ``desired`` parameters
+        """
+        with self.pool.connection("index_plan") as conn:
+            with conn.cursor() as cur:
+                rows = self.row_estimate(cur)
+                current = self.current(cur)
+
+        desired = derive_index_params(self.method, rows)
+        plan = {"rows": rows, "method": self.method, "desired": desired, "current": current}
+
+        if current is None:
+            return dict(plan, action="create", reason="index does not exist")
+        if not current["valid"]:
+            return dict(plan, action="rebuild", reason="index is invalid (interrupted concurrent build)")
+        if current["method"] != self.method:
+            return dict(plan, action="rebuild", reason=f"method is {current['method']}, want {self.method}")
+
+        built = current["params"]
+        if self.method == "ivfflat":
+            # Tolerate growth up to a factor before paying for a rebuild
+            built_lists = built.get("lists", 100)
+            ratio = max(built_lists, desired["lists"]) / max(min(built_lists, desired["lists"]), 1)
+            if ratio > INDEX_CONFIG['lists_drift_factor']:
+                return dict(plan, action="rebuild", reason=f"lists={built_lists}, want {desired['lists']}")
+        else:
+            built_params = {"m": built.get("m", 16), "ef_construction": built.get("ef_construction", 64)}
+            if built_params != desired:
+                return dict(plan, action="rebuild", reason=f"{built_params}, want {desired}")
+
+        return dict(plan, action="none", reason="index is up to date")
+
+    def _create_sql(self, name: str, params: Dict[str, int], concurrently: bool) -> str:
+        """Build the CREATE INDEX statement."""
+        opclass = f"vector_{INDEX_CONFIG['distance']}_ops"
+        options = ", ".join(f"{key} = {int(value)}" for key, value in params.items())
+        return (
+            f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}{name} "
+            f"ON {self.table} USING {self.method} ({self.column} {opclass}) "
+            f"WITH ({options});"
+        )
+
+    def ensure(self, force: bool = False) -> Dict[str, Any]:
+        """Create or rebuild the index if (and only if) it is missing or drifted.
+
+        Builds run outside a transaction with CREATE INDEX CONCURRENTLY, so
+        writes continue during the build. A rebuild creates the new index
+        under a temporary name and swaps it in afterwards.
+
+        Args:
+            force: Rebuild even if the parameters have not drifted
+
+        Returns:
+            The plan that was executed, with ``seconds`` spent building
+        """
+        plan = self.plan()
+        if plan["action"] == "none" and not force:
+            logger.info(f"Vector index {self.index_name} is up to date ({plan['current']['params']})")
+            return plan
+        if plan["action"] == "none":
+            plan = dict(plan, action="rebuild", reason="forced")
+
+        new_name = f"{self.index_name}_new" if plan["action"] == "rebuild" else self.index_name
+        logger.info(f"Building vector index {new_name}: {plan['reason']} ({self.method} {plan['desired']})")
+
+        start = time.perf_counter()
+        with self.pool.connection("index_build") as conn:
+            autocommit = conn.autocommit
+            conn.autocommit = True
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(f"SET maintenance_work_mem = '{INDEX_CONFIG['maintenance_work_mem']}';")
+                    cur.execute(
+                        "SET max_parallel_maintenance_workers = %s;",
+                        [INDEX_CONFIG['max_parallel_maintenance_workers']]
+                    )
+                    # Leftover of an interrupted build
+                    cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {self.index_name}_new;")
+                    cur.execute(self._create_sql(new_name, plan["desired"], concurrently=True))
+                    if plan["action"] == "rebuild":
+                        cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {self.index_name};")
+                        cur.execute(f"ALTER INDEX {new_name} RENAME TO {self.index_name};")
+                    cur.execute(f"ANALYZE {self.table};")
+            finally:
+                # Session settings would stay with the pooled connection
+                if not conn.closed:
+                    with conn.cursor() as cur:
+                        cur.execute("RESET maintenance_work_mem;")
+                        cur.execute("RESET max_parallel_maintenance_workers;")
+                conn.autocommit = autocommit
+
+        plan["seconds"] = time.perf_counter() - start
+        logger.info(f"Built vector index {self.index_name} in {plan['seconds']:.1f}s")
+        return plan
+
+    def ensure_on_startup(self) -> Dict[str, Any]:
+        """Cheap startup check: create a missing index, only report drift.
+
+        Rebuilding a large index can take a long time, so drift is logged
+        and left to ``python -m src.database.index_manager ensure`` unless
+        INDEX_CONFIG['rebuild_on_startup'] is set.
+
+        Returns:
+            The computed plan
+        """
+        plan = self.plan()
+        if plan["action"] == "create" or (plan["action"] == "rebuild" and INDEX_CONFIG['rebuild_on_startup']):
+            return self.ensure()
+        if plan["action"] == "rebuild":
+            logger.warning(
+                f"Vector index {self.index_name} needs a rebuild ({plan['reason']}); "
+                f"run: python -m src.database.index_manager ensure"
+            )
+        return plan
+
+
+def search_settings(probes: Optional[int] = None, ef_search: Optional[int] = None) -> List[tuple]:
+    """Build the ``set_config`` calls for per-query recall/latency knobs.
+
+    Args:
+        probes: ivfflat lists scanned per query (higher = better recall)
+        ef_search: HNSW candidate list size (higher = better recall, must be >= k)
+
+    Returns:
+        List of (sql, params) pairs to run inside the search transaction
+    """
+    probes = probes if probes is not None else INDEX_CONFIG['probes']
+    ef_search = ef_search if ef_search is not None else INDEX_CONFIG['ef_search']
+    statements = []
+    if probes is not None:
+        statements.append(("SELECT set_config('ivfflat.probes', %s, true);", [str(int(probes))]))
+    if ef_search is not None:
+        statements.append(("SELECT set_config('hnsw.ef_search', %s, true);", [str(int(ef_search))]))
+    return statements
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the pgvector index on the documents table")
+    parser.add_argument("command", choices=["status", "ensure"], help="Show the plan or apply it")
+    parser.add_argument("--method", choices=INDEX_METHODS, help="Index method (default from INDEX_CONFIG)")
+    parser.add_argument("--force", action="store_true", help="Rebuild even without drift (ensure only)")
+
+    args = parser.parse_args()
+
+    from .connection_pool import get_connection_pool
+
+    try:
+        manager = IndexManager(get_connection_pool(DB_CONFIG), method=args.method)
+        if args.command == "ensure":
+            plan = manager.ensure(force=args.force)
+        else:
+            plan = manager.plan()
+        print(json.dumps(plan, indent=2, default=str))
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -1,112 +1,568 @@
 """
-Script to migrate documents to the new embedding model.
+Re-embed the documents table with a new embedding model.
+
+The migration copies every row of the source table into a target table with
+embeddings from the new model, while the application keeps serving from the
+old table:
+
+1. ``run`` creates the target table and, unless ``--no-dual-write``, a
+   trigger that mirrors every insert, update and delete on the source table
+   into it (with a NULL embedding when the text changed). It then pages
+   through the source by id (keyset pagination), encodes whole pages at a
+   time and writes their embeddings with binary COPY. Reading, encoding and
+   writing overlap (see ``pipeline.Pipeline``). The last migrated id is
+   committed together with each page, so an interrupted run resumes where
+   it stopped. A final pass embeds rows the trigger left without one.
+2. ``cutover`` builds the source's indexes on the target, then, with writes
+   briefly blocked, embeds what is still missing and swaps the tables. The
+   old table is kept as ``<source>_old``.
+
+Usage:
+    python -m src.database.migrate_embeddings run --model sentence-transformers/all-mpnet-base-v2
+    python -m src.database.migrate_embeddings status
+    python -m src.database.migrate_embeddings cutover
 """
 
-import psycopg2
-from sentence_transformers import SentenceTransformer
+import argparse
+import hashlib
+import json
 import logging
-from tqdm import tqdm
+import re
+import signal
 import time
-import json
-from psycopg2.extras import Json
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ..config.config import DB_CONFIG, EMBEDDING_MIGRATION_CONFIG
+from ..processing.pipeline import Pipeline, Stage
+from ..utils.model_registry import get_model_registry
+from .bulk_loader import binary_int8, binary_text, binary_vector, copy_rows, encode_fields
+from .index_manager import IndexManager
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Database connection parameters
-DB_PARAMS = {
-    "dbname": "musartao",
-    "user": "datasundae",
-    "password": "6AV%b9",
-    "host": "localhost",
-    "port": 5432
-}
-
-def migrate_embeddings(batch_size=100):
-    """Migrate documents to the new embedding model."""
-    try:
-        # Initialize the new model
-        logger.info("Loading new embedding model...")
-        new_model = SentenceTransformer('sentence-transformers/all-mpnet-base-v2')
-        
-        # Connect to the database
-        logger.info("Connecting to database...")
-        conn = psycopg2.connect(**DB_PARAMS)
-        cur = conn.cursor()
-        
-        # Get total count of documents
-        cur.execute("SELECT COUNT(*) FROM documents_backup")
-        total_docs = cur.fetchone()[0]
-        logger.info(f"Total documents to migrate: {total_docs}")
-        
-        # Process documents in batches
-        offset = 0
+# (id, content) pairs of one page
+Page = List[Tuple[int, str]]
+
+
+def retarget_index(definition: str, name: str, source: str, target: str) -> str:
+    """Turn an index definition of ``source`` into a concurrent build of
+    ``<name>_next`` on ``target``.
+
+    Args:
+        definition: ``pg_indexes.indexdef`` of the source index
+        name: Name of the source index
+        source: Table the index belongs to
+        target: Table to build it on
+
+    Returns:
+        CREATE INDEX CONCURRENTLY statement
+    """
+    definition = re.sub(
+        rf"^CREATE (UNIQUE )?INDEX {re.escape(name)} ",
+        lambda match: f"CREATE {match.group(1) or ''}INDEX CONCURRENTLY {name}_next ",
+        definition
+    )
+    return re.sub(rf" ON (\S+\.)?{re.escape(source)} ", f" ON {target} ", definition, count=1)
+
+
+class EmbeddingMigration:
+    """Copies a table into a new one with embeddings from another model.
+
+    Example:
+        >>> migration = EmbeddingMigration(pool, "sentence-transformers/all-mpnet-base-v2")
+        >>> migration.run()
+        >>> migration.cutover()
+    """
+
+    def __init__(
+        self,
+        pool,
+        model_name: str = EMBEDDING_MIGRATION_CONFIG['model'],
+        source: str = EMBEDDING_MIGRATION_CONFIG['source_table'],
+        target: str = EMBEDDING_MIGRATION_CONFIG['target_table'],
+        batch_size: int = EMBEDDING_MIGRATION_CONFIG['batch_size'],
+        queue_size: int = EMBEDDING_MIGRATION_CONFIG['queue_size'],
+        dual_write: bool = EMBEDDING_MIGRATION_CONFIG['dual_write']
+    ):
+        """Initialize the migration.
+
+        Args:
+            pool: ConnectionPool for reads and writes
+            model_name: Embedding model to migrate to
+            source: Table holding the current embeddings
+            target: Table to fill with the new embeddings
+            batch_size: Rows per page (one encode call and one COPY each)
+            queue_size: Pages read or encoded ahead of the writer
+            dual_write: Mirror writes to the source into the target until cut-over
+        """
+        self.pool = pool
+        self.model_name = model_name
+        self.source = source
+        self.target = target
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.dual_write = dual_write
+        self.staging = f"{target}_embeddings"
+        self.pipeline: Optional[Pipeline] = None
+        self._error: Optional[BaseException] = None
+        self._columns: Optional[List[str]] = None
+
+    @property
+    def model(self):
+        """The new embedding model, from the shared registry."""
+        return get_model_registry().embedding_model(self.model_name)
+
+    def status(self) -> Dict[str, Any]:
+        """Progress of the migration, as stored in its checkpoint row."""
+        with self.pool.connection("migrate_embeddings_status") as conn:
+            with conn.cursor() as cur:
+                self._ensure_checkpoint_table(cur)
+                cur.execute("""
+                    SELECT model, source, last_id, migrated, started_at, updated_at, finished_at
+                    FROM embedding_migrations WHERE target = %s;
+                """, [self.target])
+                row = cur.fetchone()
+                cur.execute(f"SELECT COUNT(*) FROM {self.source};")
+                total = cur.fetchone()[0]
+                if row is None or row[-1] is not None:
+                    remaining = None
+                else:
+                    # Rows past the checkpoint that the dual-write trigger has not copied
+                    cur.execute(f"""
+                        SELECT EXISTS (
+                            SELECT 1 FROM {self.source} s WHERE s.id > %s
+                            AND NOT EXISTS (SELECT 1 FROM {self.target} t WHERE t.id = s.id)
+                        );
+                    """, [row[2]])
+                    remaining = cur.fetchone()[0]
+            conn.commit()
+
+        if row is None:
+            return {"target": self.target, "state": "not started", "rows": total}
+        model, source, last_id, migrated, started, updated, finished = row
+        return {
+            "target": self.target,
+            "source": source,
+            "model": model,
+            "state": "cut over" if finished else ("in progress" if remaining else "backfilled"),
+            "last_id": last_id,
+            "migrated": migrated,
+            "rows": total,
+            "started_at": started,
+            "updated_at": updated,
+            "finished_at": finished
+        }
+
+    def cancel(self):
+        """Stop reading new pages; pages in flight are written and checkpointed."""
+        if self.pipeline is not None:
+            self.pipeline.cancel()
+
+    def run(self) -> Dict[str, Any]:
+        """Create the target if needed and migrate every row not migrated yet.
+
+        Returns:
+            Counts and timings: ``migrated``, ``caught_up``, ``seconds``,
+            ``rows_per_second`` and per-stage statistics
+        """
+        start = time.perf_counter()
+        last_id = self.prepare()
+
+        self._error = None
+        migrated = self._process(self._source_pages(last_id), checkpoint=True)
+        stages = self.pipeline.stats()
+        cancelled = self.pipeline.cancelled
+        caught_up = 0
+        if not cancelled:
+            caught_up = self._process(self._missing_pages(), checkpoint=False)
+
+        elapsed = time.perf_counter() - start
+        return {
+            "migrated": migrated,
+            "caught_up": caught_up,
+            "cancelled": cancelled,
+            "seconds": elapsed,
+            "rows_per_second": (migrated + caught_up) / elapsed if elapsed > 0 else 0.0,
+            "stages": stages
+        }
+
+    def prepare(self) -> int:
+        """Create the target table, dual-write trigger and checkpoint row.
+
+        Returns:
+            The last migrated id (0 for a new migration)
+
+        Raises:
+            ValueError: If the target belongs to a migration to another model
+        """
+        dim = self.model.get_sentence_embedding_dimension()
+        with self.pool.connection("migrate_embeddings_prepare") as conn:
+            with conn.cursor() as cur:
+                self._ensure_checkpoint_table(cur)
+                cur.execute(
+                    "SELECT model, last_id, finished_at FROM embedding_migrations WHERE target = %s;",
+                    [self.target]
+                )
+                row = cur.fetchone()
+                if row is not None:
+                    model, last_id, finished = row
+                    if finished is not None:
+                        raise ValueError(f"Migration into {self.target} was already cut over")
+                    if model != self.model_name:
+                        raise ValueError(
+                            f"{self.target} is being migrated to {model}, not {self.model_name}; "
+                            f"drop it or choose another target"
+                        )
+                    conn.commit()
+                    return last_id
+
+                cur.execute(f"""
+                    CREATE TABLE {self.target} (LIKE {self.source} INCLUDING DEFAULTS);
+                    ALTER TABLE {self.target} ADD PRIMARY KEY (id);
+                    ALTER TABLE {self.target} ALTER COLUMN embedding TYPE vector({int(dim)});
+                """)
+                if self.dual_write:
+                    self._create_trigger(cur)
+                cur.execute("""
+                    INSERT INTO embedding_migrations (target, source, model) VALUES (%s, %s, %s);
+                """, [self.target, self.source, self.model_name])
+            conn.commit()
+        logger.info(f"Created {self.target} for {self.model_name} ({dim} dimensions)")
+        return 0
+
+    def cutover(self) -> Dict[str, Any]:
+        """Swap the migrated table in for the source table.
+
+        Indexes are built on the target first (concurrently, the source stays
+        writable). Then writes to the source are blocked while the rows
+        changed meanwhile are embedded, the tables are renamed and the id
+        sequence is handed to the new table. Switch
+        ``MODEL_CONFIG['embedding_model']`` to the new model at the same time.
+
+        Returns:
+            Names of the swapped tables and the seconds writes were blocked
+
+        Raises:
+            ValueError: If rows are still missing after the final catch-up
+        """
+        status = self.status()
+        if status["state"] != "backfilled":
+            raise ValueError(f"Migration is {status['state']}; finish 'run' before cutting over")
+
+        index_names = self._build_indexes()
+        old = f"{self.source}_old"
+        with self.pool.connection("migrate_embeddings_cutover") as conn:
+            with conn.cursor() as cur:
+                # Readers keep going, writers wait for the swap
+                cur.execute(f"LOCK TABLE {self.source} IN SHARE ROW EXCLUSIVE MODE;")
+                locked = time.perf_counter()
+                for page in self._missing_pages(cur):
+                    self._write_page(cur, page, self._encode(page))
+
+                cur.execute(f"""
+                    SELECT (SELECT COUNT(*) FROM {self.source}),
+                           (SELECT COUNT(*) FROM {self.target} WHERE embedding IS NOT NULL);
+                """)
+                source_rows, target_rows = cur.fetchone()
+                if source_rows != target_rows:
+                    conn.rollback()
+                    raise ValueError(
+                        f"{self.target} has {target_rows} embedded rows, {self.source} has {source_rows}; "
+                        f"run the migration again"
+                    )
+
+                cur.execute(f"DROP TRIGGER IF EXISTS {self.target}_dual_write ON {self.source};")
+                cur.execute(f"DROP FUNCTION IF EXISTS {self.target}_dual_write();")
+                cur.execute(f"ALTER TABLE {self.source} RENAME TO {old};")
+                for name in index_names:
+                    cur.execute(f"ALTER INDEX IF EXISTS {name} RENAME TO {name}_old;")
+                    cur.execute(f"ALTER INDEX {name}_next RENAME TO {name};")
+                cur.execute(f"ALTER TABLE {old} RENAME CONSTRAINT {self.source}_pkey TO {self.source}_pkey_old;")
+                cur.execute(f"ALTER TABLE {self.target} RENAME CONSTRAINT {self.target}_pkey TO {self.source}_pkey;")
+                cur.execute(f"ALTER TABLE {self.target} RENAME TO {self.source};")
+                # The id default keeps using the old table's sequence; let it survive dropping that table
+                cur.execute("SELECT pg_get_serial_sequence(%s, 'id');", [old])
+                sequence = cur.fetchone()[0]
+                if sequence:
+                    cur.execute(f"ALTER SEQUENCE {sequence} OWNED BY {self.source}.id;")
+                cur.execute(
+                    "UPDATE embedding_migrations SET finished_at = now(), updated_at = now() WHERE target = %s;",
+                    [self.target]
+                )
+            conn.commit()
+
+        blocked = time.perf_counter() - locked
+        logger.info(f"Cut over to {self.model_name}; writes were blocked for {blocked:.2f}s")
+        return {"table": self.source, "old_table": old, "model": self.model_name, "blocked_seconds": blocked}
+
+    def _process(self, pages: Iterator[Page], checkpoint: bool) -> int:
+        """Run pages through the encode and write stages.
+
+        Raises:
+            ValueError: If a page failed; pages after it are not written, so
+                the checkpoint never skips rows
+        """
+        written = [0]
+
+        def encode(page: Page):
+            if self._error is not None:
+                return None
+            try:
+                return page, self._encode(page)
+            except Exception as e:
+                self._fail(e)
+                return None
+
+        def write(item):
+            if self._error is not None:
+                return None
+            page, embeddings = item
+            try:
+                with self.pool.connection("migrate_embeddings") as conn:
+                    with conn.cursor() as cur:
+                        self._write_page(cur, page, embeddings)
+                        if checkpoint:
+                            cur.execute("""
+                                UPDATE embedding_migrations
+                                SET last_id = %s, migrated = migrated + %s, updated_at = now()
+                                WHERE target = %s;
+                            """, [page[-1][0], len(page), self.target])
+                    conn.commit()
+            except Exception as e:
+                self._fail(e)
+                return None
+            written[0] += len(page)
+            return page
+
+        # One encoder and one writer keep pages in id order for the checkpoint
+        self.pipeline = Pipeline([Stage("encode", encode), Stage("write", write)], self.queue_size)
+        for page in self.pipeline.run(pages):
+            logger.info(f"Migrated ids up to {page[-1][0]} ({written[0]} rows this run)")
+        if self._error is not None:
+            raise ValueError(f"Error migrating embeddings: {str(self._error)}")
+        return written[0]
+
+    def _fail(self, error: BaseException):
+        self._error = error
+        self.pipeline.cancel()
+
+    def _encode(self, page: Page) -> np.ndarray:
+        return self.model.encode(
+            [content for _, content in page],
+            batch_size=len(page),
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+
+    def _write_page(self, cur, page: Page, embeddings: np.ndarray):
+        """Copy a page's embeddings into the target.
+
+        The rest of each row is taken from the source at write time. Rows
+        whose text changed since they were read are skipped: the dual-write
+        trigger has marked them and the catch-up pass embeds them again.
+        """
+        cur.execute(f"""
+            CREATE TEMPORARY TABLE IF NOT EXISTS {self.staging} (
+                id BIGINT, digest TEXT, embedding vector
+            ) ON COMMIT DELETE ROWS;
+        """)
+        rows = [
+            (doc_id, hashlib.md5(content.encode("utf-8")).hexdigest(), embedding)
+            for (doc_id, content), embedding in zip(page, embeddings)
+        ]
+        copy_rows(
+            cur, self.staging, ("id", "digest", "embedding"),
+            [encode_fields(rows, (binary_int8, binary_text, binary_vector))]
+        )
+
+        columns = self._table_columns(cur)
+        selected = ", ".join("e.embedding" if column == "embedding" else f"s.{column}" for column in columns)
+        updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in columns if column != "id")
+        cur.execute(f"""
+            INSERT INTO {self.target} ({', '.join(columns)})
+            SELECT {selected}
+            FROM {self.staging} e JOIN {self.source} s ON s.id = e.id AND md5(s.content) = e.digest
+            ON CONFLICT (id) DO UPDATE SET {updates};
+        """)
+        cur.execute(f"TRUNCATE {self.staging};")
+
+    def _source_pages(self, last_id: int) -> Iterator[Page]:
+        """Pages of source rows after ``last_id``, by keyset pagination."""
         while True:
-            # Fetch a batch of documents
+            with self.pool.connection("migrate_embeddings_read") as conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        f"SELECT id, content FROM {self.source} WHERE id > %s ORDER BY id LIMIT %s;",
+                        [last_id, self.batch_size]
+                    )
+                    page = cur.fetchall()
+                conn.commit()
+            if not page:
+                return
+            last_id = page[-1][0]
+            yield page
+
+    def _missing_pages(self, cur=None) -> Iterator[Page]:
+        """Pages of target rows without an embedding (changed after being migrated).
+
+        Args:
+            cur: Cursor to read with; defaults to pooled connections
+        """
+        last_id = 0
+        query = f"""
+            SELECT t.id, s.content FROM {self.target} t JOIN {self.source} s ON s.id = t.id
+            WHERE t.embedding IS NULL AND t.id > %s ORDER BY t.id LIMIT %s;
+        """
+        while True:
+            if cur is not None:
+                cur.execute(query, [last_id, self.batch_size])
+                page = cur.fetchall()
+            else:
+                with self.pool.connection("migrate_embeddings_read") as conn:
+                    with conn.cursor() as read:
+                        read.execute(query, [last_id, self.batch_size])
+                        page = read.fetchall()
+                    conn.commit()
+            if not page:
+                return
+            last_id = page[-1][0]
+            yield page
+
+    def _table_columns(self, cur) -> List[str]:
+        if self._columns is None:
             cur.execute("""
-                SELECT id, content, metadata, encrypted_content
-                FROM documents_backup
-                ORDER BY id
-                LIMIT %s OFFSET %s
-            """, (batch_size, offset))
-            
-            batch = cur.fetchall()
-            if not batch:
-                break
-                
-            logger.info(f"Processing batch {offset//batch_size + 1}...")
-            
-            # Process each document
-            for doc_id, content, metadata, encrypted_content in tqdm(batch):
-                try:
-                    # Generate new embedding
-                    new_embedding = new_model.encode(content)
-                    
-                    # Ensure metadata is properly formatted
-                    if isinstance(metadata, str):
-                        try:
-                            metadata = json.loads(metadata)
-                        except json.JSONDecodeError:
-                            metadata = {}
-                    elif metadata is None:
-                        metadata = {}
-                    
-                    # Insert into new table with proper JSON handling
+                SELECT column_name FROM information_schema.columns
+                WHERE table_name = %s AND table_schema = current_schema()
+                ORDER BY ordinal_position;
+            """, [self.source])
+            self._columns = [row[0] for row in cur.fetchall()]
+        return self._columns
+
+    def _ensure_checkpoint_table(self, cur):
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS embedding_migrations (
+                target TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                model TEXT NOT NULL,
+                last_id BIGINT NOT NULL DEFAULT 0,
+                migrated BIGINT NOT NULL DEFAULT 0,
+                started_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                finished_at TIMESTAMP WITH TIME ZONE
+            );
+        """)
+
+    def _create_trigger(self, cur):
+        """Mirror writes on the source into the target until cut-over."""
+        columns = [column for column in self._table_columns(cur) if column != "embedding"]
+        values = ", ".join(f"NEW.{column}" for column in columns)
+        updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in columns if column != "id")
+        cur.execute(f"""
+            CREATE OR REPLACE FUNCTION {self.target}_dual_write() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    DELETE FROM {self.target} WHERE id = OLD.id;
+                    RETURN OLD;
+                END IF;
+                INSERT INTO {self.target} ({', '.join(columns)}) VALUES ({values})
+                ON CONFLICT (id) DO UPDATE SET {updates},
+                    embedding = CASE WHEN {self.target}.content IS DISTINCT FROM EXCLUDED.content
+                                     THEN NULL ELSE {self.target}.embedding END;
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            CREATE TRIGGER {self.target}_dual_write
+            AFTER INSERT OR UPDATE OR DELETE ON {self.source}
+            FOR EACH ROW EXECUTE FUNCTION {self.target}_dual_write();
+        """)
+
+    def _build_indexes(self) -> List[str]:
+        """Recreate the source's secondary indexes on the target as ``<name>_next``.
+
+        Returns:
+            Names of the source indexes that were recreated
+        """
+        with self.pool.connection("migrate_embeddings_indexes") as conn:
+            autocommit = conn.autocommit
+            conn.autocommit = True
+            try:
+                with conn.cursor() as cur:
                     cur.execute("""
-                        INSERT INTO documents_new (id, content, metadata, encrypted_content, embedding)
-                        VALUES (%s, %s, %s, %s, %s)
-                    """, (
-                        doc_id,
-                        content,
-                        Json(metadata),  # Use psycopg2's Json adapter
-                        encrypted_content,
-                        new_embedding.tolist()
-                    ))
-                    
-                except Exception as e:
-                    logger.error(f"Error processing document {doc_id}: {str(e)}")
-                    logger.error(f"Metadata type: {type(metadata)}")
-                    logger.error(f"Metadata content: {metadata}")
-                    continue
-            
-            # Commit after each batch
-            conn.commit()
-            offset += batch_size
-            
-            # Add a small delay to prevent overwhelming the system
-            time.sleep(1)
-        
-        logger.info("Migration completed successfully!")
-        
+                        SELECT i.indexname, i.indexdef FROM pg_indexes i
+                        JOIN pg_class c ON c.relname = i.indexname
+                        JOIN pg_index x ON x.indexrelid = c.oid
+                        WHERE i.tablename = %s AND i.schemaname = current_schema() AND NOT x.indisprimary;
+                    """, [self.source])
+                    definitions = cur.fetchall()
+                    manager = IndexManager(self.pool, table=self.target)
+                    names = []
+                    for name, definition in definitions:
+                        current = manager.current(cur, f"{name}_next")
+                        if current is not None and current["valid"]:
+                            names.append(name)
+                            continue
+                        cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}_next;")
+                        logger.info(f"Building {name}_next on {self.target}")
+                        cur.execute(retarget_index(definition, name, self.source, self.target))
+                        names.append(name)
+                    cur.execute(f"ANALYZE {self.target};")
+            finally:
+                conn.autocommit = autocommit
+        return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-embed the documents table with a new embedding model")
+    parser.add_argument("command", choices=["run", "status", "cutover"], help="Migrate, show progress or swap tables")
+    parser.add_argument("--model", default=EMBEDDING_MIGRATION_CONFIG['model'], help="Embedding model to migrate to")
+    parser.add_argument("--source", default=EMBEDDING_MIGRATION_CONFIG['source_table'], help="Table to migrate")
+    parser.add_argument("--target", default=EMBEDDING_MIGRATION_CONFIG['target_table'], help="Table to migrate into")
+    parser.add_argument("--batch-size", type=int, default=EMBEDDING_MIGRATION_CONFIG['batch_size'], help="Rows per page")
+    parser.add_argument("--queue-size", type=int, default=EMBEDDING_MIGRATION_CONFIG['queue_size'], help="Pages read ahead")
+    parser.add_argument("--no-dual-write", action="store_true", help="Do not mirror writes to the source (source must be read-only)")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    from .connection_pool import get_connection_pool
+
+    try:
+        migration = EmbeddingMigration(
+            get_connection_pool(DB_CONFIG),
+            model_name=args.model,
+            source=args.source,
+            target=args.target,
+            batch_size=args.batch_size,
+            queue_size=args.queue_size,
+            dual_write=not args.no_dual_write
+        )
+        if args.command == "run":
+            def interrupt(signum, frame):
+                signal.signal(signal.SIGINT, signal.default_int_handler)
+                print("\nStopping after the pages in flight (Ctrl-C again to abort)...")
+                migration.cancel()
+
+            signal.signal(signal.SIGINT, interrupt)
+            result = migration.run()
+            result["stages"] = {name: stage["items_per_second"] for name, stage in result["stages"].items()}
+            print(json.dumps(result, indent=2, default=str))
+            if result["cancelled"]:
+                print("Interrupted; run again to resume")
+                return 1
+        elif args.command == "cutover":
+            print(json.dumps(migration.cutover(), indent=2, default=str))
+            print(f"Set MODEL_CONFIG['embedding_model'] = '{args.model}' and restart the application")
+        else:
+            print(json.dumps(migration.status(), indent=2, default=str))
     except Exception as e:
-        logger.error(f"Error during migration: {str(e)}")
-        raise
-    finally:
-        if 'cur' in locals():
-            cur.close()
-        if 'conn' in locals():
-            conn.close()
+        print(f"Error: {str(e)}")
+        return 1
+
+    return 0
+
 
 if __name__ == "__main__":
-    migrate_embeddings() 
\ No newline at end of file
+    exit(main())
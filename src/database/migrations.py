@@ -0,0 +1,218 @@
+"""
+Versioned schema migrations for the PostgreSQL vector database.
+
+Migrations are applied once per deployment, not on every process start:
+
+    python -m src.database.migrations migrate
+    python -m src.database.migrations status
+
+Applied versions are recorded in ``schema_migrations``. At startup the
+application only compares the recorded version with ``SCHEMA_VERSION``
+(``check_schema``), which is a single catalog lookup.
+"""
+
+import argparse
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Union
+
+from ..config.config import DB_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary key for pg_advisory_lock, serializing concurrent deploys
+MIGRATION_LOCK_ID = 7_358_120
+
+
+class Migration(NamedTuple):
+    """A schema change.
+
+    ``apply`` is either a list of SQL statements, run in one transaction
+    together with the version bookkeeping, or a callable taking the
+    connection pool for steps that cannot run inside a transaction (such as
+    CREATE INDEX CONCURRENTLY).
+    """
+    version: int
+    description: str
+    apply: Union[List[str], Callable[[Any], Any]]
+
+
+def _ensure_vector_index(pool):
+    """Build the managed vector index if it is missing or drifted."""
+    from .index_manager import IndexManager
+    return IndexManager(pool).ensure()
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Create documents table", [
+        "CREATE EXTENSION IF NOT EXISTS vector;",
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm;",
+        """
+        CREATE TABLE IF NOT EXISTS documents (
+            id SERIAL PRIMARY KEY,
+            content TEXT NOT NULL,
+            encrypted_content TEXT NOT NULL,
+            metadata JSONB,
+            embedding vector(384)
+        );
+        """,
+    ]),
+    Migration(2, "Add documents.created_at", [
+        "ALTER TABLE documents ADD COLUMN IF NOT EXISTS created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP;",
+    ]),
+    Migration(3, "Add GIN index on documents.metadata", [
+        "CREATE INDEX IF NOT EXISTS documents_metadata_idx ON documents USING GIN (metadata);",
+    ]),
+    Migration(4, "Build managed vector index", _ensure_vector_index),
+    Migration(5, "Add chunk identity columns for incremental ingestion", [
+        "ALTER TABLE documents ADD COLUMN IF NOT EXISTS source TEXT;",
+        "ALTER TABLE documents ADD COLUMN IF NOT EXISTS chunk_index INTEGER;",
+        "ALTER TABLE documents ADD COLUMN IF NOT EXISTS content_hash TEXT;",
+        # Rows added by add_documents keep a NULL source and stay untracked
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS documents_source_chunk_idx
+        ON documents (source, chunk_index) WHERE source IS NOT NULL;
+        """,
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+class SchemaVersionError(Exception):
+    """Raised when the database schema is older than the code expects."""
+
+
+def current_version(pool) -> int:
+    """Return the highest applied migration version (0 for a fresh database).
+
+    Args:
+        pool: ConnectionPool for the database
+
+    Returns:
+        Applied schema version
+    """
+    with pool.connection("schema_version") as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass('schema_migrations') IS NOT NULL;")
+            if not cur.fetchone()[0]:
+                return 0
+            cur.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations;")
+            return int(cur.fetchone()[0])
+
+
+def check_schema(pool, auto_migrate: bool = False) -> int:
+    """Cheap startup check that the schema is at ``SCHEMA_VERSION``.
+
+    Args:
+        pool: ConnectionPool for the database
+        auto_migrate: Apply pending migrations instead of failing (for
+            development; deployments should run the migrate command)
+
+    Returns:
+        The schema version
+
+    Raises:
+        SchemaVersionError: If migrations are pending and ``auto_migrate`` is off
+    """
+    version = current_version(pool)
+    if version >= SCHEMA_VERSION:
+        return version
+    if auto_migrate:
+        migrate(pool)
+        return current_version(pool)
+    raise SchemaVersionError(
+        f"Database schema is at version {version}, expected {SCHEMA_VERSION}; "
+        f"run: python -m src.database.migrations migrate"
+    )
+
+
+def migrate(pool, target: int = SCHEMA_VERSION) -> List[Dict[str, Any]]:
+    """Apply pending migrations up to ``target``.
+
+    A session-level advisory lock makes concurrent runs wait for each other
+    instead of applying the same migration twice.
+
+    Args:
+        pool: ConnectionPool for the database
+        target: Highest version to apply
+
+    Returns:
+        List of applied migrations with their durations
+    """
+    applied = []
+    with pool.connection("migrate_lock") as lock_conn:
+        autocommit = lock_conn.autocommit
+        lock_conn.autocommit = True
+        try:
+            with lock_conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_lock(%s);", [MIGRATION_LOCK_ID])
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS schema_migrations (
+                        version INTEGER PRIMARY KEY,
+                        description TEXT NOT NULL,
+                        applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                    );
+                """)
+
+            version = current_version(pool)
+            for migration in MIGRATIONS:
+                if migration.version <= version or migration.version > target:
+                    continue
+
+                logger.info(f"Applying migration {migration.version}: {migration.description}")
+                start = time.perf_counter()
+                if callable(migration.apply):
+                    migration.apply(pool)
+                    statements = []
+                else:
+                    statements = migration.apply
+
+                with pool.connection("migrate") as conn:
+                    with conn.cursor() as cur:
+                        for statement in statements:
+                            cur.execute(statement)
+                        cur.execute(
+                            "INSERT INTO schema_migrations (version, description) VALUES (%s, %s);",
+                            [migration.version, migration.description]
+                        )
+                    conn.commit()
+
+                applied.append({
+                    "version": migration.version,
+                    "description": migration.description,
+                    "seconds": time.perf_counter() - start
+                })
+        finally:
+            with lock_conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_unlock(%s);", [MIGRATION_LOCK_ID])
+            lock_conn.autocommit = autocommit
+
+    return applied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply or inspect database schema migrations")
+    parser.add_argument("command", choices=["status", "migrate"], help="Show the schema version or migrate")
+    parser.add_argument("--target", type=int, default=SCHEMA_VERSION, help="Highest version to apply")
+
+    args = parser.parse_args()
+
+    from .connection_pool import get_connection_pool
+
+    try:
+        pool = get_connection_pool(DB_CONFIG)
+        if args.command == "migrate":
+            for step in migrate(pool, args.target):
+                print(f"Applied {step['version']}: {step['description']} ({step['seconds']:.1f}s)")
+        print(json.dumps({"version": current_version(pool), "expected": SCHEMA_VERSION}))
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
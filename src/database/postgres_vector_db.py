@@ -3,22 +3,34 @@ PostgreSQL vector database implementation with optimized search capabilities.
 """
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
 import psycopg2
 import psycopg2.extras
 from psycopg2.extras import execute_values
 import json
 import logging
-from typing import List, Tuple, Optional, Dict, Any
+from typing import List, Tuple, Optional, Dict, Any, Callable, Iterable
+from itertools import islice
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from cryptography.fernet import Fernet
 import base64
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from functools import lru_cache
 
+from ..config.config import MODEL_CONFIG
 from ..processing.rag_document import RAGDocument
-from .db_connection import DatabaseConnection, init_db
+from ..utils.metrics import DOCUMENT_EMBEDDING_SECONDS, QUERY_EMBEDDING_SECONDS, SEARCH_SECONDS, timed
+from ..utils.model_registry import get_embedding_model
+from ..utils.streaming import prefetch
+from ..utils.tracing import current_span, span, traced
+from .connection_pool import get_connection_pool
+from .embedding_cache import get_query_embedding_cache
+from .result_cache import SearchResultCache
+from .index_manager import search_settings
+from .migrations import check_schema
+from .incremental import Chunk, identify, plan_sync
+from .bulk_loader import BulkLoader
 
 class PostgreSQLVectorDB:
     """PostgreSQL vector database with encryption and optimized search."""
@@ -30,17 +42,23 @@ class PostgreSQLVectorDB:
         password: str = "6AV%b9",
         host: str = "localhost",
         port: int = 5432,
-        cache_size: int = 1000
+        cache_size: int = 1000,
+        auto_migrate: bool = False
     ):
         """Initialize the PostgreSQL vector database.
         
+        Construction is cheap: the schema is version-checked on first use of
+        the pool (migrations run at deploy time, see ``src.database.migrations``)
+        and the embedding model is loaded on first use or by ``warm_up()``.
+        
         Args:
             dbname: Database name
             user: Database user
             password: Database password
             host: Database host
             port: Database port
-            cache_size: Size of the LRU cache for search results
+            cache_size: Size of the LRU cache for search results (0 disables it)
+            auto_migrate: Apply pending schema migrations instead of failing
         """
         self.conn_params = {
             "dbname": dbname,
@@ -50,17 +68,31 @@ class PostgreSQLVectorDB:
             "port": port
         }
         
+        # Persistent connections shared with every other instance in the process
+        self._pool = get_connection_pool(self.conn_params)
+        
+        # Top-k results, invalidated whenever this instance writes
+        self.result_cache = SearchResultCache(max_size=cache_size)
+        
         # Initialize encryption
         self._init_encryption()
         
-        # Initialize sentence transformer model with smaller model
-        self.model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+        # Sentence transformer model from the shared registry (see the model property)
+        self.model_name = MODEL_CONFIG['embedding_model']
+        self.query_cache = get_query_embedding_cache()
         
-        # Create tables if they don't exist
-        self._init_db()
+        # The schema version is verified on first use (see the pool property)
+        self.auto_migrate = auto_migrate
+        self.schema_version: Optional[int] = None
         
         # Configure logging
         self.logger = logging.getLogger(__name__)
+        
+        # Throughput of the most recent add_documents call
+        self.last_ingest_stats: Dict[str, Any] = {}
+        
+        # Counts of the most recent sync_documents call
+        self.last_sync_stats: Dict[str, Any] = {}
     
     def _init_encryption(self):
         """Initialize encryption key and Fernet instance."""
@@ -85,134 +117,458 @@ class PostgreSQLVectorDB:
         return self.fernet.decrypt(encrypted_data.encode()).decode()
     
     def _init_db(self):
-        """Initialize the database with optimized indexes."""
+        """Check that the database schema is up to date.
+        
+        Raises:
+            ValueError: If schema migrations are pending
+        """
         try:
-            # First transaction: Create extensions and table
-            with psycopg2.connect(**self.conn_params) as conn:
-                with conn.cursor() as cur:
-                    # Enable required extensions
-                    cur.execute("CREATE EXTENSION IF NOT EXISTS vector;")
-                    cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
-                    
-                    # Drop existing indexes if they exist
-                    cur.execute("DROP INDEX IF EXISTS documents_embedding_idx;")
-                    cur.execute("DROP INDEX IF EXISTS documents_metadata_idx;")
-                    
-                    # Create documents table with optimized structure
-                    cur.execute("""
-                        CREATE TABLE IF NOT EXISTS documents (
-                            id SERIAL PRIMARY KEY,
-                            content TEXT NOT NULL,
-                            encrypted_content TEXT NOT NULL,
-                            metadata JSONB,
-                            embedding vector(384)  -- Updated for MiniLM model
-                        );
-                    """)
-                    conn.commit()
-            
-            # Second transaction: Create indexes
-            with psycopg2.connect(**self.conn_params) as conn:
-                with conn.cursor() as cur:
-                    # Increase maintenance_work_mem for index creation
-                    cur.execute("SET maintenance_work_mem = '256MB';")
-                    cur.execute("SET max_parallel_workers_per_gather = 4;")
-                    
-                    # Create optimized indexes
-                    cur.execute("""
-                        CREATE INDEX documents_embedding_idx 
-                        ON documents 
-                        USING ivfflat (embedding vector_cosine_ops)
-                        WITH (lists = 100);
-                    """)
-                    
-                    # Add GIN index for metadata
-                    cur.execute("""
-                        CREATE INDEX documents_metadata_idx
-                        ON documents
-                        USING GIN (metadata);
-                    """)
-                    
-                    conn.commit()
-                    
+            self.schema_version = check_schema(self._pool, auto_migrate=self.auto_migrate)
         except Exception as e:
             raise ValueError(f"Error initializing database: {str(e)}")
     
-    def add_documents(self, documents: List[RAGDocument]) -> List[str]:
+    @property
+    def pool(self):
+        """Connection pool, after a one-time schema version check.
+        
+        Checking on first use rather than in ``__init__`` keeps constructing
+        the database (e.g. at web app import) free of queries. The check is
+        idempotent, so concurrent first uses may both run it.
+        """
+        if self.schema_version is None:
+            self._init_db()
+        return self._pool
+    
+    @property
+    def model(self):
+        """Embedding model, shared process-wide and loaded on first use."""
+        return get_embedding_model(self.model_name)
+    
+    def warm_up(self):
+        """Load the embedding model and open a pooled connection ahead of traffic.
+        
+        Call once at startup (or in a background thread) so the first search
+        does not pay for model loading and connection setup.
+        """
+        start = time.perf_counter()
+        self.model.encode("warm up", show_progress_bar=False)
+        with self.pool.connection("warm_up") as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1;")
+        self.logger.info(f"Warm-up finished in {time.perf_counter() - start:.2f}s")
+    
+    def add_documents(
+        self,
+        documents: List[RAGDocument],
+        batch_size: Optional[int] = None,
+        embeddings: Optional[np.ndarray] = None
+    ) -> List[str]:
         """Add documents to the database with encryption.
         
+        Documents are embedded in batches of ``batch_size`` with a single
+        ``model.encode`` call each. While one batch is being encoded, the
+        previous batch is encrypted and inserted on a writer thread, so model
+        time and database time overlap. All batches share one transaction.
+        
         Args:
             documents: List of RAGDocument instances
+            batch_size: Documents per encode/insert batch, defaults to
+                ``MODEL_CONFIG['batch_size']``
+            embeddings: Precomputed embeddings aligned with ``documents``
+                (e.g. from an ingestion pipeline's embedding stage)
             
         Returns:
             List of document IDs
         """
+        batch_size = batch_size or MODEL_CONFIG['batch_size']
+        start = time.perf_counter()
+        
+        try:
+            with self.pool.connection("add_documents") as conn:
+                doc_ids, encode_seconds = self._encode_and_write(
+                    conn, documents, [doc.text for doc in documents], batch_size, self._insert_batch, embeddings
+                )
+                conn.commit()
+        
+        except Exception as e:
+            raise ValueError(f"Error adding documents: {str(e)}")
+        finally:
+            self.result_cache.invalidate()
+        
+        elapsed = time.perf_counter() - start
+        self.last_ingest_stats = {
+            "documents": len(doc_ids),
+            "batch_size": batch_size,
+            "seconds": elapsed,
+            "encode_seconds": encode_seconds,
+            "docs_per_second": len(doc_ids) / elapsed if elapsed > 0 else 0.0
+        }
+        self.logger.info(
+            f"Added {len(doc_ids)} documents in {elapsed:.2f}s "
+            f"({self.last_ingest_stats['docs_per_second']:.1f} docs/sec, "
+            f"{encode_seconds:.2f}s encoding)"
+        )
+        return doc_ids
+    
+    def _encode_and_write(
+        self,
+        conn,
+        items: List[Any],
+        texts: List[str],
+        batch_size: int,
+        write: Callable[[Any, List[Any], np.ndarray], List[str]],
+        precomputed: Optional[np.ndarray] = None
+    ) -> Tuple[List[str], float]:
+        """Embed items in batches and write each batch while the next is encoded.
+        
+        Args:
+            conn: Connection holding the ingestion transaction
+            items: Items passed to ``write``, aligned with ``texts``
+            texts: Texts to embed
+            batch_size: Items per encode/write batch
+            write: Function (conn, batch, embeddings) returning written IDs
+            precomputed: Embeddings aligned with ``items``; skips encoding
+            
+        Returns:
+            (written IDs, seconds spent encoding)
+        """
+        encode_seconds = 0.0
+        doc_ids = []
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="add_documents") as writer:
+            pending = None
+            for offset in range(0, len(items), batch_size):
+                # Generate embeddings for the whole batch at once
+                encode_start = time.perf_counter()
+                if precomputed is not None:
+                    embeddings = precomputed[offset:offset + batch_size]
+                else:
+                    with DOCUMENT_EMBEDDING_SECONDS.time():
+                        embeddings = self.model.encode(
+                            texts[offset:offset + batch_size],
+                            batch_size=batch_size,
+                            convert_to_numpy=True,
+                            show_progress_bar=False
+                        )
+                encode_seconds += time.perf_counter() - encode_start
+                
+                # Wait for the previous write before queueing the next one
+                if pending is not None:
+                    doc_ids.extend(pending.result())
+                pending = writer.submit(write, conn, items[offset:offset + batch_size], embeddings)
+            
+            if pending is not None:
+                doc_ids.extend(pending.result())
+        return doc_ids, encode_seconds
+    
+    def bulk_loader(self, **options: Any) -> BulkLoader:
+        """Create a COPY-based bulk loader writing through this instance's pool.
+        
+        Args:
+            **options: ``BulkLoader`` options (copy_format, staging, defer_indexes)
+        """
+        return BulkLoader(self.pool, self._encrypt_data, **options)
+    
+    def bulk_load(
+        self,
+        documents: Iterable[RAGDocument],
+        batch_size: Optional[int] = None,
+        keyed: bool = False,
+        **options: Any
+    ) -> Dict[str, Any]:
+        """Load a large stream of documents with COPY instead of INSERTs.
+        
+        Documents are embedded in batches on a background thread while the
+        previous batches stream to the server, see ``BulkLoader``. Unlike
+        ``add_documents`` no IDs are returned.
+        
+        Args:
+            documents: Documents to load (any iterable, consumed lazily)
+            batch_size: Documents per encode batch, defaults to
+                ``MODEL_CONFIG['batch_size']``
+            keyed: Upsert by (source, chunk index), see ``BulkLoader.load``
+            **options: ``BulkLoader`` options (copy_format, staging, defer_indexes)
+            
+        Returns:
+            Load statistics, also kept in ``last_ingest_stats``
+        """
+        batch_size = batch_size or MODEL_CONFIG['batch_size']
+        documents = iter(documents)
+        
+        def embedded():
+            while True:
+                batch = list(islice(documents, batch_size))
+                if not batch:
+                    return
+                with DOCUMENT_EMBEDDING_SECONDS.time():
+                    embeddings = self.model.encode(
+                        [doc.text for doc in batch],
+                        batch_size=batch_size,
+                        convert_to_numpy=True,
+                        show_progress_bar=False
+                    )
+                yield batch, embeddings
+        
+        try:
+            stats = self.bulk_loader(**options).load(prefetch(embedded(), maxsize=2), keyed)
+        finally:
+            self.result_cache.invalidate()
+        
+        self.last_ingest_stats = dict(stats, documents=stats["rows"], batch_size=batch_size)
+        self.logger.info(
+            f"Bulk loaded {stats['rows']} documents in {stats['seconds']:.2f}s "
+            f"({stats['rows_per_second']:.1f} docs/sec)"
+        )
+        return stats
+    
+    def sync_documents(
+        self,
+        documents: List[RAGDocument],
+        batch_size: Optional[int] = None
+    ) -> List[str]:
+        """Incrementally ingest documents, writing only what changed.
+        
+        Each document is identified by ``metadata['source']`` and its chunk
+        index (``metadata['chunk_index']`` or its position within the source).
+        Unchanged chunks (same content hash) are skipped without being
+        embedded, changed chunks are updated in place, new chunks inserted,
+        and stored chunks past the new end of a source deleted. Rows of the
+        same sources added earlier by ``add_documents`` are replaced.
+        
+        Every call must include all chunks of each source it mentions.
+        Counts are kept in ``last_sync_stats``.
+        
+        Args:
+            documents: List of RAGDocument instances with a source
+            batch_size: Documents per encode/write batch, defaults to
+                ``MODEL_CONFIG['batch_size']``
+            
+        Returns:
+            List of IDs of the added and updated rows
+        """
+        batch_size = batch_size or MODEL_CONFIG['batch_size']
+        start = time.perf_counter()
+        encode_seconds = 0.0
+        doc_ids = []
+        deleted = 0
+        
         try:
-            with psycopg2.connect(**self.conn_params) as conn:
+            chunks = identify(documents)
+            sources = sorted({source for source, _ in chunks})
+            with self.pool.connection("sync_documents") as conn:
                 with conn.cursor() as cur:
-                    # Prepare data for batch insert
-                    data = []
-                    for doc in documents:
-                        # Generate embedding
-                        embedding = self.model.encode(doc.text)
-                        
-                        # Encrypt sensitive content
-                        encrypted_content = self._encrypt_data(doc.text)
-                        
-                        # Prepare metadata
-                        metadata = json.dumps(doc.metadata)
-                        
-                        data.append((
-                            doc.text,  # Keep original content for embedding
-                            encrypted_content,
-                            metadata,
-                            embedding.tolist()
-                        ))
-                    
-                    # Batch insert documents
-                    query = """
-                        INSERT INTO documents (content, encrypted_content, metadata, embedding)
-                        VALUES %s
-                        RETURNING id;
-                    """
-                    template = "(%s, %s, %s, %s::vector)"
-                    
-                    doc_ids = []
-                    results = execute_values(cur, query, data, template=template, fetch=True)
-                    for result in results:
-                        doc_ids.append(str(result[0]))
+                    cur.execute("""
+                        SELECT source, chunk_index, content_hash
+                        FROM documents
+                        WHERE source = ANY(%s);
+                    """, [sources])
+                    existing = {(source, chunk_index): stored for source, chunk_index, stored in cur.fetchall()}
+                
+                plan = plan_sync(chunks, existing)
+                changed = plan.added + plan.updated
+                if changed:
+                    doc_ids, encode_seconds = self._encode_and_write(
+                        conn, changed, [chunk.document.text for chunk in changed], batch_size, self._upsert_batch
+                    )
+                
+                with conn.cursor() as cur:
+                    # Chunks past the new end of shrunk sources
+                    cur.execute("""
+                        DELETE FROM documents d
+                        USING unnest(%s::text[], %s::integer[]) AS s(source, chunk_count)
+                        WHERE d.source = s.source AND d.chunk_index >= s.chunk_count;
+                    """, [list(plan.chunk_counts), list(plan.chunk_counts.values())])
+                    deleted += cur.rowcount
                     
+                    # Untracked copies from earlier add_documents runs
+                    for source in sources:
+                        cur.execute(
+                            "DELETE FROM documents WHERE source IS NULL AND metadata @> %s;",
+                            [json.dumps({"source": source})]
+                        )
+                        deleted += cur.rowcount
+                conn.commit()
+        
+        except Exception as e:
+            raise ValueError(f"Error syncing documents: {str(e)}")
+        finally:
+            if doc_ids or deleted:
+                self.result_cache.invalidate()
+        
+        elapsed = time.perf_counter() - start
+        self.last_sync_stats = {
+            "added": len(plan.added),
+            "updated": len(plan.updated),
+            "skipped": plan.skipped,
+            "deleted": deleted,
+            "seconds": elapsed,
+            "encode_seconds": encode_seconds
+        }
+        self.logger.info(
+            f"Synced {len(sources)} sources in {elapsed:.2f}s: {len(plan.added)} added, "
+            f"{len(plan.updated)} updated, {plan.skipped} skipped, {deleted} deleted"
+        )
+        return doc_ids
+    
+    def prune_sources(self, present: List[str], prefix: str) -> int:
+        """Delete the chunks of removed documents.
+        
+        Args:
+            present: Sources that still exist
+            prefix: Only sources starting with this prefix (e.g. the synced
+                directory) are considered
+            
+        Returns:
+            Number of deleted rows
+        """
+        try:
+            with self.pool.connection("prune_sources") as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        DELETE FROM documents
+                        WHERE starts_with(source, %s) AND NOT (source = ANY(%s));
+                    """, [prefix, list(present)])
+                    deleted = cur.rowcount
                     conn.commit()
-                    
-                    return doc_ids
-                    
+            
+            if deleted:
+                self.result_cache.invalidate()
+            return deleted
+            
         except Exception as e:
-            raise ValueError(f"Error adding documents: {str(e)}")
+            raise ValueError(f"Error pruning sources: {str(e)}")
     
-    @lru_cache(maxsize=1000)
-    def _cached_search(
-        self,
-        query: str,
-        k: int = 5,
-        metadata_filter: Optional[Dict[str, Any]] = None
-    ) -> List[Tuple[RAGDocument, float]]:
-        """Cached version of the search function."""
-        return self._search_impl(query, k, metadata_filter)
+    def _upsert_batch(self, conn, batch: List[Chunk], embeddings: np.ndarray) -> List[str]:
+        """Encrypt and upsert one batch of chunks keyed by (source, chunk_index).
+        
+        Args:
+            conn: Connection holding the sync transaction
+            batch: Chunks in the batch
+            embeddings: Embedding matrix aligned with ``batch``
+            
+        Returns:
+            List of written document IDs, in batch order
+        """
+        data = [
+            (
+                chunk.document.text,
+                self._encrypt_data(chunk.document.text),
+                json.dumps(chunk.document.metadata),
+                embedding.tolist(),
+                chunk.source,
+                chunk.chunk_index,
+                chunk.content_hash
+            )
+            for chunk, embedding in zip(batch, embeddings)
+        ]
+        
+        query = """
+            INSERT INTO documents (content, encrypted_content, metadata, embedding, source, chunk_index, content_hash)
+            VALUES %s
+            ON CONFLICT (source, chunk_index) WHERE source IS NOT NULL DO UPDATE SET
+                content = EXCLUDED.content,
+                encrypted_content = EXCLUDED.encrypted_content,
+                metadata = EXCLUDED.metadata,
+                embedding = EXCLUDED.embedding,
+                content_hash = EXCLUDED.content_hash
+            RETURNING id;
+        """
+        template = "(%s, %s, %s, %s::vector, %s, %s, %s)"
+        
+        with conn.cursor() as cur:
+            results = execute_values(cur, query, data, template=template, page_size=len(data), fetch=True)
+        return [str(result[0]) for result in results]
+    
+    def _insert_batch(self, conn, batch: List[RAGDocument], embeddings: np.ndarray) -> List[str]:
+        """Encrypt and insert one batch of documents with their embeddings.
+        
+        Args:
+            conn: Connection holding the ingestion transaction
+            batch: Documents in the batch
+            embeddings: Embedding matrix aligned with ``batch``
+            
+        Returns:
+            List of inserted document IDs, in batch order
+        """
+        data = [
+            (
+                doc.text,  # Keep original content for embedding
+                self._encrypt_data(doc.text),
+                json.dumps(doc.metadata),
+                embedding.tolist()
+            )
+            for doc, embedding in zip(batch, embeddings)
+        ]
+        
+        query = """
+            INSERT INTO documents (content, encrypted_content, metadata, embedding)
+            VALUES %s
+            RETURNING id;
+        """
+        template = "(%s, %s, %s, %s::vector)"
+        
+        with conn.cursor() as cur:
+            results = execute_values(cur, query, data, template=template, page_size=len(data), fetch=True)
+        return [str(result[0]) for result in results]
     
+    @traced("embed_query")
+    def embed_query(self, query: str) -> np.ndarray:
+        """Embed a search query, reusing the process-wide query embedding cache.
+        
+        Args:
+            query: Query text
+            
+        Returns:
+            Read-only float32 query embedding
+        """
+        return self.query_cache.get_or_compute(query, self.model_name, timed(QUERY_EMBEDDING_SECONDS, self.model.encode))
+    
+    @traced("vector_db.search")
+    @SEARCH_SECONDS.labels(backend="postgres").time()
     def search(
         self,
         query: str,
         k: int = 5,
-        metadata_filter: Optional[Dict[str, Any]] = None
+        metadata_filter: Optional[Dict[str, Any]] = None,
+        probes: Optional[int] = None,
+        ef_search: Optional[int] = None
     ) -> List[Tuple[RAGDocument, float]]:
-        """Search for similar documents."""
+        """Search for similar documents.
+        
+        Args:
+            query: Query text
+            k: Number of results
+            metadata_filter: Optional metadata filter
+            probes: ivfflat lists scanned for this query, trading latency for
+                recall (defaults to ``INDEX_CONFIG['probes']``)
+            ef_search: HNSW candidate list size for this query, should be at
+                least ``k`` (defaults to ``INDEX_CONFIG['ef_search']``)
+            
+        Returns:
+            List of (document, similarity) tuples
+        """
         try:
-            # Generate query embedding
+            # Generate query embedding (served from the shared cache on repeats)
             self.logger.info(f"Generating embedding for query: {query}")
-            query_embedding = self.model.encode(query)
+            query_embedding = self.embed_query(query)
             self.logger.info(f"Generated embedding shape: {query_embedding.shape}")
             
-            with psycopg2.connect(**self.conn_params) as conn:
+            # Serve repeated searches without touching Postgres
+            cache_key = self.result_cache.make_key(
+                query_embedding, k, metadata_filter, probes=probes, ef_search=ef_search
+            )
+            generation = self.result_cache.generation
+            cached = self.result_cache.get(cache_key)
+            current_span().set(result_cache_hit=cached is not None)
+            if cached is not None:
+                self.logger.info(f"Returning {len(cached)} cached results")
+                return cached
+            
+            with self.pool.connection("search") as conn:
                 with conn.cursor() as cur:
+                    # Per-query index knobs, scoped to this transaction
+                    for setting_sql, setting_params in search_settings(probes, ef_search):
+                        cur.execute(setting_sql, setting_params)
+                    
                     # Construct SQL query
                     sql = """
                         SELECT id, content, encrypted_content, metadata, 
@@ -227,36 +583,42 @@ class PostgreSQLVectorDB:
                         sql += " WHERE " + filter_sql
                         params.extend(filter_params)
                     
-                    # Add similarity threshold and limit
+                    # Order by the distance operator itself so the vector index is used
                     sql += """
-                        ORDER BY similarity DESC
+                        ORDER BY embedding <=> %s::vector
                         LIMIT %s;
                     """
-                    params.append(k)
+                    params.extend([query_embedding.tolist(), k])
                     
                     # Execute query
                     self.logger.info(f"Executing vector similarity search query")
                     self.logger.info(f"SQL: {sql}")
                     self.logger.info(f"Parameters: {params}")
                     
-                    cur.execute(sql, params)
-                    results = cur.fetchall()
+                    with span("db.execute"):
+                        cur.execute(sql, params)
                     
-                    self.logger.info(f"Found {len(results)} results")
-                    
-                    # Format results
-                    documents = []
-                    for row in results:
-                        doc_id, content, encrypted_content, metadata, similarity = row
-                        self.logger.info(f"Document {doc_id} similarity: {similarity}")
-                        self.logger.info(f"Document metadata: {metadata}")
+                    with span("db.decode") as decode:
+                        results = cur.fetchall()
                         
-                        doc = RAGDocument(
-                            text=content,
-                            metadata=metadata
-                        )
-                        documents.append((doc, float(similarity)))
+                        self.logger.info(f"Found {len(results)} results")
+                        
+                        # Format results
+                        documents = []
+                        for row in results:
+                            doc_id, content, encrypted_content, metadata, similarity = row
+                            self.logger.info(f"Document {doc_id} similarity: {similarity}")
+                            self.logger.info(f"Document metadata: {metadata}")
+                            
+                            doc = RAGDocument(
+                                text=content,
+                                metadata=metadata,
+                                doc_id=doc_id
+                            )
+                            documents.append((doc, float(similarity)))
+                        decode.set(rows=len(documents))
                     
+                    self.result_cache.put(cache_key, documents, generation)
                     return documents
                     
         except Exception as e:
@@ -305,7 +667,7 @@ class PostgreSQLVectorDB:
             RAGDocument instance if found, None otherwise
         """
         try:
-            with psycopg2.connect(**self.conn_params) as conn:
+            with self.pool.connection("get_document") as conn:
                 with conn.cursor() as cur:
                     # Query document
                     cur.execute("""
@@ -338,12 +700,15 @@ class PostgreSQLVectorDB:
             True if document was deleted, False otherwise
         """
         try:
-            with psycopg2.connect(**self.conn_params) as conn:
+            with self.pool.connection("delete_document") as conn:
                 with conn.cursor() as cur:
                     cur.execute("DELETE FROM documents WHERE id = %s;", [doc_id])
                     deleted = cur.rowcount > 0
                     conn.commit()
-                    return deleted
+            
+            if deleted:
+                self.result_cache.invalidate()
+            return deleted
                     
         except Exception as e:
             raise ValueError(f"Error deleting document: {str(e)}")
@@ -351,17 +716,38 @@ class PostgreSQLVectorDB:
     def clear(self):
         """Clear all documents from the database."""
         try:
-            with psycopg2.connect(**self.conn_params) as conn:
+            with self.pool.connection("clear") as conn:
                 with conn.cursor() as cur:
                     cur.execute("TRUNCATE TABLE documents;")
                     conn.commit()
-                    
+            
+            self.result_cache.invalidate()
+            
         except Exception as e:
             raise ValueError(f"Error clearing database: {str(e)}")
     
     def close(self):
         """Close any open resources."""
-        pass  # Connection is handled by context managers
+        pass  # Connections belong to the shared pool, see close_all_pools()
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Get query embedding and search result cache statistics.
+        
+        Returns:
+            Dictionary with ``query_embeddings`` and ``search_results`` entries
+        """
+        return {
+            "query_embeddings": self.query_cache.stats(),
+            "search_results": self.result_cache.stats()
+        }
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool metrics (size, wait times, per-call latency).
+        
+        Returns:
+            Dictionary of pool statistics
+        """
+        return self._pool.stats()
     
     def get_books(self) -> List[Dict[str, str]]:
         """Get the list of books from the documents table.
@@ -370,7 +756,7 @@ class PostgreSQLVectorDB:
             List of dictionaries containing book titles and authors.
         """
         try:
-            with psycopg2.connect(**self.conn_params) as conn:
+            with self.pool.connection("get_books") as conn:
                 with conn.cursor() as cur:
                     cur.execute("""
                         SELECT metadata->>'title' as title, metadata->>'author' as author
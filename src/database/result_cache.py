@@ -0,0 +1,133 @@
+"""
+Cache of top-k vector search results, invalidated on writes.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from ..config.config import RESULT_CACHE_CONFIG
+
+
+class SearchResultCache:
+    """Bounded LRU cache of search results guarded by a generation counter.
+
+    Every write to the underlying table calls ``invalidate()``, which bumps
+    the generation. Results are stored together with the generation that was
+    current when the search *started*, so a search racing with a write can
+    never repopulate the cache with stale rows.
+
+    Example:
+        >>> cache = SearchResultCache(max_size=1000)
+        >>> key = cache.make_key(query_embedding, k=5, metadata_filter=None)
+        >>> generation = cache.generation
+        >>> results = cache.get(key)
+        >>> if results is None:
+        ...     results = run_query()
+        ...     cache.put(key, results, generation)
+    """
+
+    def __init__(self, max_size: int = RESULT_CACHE_CONFIG["max_size"], ttl: float = RESULT_CACHE_CONFIG["ttl"]):
+        """Initialize the cache.
+
+        Args:
+            max_size: Maximum number of cached result sets (0 disables caching)
+            ttl: Seconds a result set stays valid, bounding staleness from
+                writes made by other processes
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.generation = 0
+        self._entries: "OrderedDict[Hashable, Tuple[int, float, List[Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(embedding: np.ndarray, k: int, metadata_filter: Optional[Dict[str, Any]] = None, **options) -> Tuple:
+        """Build a cache key from the query embedding and search parameters.
+
+        Args:
+            embedding: Query embedding
+            k: Number of results requested
+            metadata_filter: Metadata filter, canonicalized with sorted keys
+            **options: Further parameters that change the result set
+
+        Returns:
+            Hashable cache key
+        """
+        digest = hashlib.sha1(np.ascontiguousarray(embedding, dtype=np.float32).tobytes()).hexdigest()
+        canonical_filter = json.dumps(metadata_filter or {}, sort_keys=True, default=str)
+        canonical_options = json.dumps(options, sort_keys=True, default=str)
+        return (digest, int(k), canonical_filter, canonical_options)
+
+    def get(self, key: Hashable) -> Optional[List[Any]]:
+        """Look up a result set.
+
+        Args:
+            key: Key from ``make_key``
+
+        Returns:
+            A copy of the cached result list, or None on a miss
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                generation, stored_at, results = entry
+                if generation == self.generation and now - stored_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return list(results)
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, results: List[Any], generation: int) -> None:
+        """Store a result set computed while ``generation`` was current.
+
+        Args:
+            key: Key from ``make_key``
+            results: Search results
+            generation: Value of ``self.generation`` read before searching
+        """
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (generation, time.monotonic(), list(results))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Drop all cached results after a write."""
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size.
+
+        Returns:
+            Dictionary of cache statistics
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "generation": self.generation,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
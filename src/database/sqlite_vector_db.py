@@ -2,12 +2,24 @@
 
 import json
 import sqlite3
+import threading
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import numpy as np
 
+from .embedding_matrix import EmbeddingMatrix, DIRTY_GENERATION
+
 class SQLiteVectorDB:
-    """SQLite-based vector database for document storage and retrieval."""
+    """SQLite-based vector database for document storage and retrieval.
+    
+    Embeddings are kept twice: as BLOBs in the ``documents`` table (the
+    source of truth) and as one pre-normalized float32 matrix memory-mapped
+    from ``<db_path>.vectors.npy``. Searches score the whole matrix with a
+    single matrix-vector product and only read content and metadata for the
+    top results. A generation counter stored in the database detects when
+    the matrix is out of date (another process wrote, or a write was
+    interrupted) and triggers a rebuild from the table.
+    """
 
     def __init__(self, db_path: Optional[str] = None):
         """Initialize the SQLite vector database.
@@ -21,6 +33,10 @@ class SQLiteVectorDB:
         
         self.db_path = db_path
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        
+        self.matrix = EmbeddingMatrix(f"{db_path}.vectors.npy")
+        self._matrix_loaded = False
+        self._lock = threading.RLock()
 
     async def init_db(self):
         """Initialize the database schema."""
@@ -33,7 +49,85 @@ class SQLiteVectorDB:
                     embedding BLOB NOT NULL
                 )
             """)
+            # Row of the document in the embedding matrix
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(documents)")]
+            if "vector_row" not in columns:
+                conn.execute("ALTER TABLE documents ADD COLUMN vector_row INTEGER")
+            conn.execute("CREATE INDEX IF NOT EXISTS documents_vector_row_idx ON documents (vector_row)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS vector_meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+            """)
+            conn.execute("INSERT OR IGNORE INTO vector_meta (key, value) VALUES ('generation', 0)")
+            conn.commit()
+            self._sync_matrix(conn)
+
+    def _get_generation(self, conn: sqlite3.Connection) -> int:
+        """Read the table generation, bumped by every write."""
+        row = conn.execute("SELECT value FROM vector_meta WHERE key = 'generation'").fetchone()
+        return row[0] if row else 0
+
+    def _bump_generation(self, conn: sqlite3.Connection) -> int:
+        """Increment the table generation inside the current transaction."""
+        conn.execute("UPDATE vector_meta SET value = value + 1 WHERE key = 'generation'")
+        return self._get_generation(conn)
+
+    def _sync_matrix(self, conn: sqlite3.Connection) -> None:
+        """Make sure the in-memory matrix reflects the current table state."""
+        with self._lock:
+            generation = self._get_generation(conn)
+            if self._matrix_loaded and self.matrix.generation == generation:
+                return
+            
+            if self.matrix.open() == generation:
+                slots = [row[0] for row in conn.execute(
+                    "SELECT vector_row FROM documents WHERE vector_row IS NOT NULL"
+                )]
+                self.matrix.mark_valid(slots)
+                self._matrix_loaded = True
+                return
+            
+            self._rebuild_matrix(conn, generation)
+
+    def _rebuild_matrix(self, conn: sqlite3.Connection, generation: int, chunk_size: int = 10000) -> None:
+        """Rewrite the embedding matrix from the BLOBs in the table.
+        
+        Slots are reassigned densely, which also compacts away the rows of
+        deleted documents.
+        """
+        with self._lock:
+            total = conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            first = conn.execute("SELECT embedding FROM documents LIMIT 1").fetchone()
+            if first is None:
+                self.matrix.close()
+                self.matrix.dim = None
+                self.matrix.count = 0
+                self._matrix_loaded = True
+                self.matrix.generation = generation
+                return
+            
+            dim = len(first[0]) // np.dtype(np.float32).itemsize
+            self.matrix.reset(dim, capacity=total)
+            
+            cursor = conn.execute("SELECT id, embedding FROM documents ORDER BY rowid")
+            assignments = []
+            slot = 0
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                vectors = np.vstack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
+                slots = range(slot, slot + len(rows))
+                self.matrix.set_rows(slots, vectors)
+                assignments.extend((s, row[0]) for s, row in zip(slots, rows))
+                slot += len(rows)
+            
+            conn.executemany("UPDATE documents SET vector_row = ? WHERE id = ?", assignments)
             conn.commit()
+            self.matrix.write_meta(generation)
+            self._matrix_loaded = True
 
     async def add_documents(self, documents: List[Dict[str, Any]]) -> List[str]:
         """Add documents to the database.
@@ -48,18 +142,43 @@ class SQLiteVectorDB:
         Returns:
             List of document IDs that were added.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            for doc in documents:
-                embedding_bytes = np.array(doc['embedding'], dtype=np.float32).tobytes()
-                metadata_json = json.dumps(doc['metadata'])
-                
+        if not documents:
+            return []
+        
+        with sqlite3.connect(self.db_path) as conn, self._lock:
+            self._sync_matrix(conn)
+            
+            # Replaced documents keep their row, new ones are appended
+            ids = [doc['id'] for doc in documents]
+            placeholders = ','.join('?' * len(ids))
+            existing = dict(conn.execute(
+                f"SELECT id, vector_row FROM documents WHERE id IN ({placeholders}) AND vector_row IS NOT NULL",
+                ids
+            ).fetchall())
+            next_slot = self.matrix.count
+            slots = []
+            for doc_id in ids:
+                if doc_id in existing:
+                    slots.append(existing[doc_id])
+                else:
+                    existing[doc_id] = next_slot
+                    slots.append(next_slot)
+                    next_slot += 1
+            
+            embeddings = np.vstack([np.asarray(doc['embedding'], dtype=np.float32) for doc in documents])
+            
+            self.matrix.write_meta(DIRTY_GENERATION)
+            for doc, slot, embedding in zip(documents, slots, embeddings):
                 conn.execute(
-                    "INSERT OR REPLACE INTO documents (id, content, metadata, embedding) VALUES (?, ?, ?, ?)",
-                    (doc['id'], doc['content'], metadata_json, embedding_bytes)
+                    "INSERT OR REPLACE INTO documents (id, content, metadata, embedding, vector_row) VALUES (?, ?, ?, ?, ?)",
+                    (doc['id'], doc['content'], json.dumps(doc['metadata']), embedding.tobytes(), slot)
                 )
+            generation = self._bump_generation(conn)
+            self.matrix.set_rows(slots, embeddings)
             conn.commit()
+            self.matrix.write_meta(generation)
         
-        return [doc['id'] for doc in documents]
+        return ids
 
     async def get_documents(self, doc_ids: List[str]) -> List[Dict[str, Any]]:
         """Retrieve documents by their IDs.
@@ -99,29 +218,37 @@ class SQLiteVectorDB:
         Returns:
             List of document dictionaries with similarity scores.
         """
-        query_array = np.array(query_embedding, dtype=np.float32)
-        
         with sqlite3.connect(self.db_path) as conn:
-            results = []
-            for row in conn.execute("SELECT id, content, metadata, embedding FROM documents"):
-                doc_id, content, metadata_json, embedding_bytes = row
-                doc_embedding = np.frombuffer(embedding_bytes, dtype=np.float32)
+            # Held until the rows are read: a compaction in between would
+            # move other documents into the scored slots
+            with self._lock:
+                self._sync_matrix(conn)
+                slots, scores = self.matrix.top_k(np.asarray(query_embedding, dtype=np.float32), limit)
                 
-                # Calculate cosine similarity
-                similarity = np.dot(query_array, doc_embedding) / (
-                    np.linalg.norm(query_array) * np.linalg.norm(doc_embedding)
-                )
+                if len(slots) == 0:
+                    return []
                 
-                results.append({
-                    'id': doc_id,
-                    'content': content,
-                    'metadata': json.loads(metadata_json),
-                    'similarity': float(similarity)
-                })
+                # Only the top results are read back from the table
+                placeholders = ','.join('?' * len(slots))
+                rows = conn.execute(
+                    f"SELECT vector_row, id, content, metadata FROM documents WHERE vector_row IN ({placeholders})",
+                    [int(slot) for slot in slots]
+                ).fetchall()
         
-        # Sort by similarity and return top results
-        results.sort(key=lambda x: x['similarity'], reverse=True)
-        return results[:limit]
+        by_slot = {row[0]: row for row in rows}
+        results = []
+        for slot, score in zip(slots, scores):
+            row = by_slot.get(int(slot))
+            if row is None:
+                continue
+            _, doc_id, content, metadata_json = row
+            results.append({
+                'id': doc_id,
+                'content': content,
+                'metadata': json.loads(metadata_json),
+                'similarity': float(score)
+            })
+        return results
 
     async def delete_documents(self, doc_ids: List[str]):
         """Delete documents from the database.
@@ -129,7 +256,22 @@ class SQLiteVectorDB:
         Args:
             doc_ids: List of document IDs to delete.
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with sqlite3.connect(self.db_path) as conn, self._lock:
+            self._sync_matrix(conn)
             placeholders = ','.join('?' * len(doc_ids))
+            slots = [row[0] for row in conn.execute(
+                f"SELECT vector_row FROM documents WHERE id IN ({placeholders}) AND vector_row IS NOT NULL",
+                doc_ids
+            )]
+            
+            self.matrix.write_meta(DIRTY_GENERATION)
             conn.execute(f"DELETE FROM documents WHERE id IN ({placeholders})", doc_ids)
-            conn.commit() 
\ No newline at end of file
+            generation = self._bump_generation(conn)
+            self.matrix.invalidate(slots)
+            conn.commit()
+            
+            # Compact once more than half of the matrix rows are dead
+            if self.matrix.count and self.matrix.n_valid < self.matrix.count // 2:
+                self._rebuild_matrix(conn, generation)
+            else:
+                self.matrix.write_meta(generation)
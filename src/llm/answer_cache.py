@@ -0,0 +1,206 @@
+"""
+Semantic cache of chat answers.
+
+An answer is reused when a new question's embedding is close enough to a
+cached question's (cosine similarity at least ``threshold``) *and* the
+search retrieved the same chunks with the same content. The chunk part of
+the key is a set of (row id, content digest) pairs taken from the search
+results themselves, so an answer is never served once one of its chunks
+was edited, replaced or outranked, even by a write from another process.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from itertools import count
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from ..config.config import ANSWER_CACHE_CONFIG
+
+ChunkKey = FrozenSet[Tuple[Optional[int], str]]
+
+
+class CachedAnswer(NamedTuple):
+    """A cache hit."""
+    answer: str
+    similarity: float  # Cosine similarity between the cached and the new question
+    age: float  # Seconds since the answer was stored
+
+
+class _Entry(NamedTuple):
+    bucket: Tuple[Hashable, ChunkKey]
+    embedding: np.ndarray  # Unit-length question embedding
+    answer: str
+    stored_at: float
+
+
+def chunk_key(results: Iterable[Tuple[Any, float]]) -> ChunkKey:
+    """Identify the retrieved chunks by row id and content digest.
+
+    Args:
+        results: (document, similarity) pairs as returned by ``search``
+
+    Returns:
+        Order-independent key of the chunk set
+    """
+    return frozenset(
+        (getattr(doc, 'doc_id', None), hashlib.md5((doc.text or "").encode("utf-8")).hexdigest())
+        for doc, _ in results
+    )
+
+
+class SemanticAnswerCache:
+    """Bounded LRU cache of answers, looked up by question similarity.
+
+    Entries are grouped by user and chunk set, so a lookup only compares
+    the embeddings of questions that retrieved the same context.
+
+    Example:
+        >>> cache = SemanticAnswerCache(threshold=0.95)
+        >>> hit = cache.get(query_embedding, results, user=user_id)
+        >>> if hit is None:
+        ...     answer = ask_model(results)
+        ...     cache.put(query_embedding, results, answer, user=user_id)
+    """
+
+    def __init__(
+        self,
+        max_size: int = ANSWER_CACHE_CONFIG['max_size'],
+        ttl: float = ANSWER_CACHE_CONFIG['ttl'],
+        threshold: float = ANSWER_CACHE_CONFIG['threshold'],
+        per_user: bool = ANSWER_CACHE_CONFIG['per_user']
+    ):
+        """Initialize the cache.
+
+        Args:
+            max_size: Maximum number of cached answers (0 disables caching)
+            ttl: Seconds an answer stays valid
+            threshold: Minimum cosine similarity of the questions for a hit
+            per_user: Scope answers to the user who asked
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.threshold = threshold
+        self.per_user = per_user
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._buckets: Dict[Tuple[Hashable, ChunkKey], List[int]] = {}
+        self._ids = count()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _bucket(self, results: Iterable[Tuple[Any, float]], user: Optional[Hashable]) -> Tuple[Hashable, ChunkKey]:
+        return (user if self.per_user else None, chunk_key(results))
+
+    @staticmethod
+    def _unit(embedding: np.ndarray) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        bucket = self._buckets[entry.bucket]
+        bucket.remove(entry_id)
+        if not bucket:
+            del self._buckets[entry.bucket]
+
+    def get(
+        self,
+        embedding: np.ndarray,
+        results: List[Tuple[Any, float]],
+        user: Optional[Hashable] = None
+    ) -> Optional[CachedAnswer]:
+        """Look up the answer to a similar question with the same context.
+
+        Args:
+            embedding: Embedding of the new question
+            results: Search results retrieved for it
+            user: Id of the asking user
+
+        Returns:
+            The most similar cached answer, or None on a miss
+        """
+        query = self._unit(embedding)
+        now = time.monotonic()
+        with self._lock:
+            best_id, best_similarity = None, self.threshold
+            for entry_id in list(self._buckets.get(self._bucket(results, user), ())):
+                entry = self._entries[entry_id]
+                if now - entry.stored_at > self.ttl:
+                    self._remove(entry_id)
+                    continue
+                similarity = float(np.dot(query, entry.embedding))
+                if similarity >= best_similarity:
+                    best_id, best_similarity = entry_id, similarity
+            if best_id is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            entry = self._entries[best_id]
+            return CachedAnswer(entry.answer, best_similarity, now - entry.stored_at)
+
+    def put(
+        self,
+        embedding: np.ndarray,
+        results: List[Tuple[Any, float]],
+        answer: str,
+        user: Optional[Hashable] = None
+    ) -> None:
+        """Store the answer to a question.
+
+        Args:
+            embedding: Embedding of the question
+            results: Search results the answer was generated from
+            answer: Complete answer text
+            user: Id of the asking user
+        """
+        if self.max_size <= 0:
+            return
+        entry = _Entry(self._bucket(results, user), self._unit(embedding), answer, time.monotonic())
+        with self._lock:
+            entry_id = next(self._ids)
+            self._entries[entry_id] = entry
+            self._buckets.setdefault(entry.bucket, []).append(entry_id)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, chunk_ids: Optional[Iterable[int]] = None) -> None:
+        """Drop cached answers built on the given chunks, or all of them.
+
+        Args:
+            chunk_ids: Row ids of changed or deleted chunks, None for all
+        """
+        with self._lock:
+            self.invalidations += 1
+            if chunk_ids is None:
+                self._entries.clear()
+                self._buckets.clear()
+                return
+            changed = set(chunk_ids)
+            for bucket, entry_ids in list(self._buckets.items()):
+                if any(doc_id in changed for doc_id, _ in bucket[1]):
+                    for entry_id in list(entry_ids):
+                        self._remove(entry_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size.
+
+        Returns:
+            Dictionary of cache statistics
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
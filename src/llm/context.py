@@ -0,0 +1,150 @@
+"""
+Packing retrieved passages into the chat model's context budget.
+
+A passage costs its header (title, author, page, similarity) plus its text.
+Text costs come from the ``context_tokens`` recorded in the chunk metadata
+at ingestion (see ``TextChunk.metadata``), so packing does not tokenize the
+passages. Only the short headers, chunks ingested before that field
+existed, and passages that have to be truncated are run through the
+(shared, cached) encoding.
+
+Passages are chosen greedily by similarity per token, the usual
+approximation of the 0/1 knapsack; the best passage that did not fit is
+truncated to fill what is left of the budget. The chosen passages keep the
+search order.
+"""
+
+import logging
+from typing import Any, Callable, List, NamedTuple, Optional, Tuple
+
+from ..config.config import CONTEXT_CONFIG
+from ..utils.model_registry import get_encoding
+
+logger = logging.getLogger(__name__)
+
+
+def passage_header(doc: Any, similarity: float) -> str:
+    """Header introducing a passage in the context."""
+    page = doc.metadata.get('page', doc.metadata.get('page_start', 'Unknown'))
+    return f"""
+From '{doc.metadata.get('title', 'Unknown Title')}' by {doc.metadata.get('author', 'Unknown Author')}
+Page: {page}
+Similarity Score: {similarity:.4f}
+
+"""
+
+
+class PackedContext(NamedTuple):
+    """Passages chosen for the context."""
+    passages: List[str]
+    tokens: int  # Chat model tokens of all passages
+    dropped: int  # Passages left out for lack of budget
+    truncated: bool  # Whether the last-added passage was cut to fit
+
+
+class _Candidate(NamedTuple):
+    rank: int
+    similarity: float
+    header: str
+    text: str
+    header_tokens: int
+    text_tokens: int
+    cut: bool  # Text is longer than text_tokens and has to be truncated
+
+    @property
+    def cost(self) -> int:
+        return self.header_tokens + self.text_tokens + 1  # Trailing newline
+
+
+class ContextPacker:
+    """Fits search results into a token budget.
+
+    Example:
+        >>> packer = ContextPacker(max_tokens=6000)
+        >>> packed = packer.pack(vector_db.search(query, k=20))
+        >>> system_message = "\\n\\n".join(packed.passages)
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = CONTEXT_CONFIG['max_tokens'],
+        max_chunk_tokens: int = CONTEXT_CONFIG['max_chunk_tokens'],
+        min_truncated_tokens: int = CONTEXT_CONFIG['min_truncated_tokens'],
+        header: Callable[[Any, float], str] = passage_header,
+        encoding: Optional[Any] = None
+    ):
+        """Initialize the packer.
+
+        Args:
+            max_tokens: Token budget for all passages
+            max_chunk_tokens: Longer passages are truncated to this many tokens
+            min_truncated_tokens: Smallest truncated passage worth adding
+            header: Formats the header of a passage from (document, similarity)
+            encoding: tiktoken encoding, defaults to the chat model's shared one
+        """
+        self.max_tokens = max_tokens
+        self.max_chunk_tokens = max_chunk_tokens
+        self.min_truncated_tokens = min_truncated_tokens
+        self.header = header
+        self._encoding = encoding
+
+    @property
+    def encoding(self):
+        """Encoding in use (loaded on first use)."""
+        if self._encoding is None:
+            self._encoding = get_encoding()
+        return self._encoding
+
+    def count(self, text: str) -> int:
+        """Count the tokens of a text."""
+        return len(self.encoding.encode_ordinary(text)) if text else 0
+
+    def truncate(self, text: str, tokens: int) -> str:
+        """Cut a text to its first ``tokens`` tokens."""
+        return self.encoding.decode(self.encoding.encode_ordinary(text)[:tokens])
+
+    def pack(self, results: List[Tuple[Any, float]]) -> PackedContext:
+        """Choose and format the passages that fit the budget.
+
+        Args:
+            results: (document, similarity) pairs in search order
+
+        Returns:
+            PackedContext with the formatted passages in search order
+        """
+        candidates = []
+        for rank, (doc, similarity) in enumerate(results):
+            text = getattr(doc, 'text', None) or getattr(doc, 'content', None)
+            if not text:
+                logger.warning(f"Search result {rank + 1} has no text")
+                continue
+            text_tokens = doc.metadata.get('context_tokens')
+            if text_tokens is None:
+                text_tokens = self.count(text)  # Ingested before chunk token counts were stored
+            header = self.header(doc, similarity)
+            candidates.append(_Candidate(
+                rank, float(similarity), header, text, self.count(header),
+                min(text_tokens, self.max_chunk_tokens), text_tokens > self.max_chunk_tokens
+            ))
+
+        chosen: List[_Candidate] = []
+        boundary: Optional[_Candidate] = None
+        remaining = self.max_tokens
+        for candidate in sorted(candidates, key=lambda c: max(c.similarity, 0.0) / c.cost, reverse=True):
+            if candidate.cost <= remaining:
+                chosen.append(candidate)
+                remaining -= candidate.cost
+            elif boundary is None:
+                boundary = candidate
+
+        truncated = False
+        if boundary is not None:
+            fit = remaining - boundary.header_tokens - 1
+            if fit >= self.min_truncated_tokens:
+                chosen.append(boundary._replace(text_tokens=fit, cut=True))
+                remaining -= chosen[-1].cost
+                truncated = True
+
+        chosen.sort(key=lambda c: c.rank)
+        passages = [c.header + (self.truncate(c.text, c.text_tokens) if c.cut else c.text) + "\n" for c in chosen]
+        return PackedContext(passages, self.max_tokens - remaining, len(candidates) - len(chosen), truncated)
@@ -0,0 +1,209 @@
+"""
+Server-sent events (SSE) for streamed chat answers.
+
+A streamed chat turn is sent as a sequence of events:
+
+- ``retrieval``: the passages found for the question, sent as soon as the
+  search returns and before the model is called
+- ``token``: a piece of the answer, forwarded as the model produces it
+- ``done``: finish reason and timings (time to first token, total)
+- ``error``: the turn failed; no further events follow
+
+If the client disconnects, the WSGI server closes the event generator,
+which closes the upstream HTTP stream, so the model stops generating (and
+billing) for an answer nobody reads.
+"""
+
+import json
+import logging
+import re
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Keep proxies (nginx) from buffering the event stream
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+_LAST_WHITESPACE = re.compile(r"\s(?=\S*$)")
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one server-sent event with a JSON payload.
+
+    Args:
+        event: Event name
+        data: JSON-serializable payload
+
+    Returns:
+        The event, terminated by a blank line
+    """
+    # json.dumps escapes newlines, so the payload always fits on one data line
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def source_summary(results: List[Tuple[Any, float]]) -> List[Dict[str, Any]]:
+    """Describe search results for the ``retrieval`` event.
+
+    Args:
+        results: (document, similarity) pairs as returned by ``search``
+
+    Returns:
+        Title, author, page and similarity of each passage
+    """
+    return [
+        {
+            "title": doc.metadata.get("title", "Unknown Title"),
+            "author": doc.metadata.get("author", "Unknown Author"),
+            "page": doc.metadata.get("page", doc.metadata.get("page_start")),
+            "similarity": round(float(similarity), 4)
+        }
+        for doc, similarity in results
+    ]
+
+
+class ChatStream:
+    """Text deltas of a streaming OpenAI chat completion.
+
+    Wraps the ``Stream`` returned by ``chat.completions.create(stream=True)``;
+    ``close`` closes the underlying HTTP response, which cancels the
+    generation upstream.
+    """
+
+    def __init__(self, stream: Any):
+        """Initialize the wrapper.
+
+        Args:
+            stream: OpenAI completion stream
+        """
+        self.stream = stream
+        self.finish_reason: Optional[str] = None
+
+    def __iter__(self) -> Iterator[str]:
+        for chunk in self.stream:
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            if choice.finish_reason:
+                self.finish_reason = choice.finish_reason
+            if choice.delta.content:
+                yield choice.delta.content
+
+    def close(self):
+        """Stop the generation by closing the upstream connection."""
+        self.stream.response.close()
+
+
+class CachedStream:
+    """A stored answer sent in place of a completion stream."""
+
+    finish_reason = "cached"
+
+    def __init__(self, answer: str):
+        """Initialize the stream.
+
+        Args:
+            answer: Complete answer text
+        """
+        self.answer = answer
+
+    def __iter__(self) -> Iterator[str]:
+        yield self.answer
+
+    def close(self):
+        """Nothing to cancel."""
+
+
+class RedactingBuffer:
+    """Applies a redaction function to streamed text.
+
+    Text is held back up to the last whitespace, so a pattern split across
+    two deltas (an e-mail address, a phone number) is still redacted.
+    """
+
+    def __init__(self, redact: Callable[[str], str]):
+        """Initialize the buffer.
+
+        Args:
+            redact: Function replacing sensitive substrings of a text
+        """
+        self.redact = redact
+        self.pending = ""
+
+    def feed(self, text: str) -> str:
+        """Add a delta and return the text that is safe to send."""
+        self.pending += text
+        match = _LAST_WHITESPACE.search(self.pending)
+        if match is None:
+            return ""
+        ready, self.pending = self.pending[:match.end()], self.pending[match.end():]
+        return self.redact(ready)
+
+    def flush(self) -> str:
+        """Return the held-back rest at the end of the stream."""
+        ready, self.pending = self.pending, ""
+        return self.redact(ready) if ready else ""
+
+
+def chat_events(
+    retrieve: Callable[[], Tuple[Any, List[Dict[str, Any]]]],
+    complete: Callable[[Any], ChatStream],
+    redact: Optional[Callable[[str], str]] = None,
+    describe_error: Callable[[Exception], Dict[str, Any]] = lambda e: {"error": str(e)},
+    on_complete: Optional[Callable[[str], None]] = None
+) -> Iterator[str]:
+    """Run one chat turn and yield its server-sent events.
+
+    Args:
+        retrieve: Searches for the question; returns the context handed to
+            ``complete`` and the sources for the ``retrieval`` event
+        complete: Opens the completion stream for the retrieved context
+        redact: Optional filter applied to the answer text
+        describe_error: Turns an exception into the ``error`` event payload
+        on_complete: Called with the unredacted answer when the model finished
+            normally (``finish_reason`` "stop"), e.g. to cache it
+
+    Yields:
+        SSE-formatted events
+
+    Example:
+        >>> events = chat_events(lambda: (context, sources), lambda c: ChatStream(open(c)))
+        >>> return Response(events, mimetype="text/event-stream", headers=SSE_HEADERS)
+    """
+    start = time.perf_counter()
+    stream: Optional[ChatStream] = None
+    try:
+        context, sources = retrieve()
+        yield sse_event("retrieval", {"sources": sources, "seconds": time.perf_counter() - start})
+
+        stream = complete(context)
+        buffer = RedactingBuffer(redact) if redact else None
+        first_token = None
+        answer = []
+        for delta in stream:
+            if first_token is None:
+                first_token = time.perf_counter() - start
+            answer.append(delta)
+            if buffer is not None:
+                delta = buffer.feed(delta)
+            if delta:
+                yield sse_event("token", {"text": delta})
+        if buffer is not None and buffer.pending:
+            yield sse_event("token", {"text": buffer.flush()})
+        if on_complete is not None and stream.finish_reason == "stop":
+            on_complete("".join(answer))
+
+        yield sse_event("done", {
+            "finish_reason": stream.finish_reason,
+            "first_token_seconds": first_token,
+            "seconds": time.perf_counter() - start
+        })
+    except GeneratorExit:
+        logger.info("Client disconnected, cancelling the completion")
+        raise
+    except Exception as e:
+        logger.error(f"Error in streamed chat: {str(e)}")
+        yield sse_event("error", describe_error(e))
+    finally:
+        if stream is not None:
+            stream.close()
@@ -12,8 +12,13 @@ from pdfminer.layout import LAParams
 import sys
 import logging
 
+from .extraction_cache import cached_extraction
+
 logger = logging.getLogger(__name__)
 
+# Part of the extraction cache key: bump when extract_metadata changes its output
+EXTRACTOR_VERSION = "1"
+
 def get_pdf_info(pdf_path):
     """Get PDF metadata using pdfinfo command."""
     try:
@@ -448,8 +453,14 @@ def normalize_author_names():
 def process_book(pdf_path):
     """Process a single book and add it to the database."""
     try:
-        # Extract metadata
-        metadata = extract_metadata(pdf_path)
+        # Extract metadata (reused for files that were processed before)
+        cache, cache_key, metadata = cached_extraction(str(pdf_path), "metadata", EXTRACTOR_VERSION)
+        if metadata is None:
+            metadata = extract_metadata(pdf_path)
+            if metadata and cache is not None:
+                cache.put(cache_key, metadata)
+        else:
+            metadata.update(file_path=str(pdf_path), file_name=os.path.basename(pdf_path))
         if not metadata:
             logger.error(f"Failed to extract metadata from {pdf_path}")
             return None
@@ -0,0 +1,360 @@
+"""
+Streaming, sentence-aware chunking measured in embedding model tokens.
+
+Text arrives as an iterator of segments (PDF pages or paragraphs) and leaves
+as chunks of at most ``chunk_tokens`` tokens that end on sentence boundaries
+and overlap by whole sentences of up to ``overlap_tokens`` tokens. Only the
+sentences of the chunk being built are kept and tokenized, never the whole
+book. Each chunk records its character span in the document text (the
+non-blank segments joined by ``separator``) and the pages it covers.
+
+Usage:
+    python -m src.processing.chunker benchmark --size-mb 8
+"""
+
+import argparse
+import re
+import time
+import tracemalloc
+from bisect import bisect_right
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from ..config.config import DOC_CONFIG
+from ..utils.model_registry import get_encoding, get_tokenizer
+from .text_cleaning import SAMPLE_PAGES, page_cleaner
+
+# German abbreviations whose period does not end a sentence
+ABBREVIATIONS = ['Dr.', 'Prof.', 'Hr.', 'Fr.', 'Nr.', 'St.', 'str.', 'z.B.', 'd.h.', 'u.a.', 'etc.', 'usw.', 'bzw.', 'ca.']
+
+# A sentence ends at '!', '?' or a period that does not end an abbreviation,
+# plus any closing quotes and brackets, where whitespace follows (so "3.5"
+# and the first period of "z.B." do not end one)
+_SENTENCE_END = re.compile(
+    r"(?:[!?]|\." + "".join(f"(?<!{re.escape(abbr)})" for abbr in ABBREVIATIONS) + ")"
+    r"[\"'»«“”’)\]]*(?=\s|$)"
+)
+_WORD = re.compile(r"\S+")
+
+Segment = Union[str, Tuple[Optional[int], str]]
+TokenCounter = Callable[[List[str]], List[int]]
+
+
+def find_sentence_boundary(text: str, position: int, direction: str = 'forward') -> int:
+    """Find the nearest sentence boundary, handling German abbreviations.
+
+    Args:
+        text: Text to search
+        position: Offset to search from
+        direction: 'forward' for the next boundary at or after ``position``,
+            anything else for the last boundary before it
+
+    Returns:
+        Offset just past the sentence end, ``len(text)`` or 0 if there is none
+    """
+    if direction == 'forward':
+        match = _SENTENCE_END.search(text, position)
+        return match.end() if match else len(text)
+    boundary = 0
+    for match in _SENTENCE_END.finditer(text, 0, position):
+        boundary = match.end()
+    return boundary
+
+
+def context_token_count(text: str) -> int:
+    """Count the chat model tokens of a text, as it will be sent as context."""
+    return len(get_encoding().encode_ordinary(text))
+
+
+def tokenizer_counter(tokenizer=None) -> TokenCounter:
+    """Token counter for a Hugging Face tokenizer, counting a batch per call.
+
+    Args:
+        tokenizer: Tokenizer, defaults to the embedding model's
+
+    Returns:
+        Function from a list of texts to their token counts
+    """
+    tokenizer = tokenizer or get_tokenizer()
+
+    def count_tokens(texts: List[str]) -> List[int]:
+        if not texts:
+            return []
+        return [len(ids) for ids in tokenizer(texts, add_special_tokens=False)["input_ids"]]
+
+    return count_tokens
+
+
+class TextChunk(NamedTuple):
+    """A chunk and its position in the document text."""
+    text: str
+    start: int  # Offset of the first character
+    end: int  # Offset past the last character
+    first_page: Optional[int]  # None for segments without page numbers
+    last_page: Optional[int]
+    token_count: int
+
+    def metadata(self) -> Dict[str, Any]:
+        """Position and size fields for the chunk's document metadata.
+
+        ``token_count`` is in embedding model tokens; ``context_tokens`` in
+        chat model tokens, so context packing need not tokenize the chunk.
+        """
+        metadata = {
+            "start_char": self.start,
+            "end_char": self.end,
+            "token_count": self.token_count,
+            "context_tokens": context_token_count(self.text)
+        }
+        if self.first_page is not None:
+            metadata.update(page_start=self.first_page, page_end=self.last_page)
+        return metadata
+
+
+class Chunker:
+    """Split streamed text into overlapping, sentence-aligned token windows.
+
+    Sentences longer than ``chunk_tokens`` are split between words.
+
+    Example:
+        >>> chunker = Chunker(chunk_tokens=256, overlap_tokens=32)
+        >>> for chunk in chunker.chunk(processor.iter_pages("book.pdf"), separator=" "):
+        ...     print(chunk.first_page, chunk.token_count, chunk.text[:40])
+    """
+
+    def __init__(
+        self,
+        chunk_tokens: int = DOC_CONFIG['chunk_tokens'],
+        overlap_tokens: int = DOC_CONFIG['chunk_overlap_tokens'],
+        count_tokens: Optional[TokenCounter] = None
+    ):
+        """Initialize the chunker.
+
+        Args:
+            chunk_tokens: Maximum tokens per chunk
+            overlap_tokens: Maximum tokens repeated from the previous chunk
+            count_tokens: Token counter for a batch of texts, defaults to the
+                embedding model's tokenizer (loaded on first use)
+        """
+        if chunk_tokens <= 0 or not 0 <= overlap_tokens < chunk_tokens:
+            raise ValueError(f"Invalid chunk sizes: {chunk_tokens} tokens with {overlap_tokens} overlap")
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
+        self._count_tokens = count_tokens
+
+    @property
+    def count_tokens(self) -> TokenCounter:
+        """Token counter in use."""
+        if self._count_tokens is None:
+            self._count_tokens = tokenizer_counter()
+        return self._count_tokens
+
+    def chunk(
+        self,
+        segments: Iterable[Segment],
+        separator: str = "\n\n",
+        break_segments: bool = False
+    ) -> Iterator[TextChunk]:
+        """Chunk a stream of text segments.
+
+        Args:
+            segments: Texts, or (page number, text) pairs, in document order
+            separator: Joins segments into the document text
+            break_segments: Treat the end of each segment as a sentence end
+                (for paragraphs; pages usually break mid-sentence)
+
+        Yields:
+            Chunks in document order
+        """
+        stream = _Stream(self, separator)
+        for segment in segments:
+            page, text = (None, segment) if isinstance(segment, str) else segment
+            if not text or text.isspace():
+                continue
+            stream.append(page, text)
+            yield from stream.add(stream.split(final=break_segments))
+            stream.trim()
+        yield from stream.add(stream.split(final=True))
+        if stream.fresh:
+            yield stream.emit()
+
+    def chunk_text(self, text: str) -> List[TextChunk]:
+        """Chunk a single text."""
+        return list(self.chunk([text]))
+
+
+class _Stream:
+    """State of one ``Chunker.chunk`` call."""
+
+    def __init__(self, chunker: Chunker, separator: str):
+        self.chunker = chunker
+        self.separator = separator
+        self.buffer = ""  # Document text from offset `base` on
+        self.base = 0
+        self.scanned = 0  # Offset up to which the text was split into sentences
+        self.page_offsets: List[int] = []  # Page starts still needed
+        self.page_numbers: List[int] = []
+        self.window: Deque[Tuple[int, int, int]] = deque()  # (start, end, tokens) of the chunk's sentences
+        self.tokens = 0
+        self.fresh = 0  # Sentences in the window not emitted yet
+
+    def text(self, start: int, end: int) -> str:
+        return self.buffer[start - self.base:end - self.base]
+
+    def append(self, page: Optional[int], text: str):
+        if self.base or self.buffer:
+            self.buffer += self.separator
+        if page is not None:
+            self.page_offsets.append(self.base + len(self.buffer))
+            self.page_numbers.append(page)
+        self.buffer += text
+
+    def split(self, final: bool) -> List[Tuple[int, int]]:
+        """Split complete sentences (and with ``final`` the rest) off the unscanned text."""
+        buffer, pos = self.buffer, self.scanned - self.base
+        bounds = [match.end() for match in _SENTENCE_END.finditer(buffer, pos)]
+        if final and pos < len(buffer):
+            bounds.append(len(buffer))
+        spans = []
+        for end in bounds:
+            start, pos = pos, end
+            while start < end and buffer[start].isspace():
+                start += 1
+            while end > start and buffer[end - 1].isspace():
+                end -= 1
+            if start < end:
+                spans.append((self.base + start, self.base + end))
+        self.scanned = self.base + pos
+        return spans
+
+    def add(self, spans: List[Tuple[int, int]]) -> Iterator[TextChunk]:
+        """Count the sentences' tokens and pack them into chunks."""
+        limit = self.chunker.chunk_tokens
+        counts = self.chunker.count_tokens([self.text(start, end) for start, end in spans])
+        for (start, end), tokens in zip(spans, counts):
+            pieces = self.split_words(start, end) if tokens > limit else [(start, end, tokens)]
+            for piece in pieces:
+                if self.fresh and self.tokens + piece[2] > limit:
+                    yield self.emit()
+                    # Whole trailing sentences are carried over as overlap
+                    while self.window and (self.tokens > self.chunker.overlap_tokens or self.tokens + piece[2] > limit):
+                        self.tokens -= self.window.popleft()[2]
+                    self.fresh = 0
+                self.window.append(piece)
+                self.tokens += piece[2]
+                self.fresh += 1
+
+    def split_words(self, start: int, end: int) -> List[Tuple[int, int, int]]:
+        """Split an oversized sentence between words into pieces that fit a chunk."""
+        words = [(start + match.start(), start + match.end()) for match in _WORD.finditer(self.text(start, end))]
+        counts = self.chunker.count_tokens([self.text(*word) for word in words])
+        pieces: List[Tuple[int, int, int]] = []
+        for (word_start, word_end), tokens in zip(words, counts):
+            if pieces and pieces[-1][2] + tokens <= self.chunker.chunk_tokens:
+                pieces[-1] = (pieces[-1][0], word_end, pieces[-1][2] + tokens)
+            else:
+                pieces.append((word_start, word_end, tokens))
+        return pieces
+
+    def emit(self) -> TextChunk:
+        start, end = self.window[0][0], self.window[-1][1]
+        return TextChunk(self.text(start, end), start, end, self.page_at(start), self.page_at(end - 1), self.tokens)
+
+    def page_at(self, offset: int) -> Optional[int]:
+        index = bisect_right(self.page_offsets, offset) - 1
+        return self.page_numbers[index] if index >= 0 else None
+
+    def trim(self):
+        """Drop text and page starts before the current window."""
+        keep = min(self.window[0][0], self.scanned) if self.window else self.scanned
+        if keep > self.base:
+            self.buffer = self.buffer[keep - self.base:]
+            self.base = keep
+        index = bisect_right(self.page_offsets, keep) - 1
+        if index > 0:
+            del self.page_offsets[:index]
+            del self.page_numbers[:index]
+
+
+def count_words(texts: List[str]) -> List[int]:
+    """Whitespace token counter (for benchmarks without the tokenizer)."""
+    return [len(text.split()) for text in texts]
+
+
+def benchmark(
+    size_mb: float = 8.0,
+    language: str = "de",
+    count_tokens: Optional[TokenCounter] = None,
+    chunk_tokens: int = DOC_CONFIG['chunk_tokens'],
+    overlap_tokens: int = DOC_CONFIG['chunk_overlap_tokens']
+) -> Dict[str, float]:
+    """Measure chunking throughput and peak memory over a synthetic book.
+
+    The book is the cleaned sample page repeated; pages are generated on
+    the fly, so the peak covers the chunker's own state (Python allocations
+    traced by ``tracemalloc``).
+
+    Args:
+        size_mb: Approximate size of the book (UTF-8)
+        language: Sample page language
+        count_tokens: Token counter, defaults to the embedding model's tokenizer
+        chunk_tokens: Maximum tokens per chunk
+        overlap_tokens: Overlap between chunks
+
+    Returns:
+        Result dictionary
+    """
+    page = page_cleaner.clean(SAMPLE_PAGES[language])
+    page_bytes = len(page.encode("utf-8"))
+    pages = max(1, int(size_mb * 2**20 / page_bytes))
+    chunker = Chunker(chunk_tokens, overlap_tokens, count_tokens)
+    chunker.count_tokens([page])  # Load the tokenizer outside the measurement
+
+    chunks = tokens = 0
+    tracemalloc.start()
+    start = time.perf_counter()
+    for chunk in chunker.chunk((number, page) for number in range(1, pages + 1)):
+        chunks += 1
+        tokens += chunk.token_count
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "pages": pages,
+        "mb": pages * page_bytes / 2**20,
+        "chunks": chunks,
+        "tokens": tokens,
+        "seconds": seconds,
+        "mb_per_second": pages * page_bytes / 2**20 / seconds,
+        "peak_mb": peak / 2**20
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the streaming chunker")
+    parser.add_argument("command", choices=["benchmark"], help="Action to run")
+    parser.add_argument("--size-mb", type=float, default=8.0, help="Size of the synthetic book")
+    parser.add_argument("--language", choices=sorted(SAMPLE_PAGES), default="de", help="Sample page language")
+    parser.add_argument("--tokenizer", choices=["model", "words"], default="model",
+                        help="Count embedding model tokens or whitespace-separated words")
+    parser.add_argument("--chunk-tokens", type=int, default=DOC_CONFIG['chunk_tokens'], help="Maximum tokens per chunk")
+    parser.add_argument("--overlap-tokens", type=int, default=DOC_CONFIG['chunk_overlap_tokens'], help="Overlap between chunks")
+
+    args = parser.parse_args()
+
+    try:
+        count_tokens = count_words if args.tokenizer == "words" else None
+        row = benchmark(args.size_mb, args.language, count_tokens, args.chunk_tokens, args.overlap_tokens)
+        print(f"{'pages':>8}{'MB':>8}{'chunks':>8}{'tokens':>10}{'seconds':>9}{'MB/s':>8}{'peak MB':>9}")
+        print(f"{row['pages']:>8}{row['mb']:>8.1f}{row['chunks']:>8}{row['tokens']:>10}"
+              f"{row['seconds']:>9.2f}{row['mb_per_second']:>8.1f}{row['peak_mb']:>9.2f}")
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
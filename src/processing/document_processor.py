@@ -1,22 +1,19 @@
 """Document processing module for the RAG system."""
 
-import hashlib
 import os
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-import uuid
+from typing import List, Dict, Any, Optional, Iterator
 
 import numpy as np
 from sentence_transformers import SentenceTransformer
-from PyPDF2 import PdfReader
 import pytesseract
-from pdf2image import convert_from_path
 
 from ..config.config import DOC_CONFIG, MODEL_CONFIG
 from ..database.sqlite_vector_db import SQLiteVectorDB
 
 from .rag_document import RAGDocument
 from .pdf_processor import PDFProcessor
+from .chunker import Chunker
 from .image_processor import ImageProcessor
 
 from typing import List, Optional, Dict, Any, Tuple
@@ -25,7 +22,6 @@ import io
 import os
 from pathlib import Path
 import pytesseract
-from pdf2image import convert_from_path
 import cv2
 import numpy as np
 from src.processing.rag_document import RAGDocument
@@ -47,6 +43,7 @@ class DocumentProcessor:
         """Initialize the document processor."""
         self.pdf_processor = PDFProcessor()
         self.image_processor = ImageProcessor()
+        self.chunker = Chunker()
     
     def process_document(self, path: str, metadata: Optional[Dict[str, Any]] = None) -> RAGDocument:
         """Process a document and return a RAGDocument.
@@ -123,31 +120,85 @@ class DocumentProcessor:
         else:
             raise ValueError(f"Unsupported file type: {file_path.suffix}")
     
-    def process_directory(self, directory_path: str, metadata: Optional[Dict[str, Any]] = None) -> List[RAGDocument]:
+    def process_directory(
+        self,
+        directory_path: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        recursive: bool = True
+    ) -> Iterator[RAGDocument]:
         """
-        Process all supported files in a directory.
+        Process all supported files in a directory, lazily.
+        
+        Documents are yielded file by file (see ``iter_directory``), so the
+        memory use stays flat however large the tree is; wrap the call in
+        ``list()`` to collect everything.
         
         Args:
             directory_path: Path to the directory to process
             metadata: Optional metadata to add to all documents
+            recursive: Whether to descend into subdirectories
             
-        Returns:
-            List of RAGDocument objects
+        Yields:
+            RAGDocument objects
+        """
+        yield from self.iter_directory(directory_path, metadata, recursive)
+    
+    def iter_files(self, directory_path: str, recursive: bool = True) -> Iterator[Path]:
+        """
+        Walk a directory lazily, in a stable (sorted) order.
+        
+        Args:
+            directory_path: Path to the directory
+            recursive: Whether to descend into subdirectories
+            
+        Yields:
+            Paths of the regular files
         """
         directory_path = Path(directory_path)
-        if not directory_path.exists():
+        if not directory_path.is_dir():
             raise FileNotFoundError(f"Directory not found: {directory_path}")
         
-        documents = []
-        for file_path in directory_path.rglob('*'):
-            if file_path.is_file() and self._is_supported_file(file_path):
-                try:
-                    file_documents = self.process_file(str(file_path), metadata)
-                    documents.extend(file_documents)
-                except Exception as e:
-                    print(f"Error processing {file_path}: {str(e)}")
+        for root, dirs, files in os.walk(directory_path):
+            dirs.sort()
+            if not recursive:
+                dirs.clear()
+            for name in sorted(files):
+                file_path = Path(root) / name
+                if file_path.is_file():
+                    yield file_path
+    
+    def iter_directory(
+        self,
+        directory_path: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        recursive: bool = True
+    ) -> Iterator[RAGDocument]:
+        """
+        Process the supported files of a directory one at a time.
         
-        return documents
+        Only the documents of the current file are held in memory, so the
+        memory use does not grow with the size of the tree.
+        
+        Args:
+            directory_path: Path to the directory to process
+            metadata: Optional metadata to add to all documents
+            recursive: Whether to descend into subdirectories
+            
+        Yields:
+            RAGDocument objects, file by file
+        """
+        for file_path in self.iter_files(directory_path, recursive):
+            if not self._is_supported_file(file_path):
+                continue
+            try:
+                documents = self.process_document(str(file_path), metadata)
+            except Exception as e:
+                print(f"Error processing {file_path}: {str(e)}")
+                continue
+            if isinstance(documents, list):
+                yield from documents
+            else:
+                yield documents
     
     def _is_supported_file(self, file_path: Path) -> bool:
         """Check if the file type is supported."""
@@ -158,7 +209,7 @@ class DocumentProcessor:
         """Process a text file."""
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
-        return [RAGDocument(content=content, metadata=metadata)]
+        return [RAGDocument(text=content, metadata=metadata)]
     
     def _process_json_file(self, file_path: Path, metadata: Dict[str, Any]) -> List[RAGDocument]:
         """Process a JSON file."""
@@ -169,13 +220,13 @@ class DocumentProcessor:
         if isinstance(data, dict):
             # If JSON is a single object, convert to string
             content = json.dumps(data, ensure_ascii=False)
-            documents.append(RAGDocument(content=content, metadata=metadata))
+            documents.append(RAGDocument(text=content, metadata=metadata))
         elif isinstance(data, list):
             # If JSON is an array, process each item
             for i, item in enumerate(data):
                 item_metadata = {**metadata, "item_index": i}
                 content = json.dumps(item, ensure_ascii=False)
-                documents.append(RAGDocument(content=content, metadata=item_metadata))
+                documents.append(RAGDocument(text=content, metadata=item_metadata))
         
         return documents
     
@@ -188,7 +239,7 @@ class DocumentProcessor:
             # Convert row to string representation
             content = row.to_string()
             row_metadata = {**metadata, "row_index": index}
-            documents.append(RAGDocument(content=content, metadata=row_metadata))
+            documents.append(RAGDocument(text=content, metadata=row_metadata))
         
         return documents
     
@@ -211,7 +262,7 @@ class DocumentProcessor:
                 "file_type": "docx"
             })
             
-            return RAGDocument(content=text.strip(), metadata=metadata)
+            return RAGDocument(text=text.strip(), metadata=metadata)
             
         except Exception as e:
             raise ValueError(f"Error processing Word document {file_path}: {str(e)}")
@@ -235,7 +286,7 @@ class DocumentProcessor:
                 "file_type": "text"
             })
             
-            return RAGDocument(content=text.strip(), metadata=metadata)
+            return RAGDocument(text=text.strip(), metadata=metadata)
             
         except Exception as e:
             raise ValueError(f"Error processing text file {file_path}: {str(e)}")
@@ -283,7 +334,7 @@ class DocumentProcessor:
                 "file_type": "web"
             })
             
-            return RAGDocument(content=text.strip(), metadata=metadata)
+            return RAGDocument(text=text.strip(), metadata=metadata)
             
         except Exception as e:
             raise ValueError(f"Error processing URL {url}: {str(e)}")
@@ -320,7 +371,7 @@ class DocumentProcessor:
                     "file_type": "google_doc"
                 })
                 
-                return RAGDocument(content=text.strip(), metadata=metadata)
+                return RAGDocument(text=text.strip(), metadata=metadata)
                 
             except requests.exceptions.HTTPError as e:
                 if e.response.status_code == 401:
@@ -340,178 +391,6 @@ class DocumentProcessor:
         except Exception as e:
             raise ValueError(f"Error processing Google Doc {url}: {str(e)}")
 
-    def _validate_file(self, file_path: str) -> bool:
-        """Validate if a file can be processed.
-        
-        Args:
-            file_path: Path to the file.
-        
-        Returns:
-            True if the file is valid, False otherwise.
-        """
-        path = Path(file_path)
-        if not path.exists():
-            return False
-        if path.suffix.lower() not in self.supported_formats:
-            return False
-        if path.stat().st_size > self.max_file_size:
-            return False
-        return True
-
-    def _extract_text_from_pdf(self, file_path: str) -> str:
-        """Extract text from a PDF file.
-        
-        Args:
-            file_path: Path to the PDF file.
-        
-        Returns:
-            Extracted text from the PDF.
-        """
-        reader = PdfReader(file_path)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() or ""
-            
-        # If no text was extracted, try OCR
-        if not text.strip():
-            images = convert_from_path(file_path)
-            for image in images:
-                text += pytesseract.image_to_string(image) + "\n"
-        
-        return text
-
-    def _extract_text(self, file_path: str) -> str:
-        """Extract text from a file.
-        
-        Args:
-            file_path: Path to the file.
-        
-        Returns:
-            Extracted text from the file.
-        """
-        path = Path(file_path)
-        if path.suffix.lower() == '.pdf':
-            return self._extract_text_from_pdf(file_path)
-        elif path.suffix.lower() == '.txt':
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        else:
-            raise ValueError(f"Unsupported file format: {path.suffix}")
-
-    def _chunk_text(self, text: str) -> List[str]:
-        """Split text into chunks.
-        
-        Args:
-            text: Text to split into chunks.
-        
-        Returns:
-            List of text chunks.
-        """
-        chunks = []
-        start = 0
-        
-        while start < len(text):
-            end = start + self.chunk_size
-            
-            # Adjust chunk end to not split words
-            if end < len(text):
-                while end > start and not text[end].isspace():
-                    end -= 1
-                if end == start:
-                    end = start + self.chunk_size
-            
-            chunks.append(text[start:end].strip())
-            start = end - self.chunk_overlap
-        
-        return [chunk for chunk in chunks if chunk]
-
-    def _generate_document_id(self, content: str, metadata: Dict[str, Any]) -> str:
-        """Generate a unique document ID.
-        
-        Args:
-            content: Document content.
-            metadata: Document metadata.
-        
-        Returns:
-            Unique document ID.
-        """
-        unique_str = f"{content}{metadata}{uuid.uuid4()}"
-        return hashlib.sha256(unique_str.encode()).hexdigest()[:32]
-
-    async def process_file(self, file_path: str, metadata: Optional[Dict[str, Any]] = None) -> List[str]:
-        """Process a file and store it in the database.
-        
-        Args:
-            file_path: Path to the file to process.
-            metadata: Optional metadata for the document.
-        
-        Returns:
-            List of document IDs for the processed chunks.
-        """
-        if not self._validate_file(file_path):
-            raise ValueError(f"Invalid file: {file_path}")
-
-        metadata = metadata or {}
-        metadata['source_file'] = file_path
-        metadata['file_type'] = Path(file_path).suffix.lower()
-
-        text = self._extract_text(file_path)
-        chunks = self._chunk_text(text)
-        
-        documents = []
-        for i, chunk in enumerate(chunks):
-            chunk_metadata = metadata.copy()
-            chunk_metadata['chunk_index'] = i
-            chunk_metadata['total_chunks'] = len(chunks)
-            
-            doc_id = self._generate_document_id(chunk, chunk_metadata)
-            embedding = self.model.encode(chunk).tolist()
-            
-            doc = {
-                'id': doc_id,
-                'content': chunk,
-                'metadata': chunk_metadata,
-                'embedding': embedding
-            }
-            documents.append(doc)
-        
-        return await self.db.add_documents(documents)
-
-    async def process_directory(self, dir_path: str, metadata: Optional[Dict[str, Any]] = None) -> List[str]:
-        """Process all supported files in a directory.
-        
-        Args:
-            dir_path: Path to the directory to process.
-            metadata: Optional metadata to apply to all documents.
-        
-        Returns:
-            List of document IDs for all processed chunks.
-        """
-        doc_ids = []
-        for root, _, files in os.walk(dir_path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                if self._validate_file(file_path):
-                    try:
-                        chunk_ids = await self.process_file(file_path, metadata)
-                        doc_ids.extend(chunk_ids)
-                    except Exception as e:
-                        print(f"Error processing {file_path}: {e}")
-        return doc_ids
-
-    async def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
-        """Search for documents similar to the query.
-        
-        Args:
-            query: Search query.
-            limit: Maximum number of results to return.
-        
-        Returns:
-            List of document dictionaries with similarity scores.
-        """
-        query_embedding = self.model.encode(query).tolist()
-        return await self.db.search_documents(query_embedding, limit)
-
 # Example usage
 if __name__ == "__main__":
     # Initialize the document processor
@@ -532,5 +411,5 @@ if __name__ == "__main__":
     
     # Process a directory
     directory_path = "documents"
-    docs = processor.process_directory(directory_path)
-    print(f"\nProcessed {len(docs)} documents from {directory_path}") 
\ No newline at end of file
+    count = sum(1 for _ in processor.process_directory(directory_path))
+    print(f"\nProcessed {count} documents from {directory_path}") 
\ No newline at end of file
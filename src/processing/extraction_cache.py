@@ -0,0 +1,266 @@
+"""
+Content-addressed on-disk cache of extraction results.
+
+Entries are keyed by the SHA-256 of the source file, the kind of extraction
+and the extractor version, so a renamed or moved file still hits and a
+changed file (or a changed extractor) misses. Entries never go stale, so
+there is no TTL. The cache is bounded by ``CACHE_CONFIG['max_cache_size']``
+with least-recently-used eviction (the entry file's mtime records its last
+use).
+
+Usage:
+    python -m src.processing.extraction_cache stats
+    python -m src.processing.extraction_cache clear
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from ..config.config import CACHE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+def file_sha256(file_path: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents (hex)."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """LRU-bounded directory of gzip-compressed JSON extraction results.
+
+    Safe to share between processes: entries are written to a temporary file
+    and renamed into place.
+
+    Example:
+        >>> cache = ExtractionCache()
+        >>> key = cache.key("book.pdf", "pdf", "1")
+        >>> entry = cache.get(key)
+        >>> if entry is None:
+        ...     entry = {"pages": extract_pages("book.pdf")}
+        ...     cache.put(key, entry)
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_size: int = CACHE_CONFIG['max_cache_size']
+    ):
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Directory for entries, defaults to ``<cache_dir>/extraction``
+            max_size: Maximum total size of the entries in bytes
+        """
+        self.cache_dir = Path(cache_dir or Path(CACHE_CONFIG['cache_dir']) / "extraction")
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._sizes: Optional[Dict[Path, int]] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(file_path: str, kind: str, version: str, sha256: Optional[str] = None) -> str:
+        """Build the cache key for a file.
+
+        Args:
+            file_path: Source file (hashed unless ``sha256`` is given)
+            kind: Kind of extraction, e.g. 'pdf' or 'metadata'
+            version: Extractor version; bump it when the output would change
+            sha256: Precomputed file hash
+
+        Returns:
+            Hex cache key
+        """
+        sha256 = sha256 or file_sha256(file_path)
+        return hashlib.sha256(f"{sha256}:{kind}:{version}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        """Entry path for a key (sharded by prefix)."""
+        return self.cache_dir / key[:2] / f"{key}.json.gz"
+
+    def _stat_entries(self) -> Dict[Path, os.stat_result]:
+        """Stat every entry (other processes may delete entries meanwhile)."""
+        entries = {}
+        for path in self.cache_dir.glob("*/*.json.gz"):
+            try:
+                entries[path] = path.stat()
+            except FileNotFoundError:
+                pass
+        return entries
+
+    def _scan(self) -> Dict[Path, int]:
+        """Sizes of all entries, scanned once per process."""
+        if self._sizes is None:
+            self._sizes = {path: stat.st_size for path, stat in self._stat_entries().items()}
+        return self._sizes
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry and mark it as recently used.
+
+        Args:
+            key: Key from ``key()``
+
+        Returns:
+            The stored dictionary, or None on a miss
+        """
+        path = self._path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable extraction cache entry {path}: {str(e)}")
+            self._remove(path)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: Dict[str, Any]):
+        """Store an entry and evict least recently used entries over the size bound.
+
+        Args:
+            key: Key from ``key()``
+            entry: JSON-serializable dictionary
+        """
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as f:
+                f.write(json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        with self._lock:
+            self._scan()[path] = path.stat().st_size
+        self.evict()
+
+    def evict(self) -> int:
+        """Remove least recently used entries until the cache fits ``max_size``.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            if sum(self._scan().values()) <= self.max_size:
+                return 0
+            # Other processes may have added or used entries since the scan
+            entries = self._stat_entries()
+            self._sizes = {path: stat.st_size for path, stat in entries.items()}
+            total = sum(self._sizes.values())
+            used = sorted(entries, key=lambda path: entries[path].st_mtime)
+
+        removed = 0
+        for path in used:
+            if total <= self.max_size:
+                break
+            total -= self._remove(path)
+            removed += 1
+        self.evictions += removed
+        return removed
+
+    def _remove(self, path: Path) -> int:
+        """Delete one entry, returning its size."""
+        with self._lock:
+            size = self._scan().pop(path, 0)
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        return size
+
+    def clear(self):
+        """Remove every entry."""
+        for path in list(self._scan()):
+            self._remove(path)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return entry count, size and hit statistics."""
+        with self._lock:
+            sizes = self._scan()
+            entries, size = len(sizes), sum(sizes.values())
+        return {
+            "entries": entries,
+            "size_bytes": size,
+            "max_size_bytes": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+
+_cache: Optional[ExtractionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_extraction_cache() -> Optional[ExtractionCache]:
+    """Return the process-wide cache, or None if ``CACHE_CONFIG['extraction_cache']`` is off."""
+    global _cache
+    if not CACHE_CONFIG['extraction_cache']:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ExtractionCache()
+        return _cache
+
+
+def cached_extraction(file_path: str, kind: str, version: str) -> Tuple[Optional[ExtractionCache], Optional[str], Optional[Dict[str, Any]]]:
+    """Look a file up in the process-wide cache.
+
+    Args:
+        file_path: Source file
+        kind: Kind of extraction
+        version: Extractor version
+
+    Returns:
+        (cache, key, entry); cache and key are None when caching is off,
+        entry is None on a miss
+    """
+    cache = get_extraction_cache()
+    if cache is None:
+        return None, None, None
+    key = cache.key(str(file_path), kind, version)
+    return cache, key, cache.get(key)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the extraction cache")
+    parser.add_argument("command", choices=["stats", "clear"], help="Action to run")
+
+    args = parser.parse_args()
+
+    try:
+        cache = ExtractionCache()
+        if args.command == "clear":
+            cache.clear()
+        print(json.dumps(cache.stats(), indent=2))
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -58,7 +58,7 @@ class ImageProcessor:
                 "file_type": "image"
             })
             
-            return RAGDocument(content=text.strip(), metadata=metadata)
+            return RAGDocument(text=text.strip(), metadata=metadata)
             
         except Exception as e:
             raise ValueError(f"Error processing image {file_path}: {str(e)}")
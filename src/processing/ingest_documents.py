@@ -1,107 +1,437 @@
 """
 Document ingestion module.
+
+Files go through a staged pipeline (see ``pipeline.Pipeline``):
+extract → chunk → embed → write, each stage with its own workers and a
+bounded queue in front of it, so text extraction, model inference and
+database writes overlap. In bulk mode the write stage is replaced by a
+single COPY stream (see ``src.database.bulk_loader``).
+
+Usage:
+    python -m src.processing.ingest_documents ~/Books --checkpoint books.checkpoint
+    python -m src.processing.ingest_documents ~/Books --incremental --extract-workers 4
+    python -m src.processing.ingest_documents ~/Books --bulk --defer-indexes
 """
 
+import argparse
+import json
 import os
+import signal
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional, Dict, Any
-from tqdm import tqdm
+from typing import List, Optional, Dict, Any, Callable
+
+import numpy as np
 
+from ..config.config import BULK_LOAD_CONFIG, DB_CONFIG, INGEST_CONFIG, METRICS_CONFIG
+from ..utils.metrics import DOCUMENT_EMBEDDING_SECONDS, export_ingest_metrics
 from .document_processor import DocumentProcessor
+from .pdf_processor import extraction_executor
+from .pipeline import Checkpoint, Pipeline, Stage
 from .rag_document import RAGDocument
 
+
+@dataclass
+class IngestItem:
+    """A file on its way through the ingestion stages."""
+    path: Path
+    key: Optional[str] = None  # Checkpoint key taken before processing
+    extraction: Any = None
+    documents: List[RAGDocument] = field(default_factory=list)
+    embeddings: Optional[np.ndarray] = None
+    doc_ids: List[str] = field(default_factory=list)
+    written: int = 0  # Documents written (or, in bulk mode, streamed to the load)
+
+    def __str__(self) -> str:
+        return str(self.path)
+
+
+class IngestionPipeline:
+    """Concurrent extract → chunk → embed → write ingestion of files.
+
+    In incremental mode each chunk's source is its file path and
+    ``db.sync_documents`` only writes chunks that changed since the last
+    run; as it embeds just the changed chunks itself, the embed stage passes
+    files through. With a checkpoint file, files finished by an earlier
+    (interrupted) run are skipped while unchanged.
+
+    In bulk mode embedded files are streamed into one ``BulkLoader`` COPY
+    instead of going through a write stage. The load commits once at the
+    end, so the checkpoint is only updated after it succeeded, and no
+    document IDs are returned.
+
+    Example:
+        >>> pipeline = IngestionPipeline(db, checkpoint="books.checkpoint")
+        >>> doc_ids = pipeline.run("~/Books")
+        >>> pipeline.stats()["embed"]["items_per_second"]
+    """
+
+    def __init__(
+        self,
+        db: Any,
+        metadata: Optional[Dict[str, Any]] = None,
+        incremental: bool = False,
+        batch_size: Optional[int] = None,
+        workers: Optional[Dict[str, int]] = None,
+        queue_size: int = INGEST_CONFIG['queue_size'],
+        checkpoint: Optional[str] = None,
+        bulk: bool = False,
+        defer_indexes: bool = BULK_LOAD_CONFIG['defer_indexes']
+    ):
+        """Initialize the pipeline.
+
+        Args:
+            db: Vector database (``add_documents`` / ``sync_documents``)
+            metadata: Optional metadata to attach to all documents
+            incremental: Sync changes instead of adding every document again
+            batch_size: Documents per embedding/insert batch, defaults to
+                ``MODEL_CONFIG['batch_size']``
+            workers: Workers per stage ('extract', 'chunk', 'write'), defaults
+                to ``INGEST_CONFIG``; embedding always uses one worker
+            queue_size: Files queued in front of each stage
+            checkpoint: Checkpoint file for resuming interrupted runs
+            bulk: Load with COPY instead of per-file inserts
+            defer_indexes: In bulk mode, rebuild the vector and metadata
+                indexes after the load instead of maintaining them during it
+        """
+        if bulk and incremental:
+            raise ValueError("Bulk loading and incremental sync cannot be combined")
+        workers = {**INGEST_CONFIG['workers'], **(workers or {})}
+        self.db = db
+        self.metadata = metadata
+        self.incremental = incremental
+        self.batch_size = batch_size
+        self.processor = DocumentProcessor()
+        self.checkpoint = Checkpoint(checkpoint) if checkpoint else None
+        self.bulk = bulk
+        self.defer_indexes = defer_indexes
+        self.load_stats: Dict[str, Any] = {}
+        self._executor = None
+        self.totals = {"files": 0, "skipped_files": 0, "pages": 0, "documents": 0, "added": 0, "updated": 0, "skipped": 0, "deleted": 0}
+        self._lock = threading.Lock()
+        stages = [
+            Stage("extract", self._extract, workers['extract']),
+            Stage("chunk", self._chunk, workers['chunk']),
+            Stage("embed", self._embed, 1),
+        ]
+        if not bulk:
+            # Sync statistics are per database instance: one sync at a time
+            stages.append(Stage("write", self._write, 1 if incremental else workers['write']))
+        self.pipeline = Pipeline(stages, queue_size)
+
+    def run(
+        self,
+        path: str,
+        recursive: bool = True,
+        progress: Optional[Callable[[IngestItem], None]] = None
+    ) -> List[str]:
+        """Ingest a file or directory.
+
+        Args:
+            path: Path to file or directory
+            recursive: Whether to process directories recursively
+            progress: Called with each written file
+
+        Returns:
+            List of document IDs (in incremental mode, of added and updated
+            rows), grouped by file in completion order; empty in bulk mode
+        """
+        path = Path(path).expanduser()
+        if path.is_file():
+            files = iter([path])
+        elif path.is_dir():
+            files = self.processor.iter_files(str(path), recursive)
+        else:
+            raise ValueError(f"Path not found: {path}")
+
+        # One process pool for the page extraction of every PDF of the run
+        self._executor = extraction_executor()
+        try:
+            seen: List[str] = []
+            doc_ids = []
+            if self.bulk:
+                loaded: List[IngestItem] = []
+                self.load_stats = self.db.bulk_loader(defer_indexes=self.defer_indexes).load(
+                    self._bulk_batches(self.pipeline.run(self._pending(files, seen)), loaded, progress)
+                )
+                if self.checkpoint is not None:
+                    for item in loaded:
+                        self.checkpoint.mark(str(item.path), item.key, documents=item.written)
+                return doc_ids
+
+            for item in self.pipeline.run(self._pending(files, seen)):
+                doc_ids.extend(item.doc_ids)
+                if self.checkpoint is not None:
+                    self.checkpoint.mark(str(item.path), item.key, documents=item.written)
+                if progress is not None:
+                    progress(item)
+
+            if self.incremental and path.is_dir() and not self.pipeline.cancelled:
+                # Files that failed to process are kept, only removed files are pruned
+                self.totals["deleted"] += self.db.prune_sources(seen, os.path.join(str(path), ""))
+            return doc_ids
+        finally:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def cancel(self):
+        """Stop taking new files; files in flight are finished and checkpointed."""
+        self.pipeline.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-stage statistics plus file and document totals."""
+        return {**self.pipeline.stats(), "totals": dict(self.totals), "seconds": self.pipeline.elapsed}
+
+    def _bulk_batches(self, items, loaded: List[IngestItem], progress: Optional[Callable[[IngestItem], None]]):
+        """Hand each embedded file to the bulk load, as one batch."""
+        for item in items:
+            yield item.documents, item.embeddings
+            item.written = len(item.documents)
+            with self._lock:
+                self.totals["files"] += 1
+                self.totals["documents"] += item.written
+            item.documents, item.embeddings = [], None
+            loaded.append(item)
+            if progress is not None:
+                progress(item)
+
+    def _pending(self, files, seen: List[str]):
+        """Files still to do, as pipeline items."""
+        for file_path in files:
+            seen.append(str(file_path))
+            item = IngestItem(file_path)
+            if self.checkpoint is not None:
+                item.key = Checkpoint.key(str(file_path))
+                if self.checkpoint.done(str(file_path), item.key):
+                    with self._lock:
+                        self.totals["skipped_files"] += 1
+                    continue
+            yield item
+
+    def _extract(self, item: IngestItem) -> IngestItem:
+        if item.path.suffix.lower() == '.pdf':
+            item.extraction = self.processor.pdf_processor.load_extraction(str(item.path), self._executor)
+        else:
+            # Some extractors add their fields to the metadata they are given
+            item.extraction = self.processor.process_document(str(item.path), dict(self.metadata or {}))
+        return item
+
+    def _chunk(self, item: IngestItem) -> Optional[IngestItem]:
+        if item.path.suffix.lower() == '.pdf':
+            documents = self.processor.pdf_processor.process_pdf(
+                str(item.path), self.metadata, return_chunks=True, extraction=item.extraction
+            )
+            with self._lock:
+                self.totals["pages"] += len(item.extraction[2]["pages"])
+        elif isinstance(item.extraction, list):
+            documents = item.extraction
+        else:
+            document = item.extraction
+            chunks = self.processor.chunker.chunk_text(document.text)
+            documents = [
+                RAGDocument(text=chunk.text, metadata={
+                    **document.metadata,
+                    **chunk.metadata(),
+                    "chunk_index": i,
+                    "total_chunks": len(chunks)
+                })
+                for i, chunk in enumerate(chunks)
+            ]
+        item.extraction = None
+
+        if self.incremental:
+            for document in documents:
+                document.metadata["source"] = str(item.path)
+        item.documents = documents
+        return item if documents else None
+
+    def _embed(self, item: IngestItem) -> IngestItem:
+        if not self.incremental:
+            with DOCUMENT_EMBEDDING_SECONDS.time():
+                item.embeddings = self.db.model.encode(
+                    [document.text for document in item.documents],
+                    batch_size=self.batch_size or len(item.documents),
+                    convert_to_numpy=True,
+                    show_progress_bar=False
+                )
+        return item
+
+    def _write(self, item: IngestItem) -> IngestItem:
+        if self.incremental:
+            item.doc_ids = self.db.sync_documents(item.documents, self.batch_size)
+            with self._lock:
+                for key in ("added", "updated", "skipped", "deleted"):
+                    self.totals[key] += self.db.last_sync_stats[key]
+        else:
+            item.doc_ids = self.db.add_documents(item.documents, self.batch_size, embeddings=item.embeddings)
+        item.written = len(item.doc_ids)
+        with self._lock:
+            self.totals["files"] += 1
+            self.totals["documents"] += len(item.documents)
+        item.documents, item.embeddings = [], None
+        return item
+
+
 def ingest_documents(
     path: str,
     db: Any,
     metadata: Optional[Dict[str, Any]] = None,
     batch_size: int = 100,
-    recursive: bool = True
+    recursive: bool = True,
+    incremental: bool = False,
+    queue_size: int = INGEST_CONFIG['queue_size'],
+    workers: Optional[Dict[str, int]] = None,
+    checkpoint: Optional[str] = None,
+    bulk: bool = False
 ) -> List[str]:
     """Ingest documents from a file or directory into the vector database.
-    
+
+    Runs an ``IngestionPipeline``: files are chunked with the shared
+    token-aware chunker, and extraction, embedding and writes of different
+    files overlap.
+
+    In incremental mode each document's source is its file path and
+    ``db.sync_documents`` only writes chunks that changed since the last
+    run; chunks of files no longer in the directory are deleted. Use it for
+    repeated re-syncs of the same folder.
+
     Args:
         path: Path to file or directory
         db: Database instance
         metadata: Optional metadata to attach to all documents
-        batch_size: Number of documents to process in each batch
+        batch_size: Documents per embedding/insert batch
         recursive: Whether to process directories recursively
-        
+        incremental: Sync changes instead of adding every document again
+        queue_size: Files queued in front of each pipeline stage
+        workers: Workers per stage, see ``IngestionPipeline``
+        checkpoint: Checkpoint file; files finished by an earlier run are skipped
+        bulk: Load everything in one COPY stream (no IDs are returned)
+
     Returns:
-        List of document IDs
+        List of document IDs (in incremental mode, of added and updated rows)
     """
     try:
-        processor = DocumentProcessor()
-        path = Path(path)
-        
-        # Handle single file
-        if path.is_file():
-            doc = processor.process_document(str(path), metadata)
-            doc_ids = db.add_documents([doc])
-            return doc_ids
-        
-        # Handle directory
-        if not path.is_dir():
-            raise ValueError(f"Path not found: {path}")
-        
-        # Get all files in directory
-        if recursive:
-            files = [f for f in path.rglob("*") if f.is_file()]
-        else:
-            files = [f for f in path.iterdir() if f.is_file()]
-        
-        # Process files in batches
-        doc_ids = []
-        for i in tqdm(range(0, len(files), batch_size), desc="Processing documents"):
-            batch_files = files[i:i + batch_size]
-            batch_docs = []
-            
-            for file_path in batch_files:
-                try:
-                    doc = processor.process_document(str(file_path), metadata)
-                    batch_docs.append(doc)
-                except Exception as e:
-                    print(f"Warning: Could not process file {file_path}: {e}")
-                    continue
-            
-            if batch_docs:
-                batch_ids = db.add_documents(batch_docs)
-                doc_ids.extend(batch_ids)
-        
+        pipeline = IngestionPipeline(db, metadata, incremental, batch_size, workers, queue_size, checkpoint, bulk)
+        doc_ids = pipeline.run(path, recursive)
+        if incremental:
+            totals = pipeline.totals
+            print(
+                f"Synced {path}: {totals['added']} added, {totals['updated']} updated, "
+                f"{totals['skipped']} skipped, {totals['deleted']} deleted"
+            )
         return doc_ids
-        
+
     except Exception as e:
         raise ValueError(f"Error ingesting documents: {str(e)}")
 
-def main():
-    """Example usage of the document ingestion function."""
-    # Initialize the database
-    db = PostgreSQLVectorDB(
-        dbname="rag_db",
-        user="your_username",
-        password="your_password"
+
+def format_stats(stats: Dict[str, Any]) -> str:
+    """Render pipeline statistics as a table."""
+    lines = [f"{'stage':<9}{'workers':>8}{'done':>7}{'errors':>7}{'queued':>7}{'max q':>6}{'files/s':>9}{'busy':>7}"]
+    for name, stage in stats.items():
+        if name in ("totals", "seconds"):
+            continue
+        lines.append(
+            f"{name:<9}{stage['workers']:>8}{stage['processed']:>7}{stage['errors']:>7}{stage['queued']:>7}"
+            f"{stage['max_queued']:>6}{stage['items_per_second']:>9.2f}{stage['utilization']:>7.0%}"
+        )
+    totals = stats["totals"]
+    lines.append(
+        f"{totals['files']} files ({totals['skipped_files']} already done), "
+        f"{totals['pages']} pages, {totals['documents']} documents in {stats['seconds']:.1f}s"
     )
-    
-    # Example metadata
-    metadata = {
-        "ingestion_date": "2024-03-21",
-        "source": "example_documents"
-    }
-    
-    # Example: Ingest a single file
-    file_path = "path/to/your/document.pdf"
-    try:
-        doc_ids = ingest_documents(file_path, db, metadata)
-        print(f"Successfully ingested {len(doc_ids)} documents from {file_path}")
-    except Exception as e:
-        print(f"Error ingesting {file_path}: {str(e)}")
-    
-    # Example: Ingest a directory
-    directory_path = "path/to/your/documents"
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest files into the vector database with a staged pipeline")
+    parser.add_argument("path", help="File or directory to ingest")
+    parser.add_argument("--metadata", type=json.loads, help="JSON object attached to every document")
+    parser.add_argument("--incremental", action="store_true", help="Only write changed chunks and prune removed files")
+    parser.add_argument("--no-recursive", action="store_true", help="Do not descend into subdirectories")
+    parser.add_argument("--checkpoint", help="Checkpoint file for resuming an interrupted run")
+    parser.add_argument("--restart", action="store_true", help="Forget the checkpoint and start over")
+    parser.add_argument("--extract-workers", type=int, default=INGEST_CONFIG['workers']['extract'], help="Extraction workers")
+    parser.add_argument("--chunk-workers", type=int, default=INGEST_CONFIG['workers']['chunk'], help="Chunking workers")
+    parser.add_argument("--write-workers", type=int, default=INGEST_CONFIG['workers']['write'], help="Database writers")
+    parser.add_argument("--queue-size", type=int, default=INGEST_CONFIG['queue_size'], help="Files queued per stage")
+    parser.add_argument("--batch-size", type=int, help="Documents per embedding/insert batch")
+    parser.add_argument("--bulk", action="store_true", help="Load with one COPY stream instead of per-file inserts")
+    parser.add_argument("--defer-indexes", action="store_true", help="With --bulk: rebuild indexes after the load (locks the table)")
+    parser.add_argument("--stats-every", type=int, default=10, help="Print stage statistics every N files (0: only at the end)")
+    parser.add_argument("--metrics-textfile", default=METRICS_CONFIG['textfile'], help="Write Prometheus metrics to this node_exporter textfile")
+    parser.add_argument("--pushgateway", default=METRICS_CONFIG['pushgateway'], help="Push Prometheus metrics to this Pushgateway")
+
+    args = parser.parse_args()
+
     try:
-        doc_ids = ingest_documents(directory_path, db, metadata)
-        print(f"Successfully ingested {len(doc_ids)} documents from {directory_path}")
+        from ..database.postgres_vector_db import PostgreSQLVectorDB
+        if args.restart and args.checkpoint:
+            Checkpoint(args.checkpoint).clear()
+
+        db = PostgreSQLVectorDB(**DB_CONFIG)
+        pipeline = IngestionPipeline(
+            db,
+            metadata=args.metadata,
+            incremental=args.incremental,
+            batch_size=args.batch_size,
+            workers={"extract": args.extract_workers, "chunk": args.chunk_workers, "write": args.write_workers},
+            queue_size=args.queue_size,
+            checkpoint=args.checkpoint,
+            bulk=args.bulk,
+            defer_indexes=args.defer_indexes or BULK_LOAD_CONFIG['defer_indexes']
+        )
+
+        def interrupt(signum, frame):
+            # First Ctrl-C drains the pipeline, a second one aborts
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            print("\nStopping: finishing files in flight (Ctrl-C again to abort)...")
+            pipeline.cancel()
+
+        def publish():
+            # A failing metrics sink must not stop the ingestion
+            if args.metrics_textfile or args.pushgateway:
+                try:
+                    export_ingest_metrics(pipeline.stats(), textfile=args.metrics_textfile, pushgateway=args.pushgateway)
+                except Exception as e:
+                    print(f"Warning: could not export metrics: {str(e)}")
+
+        def progress(item: IngestItem):
+            written = pipeline.totals["files"]
+            print(f"[{written}] {item.path}: {item.written} documents")
+            if args.stats_every and written % args.stats_every == 0:
+                print(format_stats(pipeline.stats()))
+                publish()
+
+        signal.signal(signal.SIGINT, interrupt)
+        doc_ids = pipeline.run(args.path, recursive=not args.no_recursive, progress=progress)
+        print(format_stats(pipeline.stats()))
+        publish()
+        if args.bulk:
+            load = pipeline.load_stats
+            print(
+                f"Bulk load: {load['rows']} rows in {load['seconds']:.1f}s ({load['rows_per_second']:.0f} rows/s; "
+                f"copy {load['copy_seconds']:.1f}s, merge {load['merge_seconds']:.1f}s, indexes {load['index_seconds']:.1f}s)"
+            )
+        if args.incremental:
+            totals = pipeline.totals
+            print(
+                f"Synced {args.path}: {totals['added']} added, {totals['updated']} updated, "
+                f"{totals['skipped']} skipped, {totals['deleted']} deleted"
+            )
+        written = pipeline.totals["documents"]
+        if pipeline.pipeline.cancelled:
+            print(f"Interrupted after {written} documents; run again with the same --checkpoint to resume")
+            return 1
+        print(f"Ingested {written} documents from {args.path}")
+        db.close()
     except Exception as e:
-        print(f"Error ingesting {directory_path}: {str(e)}")
+        print(f"Error: {str(e)}")
+        return 1
+
+    return 0
+
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    exit(main())
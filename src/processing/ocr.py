@@ -0,0 +1,99 @@
+"""
+OCR fallback for PDFs without a text layer.
+
+Pages are rasterized one at a time with PyMuPDF (grayscale, at
+``DOC_CONFIG['ocr_dpi']``) and recognized by Tesseract on a bounded pool of
+worker threads. Tesseract runs as a subprocess, so threads give real
+parallelism; at most ``2 * workers`` rendered pages exist at any time, which
+caps memory independently of the page count.
+"""
+
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional, Tuple
+
+import fitz  # PyMuPDF
+import pytesseract
+from PIL import Image
+
+from ..config.config import DOC_CONFIG
+
+
+def render_page(page: "fitz.Page", dpi: Optional[int] = None, max_pixels: Optional[int] = None) -> Image.Image:
+    """Rasterize a PDF page to a grayscale image for OCR.
+
+    Args:
+        page: PyMuPDF page
+        dpi: Resolution, defaults to ``DOC_CONFIG['ocr_dpi']``
+        max_pixels: Lower the resolution for pages that would exceed this
+            many pixels, defaults to ``DOC_CONFIG['ocr_max_pixels']``
+
+    Returns:
+        Grayscale PIL image
+    """
+    dpi = dpi or DOC_CONFIG['ocr_dpi']
+    max_pixels = max_pixels or DOC_CONFIG['ocr_max_pixels']
+
+    # Page size is in points (1/72 inch)
+    square_inches = (page.rect.width / 72) * (page.rect.height / 72)
+    if square_inches * dpi * dpi > max_pixels:
+        dpi = int(math.sqrt(max_pixels / square_inches))
+
+    pixmap = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+    image = Image.frombytes("L", (pixmap.width, pixmap.height), pixmap.samples)
+    # pytesseract hands Tesseract a temporary file in the image's format;
+    # uncompressed PGM avoids a PNG encode and decode per page
+    image.format = "PPM"
+    return image
+
+
+def _recognize(image: Image.Image, language: str) -> str:
+    """Run Tesseract on one rendered page (in a worker thread)."""
+    return pytesseract.image_to_string(image, lang=language)
+
+
+def ocr_pages(
+    file_path: str,
+    language: str = "eng",
+    start_page: int = 0,
+    workers: Optional[int] = None,
+    dpi: Optional[int] = None
+) -> Iterator[Tuple[int, str]]:
+    """OCR the pages of a PDF concurrently and yield them in page order.
+
+    Args:
+        file_path: Path to the PDF file
+        language: Tesseract language code (e.g. 'eng', 'deu')
+        start_page: Index of the first page to OCR (0-based)
+        workers: Concurrent Tesseract processes, defaults to
+            ``DOC_CONFIG['ocr_workers']`` or the CPU count
+        dpi: Rendering resolution, defaults to ``DOC_CONFIG['ocr_dpi']``
+
+    Yields:
+        (1-based page number, recognized text) for every page
+    """
+    workers = workers or DOC_CONFIG['ocr_workers'] or os.cpu_count() or 1
+    if workers > 1:
+        # Each Tesseract process would otherwise start one OpenMP thread per core
+        os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr")
+    pending = []
+    try:
+        # PyMuPDF documents are not thread-safe: pages are rendered here and
+        # only the rendered images go to the workers
+        with fitz.open(file_path) as doc:
+            for page_index in range(start_page, doc.page_count):
+                if len(pending) >= 2 * workers:
+                    page_number, future = pending.pop(0)
+                    yield page_number, future.result()
+                image = render_page(doc[page_index], dpi)
+                pending.append((page_index + 1, executor.submit(_recognize, image, language)))
+        while pending:
+            page_number, future = pending.pop(0)
+            yield page_number, future.result()
+    finally:
+        for _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
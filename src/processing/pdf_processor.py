@@ -2,24 +2,33 @@
 PDF processor module.
 """
 
+import multiprocessing
 import os
 from pathlib import Path
-from typing import List, Optional, Dict, Any, Tuple, Union
+from typing import List, Optional, Dict, Any, Tuple, Union, Iterator
+from concurrent.futures import ProcessPoolExecutor, Executor
 import PyPDF2
-import io
-import pytesseract
-from pdf2image import convert_from_path
 import cv2
 import numpy as np
 
-from ..config.config import DOC_CONFIG
+from ..config.config import DOC_CONFIG, MODEL_CONFIG
 from .rag_document import RAGDocument
+from .text_cleaning import page_cleaner, text_cleaner
+from .ocr import ocr_pages
+from .extraction_cache import ExtractionCache, cached_extraction
+from .chunker import Chunker, TextChunk, find_sentence_boundary
 from dataclasses import dataclass
-from transformers import AutoTokenizer
+from ..utils.model_registry import get_tokenizer
 import re
 import tiktoken
 import fitz  # PyMuPDF
-from PIL import Image
+
+# Part of the extraction cache key: bump when extraction or cleaning changes
+# the page text, so cached results of unchanged files are not reused
+EXTRACTOR_VERSION = "1"
+
+# A word hyphenated at the end of a page
+_PAGE_END_HYPHEN = re.compile(r"\S*[A-Za-zÄÖÜäöüß]-\s*$")
 
 @dataclass
 class RAGDocument:
@@ -41,6 +50,62 @@ class RAGDocument:
             metadata=data['metadata']
         )
 
+def clean_page_text(text: str) -> str:
+    """Clean text extracted from a PDF page.
+    
+    Module-level so page workers in other processes can use it without a
+    PDFProcessor instance. The rules are ``text_cleaning.PAGE_RULES``.
+    
+    Args:
+        text: Raw text from PDF page
+        
+    Returns:
+        Cleaned text
+    """
+    return page_cleaner.clean(text)
+
+def _extract_page_range(file_path: str, start: int, stop: int) -> List[Tuple[int, str]]:
+    """Extract and clean pages ``[start, stop)`` of a PDF (runs in a worker process).
+    
+    Args:
+        file_path: Path to the PDF file
+        start: First page index (0-based)
+        stop: Page index after the last page
+        
+    Returns:
+        List of (1-based page number, cleaned text) for pages with text
+    """
+    pages = []
+    with fitz.open(file_path) as doc:
+        for page_index in range(start, min(stop, doc.page_count)):
+            # Extract text with sorting and ligature preservation
+            text = doc[page_index].get_text("text", sort=True, flags=fitz.TEXT_PRESERVE_LIGATURES | fitz.TEXT_PRESERVE_WHITESPACE)
+            text = clean_page_text(text)
+            if text.strip():
+                pages.append((page_index + 1, text))
+    return pages
+
+def extraction_executor(workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """Create a process pool for ``iter_pages``, to share across books.
+    
+    Workers are started by a fork server (or spawned where there is none)
+    instead of being forked from the caller, which may be running threads
+    (an embedding model, connection pools) whose locks a forked child would
+    inherit in a held state.
+    
+    Args:
+        workers: Worker processes, defaults to ``DOC_CONFIG['extraction_workers']``
+            or the CPU count
+        
+    Returns:
+        The process pool; shut it down when done
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(
+        max_workers=workers or DOC_CONFIG['extraction_workers'] or os.cpu_count() or 1,
+        mp_context=multiprocessing.get_context(method)
+    )
+
 class PDFProcessor:
     """Handles the processing and chunking of PDF documents."""
     
@@ -67,26 +132,77 @@ class PDFProcessor:
         self.max_chunks = max_chunks
         self.encoding = tiktoken.encoding_for_model(model)
         self.language = language
+        self.chunker = Chunker()
         
-        # Common patterns to filter out
-        self.filter_patterns = [
-            re.compile(r'Max Weber im Kontext.*?Alle Rechte vorbehalten\.', re.DOTALL),
-            re.compile(r'Viewlit V\.2\.6.*?InfoSoftWare 1999'),
-            re.compile(r'WG\d{3}'),
-            re.compile(r'- Kap\.-Nr\. \d+ \d+ - Seite: \d+'),
-            re.compile(r'^\s*\[\d+\]\s*$'),  # Page numbers in brackets
-            re.compile(r'^\s*Anmerkungen:\s*$'),  # Footnote sections
-            re.compile(r'^\s*Titelseite:.*$'),  # Title page headers
-            re.compile(r'^\s*Titelei:.*$'),  # Title headers
-        ]
-        
-        # Initialize tokenizer
-        self.tokenizer = AutoTokenizer.from_pretrained("sentence-transformers/all-MiniLM-L6-v2")
+    @property
+    def tokenizer(self):
+        """Embedding model tokenizer, shared process-wide and loaded on first use."""
+        return get_tokenizer()
         
     def count_tokens(self, text: str) -> int:
         """Count the number of tokens in a text string."""
         return len(self.encoding.encode(text))
     
+    def iter_pages(
+        self,
+        file_path: str,
+        start_page: int = 0,
+        workers: Optional[int] = None,
+        pages_per_task: Optional[int] = None,
+        executor: Optional[Executor] = None
+    ) -> Iterator[Tuple[int, str]]:
+        """Extract and clean the pages of a PDF, in page order, in parallel.
+        
+        Page ranges of ``pages_per_task`` pages are sharded across a process
+        pool. Each range is yielded as soon as it and all earlier ranges are
+        done, with at most ``2 * workers`` ranges in flight, so callers can
+        start consuming the first pages of a long book right away.
+        
+        Args:
+            file_path: Path to the PDF file
+            start_page: Index of the first page to extract (0-based)
+            workers: Worker processes, defaults to ``DOC_CONFIG['extraction_workers']``
+                or the CPU count. 1 extracts in the calling process.
+            pages_per_task: Pages per shard, defaults to ``DOC_CONFIG['pages_per_task']``
+            executor: Existing process pool to reuse across books (see
+                ``extraction_executor``)
+            
+        Yields:
+            (1-based page number, cleaned text) for every page with text
+        """
+        with fitz.open(file_path) as doc:
+            page_count = doc.page_count
+        
+        workers = workers or DOC_CONFIG['extraction_workers'] or os.cpu_count() or 1
+        pages_per_task = pages_per_task or DOC_CONFIG['pages_per_task']
+        shards = [
+            (start, min(start + pages_per_task, page_count))
+            for start in range(start_page, page_count, pages_per_task)
+        ]
+        
+        # Small documents are not worth the process start-up
+        if executor is None and (workers <= 1 or page_count - start_page < DOC_CONFIG['parallel_min_pages']):
+            for start, stop in shards:
+                yield from _extract_page_range(file_path, start, stop)
+            return
+        
+        owns_executor = executor is None
+        if owns_executor:
+            executor = extraction_executor(min(workers, len(shards)))
+        pending = {}
+        try:
+            next_shard = 0
+            for index in range(len(shards)):
+                while next_shard < len(shards) and next_shard - index < 2 * workers:
+                    pending[next_shard] = executor.submit(_extract_page_range, file_path, *shards[next_shard])
+                    next_shard += 1
+                yield from pending.pop(index).result()
+        finally:
+            for future in pending.values():
+                future.cancel()
+            if owns_executor:
+                executor.shutdown(wait=True)
+    
     def extract_text_from_pdf(self, file_path: str, metadata: Optional[Dict] = None) -> str:
         """Extract text from a PDF file.
         
@@ -97,137 +213,104 @@ class PDFProcessor:
         Returns:
             Extracted text as a string
         """
+        return "\n\n".join(text for _, text in self.extract_pages(file_path))
+    
+    def extract_pages(self, file_path: str) -> List[Tuple[int, str]]:
+        """Extract the cleaned text of each page, reusing the extraction cache.
+        
+        Args:
+            file_path: Path to the PDF file
+            
+        Returns:
+            List of (1-based page number, cleaned text) for pages with text
+        """
+        _, _, entry = self.load_extraction(file_path)
+        return [(page_number, text) for page_number, text in entry["pages"]]
+    
+    def load_extraction(
+        self,
+        file_path: str,
+        executor: Optional[Executor] = None
+    ) -> Tuple[Optional[ExtractionCache], Optional[str], Dict[str, Any]]:
+        """Look up the extraction cache entry of a PDF, extracting it on a miss.
+        
+        Args:
+            file_path: Path to the PDF file
+            executor: Process pool to extract the pages in (see ``iter_pages``)
+            
+        Returns:
+            (cache, key, entry) where ``entry['pages']`` holds [page number, text]
+            pairs and ``entry['chunks']`` the chunks per chunking configuration;
+            cache and key are None when the cache is disabled
+        """
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"PDF file not found: {file_path}")
+        
+        # OCR output depends on the language
+        cache, key, entry = cached_extraction(str(file_path), f"pdf:{self.language}", EXTRACTOR_VERSION)
+        if entry is not None:
+            print(f"Using cached extraction of {file_path} ({len(entry['pages'])} pages)")
+            return cache, key, entry
+        
+        entry = {"source": str(file_path), "pages": self._extract_pages(file_path, executor), "chunks": {}}
+        # Empty results are not cached: OCR may just be unavailable on this machine
+        if cache is not None and entry["pages"]:
+            cache.put(key, entry)
+        return cache, key, entry
+    
+    def _extract_pages(self, file_path: str, executor: Optional[Executor] = None) -> List[Tuple[int, str]]:
+        """Extract and clean the pages of a PDF, falling back to OCR.
+        
+        Args:
+            file_path: Path to the PDF file
+            executor: Process pool to extract the pages in (see ``iter_pages``)
             
+        Returns:
+            List of (1-based page number, cleaned text) for pages with text
+        """
         try:
             # Try PyMuPDF first
-            doc = fitz.open(file_path)
-            text_parts = []
+            pages = []
             
             # Skip the first few pages (Google Books preamble)
             start_page = 5
             
-            for page_num, page in enumerate(doc[start_page:], start=start_page):
-                # Extract text with sorting and ligature preservation
-                text = page.get_text("text", sort=True, flags=fitz.TEXT_PRESERVE_LIGATURES | fitz.TEXT_PRESERVE_WHITESPACE)
-                
-                # Clean the page text
-                text = self._clean_page_text(text)
-                
-                if text.strip():
-                    text_parts.append(text)
-                    print(f"Extracted {len(text)} characters from page {page_num + 1} using PyMuPDF")
-                    
-            doc.close()
+            # Pages are extracted and cleaned in parallel, but arrive in order
+            for page_number, text in self.iter_pages(file_path, start_page=start_page, executor=executor):
+                pages.append((page_number, text))
+                print(f"Extracted {len(text)} characters from page {page_number} using PyMuPDF")
             
-            if text_parts:
-                return "\n\n".join(text_parts)
+            if pages:
+                return pages
                 
             # If PyMuPDF failed, try OCR
             print("PyMuPDF extraction failed, trying OCR...")
-            text_parts = []
             
-            # Convert PDF to images
-            images = convert_from_path(file_path)
-            
-            # Skip the first few pages (Google Books preamble)
-            for i, image in enumerate(images[start_page:], start=start_page):
-                # Convert PIL image to bytes
-                img_byte_arr = io.BytesIO()
-                image.save(img_byte_arr, format='PNG')
-                img_byte_arr = img_byte_arr.getvalue()
-                
-                # Convert bytes to PIL Image
-                img = Image.open(io.BytesIO(img_byte_arr))
-                
-                # Extract text using pytesseract with language support
-                page_text = pytesseract.image_to_string(img, lang=self.language)
+            # Pages are rendered one at a time and recognized concurrently,
+            # skipping the first few pages (Google Books preamble)
+            for page_number, page_text in ocr_pages(file_path, self.language, start_page=start_page):
                 if page_text:
                     page_text = self._clean_page_text(page_text)
                     if page_text.strip():
-                        text_parts.append(page_text)
-                        print(f"Extracted {len(page_text)} characters from page {i + 1} using OCR")
+                        pages.append((page_number, page_text))
+                        print(f"Extracted {len(page_text)} characters from page {page_number} using OCR")
                         
-            if text_parts:
-                return "\n\n".join(text_parts)
+            if pages:
+                return pages
                     
             print("Warning: No text was extracted from any page using either method")
-            return ""
+            return []
             
         except Exception as e:
             print(f"Error extracting text from PDF: {str(e)}")
             raise ValueError(f"Error extracting text from PDF: {str(e)}")
             
     def _clean_page_text(self, text: str) -> str:
-        """Clean text extracted from a PDF page.
-        
-        Args:
-            text: Raw text from PDF page
-            
-        Returns:
-            Cleaned text
-        """
-        # Remove page markers
-        text = re.sub(r"Seite:\s*\d+", "", text)
-        text = re.sub(r"- Seite: \d+ -", "", text)
-        text = re.sub(r"- Kap\.-Nr\. \d+/\d+ -", "", text)
-        text = re.sub(r"- Werke auf CD-ROM -", "", text)
-        
-        # Remove software headers and footers
-        text = re.sub(r"Max Weber im Kontext.*?Alle Rechte vorbehalten\.", "", text, flags=re.DOTALL)
-        text = re.sub(r"Viewlit V\.2\.6.*?InfoSoftWare 1999", "", text, flags=re.DOTALL)
-        
-        # Remove standalone numbers (likely page numbers)
-        text = re.sub(r"^\s*\d+\s*$", "", text, flags=re.MULTILINE)
-        
-        # Remove empty lines
-        text = re.sub(r"^\s*$\n?", "", text, flags=re.MULTILINE)
-        
-        # Fix hyphenation at line breaks
-        text = re.sub(r"([a-zäöüß])-\s*\n\s*([a-zäöüß])", r"\1\2", text)
-        text = re.sub(r"([A-ZÄÖÜ])-\s*\n\s*([a-zäöüß])", r"\1\2", text)
-        
-        # Fix spacing around punctuation
-        text = re.sub(r"\s+([.,;:!?])", r"\1", text)
-        text = re.sub(r"([.,;:!?])\s+", r"\1 ", text)
-        
-        # Remove section markers
-        text = re.sub(r"^[IVX]+\.\s*$", "", text, flags=re.MULTILINE)
-        text = re.sub(r"^§\s*\d+\s*$", "", text, flags=re.MULTILINE)
-        text = re.sub(r"^Kapitel\s+\d+\s*$", "", text, flags=re.MULTILINE)
-        text = re.sub(r"^Abschnitt\s+\d+\s*$", "", text, flags=re.MULTILINE)
-        text = re.sub(r"^Unterabschnitt\s+\d+\s*$", "", text, flags=re.MULTILINE)
-        text = re.sub(r"^Anmerkungen\s*$", "", text, flags=re.MULTILINE)
-        text = re.sub(r"^Literaturverzeichnis\s*$", "", text, flags=re.MULTILINE)
-        text = re.sub(r"^Register\s*$", "", text, flags=re.MULTILINE)
-        text = re.sub(r"^Inhaltsverzeichnis\s*$", "", text, flags=re.MULTILINE)
-        text = re.sub(r"^Vorwort\s*$", "", text, flags=re.MULTILINE)
-        text = re.sub(r"^Einleitung\s*$", "", text, flags=re.MULTILINE)
-        text = re.sub(r"^Widmung\s*$", "", text, flags=re.MULTILINE)
-        text = re.sub(r"^Danksagung\s*$", "", text, flags=re.MULTILINE)
-        text = re.sub(r"^Impressum\s*$", "", text, flags=re.MULTILINE)
-        text = re.sub(r"^Copyright\s*$", "", text, flags=re.MULTILINE)
-        text = re.sub(r"^Titelseite:.*$", "", text, flags=re.MULTILINE)
-        text = re.sub(r"^Titelei:.*$", "", text, flags=re.MULTILINE)
-        text = re.sub(r"^Dem Andenken.*$", "", text, flags=re.MULTILINE)
-        text = re.sub(r"^Inhalt:.*$", "", text, flags=re.MULTILINE)
-        text = re.sub(r"^Schluß.*$", "", text, flags=re.MULTILINE)
-        text = re.sub(r"^Anhang.*$", "", text, flags=re.MULTILINE)
-        text = re.sub(r"^Bearbeitet von.*$", "", text, flags=re.MULTILINE)
-        text = re.sub(r"^Tübingen \d{4}.*$", "", text, flags=re.MULTILINE)
-        text = re.sub(r"^\[J\.C\.B Mohr.*$", "", text, flags=re.MULTILINE)
-        text = re.sub(r"^III\. Abteilung.*$", "", text, flags=re.MULTILINE)
-        text = re.sub(r"^(Zweiter|Dritter|Erster)\s+Teil\s*$", "", text, flags=re.MULTILINE)
-        text = re.sub(r"^(Erstes|Zweites|Drittes|Viertes|Fünftes|Sechstes|Siebentes|Achtes|Neuntes|Zehntes)\s+Kapitel\s*$", "", text, flags=re.MULTILINE)
-        
-        # Normalize whitespace
-        text = re.sub(r"\s+", " ", text)
-        
-        return text.strip()
+        """Clean text extracted from a PDF page (see ``clean_page_text``)."""
+        return clean_page_text(text)
     
     def clean_text(self, text: str) -> str:
-        """Clean extracted text.
+        """Clean extracted text (rules in ``text_cleaning.TEXT_RULES``).
         
         Args:
             text: Text to clean
@@ -235,144 +318,18 @@ class PDFProcessor:
         Returns:
             Cleaned text
         """
-        # Remove software headers and footers
-        text = re.sub(r'Viewlit V\.2\.6.*?InfoSoftWare 1999', '', text)
-        text = re.sub(r'Max Weber im Kontext.*?Alle Rechte vorbehalten\.', '', text)
-        
-        # Remove page markers and numbers
-        text = re.sub(r'^Seite:\s*\d+\s*$', '', text, flags=re.MULTILINE)
-        text = re.sub(r'^-\s*Seite:\s*\d+\s*-\s*$', '', text, flags=re.MULTILINE)
-        text = re.sub(r'^-\s*Kap\.-Nr\.\s*\d+/\d+\s*-\s*$', '', text, flags=re.MULTILINE)
-        text = re.sub(r'^\d+\s*$', '', text, flags=re.MULTILINE)
-        text = re.sub(r'\[S\.\s*\d+\]', '', text)
-        
-        # Fix common OCR errors and special characters
-        text = text.replace('ii', 'ü')
-        text = text.replace('ae', 'ä')
-        text = text.replace('oe', 'ö')
-        text = text.replace('ss', 'ß')
-        text = text.replace('ﬁ', 'fi')
-        text = text.replace('ﬂ', 'fl')
-        text = text.replace('ﬀ', 'ff')
-        text = text.replace('ﬃ', 'ffi')
-        text = text.replace('ﬄ', 'ffl')
-        
-        # Fix spacing around punctuation and special characters
-        text = re.sub(r'\s+([.,;:!?])', r'\1', text)
-        text = re.sub(r'([.,;:!?])\s+', r'\1 ', text)
-        text = re.sub(r'\s+([()\[\]{}])', r'\1', text)
-        text = re.sub(r'([()\[\]{}])\s+', r'\1', text)
-        
-        # Fix hyphenation and line breaks
-        text = re.sub(r'([a-zäöüß])-\s*\n\s*([a-zäöüß])', r'\1\2', text)
-        text = re.sub(r'([A-ZÄÖÜ])-\s*\n\s*([a-zäöüß])', r'\1\2', text)
-        
-        # Remove section markers and headers
-        section_markers = [
-            r'^[IVX]+\.\s*$',
-            r'^§\s*\d+\s*$',
-            r'^Kapitel\s+\d+\s*$',
-            r'^Abschnitt\s+\d+\s*$',
-            r'^Unterabschnitt\s+\d+\s*$',
-            r'^Anmerkungen\s*$',
-            r'^Literaturverzeichnis\s*$',
-            r'^Register\s*$',
-            r'^Inhaltsverzeichnis\s*$',
-            r'^Vorwort\s*$',
-            r'^Einleitung\s*$',
-            r'^Widmung\s*$',
-            r'^Danksagung\s*$',
-            r'^Impressum\s*$',
-            r'^Copyright\s*$',
-            r'^Titelseite:.*$',
-            r'^Titelei:.*$',
-            r'^Dem Andenken.*$',
-            r'^Inhalt:.*$',
-            r'^Schluß.*$',
-            r'^Anhang.*$',
-            r'^Bearbeitet von.*$',
-            r'^Tübingen \d{4}.*$',
-            r'^\[J\.C\.B Mohr.*$',
-            r'^III\. Abteilung.*$',
-            r'^(Zweiter|Dritter|Erster)\s+Teil\s*$',
-            r'^(Erstes|Zweites|Drittes|Viertes|Fünftes|Sechstes|Siebentes|Achtes|Neuntes|Zehntes)\s+Kapitel\s*$'
-        ]
-        
-        for pattern in section_markers:
-            text = re.sub(pattern, '', text, flags=re.MULTILINE)
-        
-        # Normalize whitespace
-        text = re.sub(r'\s+', ' ', text)
-        text = re.sub(r'^\s+|\s+$', '', text, flags=re.MULTILINE)
-        
-        # Remove empty lines and normalize line breaks
-        text = re.sub(r'\n\s*\n+', '\n\n', text)
-        text = re.sub(r'^\s*$\n', '', text, flags=re.MULTILINE)
-        
-        # Final cleanup
-        text = text.strip()
-        text = re.sub(r'\n{3,}', '\n\n', text)
-        
-        return text
+        return text_cleaner.clean(text)
     
     def find_sentence_boundary(self, text: str, position: int, direction: str = 'forward') -> int:
-        """Find the nearest sentence boundary, handling German sentence structures."""
-        # German sentence endings (including abbreviations)
-        sentence_endings = '.!?'
-        abbreviations = ['Dr.', 'Prof.', 'Hr.', 'Fr.', 'Nr.', 'St.', 'str.', 'z.B.', 'd.h.', 'u.a.', 'etc.', 'usw.', 'bzw.', 'ca.']
-        
-        if direction == 'forward':
-            # Look for next sentence boundary
-            for i in range(position, len(text)):
-                if text[i] in sentence_endings:
-                    # Check if it's not part of an abbreviation
-                    is_abbreviation = False
-                    for abbr in abbreviations:
-                        if i >= len(abbr) and text[i-len(abbr)+1:i+1] == abbr:
-                            is_abbreviation = True
-                            break
-                    if not is_abbreviation:
-                        # Make sure we include any closing quotes or parentheses
-                        while i + 1 < len(text) and text[i+1] in '"\')]':
-                            i += 1
-                        return i + 1
-            return len(text)
-        else:
-            # Look for previous sentence boundary
-            for i in range(position-1, -1, -1):
-                if text[i] in sentence_endings:
-                    # Check if it's not part of an abbreviation
-                    is_abbreviation = False
-                    for abbr in abbreviations:
-                        if i >= len(abbr)-1 and text[i-len(abbr)+1:i+1] == abbr:
-                            is_abbreviation = True
-                            break
-                    if not is_abbreviation:
-                        # Include the sentence ending character
-                        return i + 1
-                elif i == 0:
-                    return 0
-            return 0
+        """Find the nearest sentence boundary (see ``chunker.find_sentence_boundary``)."""
+        return find_sentence_boundary(text, position, direction)
     
     def _extract_text_with_ocr(self, file_path: str) -> str:
         """Extract text from PDF using OCR with language support."""
         try:
-            # Convert PDF to images
-            images = convert_from_path(file_path)
-            
-            # Extract text from each image
+            # Extract text from each page
             text = ""
-            for i, image in enumerate(images):
-                # Convert PIL image to bytes
-                img_byte_arr = io.BytesIO()
-                image.save(img_byte_arr, format='PNG')
-                img_byte_arr = img_byte_arr.getvalue()
-                
-                # Convert bytes to PIL Image
-                img = Image.open(io.BytesIO(img_byte_arr))
-                
-                # Extract text using pytesseract with language support
-                page_text = pytesseract.image_to_string(img, lang=self.language)
+            for _, page_text in ocr_pages(file_path, self.language):
                 text += f"\n{page_text}"
             
             return text.strip()
@@ -380,7 +337,13 @@ class PDFProcessor:
         except Exception as e:
             raise ValueError(f"Error performing OCR on PDF: {str(e)}")
     
-    def process_pdf(self, file_path: str, metadata: Optional[Dict] = None, return_chunks: bool = False) -> Union[RAGDocument, List[RAGDocument]]:
+    def process_pdf(
+        self,
+        file_path: str,
+        metadata: Optional[Dict] = None,
+        return_chunks: bool = False,
+        extraction: Optional[Tuple[Optional[ExtractionCache], Optional[str], Dict[str, Any]]] = None
+    ) -> Union[RAGDocument, List[RAGDocument]]:
         """
         Process a PDF file and return either a single document or list of chunks.
         
@@ -388,55 +351,81 @@ class PDFProcessor:
             file_path: Path to the PDF file
             metadata: Optional metadata to attach to the document
             return_chunks: Whether to return chunks instead of a single document
+            extraction: Result of ``load_extraction`` when the PDF was already extracted
             
         Returns:
             Either a RAGDocument or list of RAGDocument objects
         """
-        # Extract text from PDF
-        raw_text = self.extract_text_from_pdf(file_path)
+        # Extract text from PDF (or reuse the extraction of an unchanged file)
+        cache, key, entry = extraction or self.load_extraction(file_path)
         
-        # Clean the text
-        cleaned_text = self.clean_text(raw_text)
+        # Clean the text page by page, so chunks keep their page numbers
+        pages = self._clean_pages(entry["pages"])
+        cleaned_text = " ".join(text for _, text in pages)
         
         # Create document metadata
         doc_metadata = {
             "source": file_path,
             "language": "de",
-            "char_count": len(cleaned_text),
-            "token_count": len(cleaned_text.split())
+            "char_count": len(cleaned_text)
         }
         if metadata:
             doc_metadata.update(metadata)
         
         # If return_chunks is True, create chunks
         if return_chunks:
-            chunks = self.create_chunks(cleaned_text)
-            return chunks
-        
-        # Otherwise return a single document
+            chunking = f"sentences:{MODEL_CONFIG['embedding_model']}:{self.chunker.chunk_tokens}:{self.chunker.overlap_tokens}"
+            chunks = entry["chunks"].get(chunking)
+            if chunks is None:
+                # Offsets refer to cleaned_text, the pages joined by a space
+                chunks = [chunk._asdict() for chunk in self.chunker.chunk(pages, separator=" ")]
+                entry["chunks"][chunking] = chunks
+                if cache is not None and entry["pages"]:
+                    cache.put(key, entry)
+            return [
+                RAGDocument(text=chunk["text"], metadata={
+                    **doc_metadata,
+                    **TextChunk(**chunk).metadata(),
+                    "char_count": len(chunk["text"]),
+                    "chunk_index": i,
+                    "total_chunks": len(chunks)
+                })
+                for i, chunk in enumerate(chunks)
+            ]
+        
+        # Otherwise return a single document, counting tokens a page at a time
+        doc_metadata.setdefault("token_count", sum(self.chunker.count_tokens([text])[0] for _, text in pages))
         return RAGDocument(text=cleaned_text, metadata=doc_metadata)
-
-    def create_chunks(self, text: str, chunk_size: int = 512, overlap: int = 50) -> List[str]:
-        """Create overlapping chunks of text with token-based sizing."""
-        # Tokenize the text
-        tokens = self.tokenizer.encode(text, add_special_tokens=False)
+    
+    def _clean_pages(self, pages: List[Tuple[int, str]]) -> List[Tuple[int, str]]:
+        """Clean each page with the document rules (``text_cleaning.TEXT_RULES``).
         
-        chunks = []
-        start = 0
+        A word hyphenated at the end of a page is moved to the next page,
+        where the hyphenation rule joins it with its second half.
         
-        while start < len(tokens):
-            # Get chunk of tokens
-            end = start + chunk_size
-            chunk_tokens = tokens[start:end]
-            
-            # Convert back to text
-            chunk_text = self.tokenizer.decode(chunk_tokens)
-            chunks.append(chunk_text)
-            
-            # Move start position, accounting for overlap
-            start = end - overlap
+        Args:
+            pages: (page number, page text) pairs
             
-        return chunks
+        Returns:
+            (page number, cleaned text) pairs of the pages left with text
+        """
+        cleaned = []
+        carry = ""
+        for i, (page_number, text) in enumerate(pages):
+            text = carry + text
+            carry = ""
+            match = _PAGE_END_HYPHEN.search(text) if text.rstrip().endswith("-") and i + 1 < len(pages) else None
+            if match:
+                carry = match.group().rstrip() + "\n"
+                text = text[:match.start()]
+            text = text_cleaner.clean(text)
+            if text:
+                cleaned.append((page_number, text))
+        return cleaned
+
+    def create_chunks(self, text: str, chunk_size: int = 512, overlap: int = 50) -> List[str]:
+        """Create overlapping, sentence-aligned chunks of text with token-based sizing."""
+        return [chunk.text for chunk in Chunker(chunk_size, overlap).chunk_text(text)]
     
     def _split_into_sections(self, text: str) -> List[str]:
         """Split text into logical sections based on headers or major breaks."""
@@ -507,28 +496,13 @@ class PDFProcessor:
     def _try_ocr_extraction(self, pdf_path: str) -> Optional[str]:
         """Extract text using OCR with Tesseract."""
         try:
-            # Convert PDF to images
-            print("Converting PDF to images for OCR...")
-            images = convert_from_path(pdf_path)
-            
             # Process each page
+            print("Running OCR on PDF pages...")
             text = ""
-            for i, image in enumerate(images):
-                print(f"Processing page {i + 1} with OCR...")
-                
-                # Convert PIL image to bytes
-                img_byte_arr = io.BytesIO()
-                image.save(img_byte_arr, format='PNG')
-                img_byte_arr = img_byte_arr.getvalue()
-                
-                # Convert bytes to PIL Image
-                img = Image.open(io.BytesIO(img_byte_arr))
-                
-                # Extract text using pytesseract
-                page_text = pytesseract.image_to_string(img, lang='eng')
+            for page_number, page_text in ocr_pages(pdf_path, 'eng'):
                 if page_text.strip():
                     text += page_text + "\n\n"
-                    print(f"Extracted {len(page_text)} characters from page {i + 1} using OCR")
+                    print(f"Extracted {len(page_text)} characters from page {page_number} using OCR")
                 
             return text if text.strip() else None
             
@@ -0,0 +1,335 @@
+"""
+Staged concurrent processing with bounded queues between the stages.
+
+Every stage has its own worker threads and takes its input from a bounded
+queue filled by the stage before it. A slow stage therefore throttles the
+ones upstream instead of letting work pile up, and different stages run
+at the same time: while one file is embedded, the next is being extracted
+and the previous one written. Stages are meant for work that releases the
+GIL (extraction in worker processes, OCR subprocesses, model inference,
+database I/O).
+
+``Checkpoint`` records finished items in an append-only file, so an
+interrupted run can resume where it stopped.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+_DONE = object()
+_ABORTED = object()
+
+
+class Stage:
+    """A processing step run by a pool of worker threads.
+
+    ``function`` takes an item and returns the item for the next stage, or
+    None to drop it. An exception drops the item and is counted and printed;
+    the other items carry on.
+    """
+
+    def __init__(self, name: str, function: Callable[[Any], Any], workers: int = 1):
+        """Initialize the stage.
+
+        Args:
+            name: Stage name used in statistics and log messages
+            function: Work done per item
+            workers: Number of worker threads
+        """
+        if workers < 1:
+            raise ValueError(f"Stage {name} needs at least one worker, got {workers}")
+        self.name = name
+        self.function = function
+        self.workers = workers
+        self.inbox: Optional[queue.Queue] = None
+        self._lock = threading.Lock()
+        self._running = 0
+        self.reset()
+
+    def reset(self):
+        """Zero the statistics."""
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.max_queued = 0
+
+    def stats(self, elapsed: float) -> Dict[str, Any]:
+        """Return throughput, utilization and queue depth.
+
+        Args:
+            elapsed: Seconds the pipeline has been running
+        """
+        with self._lock:
+            processed, busy = self.processed, self.busy_seconds
+            stats = {
+                "workers": self.workers,
+                "processed": processed,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "queued": self.inbox.qsize() if self.inbox is not None else 0,
+                "max_queued": self.max_queued,
+                "busy_seconds": busy
+            }
+        stats["items_per_second"] = processed / elapsed if elapsed > 0 else 0.0
+        stats["utilization"] = busy / (self.workers * elapsed) if elapsed > 0 else 0.0
+        return stats
+
+
+class Pipeline:
+    """Run items through a sequence of stages concurrently.
+
+    Example:
+        >>> pipeline = Pipeline([Stage("extract", extract, 2), Stage("write", write)])
+        >>> for item in pipeline.run(files):
+        ...     print(item, pipeline.stats()["write"]["items_per_second"])
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = 4):
+        """Initialize the pipeline.
+
+        Args:
+            stages: Stages in processing order
+            queue_size: Capacity of the queue in front of each stage and of
+                the output queue
+        """
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        if queue_size < 1:
+            raise ValueError(f"queue_size must be at least 1, got {queue_size}")
+        self.stages = stages
+        self.queue_size = queue_size
+        self._cancelled = threading.Event()
+        self._aborted = threading.Event()
+        self._feed_error: Optional[BaseException] = None
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+        self.fed = 0
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether ``cancel`` was called."""
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Stop feeding new items; items already in the pipeline are finished.
+
+        Safe to call from a signal handler or another thread.
+        """
+        self._cancelled.set()
+
+    def run(self, items: Iterable[Any]) -> Iterator[Any]:
+        """Process items and yield them as they leave the last stage.
+
+        Items finish in no particular order. ``items`` is consumed in a
+        background thread, at most ``queue_size`` items ahead of the first
+        stage. Closing the iterator early abandons the items in flight.
+
+        Args:
+            items: Input items
+
+        Yields:
+            Items returned by the last stage
+        """
+        self._cancelled.clear()
+        self._aborted.clear()
+        self._feed_error = None
+        self._started, self._finished = time.perf_counter(), None
+        self.fed = 0
+        queues = [queue.Queue(self.queue_size) for _ in range(len(self.stages) + 1)]
+        threads = [threading.Thread(target=self._feed, args=(items, queues[0]), name="pipeline-feed", daemon=True)]
+        for stage, inbox, outbox in zip(self.stages, queues, queues[1:]):
+            stage.reset()
+            stage.inbox = inbox
+            stage._running = stage.workers
+            threads.extend(
+                threading.Thread(target=self._work, args=(stage, inbox, outbox), name=f"pipeline-{stage.name}-{i}", daemon=True)
+                for i in range(stage.workers)
+            )
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = queues[-1].get()
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            self._aborted.set()
+            for thread in threads:
+                thread.join()
+            self._finished = time.perf_counter()
+
+        if self._feed_error is not None:
+            raise self._feed_error
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage statistics of the current or last run."""
+        elapsed = self.elapsed
+        return {stage.name: stage.stats(elapsed) for stage in self.stages}
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the current or last run started."""
+        if self._started is None:
+            return 0.0
+        return (self._finished or time.perf_counter()) - self._started
+
+    def _put(self, outbox: queue.Queue, item: Any) -> bool:
+        """Put an item, giving up if the run is aborted."""
+        while not self._aborted.is_set():
+            try:
+                outbox.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, inbox: queue.Queue) -> Any:
+        """Take an item, or ``_ABORTED`` if the run is aborted."""
+        while not self._aborted.is_set():
+            try:
+                return inbox.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _ABORTED
+
+    def _feed(self, items: Iterable[Any], outbox: queue.Queue):
+        first = self.stages[0]
+        try:
+            for item in items:
+                if self._cancelled.is_set() or not self._put(outbox, item):
+                    break
+                self.fed += 1
+                with first._lock:
+                    first.max_queued = max(first.max_queued, outbox.qsize())
+        except Exception as e:
+            self._feed_error = e
+        self._put(outbox, _DONE)
+
+    def _work(self, stage: Stage, inbox: queue.Queue, outbox: queue.Queue):
+        index = self.stages.index(stage)
+        following = self.stages[index + 1] if index + 1 < len(self.stages) else None
+        while True:
+            item = self._get(inbox)
+            if item is _ABORTED:
+                return
+            if item is _DONE:
+                # Let the other workers of this stage see the end as well
+                self._put(inbox, _DONE)
+                break
+
+            start = time.perf_counter()
+            try:
+                result = stage.function(item)
+            except Exception as e:
+                print(f"Warning: {stage.name} failed for {item}: {str(e)}")
+                result, failed = None, True
+            else:
+                failed = False
+            with stage._lock:
+                stage.busy_seconds += time.perf_counter() - start
+                stage.processed += 1
+                if failed:
+                    stage.errors += 1
+                elif result is None:
+                    stage.dropped += 1
+
+            if result is not None:
+                if not self._put(outbox, result):
+                    return
+                if following is not None:
+                    with following._lock:
+                        following.max_queued = max(following.max_queued, outbox.qsize())
+
+        with stage._lock:
+            stage._running -= 1
+            last = stage._running == 0
+        if last:
+            # Take back the end marker passed on to the other workers
+            try:
+                inbox.get_nowait()
+            except queue.Empty:
+                pass
+            self._put(outbox, _DONE)
+
+
+class Checkpoint:
+    """Append-only record of finished files, for resuming an interrupted run.
+
+    A file counts as finished while its path, size and modification time
+    are unchanged, so edited files are processed again.
+
+    Example:
+        >>> checkpoint = Checkpoint("ingest.checkpoint")
+        >>> todo = [f for f in files if not checkpoint.done(f)]
+        >>> ...
+        >>> checkpoint.mark(f, documents=12)
+    """
+
+    def __init__(self, path: str):
+        """Load the checkpoint file, if there is one.
+
+        Args:
+            path: Checkpoint file (JSON lines)
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._done: Set[str] = set()
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self._done.add(json.loads(line)["key"])
+                    except (ValueError, KeyError):
+                        # A line cut short by a crash
+                        continue
+
+    @staticmethod
+    def key(file_path: str) -> str:
+        """Identity of a file's current version."""
+        stat = os.stat(file_path)
+        return f"{os.path.abspath(file_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    def __len__(self) -> int:
+        return len(self._done)
+
+    def done(self, file_path: str, key: Optional[str] = None) -> bool:
+        """Whether the file was finished in this version.
+
+        Args:
+            file_path: File to check
+            key: Precomputed ``key(file_path)``
+        """
+        return (key or self.key(file_path)) in self._done
+
+    def mark(self, file_path: str, key: Optional[str] = None, **info: Any):
+        """Record a finished file and flush the record to disk.
+
+        Args:
+            file_path: Finished file
+            key: ``key(file_path)`` taken before processing, so a file
+                changed meanwhile is processed again next time
+            **info: Extra JSON-serializable fields to store
+        """
+        key = key or self.key(file_path)
+        line = json.dumps({"key": key, "file": str(file_path), **info}, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._done.add(key)
+
+    def clear(self):
+        """Forget every finished file."""
+        with self._lock:
+            self._done.clear()
+            if self.path.exists():
+                self.path.unlink()
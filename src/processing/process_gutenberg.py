@@ -12,12 +12,18 @@ import json
 import tiktoken
 from pathlib import Path
 from tqdm import tqdm
+from src.processing.extraction_cache import cached_extraction
+from src.processing.chunker import Chunker, TextChunk
+
+# Part of the extraction cache key: bump when text extraction or chunking changes
+EXTRACTOR_VERSION = "2"
 
 class GutenbergProcessor:
     def __init__(self, db_params: Dict[str, str]):
         """Initialize Gutenberg processor with database connection parameters."""
         self.db_params = db_params
         self.encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
+        self.chunker = Chunker()
         
     def process_text_file(self, file_path: str) -> str:
         """Process a plain text file from Project Gutenberg.
@@ -207,8 +213,13 @@ class GutenbergProcessor:
         """
         print(f"\nProcessing book: {file_path}")
         
+        # Reuse text and chunks extracted from an identical file
+        cache, cache_key, cached = cached_extraction(file_path, "gutenberg", EXTRACTOR_VERSION)
+        
         # Determine file type and process accordingly
-        if file_path.endswith('.txt'):
+        if cached is not None:
+            text = cached['text']
+        elif file_path.endswith('.txt'):
             text = self.process_text_file(file_path)
         elif file_path.endswith('.html'):
             text = self.process_html_file(file_path)
@@ -266,30 +277,16 @@ class GutenbergProcessor:
             if 'conn' in locals():
                 conn.close()
                 
-        # Create text chunks
+        # Create text chunks: paragraphs streamed into sentence-aligned token windows
         print("\nCreating text chunks...")
-        chunks = []
-        current_chunk = []
-        current_length = 0
-        chunk_size = 1000  # characters per chunk
-        chunk_overlap = 200  # characters overlap between chunks
-        
-        for paragraph in text.split('\n\n'):
-            paragraph = paragraph.strip()
-            if not paragraph:
-                continue
-                
-            if current_length + len(paragraph) > chunk_size:
-                if current_chunk:
-                    chunks.append('\n\n'.join(current_chunk))
-                current_chunk = [paragraph]
-                current_length = len(paragraph)
-            else:
-                current_chunk.append(paragraph)
-                current_length += len(paragraph)
-                
-        if current_chunk:
-            chunks.append('\n\n'.join(current_chunk))
+        if cached is not None:
+            chunks = [TextChunk(**chunk) for chunk in cached['chunks']]
+        else:
+            paragraphs = (paragraph.strip() for paragraph in text.split('\n\n'))
+            chunks = list(self.chunker.chunk(paragraphs, break_segments=True))
+            
+        if cache is not None and cached is None:
+            cache.put(cache_key, {'source': file_path, 'text': text, 'chunks': [chunk._asdict() for chunk in chunks]})
             
         print(f"Created {len(chunks)} chunks")
         
@@ -298,14 +295,14 @@ class GutenbergProcessor:
         rag_documents = []
         for i, chunk in enumerate(chunks):
             doc = RAGDocument(
-                text=chunk,
+                text=chunk.text,
                 metadata={
                     **metadata,
+                    **chunk.metadata(),
                     'chunk_index': i,
                     'total_chunks': len(chunks),
                     'source': file_path,
-                    'character_count': len(chunk),
-                    'token_count': len(self.encoding.encode(chunk))
+                    'character_count': len(chunk.text)
                 }
             )
             rag_documents.append(doc)
@@ -3,15 +3,17 @@ from typing import Dict, Optional
 class RAGDocument:
     """A document for RAG with text content and metadata."""
     
-    def __init__(self, text: str, metadata: Optional[Dict] = None):
+    def __init__(self, text: str, metadata: Optional[Dict] = None, doc_id: Optional[int] = None):
         """Initialize a RAG document.
         
         Args:
             text: The text content of the document
             metadata: Optional metadata dictionary
+            doc_id: Row id, set on documents read from the database
         """
         self.text = text
         self.metadata = metadata or {}
+        self.doc_id = doc_id
         
     def to_dict(self) -> Dict:
         """Convert the document to a dictionary.
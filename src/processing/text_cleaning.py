@@ -0,0 +1,356 @@
+"""
+Precompiled text cleaning engine.
+
+A ``TextCleaner`` runs a fixed sequence of passes over a text. Every pass is
+one compiled regular expression: rules that only delete text and do not
+depend on each other's output are fused into a single alternation, so a page
+is scanned once per pass instead of once per rule. Patterns are compiled when
+the cleaner is built, not on every call.
+
+Rules that can only match if a literal is present (the lazy ``.*?`` header
+spans, which otherwise scan to the end of the page from every start marker)
+declare it in ``requires`` and are left out of the pass for texts without it.
+
+Usage:
+    python -m src.processing.text_cleaning benchmark
+"""
+
+import argparse
+import re
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Pattern, Sequence, Tuple, Union
+
+Replacement = Union[str, Callable[["re.Match"], str]]
+
+
+class Rule(NamedTuple):
+    """A single cleaning rule.
+
+    Flags are given inline and scoped (``(?m:...)``, ``(?s:...)``) so that
+    rules with different flags can share one pass.
+    """
+    pattern: str
+    replacement: Replacement = ""
+    requires: Optional[str] = None
+
+
+def literal_rule(table: Dict[str, str]) -> Rule:
+    """Build a rule replacing several literals in one pass.
+
+    Equivalent to chained ``str.replace`` calls as long as no two literals
+    overlap and no replacement creates another literal.
+
+    Args:
+        table: Mapping of literal to replacement
+
+    Returns:
+        Rule matching any of the literals
+    """
+    pattern = "|".join(re.escape(literal) for literal in sorted(table, key=len, reverse=True))
+    return Rule(pattern, lambda match: table[match.group()])
+
+
+def _spacing(match: "re.Match") -> str:
+    """Replacement for the punctuation spacing rules (see ``spacing_rule``)."""
+    return " " if match.group("after_punctuation") is not None else ""
+
+
+def spacing_rule(brackets: bool = False) -> Rule:
+    """Build the punctuation spacing rule.
+
+    Whitespace before ``.,;:!?`` is removed and whitespace after them becomes
+    a single space. With ``brackets``, whitespace on either side of
+    ``()[]{}`` is removed as well.
+
+    Args:
+        brackets: Also tighten whitespace around brackets
+
+    Returns:
+        Rule applying all spacing fixes in one pass
+    """
+    punctuation = r"[.,;:!?]"
+    if not brackets:
+        return Rule(rf"\s+(?={punctuation})|(?<={punctuation})(?P<after_punctuation>\s+)", _spacing)
+    bracket = r"[()\[\]{}]"
+    return Rule(
+        rf"\s+(?={punctuation}|{bracket})|(?<={bracket})\s+|(?<={punctuation})(?P<after_punctuation>\s+)",
+        _spacing
+    )
+
+
+# Header lines removed from extracted pages, matched as whole lines
+SECTION_MARKERS = [
+    r"[IVX]+\.\s*",
+    r"§\s*\d+\s*",
+    r"Kapitel\s+\d+\s*",
+    r"Abschnitt\s+\d+\s*",
+    r"Unterabschnitt\s+\d+\s*",
+    r"Anmerkungen\s*",
+    r"Literaturverzeichnis\s*",
+    r"Register\s*",
+    r"Inhaltsverzeichnis\s*",
+    r"Vorwort\s*",
+    r"Einleitung\s*",
+    r"Widmung\s*",
+    r"Danksagung\s*",
+    r"Impressum\s*",
+    r"Copyright\s*",
+    r"Titelseite:.*",
+    r"Titelei:.*",
+    r"Dem Andenken.*",
+    r"Inhalt:.*",
+    r"Schluß.*",
+    r"Anhang.*",
+    r"Bearbeitet von.*",
+    r"Tübingen \d{4}.*",
+    r"\[J\.C\.B Mohr.*",
+    r"III\. Abteilung.*",
+    r"(?:Zweiter|Dritter|Erster)\s+Teil\s*",
+    r"(?:Erstes|Zweites|Drittes|Viertes|Fünftes|Sechstes|Siebentes|Achtes|Neuntes|Zehntes)\s+Kapitel\s*",
+]
+
+SECTION_RULE = Rule(rf"(?m:^(?:{'|'.join(SECTION_MARKERS)})$)")
+
+HYPHENATION_RULES = [
+    # Lower- and uppercase are separate passes: a match consumes the first
+    # letter of the next line, which the other case may still need
+    [Rule(r"([a-zäöüß])-\s*\n\s*([a-zäöüß])", r"\1\2")],
+    [Rule(r"([A-ZÄÖÜ])-\s*\n\s*([a-zäöüß])", r"\1\2")],
+]
+
+# Passes for a single extracted PDF page (Weber CD-ROM and Google Books scans)
+PAGE_RULES: List[List[Rule]] = [
+    # Page markers and software headers and footers. "- Seite: N -" needs no
+    # rule of its own: "Seite: N" is removed first.
+    [
+        Rule(r"Seite:\s*\d+"),
+        Rule(r"- Kap\.-Nr\. \d+/\d+ -"),
+        Rule(r"- Werke auf CD-ROM -"),
+        Rule(r"(?s:Max Weber im Kontext.*?Alle Rechte vorbehalten\.)", requires="Alle Rechte vorbehalten."),
+        Rule(r"(?s:Viewlit V\.2\.6.*?InfoSoftWare 1999)", requires="InfoSoftWare 1999"),
+    ],
+    # Standalone numbers (page numbers) and empty lines
+    [Rule(r"(?m:^\s*(?:\d+\s*)?$\n?)")],
+    *HYPHENATION_RULES,
+    [spacing_rule()],
+    [SECTION_RULE],
+]
+
+# Common OCR errors and ligatures
+OCR_REPLACEMENTS = {
+    'ii': 'ü',
+    'ae': 'ä',
+    'oe': 'ö',
+    'ss': 'ß',
+    'ﬁ': 'fi',
+    'ﬂ': 'fl',
+    'ﬀ': 'ff',
+    'ﬃ': 'ffi',
+    'ﬄ': 'ffl',
+}
+
+# Passes for a whole extracted document (PDFProcessor.clean_text)
+TEXT_RULES: List[List[Rule]] = [
+    # Software headers and footers (removing them can expose a page marker
+    # line, so they run before the page marker passes)
+    [
+        Rule(r"Viewlit V\.2\.6.*?InfoSoftWare 1999", requires="InfoSoftWare 1999"),
+        Rule(r"Max Weber im Kontext.*?Alle Rechte vorbehalten\.", requires="Alle Rechte vorbehalten."),
+    ],
+    # Page markers and numbers. "^Seite: N" goes first: its trailing \s* may
+    # take part of a following "- Seite: N -" line.
+    [Rule(r"(?m:^Seite:\s*\d+\s*$)")],
+    [
+        Rule(r"(?m:^-\s*Seite:\s*\d+\s*-\s*$)"),
+        Rule(r"(?m:^-\s*Kap\.-Nr\.\s*\d+/\d+\s*-\s*$)"),
+        Rule(r"(?m:^\d+\s*$)"),
+        Rule(r"\[S\.\s*\d+\]"),
+    ],
+    [literal_rule(OCR_REPLACEMENTS)],
+    [spacing_rule(brackets=True)],
+    *HYPHENATION_RULES,
+    [SECTION_RULE],
+]
+
+
+class _Pass:
+    """One compiled pass: a single rule or a fused alternation of deletions."""
+
+    def __init__(self, rules: Sequence[Rule]):
+        if not rules:
+            raise ValueError("A cleaning pass needs at least one rule")
+        if len(rules) > 1 and any(rule.replacement != "" for rule in rules):
+            raise ValueError("Only deletion rules (replacement '') can share a pass")
+        self.rules = list(rules)
+        self.replacement = rules[0].replacement
+        self.guarded = [i for i, rule in enumerate(rules) if rule.requires]
+        self._compiled: Dict[Tuple[int, ...], Optional[Pattern]] = {}
+        # Compile the common variants up front
+        self._pattern(tuple(range(len(rules))))
+        if self.guarded:
+            self._pattern(tuple(i for i in range(len(rules)) if i not in self.guarded))
+
+    def _pattern(self, active: Tuple[int, ...]) -> Optional[Pattern]:
+        """Compiled pattern for the given subset of rules (None if empty)."""
+        if active not in self._compiled:
+            if not active:
+                self._compiled[active] = None
+            elif len(active) == 1:
+                self._compiled[active] = re.compile(self.rules[active[0]].pattern)
+            else:
+                self._compiled[active] = re.compile("|".join(f"(?:{self.rules[i].pattern})" for i in active))
+        return self._compiled[active]
+
+    def apply(self, text: str) -> str:
+        """Run the pass over ``text``."""
+        if self.guarded:
+            active = tuple(
+                i for i, rule in enumerate(self.rules)
+                if not rule.requires or rule.requires in text
+            )
+        else:
+            active = tuple(range(len(self.rules)))
+        pattern = self._pattern(active)
+        if pattern is None:
+            return text
+        return pattern.sub(self.replacement, text)
+
+
+class TextCleaner:
+    """Applies a rule set, compiled once, to many texts.
+
+    Example:
+        >>> cleaner = TextCleaner(PAGE_RULES)
+        >>> cleaner.clean("Seite: 12\\nDie Bürokra-\\ntie ,  als Herrschaft")
+        'Die Bürokratie, als Herrschaft'
+    """
+
+    def __init__(self, passes: Sequence[Sequence[Rule]], collapse_whitespace: bool = True):
+        """Compile the rule set.
+
+        Args:
+            passes: Passes in order, each a list of rules run as one regex.
+                Several rules in one pass must all be deletions and must not
+                depend on each other's output.
+            collapse_whitespace: Finish by collapsing every whitespace run to
+                one space and stripping the ends (the same as
+                ``re.sub(r"\\s+", " ", text).strip()``, without a regex pass)
+        """
+        self.passes = [_Pass(rules) for rules in passes]
+        self.collapse_whitespace = collapse_whitespace
+
+    def clean(self, text: str) -> str:
+        """Clean a text.
+
+        Args:
+            text: Raw text
+
+        Returns:
+            Cleaned text
+        """
+        for cleaning_pass in self.passes:
+            text = cleaning_pass.apply(text)
+        if self.collapse_whitespace:
+            return " ".join(text.split())
+        return text
+
+    __call__ = clean
+
+
+page_cleaner = TextCleaner(PAGE_RULES)
+text_cleaner = TextCleaner(TEXT_RULES)
+
+
+SAMPLE_PAGES = {
+    "de": (
+        "Max Weber im Kontext. Gesammelte Werke. InfoSoftWare 1999. Alle Rechte vorbehalten.\n"
+        "- Werke auf CD-ROM -\n"
+        "Seite: 412\n"
+        "Kapitel 3\n"
+        "\n"
+        "Die Bürokratisierung ist das spezifische Mittel, »Gemeinschafts-\n"
+        "handeln« in rational geordnetes »Gesellschaftshandeln« zu über-\n"
+        "führen . Als Instrument der »Vergesellschaftung« der Herrschafts-\n"
+        "beziehungen war und ist sie daher ein Machtmittel ersten Ranges\n"
+        "für den, der über den bürokratischen Apparat verfügt ;denn unter\n"
+        "sonst gleichen Chancen ist planvoll geordnetes und geleitetes\n"
+        "»Gesellschaftshandeln« jedem widerstrebenden »Massen«- oder\n"
+        "»Gemeinschaftshandeln« überlegen .\n"
+        "413\n"
+        "- Kap.-Nr. 5/12 -\n"
+    ),
+    "en": (
+        "CHAPTER VIII\n"
+        "\n"
+        "Bureaucracy develops the more perfectly , the more it is \"dehuman-\n"
+        "ized,\" the more completely it succeeds in eliminating from official\n"
+        "business love, hatred, and all purely personal , irrational and emo-\n"
+        "tional elements which escape calculation . This is the specific nature\n"
+        "of bureaucracy and it is appraised as its special virtue .\n"
+        "   \n"
+        "216\n"
+        "The more complicated and specialized modern culture becomes , the\n"
+        "more its external supporting apparatus demands the personally de-\n"
+        "tached and strictly \"objective\" expert .\n"
+    ),
+}
+
+
+def benchmark(
+    cleaner: TextCleaner = page_cleaner,
+    size_mb: float = 4.0,
+    language: Optional[str] = None
+) -> List[Dict[str, float]]:
+    """Measure cleaning throughput in MB/s over the sample pages.
+
+    Args:
+        cleaner: Cleaner to measure
+        size_mb: Approximate amount of text (UTF-8) per language
+        language: Only measure this sample language
+
+    Returns:
+        One result dictionary per sample language
+    """
+    results = []
+    for name, page in SAMPLE_PAGES.items():
+        if language and name != language:
+            continue
+        page_bytes = len(page.encode("utf-8"))
+        pages = max(1, int(size_mb * 2**20 / page_bytes))
+        start = time.perf_counter()
+        for _ in range(pages):
+            cleaner.clean(page)
+        seconds = time.perf_counter() - start
+        results.append({
+            "language": name,
+            "pages": pages,
+            "mb": pages * page_bytes / 2**20,
+            "seconds": seconds,
+            "mb_per_second": pages * page_bytes / 2**20 / seconds
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the text cleaning engine")
+    parser.add_argument("command", choices=["benchmark"], help="Action to run")
+    parser.add_argument("--rules", choices=["page", "text"], default="page", help="Rule set to measure")
+    parser.add_argument("--size-mb", type=float, default=4.0, help="Text per sample language")
+    parser.add_argument("--language", choices=sorted(SAMPLE_PAGES), help="Only this sample language")
+
+    args = parser.parse_args()
+
+    try:
+        cleaner = page_cleaner if args.rules == "page" else text_cleaner
+        print(f"{'language':<10}{'pages':>8}{'MB':>8}{'seconds':>9}{'MB/s':>8}")
+        for row in benchmark(cleaner, args.size_mb, args.language):
+            print(f"{row['language']:<10}{row['pages']:>8}{row['mb']:>8.1f}{row['seconds']:>9.2f}{row['mb_per_second']:>8.1f}")
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
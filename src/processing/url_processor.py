@@ -54,7 +54,7 @@ class URLProcessor:
         else:
             content = self._process_static_page(url)
         
-        return RAGDocument(content=content, metadata=url_metadata)
+        return RAGDocument(text=content, metadata=url_metadata)
     
     def _process_google_doc(self, url: str) -> str:
         """Process a Google Doc URL."""
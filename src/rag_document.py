@@ -1,11 +1,12 @@
 from dataclasses import dataclass
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 @dataclass
 class RAGDocument:
     """A document with text content and metadata."""
     text: str
     metadata: Dict[str, Any]
+    doc_id: Optional[int] = None  # Row id, set on documents read from the database
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert document to dictionary for serialization."""
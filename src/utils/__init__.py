@@ -1,3 +1,4 @@
 from .logging import setup_logging
+from .model_registry import get_model_registry, get_embedding_model, get_tokenizer, preload_models
 
-__all__ = ['setup_logging'] 
\ No newline at end of file
+__all__ = ['setup_logging', 'get_model_registry', 'get_embedding_model', 'get_tokenizer', 'preload_models']
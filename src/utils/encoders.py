@@ -0,0 +1,330 @@
+"""
+Embedding encoder backends.
+
+``MODEL_CONFIG['backend']`` selects how the embedding model runs:
+
+    torch       SentenceTransformer as published (default)
+    torch-int8  SentenceTransformer with dynamically int8-quantized Linear layers
+    onnx        ONNX Runtime on an export of the full SentenceTransformer
+                (transformer + pooling + normalization)
+    onnx-int8   the same export with int8-quantized weights
+
+All backends produce embeddings in the same space (cosine >= 0.99 against
+the torch model), so the stored corpus does not need to be re-embedded.
+
+Usage:
+    python -m src.utils.encoders export --backend onnx-int8
+    python -m src.utils.encoders benchmark
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from ..config.config import CACHE_CONFIG, MODEL_CONFIG
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+
+
+def onnx_dir(name: str) -> Path:
+    """Directory holding the ONNX export of a model."""
+    return Path(CACHE_CONFIG['cache_dir']) / "onnx" / re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+
+
+def quantize_torch(model):
+    """Quantize the Linear layers of a SentenceTransformer to int8 (in place on CPU).
+
+    Args:
+        model: SentenceTransformer loaded on the CPU
+
+    Returns:
+        The quantized model
+    """
+    import torch
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def export_onnx(name: str, quantize: bool = False, opset: int = 14) -> Path:
+    """Export a SentenceTransformer (including pooling and normalization) to ONNX.
+
+    Exports are written once to ``<cache_dir>/onnx/<name>/`` and reused.
+
+    Args:
+        name: SentenceTransformer model name
+        quantize: Also write an int8-quantized copy and return its path
+        opset: ONNX opset version
+
+    Returns:
+        Path of the (quantized) ONNX model
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    target_dir = onnx_dir(name)
+    model_path = target_dir / "model.onnx"
+    quantized_path = target_dir / "model-int8.onnx"
+
+    if not model_path.exists():
+        target_dir.mkdir(parents=True, exist_ok=True)
+        model = SentenceTransformer(name, device="cpu")
+        model.eval()
+        features = model.tokenize(["An example sentence to trace the graph."])
+        input_names = [key for key in ("input_ids", "attention_mask", "token_type_ids") if key in features]
+
+        class SentenceEmbedding(torch.nn.Module):
+            """Wraps the SentenceTransformer pipeline so the export includes pooling."""
+
+            def __init__(self, sentence_model):
+                super().__init__()
+                self.sentence_model = sentence_model
+
+            def forward(self, *inputs):
+                return self.sentence_model(dict(zip(input_names, inputs)))["sentence_embedding"]
+
+        tmp_path = model_path.with_name("model.onnx.tmp")
+        with torch.no_grad():
+            torch.onnx.export(
+                SentenceEmbedding(model),
+                tuple(features[key] for key in input_names),
+                str(tmp_path),
+                input_names=input_names,
+                output_names=["sentence_embedding"],
+                dynamic_axes={
+                    **{key: {0: "batch", 1: "sequence"} for key in input_names},
+                    "sentence_embedding": {0: "batch"}
+                },
+                opset_version=opset
+            )
+        os.replace(tmp_path, model_path)
+        with open(target_dir / "encoder.json", "w") as f:
+            json.dump({
+                "name": name,
+                "input_names": input_names,
+                "max_seq_length": model.get_max_seq_length(),
+                "dimension": model.get_sentence_embedding_dimension()
+            }, f)
+        model.tokenizer.save_pretrained(str(target_dir))
+        logger.info(f"Exported {name} to {model_path}")
+
+    if quantize and not quantized_path.exists():
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(str(model_path), str(quantized_path), weight_type=QuantType.QInt8)
+        logger.info(f"Quantized {model_path} to {quantized_path}")
+
+    return quantized_path if quantize else model_path
+
+
+class ONNXEncoder:
+    """ONNX Runtime encoder with the ``encode`` interface of SentenceTransformer.
+
+    Only NumPy, the tokenizer and onnxruntime are needed at serving time;
+    torch is not imported.
+
+    Example:
+        >>> encoder = ONNXEncoder(export_onnx("sentence-transformers/all-MiniLM-L6-v2"))
+        >>> encoder.encode(["What is Dasein?"]).shape
+        (1, 384)
+    """
+
+    def __init__(self, model_path: Union[str, Path], num_threads: Optional[int] = None):
+        """Load an exported model.
+
+        Args:
+            model_path: Path of a model written by ``export_onnx``
+            num_threads: Intra-op threads, defaults to onnxruntime's choice
+        """
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        model_path = Path(model_path)
+        with open(model_path.parent / "encoder.json", "r") as f:
+            self.config = json.load(f)
+        self.tokenizer = AutoTokenizer.from_pretrained(str(model_path.parent))
+        self.max_seq_length = self.config["max_seq_length"]
+        self.input_names = self.config["input_names"]
+
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+
+    def get_sentence_embedding_dimension(self) -> int:
+        """Embedding dimension of the model."""
+        return self.config["dimension"]
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        show_progress_bar: bool = False,
+        normalize_embeddings: bool = False,
+        **kwargs: Any
+    ) -> np.ndarray:
+        """Embed one sentence or a list of sentences.
+
+        Args:
+            sentences: Text or list of texts
+            batch_size: Sentences per inference call
+            convert_to_numpy: Accepted for compatibility (always NumPy)
+            show_progress_bar: Accepted for compatibility (ignored)
+            normalize_embeddings: L2-normalize the output
+
+        Returns:
+            Array of shape (dim,) for a single text, else (len(sentences), dim)
+        """
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+
+        # Batch similar lengths together to minimize padding
+        order = np.argsort([-len(sentence) for sentence in sentences], kind="stable")
+        embeddings = np.empty((len(sentences), self.config["dimension"]), dtype=np.float32)
+        for start in range(0, len(sentences), batch_size):
+            batch_index = order[start:start + batch_size]
+            features = self.tokenizer(
+                [sentences[i] for i in batch_index],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np"
+            )
+            inputs = {key: features[key].astype(np.int64) for key in self.input_names}
+            embeddings[batch_index] = self.session.run(None, inputs)[0]
+
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= np.where(norms == 0, 1, norms)
+        return embeddings[0] if single else embeddings
+
+
+def load_encoder(name: Optional[str] = None, backend: Optional[str] = None, device: Optional[str] = None):
+    """Load an embedding model with the configured backend.
+
+    Args:
+        name: Model name, defaults to ``MODEL_CONFIG['embedding_model']``
+        backend: One of BACKENDS, defaults to ``MODEL_CONFIG['backend']``
+        device: Torch device for the 'torch' backend, None picks automatically
+
+    Returns:
+        Object with a SentenceTransformer-compatible ``encode`` method
+    """
+    name = name or MODEL_CONFIG['embedding_model']
+    backend = backend or MODEL_CONFIG['backend']
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown encoder backend '{backend}', expected one of {BACKENDS}")
+
+    if backend.startswith("onnx"):
+        return ONNXEncoder(export_onnx(name, quantize=backend == "onnx-int8"), MODEL_CONFIG['num_threads'])
+
+    from sentence_transformers import SentenceTransformer
+    if backend == "torch-int8":
+        # Dynamic quantization runs on the CPU only
+        return quantize_torch(SentenceTransformer(name, device="cpu"))
+    return SentenceTransformer(name, device=device or MODEL_CONFIG['device'])
+
+
+def benchmark(
+    name: Optional[str] = None,
+    backends: List[str] = list(BACKENDS),
+    queries: int = 200,
+    batch_size: int = 32
+) -> List[Dict[str, Any]]:
+    """Measure single-query latency, batch throughput and parity per backend.
+
+    Args:
+        name: Model name, defaults to ``MODEL_CONFIG['embedding_model']``
+        backends: Backends to compare (the first is the parity reference)
+        queries: Number of single-query encodes to time
+        batch_size: Batch size for the throughput run
+
+    Returns:
+        One result dictionary per backend
+    """
+    from .model_registry import _rss
+
+    texts = [
+        f"What did {author} write about {topic}?"
+        for author in ("Weber", "Heidegger", "Nietzsche", "Arendt", "Simmel")
+        for topic in ("bureaucracy", "being and time", "the will to power", "the public realm", "money", "jazz")
+    ]
+    corpus = [" ".join(texts[i:i + 8]) for i in range(len(texts))] * 8
+
+    results = []
+    reference = None
+    for backend in backends:
+        rss_before = _rss()
+        start = time.perf_counter()
+        encoder = load_encoder(name, backend)
+        load_seconds = time.perf_counter() - start
+        rss_delta = _rss() - rss_before
+
+        encoder.encode(texts[:4])  # warm up
+        latencies = []
+        for i in range(queries):
+            start = time.perf_counter()
+            encoder.encode(texts[i % len(texts)])
+            latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        embeddings = np.asarray(encoder.encode(corpus, batch_size=batch_size), dtype=np.float32)
+        batch_seconds = time.perf_counter() - start
+
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        if reference is None:
+            reference = embeddings
+        cosine = np.sum(embeddings * reference, axis=1)
+
+        results.append({
+            "backend": backend,
+            "load_seconds": load_seconds,
+            "rss_delta_mb": rss_delta / 2**20,
+            "p50_ms": float(np.percentile(latencies, 50) * 1000),
+            "p95_ms": float(np.percentile(latencies, 95) * 1000),
+            "texts_per_second": len(corpus) / batch_seconds,
+            "min_cosine": float(cosine.min())
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export and benchmark embedding encoder backends")
+    parser.add_argument("command", choices=["export", "benchmark"], help="Action to run")
+    parser.add_argument("--model", default=MODEL_CONFIG['embedding_model'], help="SentenceTransformer model name")
+    parser.add_argument("--backend", choices=BACKENDS, action="append", help="Backend(s), repeatable")
+    parser.add_argument("--queries", type=int, default=200, help="Single-query encodes to time")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "export":
+            for backend in args.backend or ["onnx", "onnx-int8"]:
+                if backend.startswith("onnx"):
+                    print(export_onnx(args.model, quantize=backend == "onnx-int8"))
+        else:
+            header = f"{'backend':<12}{'load s':>8}{'RSS MB':>9}{'p50 ms':>9}{'p95 ms':>9}{'texts/s':>10}{'min cos':>9}"
+            print(header)
+            for row in benchmark(args.model, args.backend or list(BACKENDS), args.queries):
+                print(
+                    f"{row['backend']:<12}{row['load_seconds']:>8.2f}{row['rss_delta_mb']:>9.0f}"
+                    f"{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}{row['texts_per_second']:>10.0f}{row['min_cosine']:>9.4f}"
+                )
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
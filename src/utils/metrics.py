@@ -0,0 +1,222 @@
+"""
+Prometheus metrics for the web apps and the ingestion jobs.
+
+The web apps serve the default registry at ``/metrics``: latency histograms
+for search, query embedding and OpenAI calls, OpenAI token usage and
+rate-limit retries. Cache hit/miss counters and connection pool gauges are
+read from the caches' and pools' own ``stats()`` at scrape time, so the
+request path pays nothing for them.
+
+Multi-worker servers (gunicorn with ``--workers`` > 1) must set
+``PROMETHEUS_MULTIPROC_DIR`` to an empty directory before starting, so every
+worker records its histograms and counters there and ``/metrics`` merges
+them, whichever worker answers the scrape. Cache and pool statistics are
+still those of the answering worker. Dead workers are dropped with a
+gunicorn ``child_exit`` hook::
+
+    from prometheus_client import multiprocess
+
+    def child_exit(server, worker):
+        multiprocess.mark_process_dead(worker.pid)
+
+Ingestion jobs finish before a scrape would reach them; ``export_ingest_metrics``
+writes their throughput to a node_exporter textfile or pushes it to a
+Pushgateway instead.
+"""
+
+import logging
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+    generate_latest, multiprocess, push_to_gateway, write_to_textfile
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from ..config.config import METRICS_CONFIG
+from ..database.connection_pool import connection_pools
+
+logger = logging.getLogger(__name__)
+
+SEARCH_SECONDS = Histogram(
+    "pragi_search_seconds", "Vector search latency, including query embedding",
+    ["backend"], buckets=METRICS_CONFIG['latency_buckets']
+)
+EMBEDDING_SECONDS = Histogram(
+    "pragi_embedding_seconds", "Embedding model latency per call (query cache misses, document batches)",
+    ["kind"], buckets=METRICS_CONFIG['latency_buckets']
+)
+OPENAI_SECONDS = Histogram(
+    "pragi_openai_seconds", "OpenAI chat completion latency (until the stream opens when streaming)",
+    ["model", "stream"], buckets=METRICS_CONFIG['latency_buckets']
+)
+OPENAI_TOKENS = Histogram(
+    "pragi_openai_tokens", "Tokens per OpenAI chat completion",
+    ["model", "type"], buckets=METRICS_CONFIG['token_buckets']
+)
+OPENAI_RATE_LIMIT_RETRIES = Counter(
+    "pragi_openai_rate_limit_retries", "OpenAI calls retried after a rate limit", ["model"]
+)
+
+QUERY_EMBEDDING_SECONDS = EMBEDDING_SECONDS.labels(kind="query")
+DOCUMENT_EMBEDDING_SECONDS = EMBEDDING_SECONDS.labels(kind="documents")
+
+
+def timed(metric: Any, func: Callable) -> Callable:
+    """Wrap ``func`` so every call is observed by a histogram.
+
+    Args:
+        metric: Histogram (with labels applied)
+        func: Function to time
+
+    Returns:
+        Wrapped function
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with metric.time():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def observe_openai(model: str, stream: bool, seconds: float, usage: Any = None) -> None:
+    """Record one OpenAI chat completion call.
+
+    Args:
+        model: Model name
+        stream: Whether the completion was streamed
+        seconds: Latency of the call
+        usage: ``response.usage`` (absent for streamed completions)
+    """
+    OPENAI_SECONDS.labels(model=model, stream=str(stream).lower()).observe(seconds)
+    if usage is not None:
+        OPENAI_TOKENS.labels(model=model, type="prompt").observe(usage.prompt_tokens)
+        OPENAI_TOKENS.labels(model=model, type="completion").observe(usage.completion_tokens)
+
+
+class StatsCollector:
+    """Exposes cache and connection pool statistics at scrape time."""
+
+    def __init__(self):
+        self._caches: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def register_cache(self, name: str, stats: Callable[[], Dict[str, Any]]) -> None:
+        """Expose a cache whose ``stats()`` reports ``hits``, ``misses`` and ``size``.
+
+        Args:
+            name: Value of the ``cache`` label
+            stats: The cache's statistics function
+        """
+        with self._lock:
+            self._caches[name] = stats
+
+    def collect(self):
+        hits = CounterMetricFamily("pragi_cache_hits", "Cache hits", labels=["cache"])
+        misses = CounterMetricFamily("pragi_cache_misses", "Cache misses", labels=["cache"])
+        size = GaugeMetricFamily("pragi_cache_entries", "Entries held by the cache", labels=["cache"])
+        with self._lock:
+            caches = dict(self._caches)
+        for name, stats in caches.items():
+            try:
+                snapshot = stats()
+            except Exception as e:
+                logger.warning(f"Could not read statistics of cache {name}: {str(e)}")
+                continue
+            hits.add_metric([name], snapshot["hits"])
+            misses.add_metric([name], snapshot["misses"])
+            size.add_metric([name], snapshot["size"])
+        yield from (hits, misses, size)
+
+        connections = GaugeMetricFamily("pragi_db_pool_connections", "Open pooled connections", labels=["pool", "state"])
+        max_size = GaugeMetricFamily("pragi_db_pool_max_size", "Maximum pool size", labels=["pool"])
+        checkouts = CounterMetricFamily("pragi_db_pool_checkouts", "Connections handed out", labels=["pool"])
+        wait = CounterMetricFamily("pragi_db_pool_wait_seconds", "Time spent waiting for a connection", labels=["pool"])
+        timeouts = CounterMetricFamily("pragi_db_pool_timeouts", "Checkouts that timed out", labels=["pool"])
+        for name, pool in connection_pools().items():
+            snapshot = pool.stats()
+            connections.add_metric([name, "idle"], snapshot["idle"])
+            connections.add_metric([name, "in_use"], snapshot["in_use"])
+            max_size.add_metric([name], snapshot["max_size"])
+            checkouts.add_metric([name], snapshot["checkouts"])
+            wait.add_metric([name], snapshot["wait_seconds_total"])
+            timeouts.add_metric([name], snapshot["timeouts"])
+        yield from (connections, max_size, checkouts, wait, timeouts)
+
+
+_collector = StatsCollector()
+REGISTRY.register(_collector)
+
+
+def register_cache(name: str, stats: Callable[[], Dict[str, Any]]) -> None:
+    """Shortcut for registering a cache with the process-wide collector."""
+    _collector.register_cache(name, stats)
+
+
+def metrics_response() -> tuple:
+    """Body and content type of a ``/metrics`` response.
+
+    With ``METRICS_CONFIG['multiprocess_dir']`` set, histograms and counters
+    are merged from all workers' files; cache and pool statistics come from
+    this process.
+    """
+    if METRICS_CONFIG['multiprocess_dir']:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry, path=METRICS_CONFIG['multiprocess_dir'])
+        registry.register(_collector)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def export_ingest_metrics(
+    stats: Dict[str, Any],
+    textfile: Optional[str] = METRICS_CONFIG['textfile'],
+    pushgateway: Optional[str] = METRICS_CONFIG['pushgateway'],
+    job: str = METRICS_CONFIG['job']
+) -> CollectorRegistry:
+    """Publish the throughput of an ingestion run.
+
+    Args:
+        stats: ``IngestionPipeline.stats()``
+        textfile: node_exporter textfile to write (replaced atomically)
+        pushgateway: Pushgateway address to push to
+        job: Job label for the Pushgateway
+
+    Returns:
+        The registry holding the ingestion metrics
+
+    Example:
+        >>> export_ingest_metrics(pipeline.stats(), textfile="/var/lib/node_exporter/pragi_ingest.prom")
+    """
+    registry = CollectorRegistry()
+    totals, seconds = stats["totals"], stats["seconds"]
+
+    def gauge(name: str, documentation: str, value: float):
+        Gauge(name, documentation, registry=registry).set(value)
+
+    gauge("pragi_ingest_files", "Files ingested in this run", totals["files"])
+    gauge("pragi_ingest_pages", "PDF pages ingested in this run", totals["pages"])
+    gauge("pragi_ingest_chunks", "Chunks (documents) written in this run", totals["documents"])
+    gauge("pragi_ingest_seconds", "Duration of the run so far", seconds)
+    gauge("pragi_ingest_pages_per_second", "PDF pages ingested per second", totals["pages"] / seconds if seconds else 0.0)
+    gauge("pragi_ingest_chunks_per_second", "Chunks written per second", totals["documents"] / seconds if seconds else 0.0)
+
+    stage_rate = Gauge("pragi_ingest_stage_items_per_second", "Files per second through a stage", ["stage"], registry=registry)
+    stage_busy = Gauge("pragi_ingest_stage_utilization", "Share of worker time a stage was busy", ["stage"], registry=registry)
+    stage_errors = Gauge("pragi_ingest_stage_errors", "Files a stage failed on", ["stage"], registry=registry)
+    for name, stage in stats.items():
+        if name in ("totals", "seconds"):
+            continue
+        stage_rate.labels(stage=name).set(stage["items_per_second"])
+        stage_busy.labels(stage=name).set(stage["utilization"])
+        stage_errors.labels(stage=name).set(stage["errors"])
+    gauge("pragi_ingest_last_update_timestamp_seconds", "When these metrics were exported", time.time())
+
+    if textfile:
+        write_to_textfile(textfile, registry)
+    if pushgateway:
+        push_to_gateway(pushgateway, job=job, registry=registry)
+    return registry
@@ -0,0 +1,210 @@
+"""
+Process-wide registry of embedding models, tokenizers and tiktoken encodings.
+
+Every component asks the registry instead of instantiating its own
+SentenceTransformer or tokenizer, so each model is loaded once per process
+and shared across threads.
+
+Preloading before fork (e.g. gunicorn ``--preload`` with an ``on_starting``
+hook calling ``preload_models()``) lets workers share the weights
+copy-on-write instead of each loading a private copy.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import psutil
+
+from ..config.config import MODEL_CONFIG, OPENAI_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+def _rss() -> int:
+    """Resident set size of the current process in bytes."""
+    return psutil.Process().memory_info().rss
+
+
+class ModelRegistry:
+    """Loads each model once, on first use, and hands out the shared instance.
+
+    Loads of different models may run concurrently; concurrent requests for
+    the same model wait for a single load.
+
+    Example:
+        >>> registry = ModelRegistry()
+        >>> model = registry.embedding_model()
+        >>> registry.stats()["models"]["embedding:sentence-transformers/all-MiniLM-L6-v2:torch"]["load_seconds"]
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._models: Dict[Hashable, Any] = {}
+        self._stats: Dict[Hashable, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+
+    def _after_fork(self):
+        """Reset locks in a forked child (a parent thread may have held them)."""
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the model registered under ``key``, loading it on first use.
+
+        Args:
+            key: Registry key, e.g. ("embedding", model_name)
+            loader: Zero-argument function that loads the model
+
+        Returns:
+            The shared model instance
+        """
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            model = self._models.get(key)
+            if model is not None:
+                return model
+
+            rss_before = _rss()
+            start = time.perf_counter()
+            model = loader()
+            load_seconds = time.perf_counter() - start
+            rss_delta = _rss() - rss_before
+
+            with self._lock:
+                self._models[key] = model
+                self._stats[key] = {
+                    "load_seconds": load_seconds,
+                    "rss_delta_bytes": rss_delta,
+                    "loaded_at": time.time(),
+                    "pid": os.getpid()
+                }
+            logger.info(
+                f"Loaded {':'.join(map(str, key))} in {load_seconds:.2f}s "
+                f"(+{rss_delta / 2**20:.0f} MB RSS)"
+            )
+            return model
+
+    def embedding_model(self, name: Optional[str] = None, backend: Optional[str] = None):
+        """Return the shared embedding model.
+
+        Args:
+            name: Model name, defaults to ``MODEL_CONFIG['embedding_model']``
+            backend: Encoder backend, defaults to ``MODEL_CONFIG['backend']``
+
+        Returns:
+            SentenceTransformer (or compatible encoder) instance
+        """
+        name = name or MODEL_CONFIG['embedding_model']
+        backend = backend or MODEL_CONFIG['backend']
+
+        def load():
+            from .encoders import load_encoder
+            return load_encoder(name, backend)
+
+        return self.get(("embedding", name, backend), load)
+
+    def tokenizer(self, name: Optional[str] = None):
+        """Return the shared Hugging Face tokenizer.
+
+        Args:
+            name: Tokenizer name, defaults to ``MODEL_CONFIG['embedding_model']``
+
+        Returns:
+            PreTrainedTokenizer instance
+        """
+        name = name or MODEL_CONFIG['embedding_model']
+
+        def load():
+            from transformers import AutoTokenizer
+            return AutoTokenizer.from_pretrained(name)
+
+        return self.get(("tokenizer", name), load)
+
+    def encoding(self, model: Optional[str] = None):
+        """Return the shared tiktoken encoding of an OpenAI model.
+
+        Args:
+            model: Chat model name, defaults to ``OPENAI_CONFIG['model']``
+
+        Returns:
+            tiktoken Encoding instance
+        """
+        model = model or OPENAI_CONFIG['model']
+
+        def load():
+            import tiktoken
+            return tiktoken.encoding_for_model(model)
+
+        return self.get(("encoding", model), load)
+
+    def preload(self, embedding_model: bool = True, tokenizer: bool = True) -> Dict[str, Any]:
+        """Load the default models now, typically in the parent before forking workers.
+
+        Args:
+            embedding_model: Load the default embedding model
+            tokenizer: Load the default tokenizer
+
+        Returns:
+            Registry statistics after loading
+        """
+        # Tokenizer thread pools do not survive fork
+        os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+        if embedding_model:
+            self.embedding_model()
+        if tokenizer:
+            self.tokenizer()
+        return self.stats()
+
+    def loaded(self, key: Hashable) -> bool:
+        """Whether the model under ``key`` has been loaded."""
+        return key in self._models
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-model load time and memory, and the process RSS.
+
+        Returns:
+            Dictionary with ``models`` (keyed "kind:name") and ``rss_bytes``
+        """
+        with self._lock:
+            models = {":".join(map(str, key)): dict(stats) for key, stats in self._stats.items()}
+        return {"models": models, "rss_bytes": _rss(), "pid": os.getpid()}
+
+
+_registry = ModelRegistry()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_registry._after_fork)
+
+
+def get_model_registry() -> ModelRegistry:
+    """Return the registry shared by the whole process."""
+    return _registry
+
+
+def get_embedding_model(name: Optional[str] = None):
+    """Shortcut for ``get_model_registry().embedding_model(name)``."""
+    return _registry.embedding_model(name)
+
+
+def get_tokenizer(name: Optional[str] = None):
+    """Shortcut for ``get_model_registry().tokenizer(name)``."""
+    return _registry.tokenizer(name)
+
+
+def get_encoding(model: Optional[str] = None):
+    """Shortcut for ``get_model_registry().encoding(model)``."""
+    return _registry.encoding(model)
+
+
+def preload_models() -> Dict[str, Any]:
+    """Shortcut for ``get_model_registry().preload()``."""
+    return _registry.preload()
@@ -0,0 +1,81 @@
+"""
+Helpers for streaming work through bounded queues.
+
+``prefetch`` runs a producer (e.g. text extraction) in a background thread
+while the consumer (e.g. embedding and database writes) works on earlier
+items. The queue between them is bounded, so a slow consumer stalls the
+producer instead of letting extracted text pile up in memory.
+"""
+
+import queue
+import threading
+from typing import Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class _Failure:
+    """An exception raised by the producer, re-raised in the consumer."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def prefetch(items: Iterable[T], maxsize: int = 2) -> Iterator[T]:
+    """Iterate over ``items`` produced in a background thread.
+
+    At most ``maxsize`` items wait in the queue, plus the one being produced.
+    Exceptions of the producer are raised in the consumer; closing the
+    iterator early stops the producer after its current item.
+
+    Args:
+        items: Iterable to consume, evaluated in the background thread
+        maxsize: Maximum number of items produced ahead of the consumer
+
+    Yields:
+        The items, in order
+
+    Example:
+        >>> for batch in prefetch(extract_batches(files), maxsize=2):
+        ...     db.add_documents(batch)
+    """
+    if maxsize < 1:
+        raise ValueError(f"maxsize must be at least 1, got {maxsize}")
+    pending: "queue.Queue" = queue.Queue(maxsize)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                pending.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put(_Failure(e))
+            return
+        put(_DONE)
+
+    thread = threading.Thread(target=produce, name="prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = pending.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
@@ -0,0 +1,376 @@
+"""
+Span tracing of the request hot path.
+
+A request opens a trace with ``trace(name)``; code anywhere below it on the
+same thread opens child spans with ``span(name)``, so the trace id travels
+from ``chat()`` down to ``PostgreSQLVectorDB.search()`` and the connection
+pool without being passed around. Outside a trace ``span`` does nothing,
+which keeps batch jobs calling the same code untraced.
+
+Finished traces are kept in a ring buffer (``recent``/``summary``, served
+at ``/debug/traces``) and, when ``TRACING_CONFIG['export_url']`` is set,
+posted as OTLP/HTTP JSON to a local collector (OpenTelemetry Collector,
+Jaeger, Tempo) by a background thread that never blocks requests.
+"""
+
+import json
+import logging
+import queue
+import secrets
+import threading
+import time
+import urllib.request
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from ..config.config import TRACING_CONFIG
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Trace:
+    """The spans of one request."""
+
+    def __init__(self, name: str):
+        self.trace_id = secrets.token_hex(16)
+        self.name = name
+        self.spans: List["Span"] = []
+
+
+class Span:
+    """A timed stage of a trace."""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace: Trace, name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    @property
+    def duration(self) -> float:
+        """Seconds from start to end (or to now while open)."""
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def set(self, **attributes) -> None:
+        """Add attributes, e.g. row counts or cache hits."""
+        self.attributes.update(attributes)
+
+    def to_dict(self, origin_ns: int) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "offset_ms": round((self.start_ns - origin_ns) / 1e6, 3),
+            "duration_ms": round(self.duration * 1e3, 3),
+            "attributes": self.attributes,
+            "error": self.error
+        }
+
+
+class _NoopSpan:
+    """Stands in for a span outside of a trace."""
+
+    trace_id = None
+
+    def set(self, **attributes) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Tracer:
+    """Records traces into a ring buffer and optionally exports them.
+
+    Example:
+        >>> tracer = Tracer(buffer_size=100)
+        >>> with tracer.trace("chat") as root:
+        ...     with tracer.span("search", k=5) as span:
+        ...         span.set(rows=len(run_search()))
+        >>> tracer.recent(1)[0]["spans"][1]["name"]
+        'search'
+    """
+
+    def __init__(
+        self,
+        enabled: bool = TRACING_CONFIG['enabled'],
+        buffer_size: int = TRACING_CONFIG['buffer_size'],
+        export_url: Optional[str] = TRACING_CONFIG['export_url'],
+        export_queue_size: int = TRACING_CONFIG['export_queue_size'],
+        service_name: str = TRACING_CONFIG['service_name']
+    ):
+        """Initialize the tracer.
+
+        Args:
+            enabled: Record traces at all
+            buffer_size: Number of recent traces kept in memory
+            export_url: OTLP/HTTP JSON endpoint, e.g. http://localhost:4318/v1/traces
+            export_queue_size: Traces waiting for export before new ones are dropped
+            service_name: ``service.name`` resource attribute of exported spans
+        """
+        self.enabled = enabled
+        self.export_url = export_url
+        self.service_name = service_name
+        self._traces: Deque[Trace] = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Trace]" = queue.Queue(maxsize=export_queue_size)
+        self._exporter: Optional[threading.Thread] = None
+        self.exported = 0
+        self.dropped = 0
+
+    def start(self, name: str, **attributes) -> Span:
+        """Open the root span of a new trace (finish it with ``finish``)."""
+        trace = Trace(name)
+        root = Span(trace, name, None, attributes)
+        trace.spans.append(root)
+        return root
+
+    @contextmanager
+    def activate(self, span: Span) -> Iterator[Span]:
+        """Make ``span`` the parent of spans opened in the block.
+
+        Used where a request's work is split across calls, e.g. a streamed
+        response generated after the view function returned.
+        """
+        token = _current.set(span)
+        try:
+            yield span
+        finally:
+            _current.reset(token)
+
+    def finish(self, root: Span, error: Optional[BaseException] = None) -> None:
+        """Close a trace and hand it to the ring buffer and the exporter."""
+        if root.end_ns is not None:
+            return
+        root.end_ns = time.time_ns()
+        if error is not None:
+            root.error = f"{type(error).__name__}: {error}"
+        if not self.enabled:
+            return
+        with self._lock:
+            self._traces.append(root.trace)
+        if self.export_url:
+            self._export(root.trace)
+
+    @contextmanager
+    def trace(self, name: str, **attributes) -> Iterator[Any]:
+        """Record the block as a new trace with ``name`` as its root span."""
+        if not self.enabled:
+            yield _NOOP
+            return
+        root = self.start(name, **attributes)
+        error = None
+        try:
+            with self.activate(root):
+                yield root
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self.finish(root, error)
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Any]:
+        """Record the block as a child of the current span, if there is one."""
+        parent = _current.get()
+        if parent is None:
+            yield _NOOP
+            return
+        child = Span(parent.trace, name, parent.span_id, attributes)
+        token = _current.set(child)
+        try:
+            yield child
+        except BaseException as e:
+            child.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            child.end_ns = time.time_ns()
+            _current.reset(token)
+            parent.trace.spans.append(child)
+
+    def current_span(self) -> Any:
+        """The innermost open span on this thread (a no-op stand-in outside a trace)."""
+        span = _current.get()
+        return span if span is not None else _NOOP
+
+    def current_trace_id(self) -> Optional[str]:
+        """Id of the trace recording on this thread, if any."""
+        return self.current_span().trace_id
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Describe the most recent traces, newest first.
+
+        Args:
+            limit: Maximum number of traces
+
+        Returns:
+            Traces with their spans in start order and offsets relative to
+            the root span
+        """
+        with self._lock:
+            traces = list(self._traces)[::-1][:limit]
+        described = []
+        for trace in traces:
+            root = trace.spans[0]
+            described.append({
+                "trace_id": trace.trace_id,
+                "name": trace.name,
+                "start": root.start_ns / 1e9,
+                "duration_ms": round(root.duration * 1e3, 3),
+                "error": root.error,
+                "spans": [span.to_dict(root.start_ns) for span in sorted(trace.spans, key=lambda s: s.start_ns)]
+            })
+        return described
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Latency percentiles per span name over the buffered traces.
+
+        Returns:
+            Count, p50, p95 and p99 milliseconds for each span name
+        """
+        with self._lock:
+            traces = list(self._traces)
+        durations: Dict[str, List[float]] = {}
+        for trace in traces:
+            for span in trace.spans:
+                durations.setdefault(span.name, []).append(span.duration * 1e3)
+        return {
+            name: {
+                "count": len(values),
+                "p50_ms": float(np.percentile(values, 50)),
+                "p95_ms": float(np.percentile(values, 95)),
+                "p99_ms": float(np.percentile(values, 99))
+            }
+            for name, values in sorted(durations.items())
+        }
+
+    def _export(self, trace: Trace) -> None:
+        """Queue a trace for the exporter thread, dropping it if the queue is full."""
+        if self._exporter is None:
+            with self._lock:
+                if self._exporter is None:
+                    self._exporter = threading.Thread(target=self._export_loop, name="trace_exporter", daemon=True)
+                    self._exporter.start()
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def _export_loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < 64:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.post(batch)
+                self.exported += len(batch)
+            except Exception as e:
+                self.dropped += len(batch)
+                logger.warning(f"Could not export {len(batch)} traces: {str(e)}")
+
+    def otlp_payload(self, traces: List[Trace]) -> Dict[str, Any]:
+        """Encode traces as an OTLP/HTTP JSON ``ExportTraceServiceRequest``."""
+        spans = []
+        for trace in traces:
+            for span in trace.spans:
+                encoded = {
+                    "traceId": trace.trace_id,
+                    "spanId": span.span_id,
+                    "name": span.name,
+                    "kind": 1,  # SPAN_KIND_INTERNAL
+                    "startTimeUnixNano": str(span.start_ns),
+                    "endTimeUnixNano": str(span.end_ns or span.start_ns),
+                    "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in span.attributes.items()],
+                    "status": {"code": 2, "message": span.error} if span.error else {"code": 1}
+                }
+                if span.parent_id:
+                    encoded["parentSpanId"] = span.parent_id
+                spans.append(encoded)
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}]
+        }]}
+
+    def post(self, traces: List[Trace]) -> None:
+        """Send traces to the collector."""
+        request = urllib.request.Request(
+            self.export_url,
+            data=json.dumps(self.otlp_payload(traces)).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=5) as response:
+            response.read()
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Return the tracer shared by the whole process."""
+    return _tracer
+
+
+def trace(name: str, **attributes):
+    """Shortcut for ``get_tracer().trace(name, ...)``."""
+    return _tracer.trace(name, **attributes)
+
+
+def span(name: str, **attributes):
+    """Shortcut for ``get_tracer().span(name, ...)``."""
+    return _tracer.span(name, **attributes)
+
+
+def current_span():
+    """Shortcut for ``get_tracer().current_span()``."""
+    return _tracer.current_span()
+
+
+def traced(name: str, root: bool = False) -> Callable[[Callable], Callable]:
+    """Decorator recording each call of a function as a span.
+
+    Args:
+        name: Span name
+        root: Start a new trace per call (for request handlers) instead of
+            a child span of the current one
+
+    Returns:
+        Decorator
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with (trace(name) if root else span(name)):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
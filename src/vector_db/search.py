@@ -2,20 +2,28 @@ import psycopg2
 from psycopg2.extras import DictCursor
 import numpy as np
 from typing import List, Dict, Any, Optional
-from sentence_transformers import SentenceTransformer
 import logging
+from ..config.config import MODEL_CONFIG
+from ..database.embedding_cache import get_query_embedding_cache
+from ..utils.model_registry import get_embedding_model
 
 class VectorDBSearch:
     def __init__(self, connection_string: str):
         self.connection_string = connection_string
-        self.model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+        self.model_name = MODEL_CONFIG['embedding_model']
+        self.query_cache = get_query_embedding_cache()
         self.logger = logging.getLogger(__name__)
+    
+    @property
+    def model(self):
+        """Embedding model, shared process-wide and loaded on first use."""
+        return get_embedding_model(self.model_name)
         
     def search(self, query: str, limit: int = 5, metadata_filter: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Search for similar documents in the vector database"""
         try:
-            # Generate query embedding
-            query_embedding = self.model.encode(query)
+            # Generate query embedding (served from the shared cache on repeats)
+            query_embedding = self.query_cache.get_or_compute(query, self.model_name, self.model.encode)
             self.logger.info(f"Generated embedding with shape: {query_embedding.shape}")
             
             with psycopg2.connect(self.connection_string) as conn:
@@ -2,16 +2,16 @@
 Web application module.
 """
 
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
-from sentence_transformers import SentenceTransformer
+from flask import Flask, Response, render_template, request, jsonify, session, redirect, url_for
 import numpy as np
 import os
 from dotenv import load_dotenv
 from src.database.postgres_vector_db import PostgreSQLVectorDB
 from src.processing.rag_document import RAGDocument
 from src.config.config import DB_CONFIG, VECTOR_CONFIG
-import tiktoken
 import logging
+import threading
+import time
 import warnings
 from functools import wraps
 import secrets
@@ -25,9 +25,14 @@ from datetime import timedelta, datetime
 import psycopg2
 import re
 from flask_session import Session
-from typing import List
+from typing import List, Tuple
 from ..processing.book_metadata import process_book, normalize_author_names
 import openai
+from ..llm.answer_cache import SemanticAnswerCache
+from ..llm.context import ContextPacker
+from ..llm.streaming import SSE_HEADERS, CachedStream, ChatStream, chat_events, source_summary
+from ..utils.metrics import metrics_response, observe_openai, register_cache
+from ..utils.tracing import get_tracer, span, traced
 
 # Load environment variables
 load_dotenv()
@@ -37,6 +42,9 @@ openai.api_key = os.getenv('OPENAI_API_KEY')
 if not openai.api_key:
     raise ValueError("OpenAI API key not found in environment variables")
 
+# Client for streamed completions
+client = openai.OpenAI(api_key=openai.api_key)
+
 # Suppress specific warnings about tokenizers
 warnings.filterwarnings("ignore", message=".*tokenizers.*")
 
@@ -89,8 +97,12 @@ vector_db = PostgreSQLVectorDB(
     port=5432
 )
 
-# Initialize sentence transformer model
-model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+# Hit rates of the caches on /metrics
+register_cache("query_embedding", vector_db.query_cache.stats)
+register_cache("search_results", lambda: vector_db.result_cache.stats())
+
+# Load the embedding model and open pooled connections off the request path
+threading.Thread(target=vector_db.warm_up, name="warm_up", daemon=True).start()
 
 # Google OAuth2 configuration
 CLIENT_SECRETS_FILE = 'google_client_secret_804506683754-9ogj9ju96r0e88fb6v7t7usga753hh0h.apps.googleusercontent.com.json'
@@ -143,7 +155,7 @@ def after_request(response):
 
 def init_models():
     """Initialize models after the fork to avoid tokenizer warnings"""
-    global vector_db, model
+    global vector_db
     if vector_db is None:
         try:
             vector_db = PostgreSQLVectorDB()
@@ -152,49 +164,56 @@ def init_models():
             logger.error(f"Failed to connect to vector database: {str(e)}")
             raise
 
+# Passages are sent without headers, within a 4000 token context budget
+context_packer = ContextPacker(max_tokens=4000, header=lambda doc, similarity: "")
+
+# Answers to recent questions, reused for similar questions over the same passages
+answer_cache = SemanticAnswerCache()
+register_cache("answer", answer_cache.stats)
+
 def count_tokens(text: str) -> int:
     """Count the number of tokens in a text string."""
-    encoding = tiktoken.encoding_for_model("gpt-4-turbo-preview")
-    return len(encoding.encode(text))
+    return context_packer.count(text)
+
+@traced("get_relevant_context")
+def get_relevant_context(query: str) -> Tuple[list, List[str]]:
+    """Get relevant context from the vector database.
 
-def get_relevant_context(query: str) -> List[str]:
-    """Get relevant context from the vector database."""
+    Returns:
+        The search results and the context passages packed from them
+    """
     try:
         logger.info(f"Attempting to retrieve context from books database...")
         logger.info(f"Searching for context related to: {query}")
         
-        # Generate query embedding
-        logger.info("Generating query embedding...")
-        query_embedding = model.encode(query)
-        logger.info(f"Generated embedding with shape: {query_embedding.shape}")
-        
-        # Perform vector similarity search
+        # Perform vector similarity search (the query embedding is cached by the DB)
         logger.info("Performing vector similarity search...")
-        results = vector_db.search(query_embedding)
+        results = vector_db.search(query, k=5)
         
         if not results:
             logger.info("No relevant documents found")
-            return []
+            return [], []
             
         logger.info(f"Found {len(results)} relevant documents")
         
-        # Process and return context
-        context_parts = []
-        for i, doc in enumerate(results, 1):
-            logger.info(f"Processing document {i}/{len(results)}")
-            logger.info(f"Document {i} source: {doc.metadata.get('source', 'Unknown')}")
-            
-            if not doc.text:
-                logger.warning(f"Document {i} has no text content")
-                continue
-                
-            context_parts.append(doc.text)
-            
-        return context_parts
+        # Pack the passages into the token budget
+        with span("context.pack", results=len(results)):
+            packed = context_packer.pack(results)
+        logger.info(f"Packed {len(packed.passages)} documents into {packed.tokens} tokens")
+        return results, packed.passages
         
     except Exception as e:
         logger.error(f"Error retrieving context: {str(e)}")
-        return []
+        return [], []
+
+def embed_question(query: str):
+    """Embedding of the question for the answer cache (None if unavailable)."""
+    try:
+        # Served from the query embedding cache, the search just computed it
+        return vector_db.embed_query(query)
+    except Exception as e:
+        logger.error(f"Error embedding the question for the answer cache: {str(e)}")
+        return None
 
 def filter_sensitive_info(text):
     """Filter out sensitive information from text."""
@@ -362,6 +381,7 @@ def ingest_content():
 
 @app.route('/chat', methods=['POST'])
 @login_required
+@traced("chat", root=True)
 def chat():
     """Handle chat requests."""
     try:
@@ -373,19 +393,28 @@ def chat():
         logger.info(f"Received user message: {user_message}")
         
         # Get relevant context
-        context_parts = get_relevant_context(user_message)
+        results, context_parts = get_relevant_context(user_message)
         
         if not context_parts:
             logger.info("No relevant context found - proceeding with general knowledge")
+
+        # Reuse the answer to a similar question over the same passages
+        user_id = session.get('user_id')
+        query_embedding = embed_question(user_message)
+        if query_embedding is not None:
+            with span("answer_cache.get") as lookup:
+                cached = answer_cache.get(query_embedding, results, user=user_id)
+                lookup.set(hit=cached is not None)
+            if cached is not None:
+                logger.info(f"Answer cache hit (similarity {cached.similarity:.3f}, {cached.age:.0f}s old)")
+                return jsonify({
+                    'response': filter_sensitive_info(cached.answer),
+                    'context_used': bool(context_parts),
+                    'cached': True
+                })
             
-        # Prepare the context for the model
+        # Prepare the context for the model (packed within the token budget)
         context = "\n\n".join(context_parts)
-        
-        # Count tokens and truncate if necessary
-        context_tokens = count_tokens(context)
-        max_context_tokens = 4000  # Adjust based on model limits
-        if context_tokens > max_context_tokens:
-            context = truncate_text(context, max_context_tokens)
             
         # Prepare the messages for the model
         messages = [
@@ -395,15 +424,20 @@ def chat():
         
         # Get response from OpenAI
         logger.info("Sending request to OpenAI with context")
-        response = openai.ChatCompletion.create(
-            model="gpt-4-turbo-preview",
-            messages=messages,
-            temperature=0.7,
-            max_tokens=1000
-        )
+        with span("openai.chat", model="gpt-4-turbo-preview"):
+            started = time.perf_counter()
+            response = client.chat.completions.create(
+                model="gpt-4-turbo-preview",
+                messages=messages,
+                temperature=0.7,
+                max_tokens=1000
+            )
+            observe_openai("gpt-4-turbo-preview", False, time.perf_counter() - started, response.usage)
         
-        # Extract and filter the response
+        # Extract and filter the response (cached unfiltered, like the streamed answers)
         assistant_message = response.choices[0].message.content
+        if query_embedding is not None and response.choices[0].finish_reason == "stop":
+            answer_cache.put(query_embedding, results, assistant_message, user=user_id)
         filtered_message = filter_sensitive_info(assistant_message)
         
         logger.info("Received response from OpenAI")
@@ -416,16 +450,102 @@ def chat():
         logger.error(f"Error in chat: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/chat/stream', methods=['POST'])
+@login_required
+def chat_stream():
+    """Answer a chat message as server-sent events (retrieval, token, done)."""
+    data = request.get_json()
+    if not data or 'message' not in data:
+        return jsonify({'error': 'No message provided'}), 400
+
+    user_message = data['message']
+    logger.info(f"Received streamed user message: {user_message}")
+    user_id = session.get('user_id')
+    retrieved = {'results': [], 'embedding': None}
+
+    # The events are generated after this view returns, so the trace is
+    # re-activated around each step and finished with the stream
+    tracer = get_tracer()
+    root = tracer.start("chat_stream")
+
+    def in_trace(func):
+        @wraps(func)
+        def call(*args):
+            with tracer.activate(root):
+                return func(*args)
+        return call
+
+    def traced_events(events):
+        try:
+            yield from events
+        finally:
+            tracer.finish(root)
+
+    @in_trace
+    def retrieve():
+        results, context_parts = get_relevant_context(user_message)
+        retrieved['results'] = results
+        retrieved['embedding'] = embed_question(user_message)
+        return "\n\n".join(context_parts), source_summary(results)
+
+    @in_trace
+    def complete(context):
+        if retrieved['embedding'] is not None:
+            with span("answer_cache.get") as lookup:
+                cached = answer_cache.get(retrieved['embedding'], retrieved['results'], user=user_id)
+                lookup.set(hit=cached is not None)
+            if cached is not None:
+                logger.info(f"Answer cache hit (similarity {cached.similarity:.3f}, {cached.age:.0f}s old)")
+                return CachedStream(cached.answer)
+        with span("openai.chat", model="gpt-4-turbo-preview", stream=True):
+            started = time.perf_counter()
+            stream = client.chat.completions.create(
+                model="gpt-4-turbo-preview",
+                messages=[
+                    {"role": "system", "content": "You are a helpful assistant that provides accurate information based on the provided context. If the context doesn't contain relevant information, say so and provide general knowledge."},
+                    {"role": "user", "content": f"Context:\n{context}\n\nQuestion: {user_message}"}
+                ],
+                temperature=0.7,
+                max_tokens=1000,
+                stream=True
+            )
+            observe_openai("gpt-4-turbo-preview", True, time.perf_counter() - started)
+        return ChatStream(stream)
+
+    def remember(answer):
+        if retrieved['embedding'] is not None:
+            answer_cache.put(retrieved['embedding'], retrieved['results'], answer, user=user_id)
+
+    return Response(
+        traced_events(chat_events(retrieve, complete, redact=filter_sensitive_info, on_complete=remember)),
+        mimetype='text/event-stream',
+        headers=SSE_HEADERS
+    )
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics of this process."""
+    body, content_type = metrics_response()
+    return Response(body, mimetype=content_type)
+
+@app.route('/debug/traces')
+@login_required
+def debug_traces():
+    """Recent request traces and per-stage latency percentiles."""
+    tracer = get_tracer()
+    limit = request.args.get('limit', 50, type=int)
+    return jsonify({
+        'summary': tracer.summary(),
+        'traces': tracer.recent(limit),
+        'exported': tracer.exported,
+        'dropped': tracer.dropped
+    })
+
 def truncate_text(text: str, max_tokens: int) -> str:
     """Truncate text to fit within token limit."""
-    encoding = tiktoken.encoding_for_model("gpt-4-turbo-preview")
-    tokens = encoding.encode(text)
-    if len(tokens) <= max_tokens:
+    if count_tokens(text) <= max_tokens:
         return text
-        
-    # Truncate to max_tokens
-    truncated_tokens = tokens[:max_tokens]
-    return encoding.decode(truncated_tokens)
+    return context_packer.truncate(text, max_tokens)
 
 @app.route('/books')
 @login_required
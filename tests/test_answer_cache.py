@@ -0,0 +1,53 @@
+"""Tests for the semantic answer cache."""
+
+import numpy as np
+
+from src.llm import answer_cache
+from src.llm.answer_cache import SemanticAnswerCache
+from src.processing.rag_document import RAGDocument
+
+RESULTS = [
+    (RAGDocument(text="Herrschaft soll heißen ...", doc_id=1), 0.82),
+    (RAGDocument(text="Legitime Ordnung ...", doc_id=2), 0.79),
+]
+QUESTION = np.array([1.0, 0.0, 0.0])
+PARAPHRASE = np.array([0.99, 0.1, 0.0])  # Cosine ~0.995
+OTHER = np.array([0.0, 1.0, 0.0])
+
+
+def test_similar_question_over_same_chunks_hits_per_user():
+    cache = SemanticAnswerCache(threshold=0.95)
+    cache.put(QUESTION, RESULTS, "Weber defines domination as ...", user="anna")
+
+    hit = cache.get(PARAPHRASE, list(reversed(RESULTS)), user="anna")
+    assert hit.answer == "Weber defines domination as ..." and hit.similarity > 0.99
+    assert cache.get(OTHER, RESULTS, user="anna") is None
+    assert cache.get(PARAPHRASE, RESULTS, user="ben") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_changed_or_invalidated_chunks_miss():
+    """Edited chunk content changes the key; invalidation drops answers by chunk id."""
+    cache = SemanticAnswerCache()
+    cache.put(QUESTION, RESULTS, "answer")
+
+    edited = [(RAGDocument(text="Herrschaft heißt ...", doc_id=1), 0.82), RESULTS[1]]
+    assert cache.get(QUESTION, edited) is None
+
+    cache.invalidate([2])
+    assert cache.get(QUESTION, RESULTS) is None and cache.stats()["size"] == 0
+
+
+def test_ttl_and_size_bound(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(answer_cache.time, "monotonic", lambda: clock[0])
+    cache = SemanticAnswerCache(max_size=2, ttl=60)
+
+    for doc_id in (1, 2, 3):
+        cache.put(QUESTION, [(RAGDocument(text="x", doc_id=doc_id), 0.9)], f"answer {doc_id}")
+    assert cache.stats()["size"] == 2
+    assert cache.get(QUESTION, [(RAGDocument(text="x", doc_id=1), 0.9)]) is None  # Evicted
+
+    clock[0] += 61
+    assert cache.get(QUESTION, [(RAGDocument(text="x", doc_id=3), 0.9)]) is None  # Expired
+    assert cache.stats()["size"] == 1
@@ -0,0 +1,117 @@
+"""Tests for the COPY row encoding of the bulk loader."""
+
+import json
+from contextlib import contextmanager
+from struct import unpack_from
+
+import numpy as np
+import pytest
+
+from src.database.bulk_loader import BulkLoader, _ByteStream, encode_binary, encode_text
+from src.database.index_manager import IndexManager
+from src.processing.rag_document import RAGDocument
+
+
+def decode_binary(data):
+    """Parse binary COPY tuples back into lists of raw field bytes."""
+    rows, offset = [], 0
+    while offset < len(data):
+        (fields,), offset = unpack_from(">h", data, offset), offset + 2
+        row = []
+        for _ in range(fields):
+            (length,), offset = unpack_from(">i", data, offset), offset + 4
+            row.append(None if length < 0 else data[offset:offset + length])
+            offset += max(length, 0)
+        rows.append(row)
+    return rows
+
+
+def test_binary_rows_match_postgres_wire_format():
+    """Text is UTF-8, JSONB is versioned, vectors use pgvector's send format."""
+    embedding = np.array([0.5, -1.25, 3.0], dtype=np.float32)
+    rows = [
+        ("Über\tdie Macht", "gAAA", json.dumps({"page": 3}), embedding, "/books/weber.pdf", 7, "ab12"),
+        ("Herrschaft", "gBBB", "{}", embedding, None, None, None),
+    ]
+    first, second = decode_binary(encode_binary(rows))
+
+    assert first[0].decode("utf-8") == "Über\tdie Macht"
+    assert first[2] == b'\x01{"page": 3}'
+    dimensions, unused = unpack_from(">HH", first[3])
+    assert (dimensions, unused) == (3, 0)
+    assert np.frombuffer(first[3], dtype=">f4", offset=4).tolist() == [0.5, -1.25, 3.0]
+    assert unpack_from(">i", first[5]) == (7,)
+    assert second[4:] == [None, None, None]
+
+
+def test_text_rows_escape_separators():
+    """Tabs, newlines and backslashes in the text do not break COPY lines."""
+    line = encode_text([("a\tb\nc\\d", "x", "{}", np.zeros(2), None, None, None)]).decode("utf-8")
+    assert line == "a\\tb\\nc\\\\d\tx\t{}\t[0.0,0.0]\t\\N\t\\N\t\\N\n"
+
+
+def test_stream_is_lazy_and_keyed_rows_keep_last_duplicate():
+    """COPY pulls blocks on demand; a repeated chunk key keeps the later document."""
+    pulled = []
+
+    def blocks():
+        for block in (b"abc", b"defg", b"h"):
+            pulled.append(block)
+            yield block
+
+    stream = _ByteStream(blocks())
+    assert stream.read(2) == b"ab" and len(pulled) == 1
+    assert stream.read(4) == b"cdef"
+    assert stream.read(10) == b"gh" and stream.read(10) == b""
+
+    loader = BulkLoader(pool=None, encrypt=str.upper)
+    documents = [
+        RAGDocument(text="alt", metadata={"source": "/a.pdf", "chunk_index": 0}),
+        RAGDocument(text="eins", metadata={"source": "/a.pdf", "chunk_index": 1}),
+        RAGDocument(text="neu", metadata={"source": "/a.pdf", "chunk_index": 0}),
+    ]
+    rows = list(loader._rows(documents, np.ones((3, 2)), keyed=True))
+    assert [(row[0], row[1], row[4], row[5]) for row in rows] == [("eins", "EINS", "/a.pdf", 1), ("neu", "NEU", "/a.pdf", 0)]
+
+
+class RecordingConnection:
+    """Autocommit-capable connection that records statements and fails on request."""
+
+    def __init__(self, fail_on=None):
+        self.statements = []
+        self.fail_on = fail_on
+        self.autocommit = False
+        self.closed = 0
+
+    @contextmanager
+    def connection(self, label="query"):
+        yield self
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql.strip())
+        if self.fail_on and self.fail_on in sql:
+            raise RuntimeError(f"failed: {sql}")
+
+
+def test_index_rebuild_resets_maintenance_memory(monkeypatch):
+    """The build budget is not left on the pooled connection, even when the build fails."""
+    monkeypatch.setattr(IndexManager, "ensure", lambda self, force=False: {})
+    conn = RecordingConnection()
+    BulkLoader(pool=conn, encrypt=str.upper)._rebuild_indexes()
+    assert conn.statements[0].startswith("SET maintenance_work_mem")
+    assert conn.statements[-1] == "RESET maintenance_work_mem;"
+
+    failing = RecordingConnection(fail_on="CREATE INDEX")
+    with pytest.raises(RuntimeError):
+        BulkLoader(pool=failing, encrypt=str.upper)._rebuild_indexes()
+    assert failing.statements[-1] == "RESET maintenance_work_mem;"
+    assert failing.autocommit is False
@@ -0,0 +1,70 @@
+"""Tests for the server-sent events of streamed chat answers."""
+
+import json
+import re
+from types import SimpleNamespace
+
+from src.llm.streaming import ChatStream, RedactingBuffer, chat_events
+
+
+class FakeResponse:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeStream:
+    """Mimics the chunk iterator returned by ``create(stream=True)``."""
+
+    def __init__(self, deltas):
+        self.deltas = deltas
+        self.response = FakeResponse()
+
+    def __iter__(self):
+        for i, text in enumerate(self.deltas):
+            finish = "stop" if i == len(self.deltas) - 1 else None
+            delta = SimpleNamespace(content=text)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=finish)])
+
+
+def parse(event):
+    name, data = event.rstrip("\n").split("\n")
+    return name[len("event: "):], json.loads(data[len("data: "):])
+
+
+def test_events_are_sent_in_order():
+    """Sources come first, then every delta, then the finish reason."""
+    upstream = FakeStream(["Max ", "Weber", None])
+    events = [parse(e) for e in chat_events(
+        lambda: (["passage"], [{"title": "Wirtschaft und Gesellschaft"}]),
+        lambda context: ChatStream(upstream)
+    )]
+
+    assert [name for name, _ in events] == ["retrieval", "token", "token", "done"]
+    assert events[0][1]["sources"] == [{"title": "Wirtschaft und Gesellschaft"}]
+    assert "".join(data["text"] for name, data in events if name == "token") == "Max Weber"
+    assert events[-1][1]["finish_reason"] == "stop"
+    assert upstream.response.closed
+
+
+def test_disconnect_closes_the_upstream_stream():
+    """Closing the generator mid-answer cancels the completion."""
+    upstream = FakeStream(["a ", "b ", "c ", "d"])
+    events = chat_events(lambda: ([], []), lambda context: ChatStream(upstream))
+
+    assert parse(next(events))[0] == "retrieval"
+    assert parse(next(events))[0] == "token"
+    events.close()
+    assert upstream.response.closed
+
+
+def test_redaction_spans_deltas():
+    """An e-mail address split across two deltas is still redacted."""
+    redact = lambda text: re.sub(r"\S+@\S+\.\w+", "[REDACTED]", text)
+    buffer = RedactingBuffer(redact)
+
+    sent = buffer.feed("Write to max.we") + buffer.feed("ber@example.org today")
+    sent += buffer.flush()
+    assert sent == "Write to [REDACTED] today"
@@ -0,0 +1,54 @@
+"""Tests for the streaming token-aware chunker (words stand in for tokens)."""
+
+import pytest
+
+from src.processing.chunker import Chunker, count_words, find_sentence_boundary
+
+
+PAGES = [
+    (7, "Die Bürokratie ist ein Machtmittel. Sie ist z.B. in Preußen früh entstanden."),
+    (8, "Ein Satz, der über die"),
+    (9, "Seitengrenze geht. Kurz. Dr. Weber nennt 3.5 Gründe! Und dann?"),
+]
+
+
+def test_sentence_boundaries_skip_abbreviations_and_numbers():
+    """Abbreviations, decimals and closing quotes are handled."""
+    text = "Dr. Weber sagt z.B. 3.5 Mal »Nein.« Dann geht er."
+    assert text[:find_sentence_boundary(text, 0)] == "Dr. Weber sagt z.B. 3.5 Mal »Nein.«"
+    assert find_sentence_boundary(text, len(text) - 3, "backward") == len("Dr. Weber sagt z.B. 3.5 Mal »Nein.«")
+    assert find_sentence_boundary("kein Ende", 0) == len("kein Ende")
+
+
+def test_chunks_follow_sentences_with_offsets_and_pages():
+    """Chunks end on sentences, fit the budget, overlap and point back into the text."""
+    document = "\n\n".join(text for _, text in PAGES)
+    chunks = list(Chunker(12, 4, count_words).chunk(iter(PAGES)))
+
+    assert [chunk.text for chunk in chunks] == [
+        "Die Bürokratie ist ein Machtmittel. Sie ist z.B. in Preußen früh entstanden.",
+        "Ein Satz, der über die\n\nSeitengrenze geht. Kurz.",
+        "Kurz. Dr. Weber nennt 3.5 Gründe! Und dann?",
+    ]
+    for chunk in chunks:
+        assert document[chunk.start:chunk.end] == chunk.text
+        assert chunk.token_count == len(chunk.text.split()) <= 12
+    assert [(chunk.first_page, chunk.last_page) for chunk in chunks] == [(7, 7), (8, 9), (9, 9)]
+
+
+def test_streaming_matches_whole_text_and_splits_long_sentences():
+    """Page by page gives the same chunks as the joined text; overlong sentences split between words."""
+    chunker = Chunker(5, 2, count_words)
+    pages = PAGES + [(10, " ".join(["lang"] * 12) + ".")]
+    streamed = list(chunker.chunk(pages))
+    whole = chunker.chunk_text("\n\n".join(text for _, text in pages))
+
+    assert [(c.text, c.start, c.end) for c in streamed] == [(c.text, c.start, c.end) for c in whole]
+    assert all(chunk.token_count <= 5 for chunk in streamed)
+    assert [chunk.text for chunk in streamed[-3:]] == ["lang lang lang lang lang"] * 2 + ["lang lang."]
+    assert whole[0].first_page is None
+
+
+def test_rejects_overlap_not_smaller_than_chunk():
+    with pytest.raises(ValueError):
+        Chunker(10, 10, count_words)
@@ -0,0 +1,194 @@
+"""Tests for the PostgreSQL connection pool."""
+
+import os
+import threading
+import time
+
+import psycopg2
+import psycopg2.extensions
+import pytest
+
+from src.database.connection_pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeCursor:
+    """Minimal cursor that can be told to fail."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        if self.conn.broken:
+            raise psycopg2.OperationalError("server closed the connection")
+        self.conn.status = psycopg2.extensions.STATUS_BEGIN
+
+
+class FakeConnection:
+    """Stand-in for a psycopg2 connection."""
+
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.status = psycopg2.extensions.STATUS_READY
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+        self.status = psycopg2.extensions.STATUS_READY
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = psycopg2.extensions.STATUS_READY
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def connections():
+    """Record every connection the pool opens."""
+    return []
+
+
+@pytest.fixture
+def make_pool(connections):
+    """Build pools backed by fake connections."""
+    def factory(**kwargs):
+        def connect(**params):
+            conn = FakeConnection()
+            connections.append(conn)
+            return conn
+        kwargs.setdefault("min_size", 1)
+        kwargs.setdefault("max_size", 2)
+        kwargs.setdefault("timeout", 0.2)
+        return ConnectionPool({"dbname": "test"}, connection_factory=connect, **kwargs)
+    return factory
+
+
+def test_connection_is_reused(make_pool, connections):
+    """Sequential calls reuse the same persistent connection."""
+    pool = make_pool()
+    for _ in range(5):
+        with pool.connection("search") as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+    assert len(connections) == 1
+    assert connections[0].commits == 5
+    stats = pool.stats()
+    assert stats["checkouts"] == 5
+    assert stats["calls"]["search"]["calls"] == 5
+
+
+def test_rollback_on_error(make_pool, connections):
+    """A failing block rolls back and keeps the connection in the pool."""
+    pool = make_pool()
+    with pytest.raises(ValueError):
+        with pool.connection("add_documents") as conn:
+            with conn.cursor() as cur:
+                cur.execute("INSERT ...")
+            raise ValueError("boom")
+    assert connections[0].rollbacks == 1
+    assert pool.stats()["idle"] == 1
+    assert pool.stats()["calls"]["add_documents"]["errors"] == 1
+
+
+def test_operational_error_discards_connection(make_pool, connections):
+    """Connections that fail at the transport level are not reused."""
+    pool = make_pool()
+    with pytest.raises(psycopg2.OperationalError):
+        with pool.connection() as conn:
+            conn.broken = True
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+    assert connections[0].closed
+    with pool.connection() as conn:
+        assert conn is connections[1]
+
+
+def test_health_check_replaces_dead_connection(make_pool, connections):
+    """Idle connections failing SELECT 1 are replaced transparently."""
+    pool = make_pool(health_check_interval=0)
+    connections[0].broken = True
+    with pool.connection() as conn:
+        assert conn is connections[1]
+    assert pool.stats()["health_check_failures"] == 1
+
+
+def test_idle_connections_are_recycled(make_pool, connections):
+    """Surplus connections idle beyond max_idle are closed on next checkout."""
+    pool = make_pool(max_idle=0.01)
+    with pool.connection():
+        with pool.connection():
+            pass
+    assert pool.stats()["size"] == 2
+    time.sleep(0.05)
+    with pool.connection():
+        pass
+    assert pool.stats()["size"] == 1
+    assert sum(1 for c in connections if c.closed) == 1
+
+
+def test_timeout_when_exhausted(make_pool):
+    """Checkout fails with PoolTimeoutError when max_size is in use."""
+    pool = make_pool(max_size=1)
+    with pool.connection():
+        with pytest.raises(PoolTimeoutError):
+            with pool.connection():
+                pass
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_waiters_are_woken_on_checkin(make_pool, connections):
+    """Threads blocked on a full pool proceed once a connection is returned."""
+    pool = make_pool(max_size=1, timeout=2)
+    results = []
+
+    def worker():
+        with pool.connection("search"):
+            time.sleep(0.01)
+            results.append(1)
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 5
+    assert len(connections) == 1
+    assert pool.stats()["in_use"] == 0
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork()")
+def test_forked_child_does_not_reuse_or_close_inherited_connections(make_pool, connections):
+    """A child (e.g. a gunicorn worker after --preload) opens its own connections."""
+    pool = make_pool(min_size=2)
+    inherited = list(connections)
+    pid = os.fork()
+    if pid == 0:
+        try:
+            with pool.connection("search") as conn:
+                pass
+            ok = (
+                conn not in inherited
+                and not any(c.closed for c in inherited)
+                and pool.stats()["size"] == 1
+                and pool.stats()["checkouts"] == 1
+            )
+        except BaseException:
+            ok = False
+        os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+    with pool.connection("search") as conn:
+        assert conn in inherited
@@ -0,0 +1,66 @@
+"""Tests for packing search results into the context budget."""
+
+from src.llm.context import ContextPacker
+from src.processing.rag_document import RAGDocument
+
+
+class CharEncoding:
+    """One token per character; records the texts it encodes."""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode_ordinary(self, text):
+        self.encoded.append(text)
+        return [ord(char) for char in text]
+
+    def decode(self, tokens):
+        return "".join(chr(token) for token in tokens)
+
+
+def result(text, similarity, **metadata):
+    return RAGDocument(text=text, metadata=metadata), similarity
+
+
+def make_packer(encoding, **options):
+    return ContextPacker(header=lambda doc, similarity: "", encoding=encoding, **options)
+
+
+def test_stored_token_counts_avoid_tokenizing_passages():
+    """Passages with ``context_tokens`` that fit are not run through the encoding."""
+    encoding = CharEncoding()
+    packed = make_packer(encoding, max_tokens=100).pack([
+        result("a" * 30, 0.9, context_tokens=30),
+        result("b" * 20, 0.8, context_tokens=20),
+    ])
+
+    assert packed.passages == ["a" * 30 + "\n", "b" * 20 + "\n"]
+    assert packed.tokens == 52 and packed.dropped == 0 and not packed.truncated
+    assert encoding.encoded == []
+
+
+def test_greedy_by_similarity_per_token_and_boundary_truncation():
+    """Two short passages beat one long one; the long one fills the rest, in search order."""
+    encoding = CharEncoding()
+    packed = make_packer(encoding, max_tokens=50, min_truncated_tokens=5).pack([
+        result("x" * 80, 0.9, context_tokens=80),
+        result("y" * 20, 0.8, context_tokens=20),
+        result("z" * 20, 0.7, context_tokens=20),
+    ])
+
+    assert packed.passages == ["x" * 7 + "\n", "y" * 20 + "\n", "z" * 20 + "\n"]
+    assert packed.tokens == 50 and packed.truncated
+    assert encoding.encoded == ["x" * 80]  # Only the boundary passage is tokenized
+
+
+def test_missing_counts_are_computed_and_long_passages_capped():
+    """Chunks ingested without counts are counted; passages over the cap are cut."""
+    encoding = CharEncoding()
+    packed = make_packer(encoding, max_tokens=1000, max_chunk_tokens=12).pack([
+        result("legacy chunk", 0.5),
+        result("w" * 40, 0.4, context_tokens=40),
+        result("", 0.3),
+    ])
+
+    assert packed.passages == ["legacy chunk\n", "w" * 12 + "\n"]
+    assert packed.tokens == 13 + 13 and packed.dropped == 0
@@ -0,0 +1,86 @@
+"""Tests for the query embedding cache."""
+
+import time
+
+import numpy as np
+import pytest
+
+from src.database.embedding_cache import QueryEmbeddingCache
+
+
+class CountingEncoder:
+    """Encoder stub that records how often it is called."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, text):
+        self.calls += 1
+        return np.arange(4, dtype=np.float64) + len(text)
+
+
+def test_hit_after_miss():
+    """The second lookup of the same query skips the encoder."""
+    cache = QueryEmbeddingCache(max_size=10, ttl=60)
+    encoder = CountingEncoder()
+    first = cache.get_or_compute("What is Dasein?", "minilm", encoder)
+    second = cache.get_or_compute("What is Dasein?", "minilm", encoder)
+    assert encoder.calls == 1
+    assert first is second
+    assert first.dtype == np.float32
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_normalization():
+    """Whitespace and case differences share one entry."""
+    cache = QueryEmbeddingCache(max_size=10, ttl=60, lowercase=True)
+    encoder = CountingEncoder()
+    cache.get_or_compute("  What is   Dasein? ", "minilm", encoder)
+    cache.get_or_compute("what is dasein?", "minilm", encoder)
+    assert encoder.calls == 1
+    # Lowercased like the tokenizer does, not case-folded: "Maße" is not "Masse"
+    cache.get_or_compute("Maße", "minilm", encoder)
+    cache.get_or_compute("Masse", "minilm", encoder)
+    assert encoder.calls == 3
+
+
+def test_model_name_is_part_of_key():
+    """Embeddings from different models are never mixed up."""
+    cache = QueryEmbeddingCache(max_size=10, ttl=60)
+    encoder = CountingEncoder()
+    cache.get_or_compute("query", "minilm", encoder)
+    cache.get_or_compute("query", "mpnet", encoder)
+    assert encoder.calls == 2
+
+
+def test_lru_eviction():
+    """The least recently used entry is evicted first."""
+    cache = QueryEmbeddingCache(max_size=2, ttl=60)
+    encoder = CountingEncoder()
+    cache.get_or_compute("a", "m", encoder)
+    cache.get_or_compute("b", "m", encoder)
+    cache.get("a", "m")
+    cache.get_or_compute("c", "m", encoder)
+    assert cache.get("a", "m") is not None
+    assert cache.get("b", "m") is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry():
+    """Entries older than the TTL are treated as misses."""
+    cache = QueryEmbeddingCache(max_size=10, ttl=0.01)
+    encoder = CountingEncoder()
+    cache.get_or_compute("query", "m", encoder)
+    time.sleep(0.02)
+    cache.get_or_compute("query", "m", encoder)
+    assert encoder.calls == 2
+    assert cache.stats()["expirations"] == 1
+
+
+def test_cached_embeddings_are_read_only():
+    """Callers cannot corrupt cached vectors in place."""
+    cache = QueryEmbeddingCache(max_size=10, ttl=60)
+    vector = cache.put("query", "m", [1.0, 2.0])
+    with pytest.raises(ValueError):
+        vector[0] = 5.0
@@ -0,0 +1,48 @@
+"""Parity tests for the embedding encoder backends."""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("sentence_transformers")
+
+from src.config.config import MODEL_CONFIG
+from src.utils.encoders import load_encoder
+
+SENTENCES = [
+    "What did Max Weber write about bureaucracy?",
+    "Dasein is the being for whom being is an issue.",
+    "Die protestantische Ethik und der Geist des Kapitalismus",
+    "Jazz improvisation and the blues scale",
+    "",
+]
+
+
+@pytest.fixture(scope="module")
+def reference():
+    """Embeddings from the full-precision torch model."""
+    try:
+        model = load_encoder(MODEL_CONFIG['embedding_model'], "torch", device="cpu")
+    except OSError as e:
+        pytest.skip(f"Embedding model not available: {e}")
+    return model.encode(SENTENCES, convert_to_numpy=True)
+
+
+def cosine(a, b):
+    """Row-wise cosine similarity."""
+    return np.sum(a * b, axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+
+
+@pytest.mark.parametrize("backend", ["torch-int8", "onnx", "onnx-int8"])
+def test_backend_matches_torch_embeddings(reference, backend):
+    """Every backend stays within cosine 0.99 of the stored (torch) embeddings."""
+    if backend.startswith("onnx"):
+        pytest.importorskip("onnxruntime")
+        pytest.importorskip("onnx")
+    encoder = load_encoder(MODEL_CONFIG['embedding_model'], backend)
+    embeddings = encoder.encode(SENTENCES, batch_size=2, convert_to_numpy=True)
+    assert embeddings.shape == reference.shape
+    assert cosine(embeddings, reference).min() >= 0.99
+
+    single = encoder.encode(SENTENCES[0])
+    assert single.shape == reference[0].shape
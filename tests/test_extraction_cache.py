@@ -0,0 +1,54 @@
+"""Tests for the content-addressed extraction cache."""
+
+import os
+
+from src.processing.extraction_cache import ExtractionCache
+
+
+def test_key_follows_content_not_path(tmp_path):
+    """A copied file shares the key; changed content or extractor does not."""
+    original = tmp_path / "a.pdf"
+    copy = tmp_path / "b.pdf"
+    original.write_bytes(b"%PDF-1.4 Weber")
+    copy.write_bytes(b"%PDF-1.4 Weber")
+
+    key = ExtractionCache.key(str(original), "pdf", "1")
+    assert ExtractionCache.key(str(copy), "pdf", "1") == key
+    assert ExtractionCache.key(str(original), "pdf", "2") != key
+    assert ExtractionCache.key(str(original), "metadata", "1") != key
+
+    copy.write_bytes(b"%PDF-1.4 Heidegger")
+    assert ExtractionCache.key(str(copy), "pdf", "1") != key
+
+
+def test_round_trip_and_corrupt_entries(tmp_path):
+    """Entries survive a new cache instance; unreadable entries count as misses."""
+    cache = ExtractionCache(cache_dir=str(tmp_path), max_size=1 << 20)
+    entry = {"pages": [[6, "Die Bürokratie"], [7, "Herrschaft"]], "chunks": {}}
+    cache.put("ab" * 32, entry)
+
+    reopened = ExtractionCache(cache_dir=str(tmp_path), max_size=1 << 20)
+    assert reopened.get("ab" * 32) == entry
+    assert reopened.get("cd" * 32) is None
+    assert reopened.stats()["entries"] == 1
+
+    reopened._path("ab" * 32).write_bytes(b"not gzip")
+    assert reopened.get("ab" * 32) is None
+    assert reopened.stats()["entries"] == 0
+
+
+def test_evicts_least_recently_used(tmp_path):
+    """Over the size bound, the entries used longest ago are removed first."""
+    cache = ExtractionCache(cache_dir=str(tmp_path), max_size=1 << 20)
+    text = os.urandom(3000).hex()  # incompressible
+    keys = [f"{i:02x}" * 32 for i in range(3)]
+    for age, key in zip((300, 200, 100), keys):
+        cache.put(key, {"text": text})
+        os.utime(cache._path(key), (0, 1_000_000 - age))
+    assert cache.get(keys[0]) is not None  # now the most recently used
+
+    cache.max_size = 2 * cache._path(keys[0]).stat().st_size
+    assert cache.evict() == 1
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[2]) is not None
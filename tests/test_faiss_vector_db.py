@@ -0,0 +1,196 @@
+"""Tests for the in-process FAISS vector database."""
+
+import json
+import sqlite3
+import tempfile
+import zlib
+
+import numpy as np
+import pytest
+
+from src.config.config import FAISS_CONFIG, MODEL_CONFIG
+from src.database import faiss_vector_db
+from src.database.faiss_vector_db import FAISSVectorDB, _matches
+from src.processing.rag_document import RAGDocument
+
+
+class FakeModel:
+    """Maps every text to a fixed pseudo-random vector."""
+
+    def encode(self, texts, **kwargs):
+        if isinstance(texts, str):
+            return self.vector(texts)
+        return np.vstack([self.vector(text) for text in texts])
+
+    def vector(self, text):
+        rng = np.random.default_rng(zlib.crc32(text.encode()))
+        return rng.normal(size=MODEL_CONFIG['embedding_dimension']).astype(np.float32)
+
+
+@pytest.fixture
+def index_dir(monkeypatch):
+    monkeypatch.setattr(faiss_vector_db, "get_embedding_model", lambda name: FakeModel())
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield temp_dir
+
+
+def documents(start, stop):
+    return [RAGDocument(text=f"doc {i}", metadata={"n": i, "tags": ["even" if i % 2 == 0 else "odd"]})
+            for i in range(start, stop)]
+
+
+def doc_id(db, text):
+    return str(db.conn.execute("SELECT id FROM documents WHERE content = ?", (text,)).fetchone()[0])
+
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw", "ivf"])
+def test_add_search_delete_and_reopen(index_dir, index_type, monkeypatch):
+    monkeypatch.setitem(FAISS_CONFIG, 'min_train_size', 50)
+    db = FAISSVectorDB(index_dir=index_dir, index_type=index_type, cache_size=0)
+    db.add_documents(documents(0, 120), batch_size=40)
+    assert db.stats()["index_type"] == index_type
+    assert db.stats()["vectors"] == 120
+
+    document, score = db.search("doc 17", k=3)[0]
+    assert document.text == "doc 17" and document.metadata["n"] == 17
+    assert score == pytest.approx(1.0, abs=1e-4)
+    assert [doc.text for doc, _ in db.search("doc 17", k=3, metadata_filter={"tags": ["odd"]})][0] == "doc 17"
+    assert all(doc.metadata["n"] % 2 == 0 for doc, _ in db.search("doc 17", k=3, metadata_filter={"tags": ["even"]}))
+
+    assert db.delete_document(doc_id(db, "doc 17"))
+    assert "doc 17" not in [doc.text for doc, _ in db.search("doc 17", k=3)]
+    assert db.stats()["documents"] == 119
+    db.close()
+
+    def no_rebuild(self, index_type=None):
+        raise AssertionError("an index in sync with the store is loaded, not rebuilt")
+
+    monkeypatch.setattr(FAISSVectorDB, "rebuild", no_rebuild)
+    reopened = FAISSVectorDB(index_dir=index_dir, index_type=index_type, cache_size=0)
+    assert reopened.stats()["index_type"] == index_type and reopened.stats()["documents"] == 119
+    assert [doc.text for doc, _ in reopened.search("doc 18", k=1)] == ["doc 18"]
+    assert "doc 17" not in [doc.text for doc, _ in reopened.search("doc 17", k=3)]
+    reopened.close()
+
+
+def test_ivf_is_trained_once_enough_vectors_exist(index_dir, monkeypatch):
+    """Below min_train_size an 'ivf' index is searched exactly; crossing it trains and rebuilds."""
+    monkeypatch.setitem(FAISS_CONFIG, 'min_train_size', 100)
+    db = FAISSVectorDB(index_dir=index_dir, index_type="ivf", cache_size=0)
+    db.add_documents(documents(0, 60))
+    assert db.stats()["index_type"] == "flat"
+
+    db.add_documents(documents(60, 99))
+    assert db.stats()["index_type"] == "flat"
+    db.add_documents(documents(99, 130))
+    assert db.stats() == dict(db.stats(), index_type="ivf", vectors=130)
+    assert faiss_vector_db.faiss.extract_index_ivf(db.index).is_trained
+    assert [doc.text for doc, _ in db.search("doc 5", k=1)] == ["doc 5"]
+    db.close()
+
+
+def test_hnsw_deletions_are_compacted(index_dir, monkeypatch):
+    """Deleted HNSW vectors stay in the graph until max_deleted_ratio is exceeded."""
+    monkeypatch.setitem(FAISS_CONFIG, 'max_deleted_ratio', 0.2)
+    db = FAISSVectorDB(index_dir=index_dir, index_type="hnsw", cache_size=0)
+    db.add_documents(documents(0, 20))
+
+    for i in range(4):
+        db.delete_document(doc_id(db, f"doc {i}"))
+    assert db.stats()["vectors"] == 20 and db.stats()["deleted_vectors"] == 4
+    assert [doc.text for doc, _ in db.search("doc 2", k=16)].count("doc 2") == 0
+    assert len(db.search("doc 2", k=16)) == 16
+
+    db.delete_document(doc_id(db, "doc 4"))
+    assert db.stats()["vectors"] == 15 and db.stats()["deleted_vectors"] == 0
+    db.close()
+
+
+def test_stale_index_is_rebuilt(index_dir):
+    """Writes to the store that the index file missed are detected through the generation."""
+    db = FAISSVectorDB(index_dir=index_dir, index_type="flat", cache_size=0)
+    db.add_documents(documents(0, 10))
+    removed = doc_id(db, "doc 3")
+    db.close()
+
+    # An interrupted delete: the row and generation changed, the index file did not
+    store = sqlite3.connect(f"{index_dir}/docstore.db")
+    store.execute("DELETE FROM documents WHERE id = ?", (int(removed),))
+    store.execute("UPDATE index_meta SET value = value + 1 WHERE key = 'generation'")
+    store.commit()
+    store.close()
+
+    db = FAISSVectorDB(index_dir=index_dir, index_type="flat", cache_size=0)
+    assert db.stats()["vectors"] == 9 and db.stats()["deleted_vectors"] == 0
+    with open(db.meta_path) as f:
+        assert json.load(f)["generation"] == db.stats()["generation"]
+    db.close()
+
+
+class FakePostgres:
+    """Serves rows of the documents table one keyset page at a time."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.pages = []
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params):
+        last_id, limit = params
+        self.pages.append(last_id)
+        self.result = [row for row in self.rows if row[0] > last_id][:limit]
+
+    def fetchall(self):
+        return self.result
+
+
+def test_import_postgres(index_dir, monkeypatch):
+    """Rows are paged by id and added with their stored embeddings, without re-encoding."""
+    model = FakeModel()
+    encoded = []
+    rows = [
+        (id_, f"doc {id_}", {"n": id_} if id_ != 7 else None, json.dumps(model.vector(f"doc {id_}").tolist()))
+        for id_ in (2, 3, 5, 7, 11, 13, 17, 19, 23, 29)
+    ]
+    conn = FakePostgres(rows)
+    db = FAISSVectorDB(index_dir=index_dir, index_type="hnsw", cache_size=0)
+    monkeypatch.setattr(model, "encode", lambda texts, **kwargs: encoded.append(texts) or FakeModel().encode(texts))
+    monkeypatch.setattr(faiss_vector_db, "get_embedding_model", lambda name: model)
+
+    assert db.import_postgres(conn, batch_size=4) == 10
+    assert encoded == []
+    assert conn.pages == [0, 7, 19, 29]
+    assert db.stats()["vectors"] == 10
+    assert db.autosave
+    assert [(doc.text, doc.metadata) for doc, _ in db.search("doc 7", k=1)] == [("doc 7", {})]
+    db.close()
+
+
+def test_metadata_filter_follows_postgres_semantics():
+    metadata = {"tags": ["a", "b"], "author": "Weber", "year": 1922, "draft": False, "info": {"lang": "de", "pages": 400}}
+
+    # Equality is JSONB containment
+    assert _matches(metadata, {"author": "Weber", "year": 1922.0})
+    assert _matches(metadata, {"tags": ["a"]}) and _matches(metadata, {"tags": ["b", "a"]})
+    assert not _matches(metadata, {"tags": "a"})
+    assert not _matches(metadata, {"tags": ["a", "c"]})
+    assert not _matches(metadata, {"draft": 0})
+    assert not _matches(metadata, {"missing": None})
+
+    # $in matches scalars, list elements and object keys
+    assert _matches(metadata, {"tags": {"$in": ["a"]}})
+    assert _matches(metadata, {"author": {"$in": ["Marx", "Weber"]}})
+    assert _matches(metadata, {"info": {"$in": ["lang"]}})
+    assert not _matches(metadata, {"tags": {"$in": ["c"]}})
+    assert not _matches(metadata, {"missing": {"$in": [None]}})
+
+    assert _matches(metadata, {"author": {"$exists": True}, "missing": {"$exists": False}})
+    assert _matches(metadata, {"author": {"$regex": "^We"}})
@@ -0,0 +1,39 @@
+"""Tests for incremental ingestion change detection."""
+
+import pytest
+
+from src.database.incremental import content_hash, identify, plan_sync
+from src.processing.rag_document import RAGDocument
+
+
+def book(source, *texts, **metadata):
+    """Chunks of one source."""
+    return [RAGDocument(text, {"source": source, **metadata}) for text in texts]
+
+
+def test_identify_uses_position_or_chunk_index():
+    """Chunks are keyed by source and index, falling back to their position."""
+    chunks = identify(book("weber.pdf", "a", "b") + book("kafka.pdf", "c") + [
+        RAGDocument("d", {"source": "kafka.pdf", "chunk_index": 5})
+    ])
+    assert list(chunks) == [("weber.pdf", 0), ("weber.pdf", 1), ("kafka.pdf", 0), ("kafka.pdf", 5)]
+    assert chunks[("weber.pdf", 1)].content_hash == content_hash("b")
+
+    with pytest.raises(ValueError):
+        identify([RAGDocument("no source")])
+
+
+def test_plan_only_writes_changes():
+    """Unchanged chunks are skipped, changed ones updated, new ones added."""
+    existing = {
+        ("weber.pdf", 0): content_hash("Bürokratie"),
+        ("weber.pdf", 1): content_hash("Charisma"),
+        ("weber.pdf", 2): content_hash("Tradition"),
+    }
+    plan = plan_sync(identify(book("weber.pdf", "Bürokratie", "Charisma (revised)") + book("new.pdf", "x")), existing)
+
+    assert [chunk.chunk_index for chunk in plan.updated] == [1]
+    assert [(chunk.source, chunk.chunk_index) for chunk in plan.added] == [("new.pdf", 0)]
+    assert plan.skipped == 1
+    # weber.pdf shrank to two chunks, so its chunk 2 is deleted
+    assert plan.chunk_counts == {"weber.pdf": 2, "new.pdf": 1}
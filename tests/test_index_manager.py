@@ -0,0 +1,102 @@
+"""Tests for pgvector index parameter management."""
+
+from contextlib import contextmanager
+
+import pytest
+
+from src.database.index_manager import IndexManager, derive_index_params, search_settings
+
+
+class FakeCursor:
+    """Cursor answering the index manager's catalog queries."""
+
+    def __init__(self, rows, index):
+        self.rows = rows
+        self.index = index
+        self.result = None
+        self.statements = []
+        self.fail_on = None
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql.strip())
+        if self.fail_on and self.fail_on in sql:
+            raise RuntimeError(f"failed: {sql}")
+        if "reltuples" in sql:
+            self.result = (self.rows,)
+        elif "pg_am" in sql:
+            self.result = self.index
+
+    def fetchone(self):
+        return self.result
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakePool:
+    """Pool handing out a single fake connection."""
+
+    def __init__(self, rows, index=None):
+        self._cursor = FakeCursor(rows, index)
+        self.autocommit = False
+        self.closed = 0
+
+    @contextmanager
+    def connection(self, label="query"):
+        yield self
+
+    def cursor(self):
+        return self._cursor
+
+
+def test_derive_ivfflat_lists():
+    """lists grows as rows/1000, then sqrt(rows), with a lower bound."""
+    assert derive_index_params("ivfflat", 0)["lists"] == 10
+    assert derive_index_params("ivfflat", 500_000)["lists"] == 500
+    assert derive_index_params("ivfflat", 4_000_000)["lists"] == 2000
+
+
+def test_plan_detects_missing_and_drifted_index():
+    """Only missing, invalid or drifted indexes are scheduled for a build."""
+    assert IndexManager(FakePool(1000), method="ivfflat").plan()["action"] == "create"
+
+    fresh = ("ivfflat", ["lists=500"], True)
+    assert IndexManager(FakePool(600_000, fresh), method="ivfflat").plan()["action"] == "none"
+
+    grown = ("ivfflat", ["lists=100"], True)
+    plan = IndexManager(FakePool(600_000, grown), method="ivfflat").plan()
+    assert plan["action"] == "rebuild" and plan["desired"] == {"lists": 600}
+
+    invalid = ("hnsw", ["m=16", "ef_construction=64"], False)
+    assert IndexManager(FakePool(1000, invalid), method="hnsw").plan()["action"] == "rebuild"
+
+    switched = ("ivfflat", ["lists=100"], True)
+    assert IndexManager(FakePool(1000, switched), method="hnsw").plan()["action"] == "rebuild"
+
+
+def test_search_settings_are_transaction_local():
+    """Per-query knobs are applied with set_config(..., is_local => true)."""
+    statements = search_settings(probes=10, ef_search=80)
+    assert statements == [
+        ("SELECT set_config('ivfflat.probes', %s, true);", ["10"]),
+        ("SELECT set_config('hnsw.ef_search', %s, true);", ["80"]),
+    ]
+
+
+def test_build_settings_do_not_leak_into_the_pool():
+    """Session-level build settings are reset before the connection goes back, even on failure."""
+    pool = FakePool(1000)
+    IndexManager(pool, method="ivfflat").ensure()
+    statements = pool._cursor.statements
+    assert statements[-2:] == ["RESET maintenance_work_mem;", "RESET max_parallel_maintenance_workers;"]
+    assert pool.autocommit is False
+
+    pool = FakePool(1000)
+    pool._cursor.fail_on = "CREATE INDEX"
+    with pytest.raises(RuntimeError):
+        IndexManager(pool, method="ivfflat").ensure()
+    assert pool._cursor.statements[-2:] == ["RESET maintenance_work_mem;", "RESET max_parallel_maintenance_workers;"]
+    assert pool.autocommit is False
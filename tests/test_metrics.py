@@ -0,0 +1,92 @@
+"""Tests for the Prometheus metrics."""
+
+import os
+import subprocess
+import sys
+
+from prometheus_client import REGISTRY, CollectorRegistry, generate_latest
+
+from src.utils import metrics
+from src.utils.metrics import StatsCollector, export_ingest_metrics, observe_openai, timed
+
+
+class FakePool:
+    def stats(self):
+        return {"idle": 3, "in_use": 2, "max_size": 10, "checkouts": 42, "wait_seconds_total": 1.5, "timeouts": 1}
+
+
+class FakeUsage:
+    prompt_tokens = 900
+    completion_tokens = 150
+
+
+def test_caches_and_pools_are_read_at_scrape_time(monkeypatch):
+    monkeypatch.setattr(metrics, "connection_pools", lambda: {"musartao@localhost": FakePool()})
+    collector = StatsCollector()
+    registry = CollectorRegistry()
+    registry.register(collector)
+    stats = {"hits": 0, "misses": 0, "size": 0}
+    collector.register_cache("answer", lambda: dict(stats))
+    collector.register_cache("broken", lambda: 1 / 0)
+
+    stats.update(hits=7, misses=3, size=5)
+    text = generate_latest(registry).decode()
+    assert 'pragi_cache_hits_total{cache="answer"} 7.0' in text
+    assert 'pragi_cache_misses_total{cache="answer"} 3.0' in text
+    assert 'pragi_cache_entries{cache="answer"} 5.0' in text
+    assert 'cache="broken"' not in text
+    assert 'pragi_db_pool_connections{pool="musartao@localhost",state="in_use"} 2.0' in text
+    assert 'pragi_db_pool_wait_seconds_total{pool="musartao@localhost"} 1.5' in text
+
+
+def test_latency_and_token_histograms():
+    def count(name, labels):
+        return REGISTRY.get_sample_value(name, labels) or 0.0
+
+    before = count("pragi_embedding_seconds_count", {"kind": "query"})
+    encode = timed(metrics.QUERY_EMBEDDING_SECONDS, lambda text: [0.0] * 3)
+    assert encode("Herrschaft") == [0.0] * 3
+    assert count("pragi_embedding_seconds_count", {"kind": "query"}) == before + 1
+
+    tokens = count("pragi_openai_tokens_sum", {"model": "gpt-test", "type": "prompt"})
+    observe_openai("gpt-test", False, 1.2, FakeUsage())
+    observe_openai("gpt-test", True, 0.4)
+    assert count("pragi_openai_tokens_sum", {"model": "gpt-test", "type": "prompt"}) == tokens + 900
+    assert count("pragi_openai_seconds_count", {"model": "gpt-test", "stream": "true"}) >= 1
+
+
+def test_ingest_throughput_is_written_to_textfile(tmp_path):
+    stats = {
+        "extract": {"items_per_second": 2.0, "utilization": 0.9, "errors": 1},
+        "embed": {"items_per_second": 1.5, "utilization": 0.5, "errors": 0},
+        "totals": {"files": 4, "skipped_files": 0, "pages": 120, "documents": 600},
+        "seconds": 60.0,
+    }
+    path = tmp_path / "pragi_ingest.prom"
+    export_ingest_metrics(stats, textfile=str(path), pushgateway=None)
+
+    text = path.read_text()
+    assert "pragi_ingest_pages_per_second 2.0" in text
+    assert "pragi_ingest_chunks_per_second 10.0" in text
+    assert 'pragi_ingest_stage_items_per_second{stage="extract"} 2.0' in text
+    assert 'pragi_ingest_stage_errors{stage="extract"} 1.0' in text
+
+
+def test_multiprocess_scrape_merges_workers(tmp_path, monkeypatch):
+    """Counters written by other workers are served next to this process's cache statistics."""
+    worker = (
+        "from prometheus_client import Counter\n"
+        "Counter('pragi_openai_rate_limit_retries', 'retries', ['model']).labels(model='gpt-test').inc(2)\n"
+    )
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", worker], check=True,
+                       env=dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path)))
+    monkeypatch.setitem(metrics.METRICS_CONFIG, 'multiprocess_dir', str(tmp_path))
+    monkeypatch.setattr(metrics, "connection_pools", lambda: {})
+    monkeypatch.setattr(metrics._collector, "_caches", {})
+    metrics.register_cache("answer", lambda: {"hits": 1, "misses": 0, "size": 1})
+
+    body, content_type = metrics.metrics_response()
+    text = body.decode()
+    assert 'pragi_openai_rate_limit_retries_total{model="gpt-test"} 4.0' in text
+    assert 'pragi_cache_hits_total{cache="answer"} 1.0' in text
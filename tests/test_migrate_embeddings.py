@@ -0,0 +1,90 @@
+"""Tests for the resumable embedding migration."""
+
+from contextlib import contextmanager
+
+import numpy as np
+import pytest
+
+from src.database.migrate_embeddings import EmbeddingMigration, retarget_index
+
+
+class FakePool:
+    """Connections whose cursors record the checkpoint updates."""
+
+    def __init__(self):
+        self.checkpoints = []
+
+    @contextmanager
+    def connection(self, label="query"):
+        yield self
+
+    def cursor(self):
+        return self
+
+    def commit(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        if "UPDATE embedding_migrations" in sql:
+            self.checkpoints.append(params[0])
+
+
+class FakeModel:
+    def encode(self, texts, **kwargs):
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+
+class FakeMigration(EmbeddingMigration):
+    model = FakeModel()
+
+
+def make_migration(pool, written, fail_on=None):
+    migration = FakeMigration(pool, "new-model", batch_size=2, queue_size=1)
+
+    def write_page(cur, page, embeddings):
+        if page[0][0] == fail_on:
+            raise RuntimeError("connection lost")
+        written.extend(doc_id for doc_id, _ in page)
+
+    migration._write_page = write_page
+    return migration
+
+
+def test_pages_are_written_in_order_with_a_checkpoint_each():
+    """The checkpoint follows the last id of every written page."""
+    pool, written = FakePool(), []
+    migration = make_migration(pool, written)
+    pages = [[(1, "a"), (2, "b")], [(5, "c"), (8, "d")], [(9, "e")]]
+
+    assert migration._process(iter(pages), checkpoint=True) == 5
+    assert written == [1, 2, 5, 8, 9]
+    assert pool.checkpoints == [2, 8, 9]
+
+
+def test_failed_page_stops_the_checkpoint_before_it():
+    """No page after a failed one is written, so resuming cannot skip rows."""
+    pool, written = FakePool(), []
+    migration = make_migration(pool, written, fail_on=5)
+    pages = [[(1, "a"), (2, "b")], [(5, "c"), (8, "d")], [(9, "e")], [(10, "f")]]
+
+    with pytest.raises(ValueError, match="connection lost"):
+        migration._process(iter(pages), checkpoint=True)
+    assert written == [1, 2]
+    assert pool.checkpoints == [2]
+
+
+def test_retarget_index_builds_a_concurrent_copy_on_the_target():
+    definition = (
+        "CREATE UNIQUE INDEX documents_source_chunk_idx ON public.documents "
+        "USING btree (source, chunk_index) WHERE (source IS NOT NULL)"
+    )
+    assert retarget_index(definition, "documents_source_chunk_idx", "documents", "documents_new") == (
+        "CREATE UNIQUE INDEX CONCURRENTLY documents_source_chunk_idx_next ON documents_new "
+        "USING btree (source, chunk_index) WHERE (source IS NOT NULL)"
+    )
@@ -0,0 +1,96 @@
+"""Tests for versioned schema migrations."""
+
+from contextlib import contextmanager
+
+import pytest
+
+from src.database import migrations
+from src.database.migrations import Migration, SchemaVersionError, check_schema, migrate
+
+
+class FakeDatabase:
+    """Records statements and tracks applied migration versions."""
+
+    def __init__(self, versions=()):
+        self.versions = set(versions)
+        self.has_table = bool(self.versions)
+        self.statements = []
+        self.autocommit = False
+        self.result = None
+
+    @contextmanager
+    def connection(self, label="query"):
+        yield self
+
+    def cursor(self):
+        return self
+
+    def commit(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql.strip())
+        if "to_regclass" in sql:
+            self.result = (self.has_table,)
+        elif "MAX(version)" in sql:
+            self.result = (max(self.versions, default=0),)
+        elif "CREATE TABLE IF NOT EXISTS schema_migrations" in sql:
+            self.has_table = True
+        elif sql.startswith("INSERT INTO schema_migrations"):
+            self.versions.add(params[0])
+
+    def fetchone(self):
+        return self.result
+
+
+@pytest.fixture
+def steps(monkeypatch):
+    """Replace the migration list with two trivial steps."""
+    called = []
+    fake = [
+        Migration(1, "first", ["CREATE TABLE a ();"]),
+        Migration(2, "second", lambda pool: called.append(pool)),
+    ]
+    monkeypatch.setattr(migrations, "MIGRATIONS", fake)
+    monkeypatch.setattr(migrations, "SCHEMA_VERSION", 2)
+    return called
+
+
+def test_check_schema_fails_when_behind(steps):
+    """Startup refuses to run against an old schema unless asked to migrate."""
+    db = FakeDatabase(versions=[1])
+    with pytest.raises(SchemaVersionError):
+        check_schema(db)
+    assert check_schema(db, auto_migrate=True) == 2
+
+
+def test_migrate_applies_only_pending_steps(steps):
+    """Applied versions are skipped and callables receive the pool."""
+    db = FakeDatabase(versions=[1])
+    applied = migrate(db)
+    assert [step["version"] for step in applied] == [2]
+    assert steps == [db]
+    assert "CREATE TABLE a ();" not in db.statements
+    assert migrate(db) == []
+    assert db.statements[-1].startswith("SELECT pg_advisory_unlock")
+
+
+def test_vector_db_checks_schema_on_first_use(steps, monkeypatch):
+    """Constructing the database runs no queries; the first pool use checks the schema."""
+    from src.database import postgres_vector_db
+
+    db = FakeDatabase(versions=[1])
+    monkeypatch.setattr(postgres_vector_db, "get_connection_pool", lambda params: db)
+    vector_db = postgres_vector_db.PostgreSQLVectorDB()
+    assert db.statements == [] and vector_db.schema_version is None
+
+    with pytest.raises(ValueError, match="expected 2"):
+        vector_db.pool
+    vector_db.auto_migrate = True
+    assert vector_db.pool is db and vector_db.schema_version == 2
@@ -0,0 +1,41 @@
+"""Tests for the shared model registry."""
+
+import threading
+import time
+
+from src.utils.model_registry import ModelRegistry
+
+
+def test_model_is_loaded_once_across_threads():
+    """Concurrent first requests share a single load."""
+    registry = ModelRegistry()
+    loads = []
+
+    def loader():
+        loads.append(1)
+        time.sleep(0.05)
+        return object()
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(registry.get(("embedding", "test"), loader)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(loads) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_stats_report_load_time_and_memory():
+    """Each loaded model reports its load time and RSS growth."""
+    registry = ModelRegistry()
+    registry.get(("tokenizer", "test"), lambda: bytearray(8 * 2**20))
+    stats = registry.stats()
+    assert stats["rss_bytes"] > 0
+    assert stats["models"]["tokenizer:test"]["load_seconds"] >= 0
+    assert "rss_delta_bytes" in stats["models"]["tokenizer:test"]
+    assert registry.loaded(("tokenizer", "test"))
@@ -0,0 +1,63 @@
+"""Tests for the concurrent OCR fallback (Tesseract itself is replaced)."""
+
+import io
+import random
+import threading
+import time
+
+import pytest
+
+fitz = pytest.importorskip("fitz")
+
+from src.processing import ocr
+
+
+@pytest.fixture
+def scanned_pdf(tmp_path):
+    """A 12-page PDF whose pages are numbered in their text."""
+    path = tmp_path / "scan.pdf"
+    doc = fitz.open()
+    for number in range(1, 13):
+        page = doc.new_page(width=595, height=842)
+        page.insert_text((72, 72), f"Page {number}")
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def test_pages_come_back_in_order_with_bounded_memory(scanned_pdf, monkeypatch):
+    """Pages finishing out of order are still yielded in order, with few pages in flight."""
+    lock = threading.Lock()
+    state = {"rendered": 0, "recognized": 0, "max_in_flight": 0}
+    render_page = ocr.render_page
+
+    def counting_render(page, dpi=None, max_pixels=None):
+        with lock:
+            state["rendered"] += 1
+            state["max_in_flight"] = max(state["max_in_flight"], state["rendered"] - state["recognized"])
+        return render_page(page, dpi, max_pixels)
+
+    def fake_tesseract(image, lang):
+        time.sleep(random.uniform(0, 0.02))
+        with lock:
+            state["recognized"] += 1
+        return f"{lang} {image.mode}"
+
+    monkeypatch.setattr(ocr, "render_page", counting_render)
+    monkeypatch.setattr(ocr.pytesseract, "image_to_string", fake_tesseract)
+
+    pages = list(ocr.ocr_pages(scanned_pdf, "deu", start_page=2, workers=2, dpi=50))
+    assert [number for number, _ in pages] == list(range(3, 13))
+    assert all(text == "deu L" for _, text in pages)
+    assert state["max_in_flight"] <= 2 * 2 + 1
+
+
+def test_render_page_caps_pixels(scanned_pdf):
+    """Oversized renders fall back to a lower DPI and stay uncompressed."""
+    with fitz.open(scanned_pdf) as doc:
+        image = ocr.render_page(doc[0], dpi=300, max_pixels=1_000_000)
+    assert image.mode == "L"
+    assert image.width * image.height <= 1_000_000
+    buffer = io.BytesIO()
+    image.save(buffer, format=image.format)
+    assert buffer.getvalue().startswith(b"P5")
@@ -0,0 +1,80 @@
+"""Tests for page-parallel PDF text extraction."""
+
+from concurrent.futures import Future
+
+import fitz
+import pytest
+
+from src.processing import pdf_processor
+from src.processing.pdf_processor import PDFProcessor, extraction_executor
+
+
+def make_pdf(path, pages):
+    doc = fitz.open()
+    for number in range(1, pages + 1):
+        doc.new_page().insert_text((72, 72), f"Seite {number} der Wirtschaft und Gesellschaft.")
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+class LazyFuture(Future):
+    """A future that runs its task only when its result is asked for."""
+
+    def __init__(self, fn, args):
+        super().__init__()
+        self.fn, self.args = fn, args
+
+    def result(self, timeout=None):
+        if not self.done():
+            self.set_result(self.fn(*self.args))
+        return super().result(timeout)
+
+
+class RecordingExecutor:
+    def __init__(self):
+        self.futures = []
+
+    def submit(self, fn, *args):
+        self.futures.append(LazyFuture(fn, args))
+        return self.futures[-1]
+
+
+@pytest.fixture
+def processor():
+    return PDFProcessor()
+
+
+def test_sharded_pages_match_the_serial_path(processor, tmp_path):
+    """Pages come back in order with the same text whatever the sharding."""
+    path = make_pdf(tmp_path / "book.pdf", 40)
+    serial = list(processor.iter_pages(path, workers=1))
+    assert [number for number, _ in serial] == list(range(1, 41))
+    assert "Seite 17 " in serial[16][1]
+
+    assert list(processor.iter_pages(path, workers=3, pages_per_task=4)) == serial
+    with extraction_executor(2) as executor:
+        assert list(processor.iter_pages(path, start_page=5, pages_per_task=3, executor=executor)) == serial[5:]
+
+
+def test_small_pdfs_are_extracted_in_process(processor, tmp_path, monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("no process pool for a small PDF")
+
+    monkeypatch.setattr(pdf_processor, "extraction_executor", no_pool)
+    path = make_pdf(tmp_path / "essay.pdf", 6)
+    pages = list(processor.iter_pages(path, workers=4, pages_per_task=2))
+    assert [number for number, _ in pages] == [1, 2, 3, 4, 5, 6]
+
+
+def test_closing_early_cancels_pending_shards(processor, tmp_path):
+    """At most 2 * workers shards are in flight, and unread ones are cancelled."""
+    path = make_pdf(tmp_path / "book.pdf", 40)
+    executor = RecordingExecutor()
+    pages = processor.iter_pages(path, workers=2, pages_per_task=2, executor=executor)
+
+    assert next(pages)[0] == 1
+    assert len(executor.futures) == 4
+    pages.close()
+    assert executor.futures[0].done() and not executor.futures[0].cancelled()
+    assert all(future.cancelled() for future in executor.futures[1:])
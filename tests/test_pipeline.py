@@ -0,0 +1,80 @@
+"""Tests for the staged pipeline engine and its checkpoints."""
+
+import os
+import threading
+import time
+
+from src.processing.pipeline import Checkpoint, Pipeline, Stage
+
+
+def test_stages_overlap_and_count_errors():
+    """Every item passes every stage; failures and drops are counted, not fatal."""
+    active = {"extract": 0, "write": 0}
+    overlap = threading.Event()
+    lock = threading.Lock()
+
+    def timed(name, function):
+        def run(item):
+            with lock:
+                active[name] += 1
+                if all(active.values()):
+                    overlap.set()
+            time.sleep(0.005)
+            with lock:
+                active[name] -= 1
+            return function(item)
+        return run
+
+    def extract(n):
+        if n == 3:
+            raise ValueError("unreadable")
+        return n * 10
+
+    pipeline = Pipeline([
+        Stage("extract", timed("extract", extract), workers=3),
+        Stage("filter", lambda n: None if n == 50 else n),
+        Stage("write", timed("write", lambda n: n + 1), workers=2),
+    ], queue_size=2)
+    results = sorted(pipeline.run(range(10)))
+
+    assert results == [n * 10 + 1 for n in range(10) if n not in (3, 5)]
+    assert overlap.is_set()
+    stats = pipeline.stats()
+    assert stats["extract"]["processed"] == 10 and stats["extract"]["errors"] == 1
+    assert stats["filter"]["dropped"] == 1
+    assert stats["write"]["processed"] == 8
+    assert all(stage["max_queued"] <= 2 for stage in stats.values())
+
+
+def test_cancel_finishes_items_in_flight():
+    """After cancel no new items are fed, but fed items still come out."""
+    pipeline = Pipeline([Stage("slow", lambda n: (time.sleep(0.01), n)[1])], queue_size=1)
+    results = []
+    for item in pipeline.run(iter(range(1000))):
+        results.append(item)
+        if item == 2:
+            pipeline.cancel()
+
+    assert pipeline.cancelled
+    assert results == list(range(len(results)))
+    assert len(results) == pipeline.fed < 10
+
+
+def test_checkpoint_survives_restart_and_detects_changes(tmp_path):
+    """Finished files are remembered across instances until they change."""
+    book = tmp_path / "weber.pdf"
+    book.write_bytes(b"%PDF Wirtschaft und Gesellschaft")
+    path = tmp_path / "ingest.checkpoint"
+
+    checkpoint = Checkpoint(str(path))
+    assert not checkpoint.done(str(book))
+    checkpoint.mark(str(book), documents=3)
+    with open(path, "a") as f:
+        f.write('{"key": "cut sho')  # Interrupted write
+
+    reloaded = Checkpoint(str(path))
+    assert reloaded.done(str(book)) and len(reloaded) == 1
+
+    book.write_bytes(b"%PDF Wirtschaft und Gesellschaft, 5. Auflage")
+    os.utime(book, ns=(0, 10**18))
+    assert not reloaded.done(str(book))
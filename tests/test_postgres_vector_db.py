@@ -0,0 +1,125 @@
+"""Tests for batched, overlapped document ingestion in PostgreSQLVectorDB."""
+
+import threading
+
+import numpy as np
+import psycopg2.extensions
+import pytest
+
+from src.database import postgres_vector_db
+from src.database.connection_pool import ConnectionPool
+from src.processing.rag_document import RAGDocument
+
+
+class FakeConnection:
+    """Keeps inserted rows pending until commit, like a transaction."""
+
+    def __init__(self):
+        self.closed = 0
+        self.status = psycopg2.extensions.STATUS_READY
+        self.pending = []
+        self.committed = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def commit(self):
+        self.commits += 1
+        self.committed.extend(self.pending)
+        self.pending = []
+        self.status = psycopg2.extensions.STATUS_READY
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.pending = []
+        self.status = psycopg2.extensions.STATUS_READY
+
+    def close(self):
+        self.closed = 1
+
+
+class FakeModel:
+    def __init__(self):
+        self.batches = []
+
+    def encode(self, texts, batch_size=None, convert_to_numpy=True, show_progress_bar=False):
+        self.batches.append(list(texts))
+        return np.array([[float(len(text)), 1.0] for text in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """A database over one fake connection, a fake model and a fake execute_values."""
+    conn = FakeConnection()
+    pool = ConnectionPool({"dbname": "test"}, min_size=0, max_size=1, connection_factory=lambda **params: conn)
+    model = FakeModel()
+    writes = {"threads": [], "fail_on": None}
+
+    def execute_values(cur, query, data, template=None, page_size=None, fetch=False):
+        writes["threads"].append(threading.current_thread().name)
+        if writes["fail_on"] is not None and len(writes["threads"]) == writes["fail_on"]:
+            raise RuntimeError("disk full")
+        first = len(cur.pending) + len(cur.committed) + 1
+        cur.pending.extend(data)
+        cur.status = psycopg2.extensions.STATUS_BEGIN
+        return [(first + i,) for i in range(len(data))]
+
+    monkeypatch.setattr(postgres_vector_db, "get_connection_pool", lambda params: pool)
+    monkeypatch.setattr(postgres_vector_db, "get_embedding_model", lambda name: model)
+    monkeypatch.setattr(postgres_vector_db, "execute_values", execute_values)
+    vector_db = postgres_vector_db.PostgreSQLVectorDB()
+    vector_db.schema_version = 1  # Pretend the schema check already ran
+    return vector_db, conn, model, writes
+
+
+def documents(count):
+    return [RAGDocument(text=f"Kapitel {i} " + "x" * i, metadata={"chunk_index": i}) for i in range(count)]
+
+
+def test_batches_are_encoded_and_written_in_order(db):
+    """Each batch is one encode call; writes run on the writer thread; IDs keep document order."""
+    vector_db, conn, model, writes = db
+    docs = documents(7)
+
+    doc_ids = vector_db.add_documents(docs, batch_size=3)
+
+    assert [len(batch) for batch in model.batches] == [3, 3, 1]
+    assert doc_ids == [str(i) for i in range(1, 8)]
+    assert [row[0] for row in conn.committed] == [doc.text for doc in docs]
+    assert [row[3] for row in conn.committed] == [[float(len(doc.text)), 1.0] for doc in docs]
+    assert conn.commits == 1
+    assert all(name.startswith("add_documents") for name in writes["threads"]) and len(writes["threads"]) == 3
+    assert vector_db.last_ingest_stats["documents"] == 7
+
+
+def test_precomputed_embeddings_skip_the_model(db):
+    vector_db, conn, model, writes = db
+    docs = documents(5)
+    embeddings = np.arange(10, dtype=np.float32).reshape(5, 2)
+
+    doc_ids = vector_db.add_documents(docs, batch_size=2, embeddings=embeddings)
+
+    assert model.batches == []
+    assert len(doc_ids) == 5 and len(writes["threads"]) == 3
+    assert [row[3] for row in conn.committed] == embeddings.tolist()
+
+
+def test_failed_batch_rolls_back_every_batch(db):
+    """All batches share one transaction: a failing write leaves nothing behind."""
+    vector_db, conn, model, writes = db
+    writes["fail_on"] = 2
+
+    with pytest.raises(ValueError, match="disk full"):
+        vector_db.add_documents(documents(6), batch_size=2)
+
+    assert conn.committed == [] and conn.pending == []
+    assert conn.commits == 0 and conn.rollbacks == 1
+    assert vector_db.pool_stats()["idle"] == 1  # The connection went back to the pool
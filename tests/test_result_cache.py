@@ -0,0 +1,46 @@
+"""Tests for the search result cache."""
+
+import numpy as np
+
+from src.database.result_cache import SearchResultCache
+
+
+def test_key_canonicalizes_filter():
+    """Filters with the same content but different key order share a key."""
+    embedding = np.ones(4, dtype=np.float32)
+    key_a = SearchResultCache.make_key(embedding, 5, {"author": "Weber", "type": "book"})
+    key_b = SearchResultCache.make_key(embedding, 5, {"type": "book", "author": "Weber"})
+    assert key_a == key_b
+    assert key_a != SearchResultCache.make_key(embedding, 10, {"type": "book", "author": "Weber"})
+    assert key_a != SearchResultCache.make_key(embedding * 2, 5, {"type": "book", "author": "Weber"})
+
+
+def test_hit_and_invalidate():
+    """Writes bump the generation and drop cached results."""
+    cache = SearchResultCache(max_size=10, ttl=60)
+    key = cache.make_key(np.zeros(4), 5)
+    cache.put(key, [("doc", 0.9)], cache.generation)
+    assert cache.get(key) == [("doc", 0.9)]
+    cache.invalidate()
+    assert cache.get(key) is None
+    assert cache.stats()["generation"] == 1
+
+
+def test_results_from_before_a_write_are_not_stored():
+    """A search that started before a write cannot repopulate the cache."""
+    cache = SearchResultCache(max_size=10, ttl=60)
+    key = cache.make_key(np.zeros(4), 5)
+    generation = cache.generation
+    cache.invalidate()
+    cache.put(key, [("stale", 0.5)], generation)
+    assert cache.get(key) is None
+
+
+def test_size_bound():
+    """The cache never holds more than max_size result sets."""
+    cache = SearchResultCache(max_size=2, ttl=60)
+    keys = [cache.make_key(np.full(4, i), 5) for i in range(3)]
+    for key in keys:
+        cache.put(key, [], cache.generation)
+    assert cache.stats()["size"] == 2
+    assert cache.get(keys[0]) is None
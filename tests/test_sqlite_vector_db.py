@@ -0,0 +1,145 @@
+"""Tests for the memory-mapped search in SQLiteVectorDB."""
+
+import asyncio
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.database.sqlite_vector_db import SQLiteVectorDB
+
+
+@pytest.fixture(scope="function")
+def db_path():
+    """Create a temporary database path."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield str(Path(temp_dir) / "test.db")
+
+
+def make_doc(doc_id, embedding):
+    """Build a document dictionary with the given embedding."""
+    return {
+        'id': doc_id,
+        'content': f"content of {doc_id}",
+        'metadata': {'source': doc_id},
+        'embedding': list(embedding)
+    }
+
+
+def brute_force(docs, query, limit):
+    """Reference cosine ranking over plain Python lists."""
+    query = np.asarray(query, dtype=np.float32)
+    scored = []
+    for doc in docs:
+        vector = np.asarray(doc['embedding'], dtype=np.float32)
+        scored.append((float(vector @ query / (np.linalg.norm(vector) * np.linalg.norm(query))), doc['id']))
+    scored.sort(reverse=True)
+    return [doc_id for _, doc_id in scored[:limit]]
+
+
+@pytest.mark.asyncio
+async def test_search_matches_brute_force(db_path):
+    """Top-k results match a reference ranking and carry content and metadata."""
+    rng = np.random.default_rng(0)
+    docs = [make_doc(f"doc{i}", rng.normal(size=16)) for i in range(200)]
+    db = SQLiteVectorDB(db_path)
+    await db.init_db()
+    await db.add_documents(docs)
+
+    query = rng.normal(size=16)
+    results = await db.search_documents(query.tolist(), limit=5)
+    assert [r['id'] for r in results] == brute_force(docs, query, 5)
+    assert results[0]['content'] == f"content of {results[0]['id']}"
+    assert results[0]['metadata'] == {'source': results[0]['id']}
+    assert results[0]['similarity'] >= results[-1]['similarity']
+
+
+@pytest.mark.asyncio
+async def test_replace_and_delete(db_path):
+    """Replacing a document reuses its row and deleted documents are never returned."""
+    db = SQLiteVectorDB(db_path)
+    await db.init_db()
+    await db.add_documents([make_doc("a", [1, 0, 0]), make_doc("b", [0, 1, 0]), make_doc("c", [0, 0, 1])])
+    await db.add_documents([make_doc("a", [0, 0, 1])])
+    assert db.matrix.count == 3
+
+    results = await db.search_documents([0, 0, 1], limit=2)
+    assert {r['id'] for r in results} == {"a", "c"}
+
+    await db.delete_documents(["c"])
+    results = await db.search_documents([0, 0, 1], limit=3)
+    assert [r['id'] for r in results][0] == "a"
+    assert "c" not in [r['id'] for r in results]
+
+
+@pytest.mark.asyncio
+async def test_reopen_and_rebuild(db_path):
+    """A new instance reuses the matrix file, and rebuilds it when it is stale or missing."""
+    db = SQLiteVectorDB(db_path)
+    await db.init_db()
+    await db.add_documents([make_doc("a", [1, 0]), make_doc("b", [0, 1])])
+
+    reopened = SQLiteVectorDB(db_path)
+    await reopened.init_db()
+    assert [r['id'] for r in await reopened.search_documents([0, 1], limit=1)] == ["b"]
+
+    # A write by another instance makes the first one's matrix stale
+    await reopened.add_documents([make_doc("c", [0, 2])])
+    results = await db.search_documents([0, 1], limit=3)
+    assert {r['id'] for r in results} == {"a", "b", "c"}
+
+    os.remove(f"{db_path}.vectors.npy")
+    os.remove(f"{db_path}.vectors.npy.json")
+    rebuilt = SQLiteVectorDB(db_path)
+    await rebuilt.init_db()
+    assert rebuilt.matrix.count == 3
+    assert [r['id'] for r in await rebuilt.search_documents([1, 0], limit=1)] == ["a"]
+
+
+class DeleteOnRelease:
+    """Wraps the database lock to run a compacting delete as soon as a search releases it."""
+
+    def __init__(self, db, doc_ids):
+        self.lock = db._lock
+        self.delete = lambda: asyncio.run(db.delete_documents(doc_ids))
+        self.armed = False
+
+    def __enter__(self):
+        return self.lock.__enter__()
+
+    def __exit__(self, *exc):
+        self.lock.__exit__(*exc)
+        if self.armed:
+            self.armed = False
+            deleter = threading.Thread(target=self.delete)
+            deleter.start()
+            deleter.join()
+        return False
+
+
+@pytest.mark.asyncio
+async def test_compaction_cannot_move_rows_under_a_search(db_path):
+    """A delete that compacts the matrix runs only after the scored slots have been read back."""
+    db = SQLiteVectorDB(db_path)
+    await db.init_db()
+    await db.add_documents([make_doc(f"old{i}", [0, 1]) for i in range(4)])
+    await db.add_documents([make_doc("near", [1, 0]), make_doc("far", [1, 1])])
+
+    db._lock = DeleteOnRelease(db, [f"old{i}" for i in range(4)])
+    top_k = db.matrix.top_k
+
+    def scoring(query, limit):
+        db._lock.armed = True
+        return top_k(query, limit)
+
+    db.matrix.top_k = scoring
+    results = await db.search_documents([1, 0], limit=2)
+    db.matrix.top_k = top_k
+
+    assert [r['id'] for r in results] == ["near", "far"]
+    assert results[0]['similarity'] == pytest.approx(1.0)
+    assert db.matrix.count == 2  # The delete compacted the matrix afterwards
+    assert [r['id'] for r in await db.search_documents([1, 0], limit=2)] == ["near", "far"]
@@ -0,0 +1,46 @@
+"""Tests for the bounded-queue streaming helpers."""
+
+import threading
+import time
+
+import pytest
+
+from src.utils.streaming import prefetch
+
+
+def test_prefetch_stays_bounded_ahead_of_consumer():
+    """The producer waits for a slow consumer instead of running ahead."""
+    produced = []
+
+    def produce():
+        for i in range(20):
+            produced.append(i)
+            yield i
+
+    consumed = []
+    for item in prefetch(produce(), maxsize=2):
+        time.sleep(0.005)
+        # Queued items plus the one the producer holds while blocked
+        assert len(produced) - len(consumed) <= 2 + 2
+        consumed.append(item)
+    assert consumed == list(range(20))
+
+
+def test_prefetch_raises_producer_errors_and_stops_on_close():
+    """Producer exceptions reach the consumer; closing early stops the producer."""
+    def failing():
+        yield 1
+        raise RuntimeError("extraction failed")
+
+    with pytest.raises(RuntimeError, match="extraction failed"):
+        list(prefetch(failing()))
+
+    produced = []
+    items = prefetch(iter(lambda: produced.append(1) or len(produced), None), maxsize=1)
+    assert next(items) == 1
+    items.close()
+    count = len(produced)
+    time.sleep(0.05)
+    assert len(produced) == count <= 3
+    assert not any(thread.name == "prefetch" for thread in threading.enumerate())
+
@@ -0,0 +1,43 @@
+"""Tests for the precompiled text cleaning engine."""
+
+import pytest
+
+from src.processing.text_cleaning import (
+    SAMPLE_PAGES, Rule, TextCleaner, benchmark, literal_rule, page_cleaner, text_cleaner
+)
+
+
+def test_page_cleaner_removes_markers_and_joins_hyphenation():
+    """Page markers, software headers, page numbers and section lines are dropped."""
+    cleaned = page_cleaner.clean(SAMPLE_PAGES["de"])
+    assert cleaned.startswith("Die Bürokratisierung ist das spezifische Mittel, »Gemeinschaftshandeln«")
+    for marker in ("Seite", "Kap.-Nr.", "Kapitel 3", "413", "Alle Rechte", "\n"):
+        assert marker not in cleaned
+    assert "überführen. Als" in cleaned
+
+
+def test_text_cleaner_fixes_ocr_and_bracket_spacing():
+    """Document cleaning also replaces OCR literals and tightens brackets."""
+    assert text_cleaner.clean("Groesse ( siehe [S. 3] oben ) ﬁnden\n12\n") == "Größe(siehe oben)finden"
+
+
+def test_guarded_rule_only_runs_when_literal_present():
+    """A lazy span without its terminator is left alone, with or without the guard."""
+    guarded = TextCleaner([[Rule(r"(?s:BEGIN.*?END)", requires="END"), Rule(r"x")]])
+    assert guarded.clean("a BEGIN b x") == "a BEGIN b"
+    assert guarded.clean("a BEGIN b\nEND x c") == "a c"
+
+
+def test_fused_passes_only_accept_deletions():
+    """Rules with a replacement must run in a pass of their own."""
+    with pytest.raises(ValueError):
+        TextCleaner([[Rule("a", "b"), Rule("c")]])
+    cleaner = TextCleaner([[literal_rule({"ae": "ä", "ss": "ß"})]], collapse_whitespace=False)
+    assert cleaner.clean("Maasse  aer") == "Maaße  är"
+
+
+def test_benchmark_reports_throughput():
+    """The benchmark measures every sample language."""
+    results = benchmark(size_mb=0.01)
+    assert [row["language"] for row in results] == list(SAMPLE_PAGES)
+    assert all(row["mb_per_second"] > 0 for row in results)
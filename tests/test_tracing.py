@@ -0,0 +1,84 @@
+"""Tests for request tracing."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.utils.tracing import Tracer
+
+
+def test_spans_nest_under_the_request_trace():
+    """Spans opened in called code join the active trace; outside one they are no-ops."""
+    tracer = Tracer(buffer_size=10, export_url=None)
+
+    def search():
+        with tracer.span("db.execute") as execute:
+            execute.set(rows=5)
+            return tracer.current_trace_id()
+
+    with tracer.span("ignored") as outside:
+        assert outside.trace_id is None
+    with tracer.trace("chat") as root:
+        with tracer.span("vector_db.search"):
+            assert search() == root.trace_id
+
+    (trace,) = tracer.recent()
+    names = {span["name"]: span for span in trace["spans"]}
+    assert list(names) == ["chat", "vector_db.search", "db.execute"]
+    assert names["db.execute"]["parent_id"] == names["vector_db.search"]["span_id"]
+    assert names["db.execute"]["attributes"] == {"rows": 5}
+
+
+def test_errors_ring_buffer_and_summary():
+    tracer = Tracer(buffer_size=3, export_url=None)
+    for _ in range(4):
+        with tracer.trace("chat"):
+            with tracer.span("openai.chat"):
+                pass
+    with pytest.raises(RuntimeError):
+        with tracer.trace("chat"):
+            with tracer.span("openai.chat"):
+                raise RuntimeError("rate limited")
+
+    traces = tracer.recent()
+    assert len(traces) == 3
+    assert traces[0]["error"] == "RuntimeError: rate limited"
+    assert traces[0]["spans"][1]["error"] == "RuntimeError: rate limited"
+    assert tracer.summary()["openai.chat"]["count"] == 3
+
+
+def test_traces_are_exported_as_otlp_json():
+    received = []
+
+    class Collector(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Collector)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        tracer = Tracer(export_url=f"http://127.0.0.1:{server.server_port}/v1/traces", service_name="pragi")
+        with tracer.trace("chat", user="anna"):
+            with tracer.span("context.pack"):
+                pass
+        deadline = time.monotonic() + 5
+        while not received and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        server.shutdown()
+
+    (resource,) = received[0]["resourceSpans"]
+    assert resource["resource"]["attributes"][0]["value"] == {"stringValue": "pragi"}
+    root, child = resource["scopeSpans"][0]["spans"]
+    assert len(root["traceId"]) == 32 and child["traceId"] == root["traceId"]
+    assert child["parentSpanId"] == root["spanId"] and "parentSpanId" not in root
+    assert root["attributes"] == [{"key": "user", "value": {"stringValue": "anna"}}]
+    assert int(child["endTimeUnixNano"]) >= int(child["startTimeUnixNano"])